@@ -1,12 +1,32 @@
-"""Core module for autonomous ASP data collection."""
+"""Core module for autonomous ASP data collection.
 
-from .database import SupabaseClient
-from .browser import BrowserController
-from .ai_client import GeminiClient
-from .claude_client import ClaudeClient
-from .orchestrator import AgentLoop
-from .notifier import Notifier
-from .scenario_loader import ScenarioLoader, get_scenario_loader
+Public names are resolved lazily (PEP 562) so that ``import core`` does not
+pull in Playwright, Supabase, or the LLM SDKs until they are actually used.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .database import SupabaseClient
+    from .browser import BrowserController
+    from .ai_client import GeminiClient
+    from .claude_client import ClaudeClient
+    from .orchestrator import AgentLoop
+    from .notifier import Notifier
+    from .scenario_loader import ScenarioLoader, get_scenario_loader
+
+# Public name -> submodule that defines it
+_LAZY_ATTRS = {
+    "SupabaseClient": ".database",
+    "BrowserController": ".browser",
+    "GeminiClient": ".ai_client",
+    "ClaudeClient": ".claude_client",
+    "AgentLoop": ".orchestrator",
+    "Notifier": ".notifier",
+    "ScenarioLoader": ".scenario_loader",
+    "get_scenario_loader": ".scenario_loader",
+}
 
 __all__ = [
     "SupabaseClient",
@@ -18,3 +38,19 @@ __all__ = [
     "ScenarioLoader",
     "get_scenario_loader",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import the submodule backing ``name`` on first access."""
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Cache on the package so later lookups bypass __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,270 @@
+"""Timeouts and waits learned from the observed latency of each step.
+
+Every measured step (an orchestrator command, or a ``BaseScraper.settle``
+wait) records its duration per (asp, step) in a local SQLite file. The
+timeout of the next run is a high quantile of the recent samples times a
+margin, clamped to ``[floor_ms, ceiling_ms]``:
+
+    timeout = clamp(p99(last 200 samples) * 1.5, 1000, 60000)
+
+Until a step has ``min_samples`` successful samples, the value written in the
+scraper or scenario (e.g. ``wait_for_timeout(8000)``, ``milliseconds: 5000``)
+is used as the cold-start default.
+
+The quantile only uses steps that finished (``ok``). A timed-out step only
+says the limit was too short, not how long the step takes, so feeding it back
+as a sample would ratchet the limit up to the ceiling. Instead, each timeout
+among the last ``bump_window`` samples multiplies the timeout by
+``timeout_bump`` (at most ``max_bump`` in total); the bump decays as
+successful samples push the timeouts out of the window:
+
+    timeout = clamp(p99(ok samples) * 1.5 * min(1.5 ** recent_timeouts, 3), 1000, 60000)
+
+Waits become "settle" waits: a short fixed pause, then until the network is
+idle, for at most the learned timeout. Fast sites stop paying the worst case
+of slow ones.
+
+Settings come from the ``timeouts`` section of the scenario YAML or
+``BaseScraper.TIMEOUTS``:
+
+    timeouts:
+      adaptive: true      # false keeps the fixed values
+      quantile: 0.99
+      margin: 1.5
+      floor_ms: 1000
+      ceiling_ms: 60000
+      timeout_bump: 1.5   # factor per recent timeout
+      max_bump: 3.0
+"""
+
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_PATH = Path(__file__).parent.parent / "var" / "latency.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    asp TEXT NOT NULL,
+    step TEXT NOT NULL,
+    ms REAL NOT NULL,
+    ok INTEGER NOT NULL DEFAULT 1,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_key ON samples (asp, step, id);
+"""
+
+
+def quantile(values: List[float], q: float) -> float:
+    """Nearest-rank quantile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class TimeoutConfig:
+    """How learned timeouts are derived."""
+
+    adaptive: bool = True
+    quantile: float = 0.99
+    margin: float = 1.5
+    floor_ms: int = 1000
+    ceiling_ms: int = 60000
+    # Successful samples needed before the learned value replaces the default
+    min_samples: int = 20
+    # Each timeout among the last bump_window samples multiplies the timeout
+    # by timeout_bump, up to max_bump in total
+    timeout_bump: float = 1.5
+    max_bump: float = 3.0
+    bump_window: int = 10
+    # Fixed pause before a settle wait checks for network idle
+    min_wait_ms: int = 500
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "TimeoutConfig":
+        """Build from a ``timeouts`` config section (unknown keys are ignored)."""
+        config = config or {}
+        known = {f.name for f in fields(cls)}
+        values = {}
+        for name, value in config.items():
+            if name not in known or value is None:
+                continue
+            values[name] = bool(value) if name == "adaptive" else type(getattr(cls, name))(value)
+        return cls(**values)
+
+
+def settle(page: Any, limit_ms: float, min_wait_ms: int = 500) -> Tuple[float, bool]:
+    """Wait a short pause, then until the network is idle, for at most ``limit_ms``.
+
+    Returns:
+        (elapsed milliseconds, whether the limit was reached)
+    """
+    started = time.monotonic()
+    page.wait_for_timeout(min(min_wait_ms, limit_ms))
+    remaining = limit_ms - (time.monotonic() - started) * 1000
+    timed_out = False
+    if remaining > 0:
+        try:
+            page.wait_for_load_state("networkidle", timeout=remaining)
+        except Exception:
+            # Waited the whole limit, like the fixed wait it replaces
+            timed_out = True
+    return (time.monotonic() - started) * 1000, timed_out
+
+
+class LatencyModel:
+    """Per-(asp, step) latency samples persisted in SQLite."""
+
+    def __init__(self, path: Optional[Path] = None, window: int = 200):
+        """Initialize latency model.
+
+        Args:
+            path: SQLite file. Defaults to $SCRAPER_LATENCY_PATH or var/latency.sqlite3
+            window: Samples kept per (asp, step); older ones are pruned
+        """
+        self.path = Path(path or os.getenv("SCRAPER_LATENCY_PATH") or DEFAULT_LATENCY_PATH)
+        self.window = window
+        self._cache: Dict[Tuple[str, str], List[Tuple[float, bool]]] = {}
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ==================== Samples ====================
+
+    def history(self, asp: str, step: str) -> List[Tuple[float, bool]]:
+        """Recent ``(milliseconds, ok)`` samples of a step (oldest first)."""
+        key = (asp, step)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            return list(cached)
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT ms, ok FROM samples WHERE asp = ? AND step = ? ORDER BY id DESC LIMIT ?",
+                (asp, step, self.window),
+            ).fetchall()
+        values = [(row["ms"], bool(row["ok"])) for row in reversed(rows)]
+        with self._lock:
+            self._cache[key] = values
+        return list(values)
+
+    def samples(self, asp: str, step: str) -> List[float]:
+        """Recent durations of the runs of a step that finished (oldest first)."""
+        return [ms for ms, ok in self.history(asp, step) if ok]
+
+    def recent_timeouts(self, asp: str, step: str, config: Optional[TimeoutConfig] = None) -> int:
+        """Timeouts among the last ``bump_window`` samples of a step."""
+        config = config or TimeoutConfig()
+        recent = self.history(asp, step)[-config.bump_window:] if config.bump_window > 0 else []
+        return sum(1 for _, ok in recent if not ok)
+
+    def record(self, asp: str, step: str, ms: float, ok: bool = True) -> None:
+        """Record one run of a step (``ok=False`` if it hit its timeout)."""
+        values = self.history(asp, step)
+        try:
+            with self._connect() as conn:
+                cursor = conn.execute(
+                    "INSERT INTO samples (asp, step, ms, ok, recorded_at) VALUES (?, ?, ?, ?, ?)",
+                    (asp, step, float(ms), int(ok), time.time()),
+                )
+                if cursor.lastrowid % 50 == 0:
+                    self._prune(conn)
+        except sqlite3.Error as e:
+            # Learning is best effort; never fail a scrape over it
+            logger.warning(f"Could not record latency of {asp}/{step}: {e}")
+        with self._lock:
+            self._cache[(asp, step)] = (values + [(float(ms), bool(ok))])[-self.window:]
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "DELETE FROM samples WHERE id IN ("
+            " SELECT id FROM (SELECT id, ROW_NUMBER() OVER"
+            "  (PARTITION BY asp, step ORDER BY id DESC) AS age FROM samples)"
+            " WHERE age > ?)",
+            (self.window,),
+        )
+
+    @contextmanager
+    def measure(self, asp: str, step: str) -> Iterator[None]:
+        """Record the duration of the block (failures are not recorded)."""
+        started = time.monotonic()
+        yield
+        self.record(asp, step, (time.monotonic() - started) * 1000)
+
+    # ==================== Timeouts ====================
+
+    def timeout_ms(
+        self, asp: str, step: str, default_ms: int, config: Optional[TimeoutConfig] = None
+    ) -> int:
+        """Learned timeout of a step, or ``default_ms`` until enough samples exist.
+
+        Either is raised by the bump of recent timeouts (see the module docstring).
+        """
+        config = config or TimeoutConfig()
+        if not config.adaptive:
+            return int(default_ms)
+        bump = min(config.max_bump, config.timeout_bump ** self.recent_timeouts(asp, step, config))
+        values = self.samples(asp, step)
+        if len(values) < config.min_samples:
+            # The cold-start default is kept even if it is above the ceiling
+            return int(min(max(config.ceiling_ms, default_ms), default_ms * bump))
+        learned = quantile(values, config.quantile) * config.margin * bump
+        return int(min(config.ceiling_ms, max(config.floor_ms, learned)))
+
+    def stats(self, config: Optional[TimeoutConfig] = None) -> List[Dict[str, Any]]:
+        """Summary per (asp, step): sample counts, p50, p99 and learned timeout."""
+        config = config or TimeoutConfig()
+        with self._connect() as conn:
+            keys = conn.execute("SELECT DISTINCT asp, step FROM samples ORDER BY asp, step").fetchall()
+        summary = []
+        for row in keys:
+            values = self.samples(row["asp"], row["step"])
+            if not values:
+                continue
+            learned = len(values) >= config.min_samples
+            summary.append({
+                "asp": row["asp"],
+                "step": row["step"],
+                "samples": len(values),
+                "recent_timeouts": self.recent_timeouts(row["asp"], row["step"], config),
+                "p50_ms": quantile(values, 0.5),
+                "p99_ms": quantile(values, config.quantile),
+                "timeout_ms": self.timeout_ms(row["asp"], row["step"], 0, config) if learned else None,
+            })
+        return summary
+
+
+# Singleton instance
+_model: Optional[LatencyModel] = None
+
+
+def get_latency_model() -> LatencyModel:
+    """Get singleton latency model instance."""
+    global _model
+    if _model is None:
+        _model = LatencyModel()
+    return _model
@@ -5,6 +5,8 @@ import json
 from typing import Dict, Any, Optional
 import google.generativeai as genai
 
+from . import metrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -79,7 +81,7 @@ class GeminiClient:
             logger.info("Image data included in prompt")
 
         try:
-            response = self.model.generate_content(prompt_parts)
+            response = metrics.track_llm("gemini", "interpret", self.model.generate_content, prompt_parts)
 
             # Check if response was blocked
             if not response.candidates or not response.parts:
@@ -89,7 +91,9 @@ class GeminiClient:
                 if screenshot_base64:
                     logger.info("Retrying without screenshot...")
                     prompt_parts_no_image = [self._build_interpretation_prompt(scenario_step, page_context)]
-                    response = self.model.generate_content(prompt_parts_no_image)
+                    response = metrics.track_llm(
+                        "gemini", "interpret", self.model.generate_content, prompt_parts_no_image
+                    )
 
                     if not response.candidates or not response.parts:
                         logger.error("Response still blocked after removing screenshot")
@@ -225,7 +229,7 @@ class GeminiClient:
 """
 
         try:
-            response = self.model.generate_content(prompt)
+            response = metrics.track_llm("gemini", "extract", self.model.generate_content, prompt)
             extracted_data = response.text.strip()
 
             # Remove markdown code blocks if present
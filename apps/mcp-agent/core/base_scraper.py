@@ -5,15 +5,31 @@ ASP IDとメディアIDをパラメータとして受け取り、
 認証情報はasp_credentialsテーブルから動的に取得する。
 """
 import os
+import shutil
+import tempfile
 import time
 import random
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Callable, Iterable, Iterator, Optional, Dict, Any, List
 from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext
 from supabase import create_client, Client
 
+from . import (
+    adaptive_timeouts, budget, instrumentation, metrics, parsing, profiling, response_capture, retry_policy,
+)
+from .adaptive_timeouts import TimeoutConfig, get_latency_model
+from .budget import BudgetConfig, BudgetExceeded, Deadline
+from .database import SupabaseClient
+from .instrumentation import CallStats
+from .resource_policy import ResourcePolicy
+from .retry_policy import RetryPolicy
+from .run_lock import LOCKED, RunLock
+from .spool import SPOOLED, RecordSpool, get_record_spool
+from .write_buffer import WriteBehindBuffer
+
 
 class BaseScraper(ABC):
     """
@@ -31,28 +47,94 @@ class BaseScraper(ABC):
         # 実行
         scraper = MoshimoScraper(asp_id="xxx", media_id="yyy")
         result = scraper.run_daily()
+
+    リクエストのブロック設定（フォント・動画・トラッカーはデフォルトでブロック）:
+        class HeavyAspScraper(BaseScraper):
+            RESOURCE_POLICY = {"block_types": ["image"], "allow": ["/captcha/"]}
+
+    リトライ設定（エラー種別ごとの動作、認証エラーは即失敗）:
+        class SlowAspScraper(BaseScraper):
+            RETRY_POLICY = {"delay_ms": 30000, "actions": {"parse_error": "retry"}}
+
+    時間予算（リトライを含むASP全体の上限と、操作ごとのタイムアウト）:
+        class SlowAspScraper(BaseScraper):
+            BUDGET = {"asp_seconds": 600, "action_timeout_ms": 20000}
+
+        長いループでは各周回の先頭で予算を確認し、時間切れでも取得済みの分は保存する:
+            for month in months:
+                self.check_budget(records)
+                records.extend(self._scrape_month(page, month))
+
+    固定の待ち時間の代わりに、過去の実行から学習した時間だけ待つ（core/adaptive_timeouts.py）:
+        page.click("text=日別")
+        self.settle(page, "daily_report", 5000)   # 5000ms は学習前の初期値
     """
 
+    # リソースブロック設定（core/resource_policy.py 参照、None でデフォルト）
+    RESOURCE_POLICY: Optional[Dict[str, Any]] = None
+    # リトライ設定（core/retry_policy.py 参照、試行回数は max_retries が優先）
+    RETRY_POLICY: Optional[Dict[str, Any]] = None
+    # 同じASPで同時にログインするメディア数の上限（None でランナーの設定に従う）
+    MAX_MEDIA_CONCURRENCY: Optional[int] = None
+    # 時間予算（core/budget.py 参照、None で実行全体の制限時間のみ）
+    BUDGET: Optional[Dict[str, Any]] = None
+    # 学習したタイムアウトの設定（core/adaptive_timeouts.py 参照、None でデフォルト）
+    TIMEOUTS: Optional[Dict[str, Any]] = None
+
     def __init__(
         self,
         asp_id: str,
         media_id: str,
         headless: bool = True,
-        max_retries: int = 3
+        max_retries: int = 3,
+        write_buffer: Optional["WriteBehindBuffer"] = None,
+        spool: Optional[RecordSpool] = None,
+        browser: Optional[Browser] = None,
+        run_lock: Optional[RunLock] = None,
+        db: Optional[SupabaseClient] = None
     ):
         self.asp_id = asp_id
         self.media_id = media_id
         self.headless = headless
         self.max_retries = max_retries
-
-        # Supabase接続
+        # ブラウザ再起動を伴うため、待ち時間はシナリオ単位のリトライより長め
+        self.retry_policy = RetryPolicy.from_config(
+            self.RETRY_POLICY, base_delay=10.0, max_delay=120.0
+        )
+        self.retry_policy.max_attempts = max_retries
+        # 実行全体で共有する書き込みバッファ（指定時は保存をまとめて遅延書き込み）
+        self.write_buffer = write_buffer
+        # 送信前にバッチを保存するローカルスプール（DB書き込み失敗時の再スクレイプを防ぐ）
+        self.spool = spool or get_record_spool()
+        self.resource_policy: Optional[ResourcePolicy] = None
+        self.budget_config = BudgetConfig.from_config(self.BUDGET)
+        self.timeout_config = TimeoutConfig.from_config(self.TIMEOUTS)
+        # 実行中の時間予算（実行全体の制限時間の範囲内、_run_with_retry で開始）
+        self.deadline = Deadline()
+        # 実行リースの保持中の期限（リースを失うとキャンセルされ、次の予算確認で止まる）
+        self._lease_deadline: Optional[Deadline] = None
+        # 実行中のコンテキスト（check_budget・ページ遷移ごとにタイムアウトを制限し直す）
+        self._context: Optional[BrowserContext] = None
+        # Playwright 呼び出しの計測（SCRAPER_INSTRUMENT=1 の場合のみ、_run_with_retry で開始）
+        self.call_stats: Optional[CallStats] = None
+        # 同じASPの複数メディアで共有するブラウザ（指定時は実行ごとにコンテキストだけ作成）
+        self.browser = browser
+        # create_download_dir で作成した一時ディレクトリ（実行ごとに削除）
+        self._download_dirs: List[Path] = []
+
+        # Supabase接続（db 指定時はそのクライアントを使う。負荷試験の疑似DBなど）
         self.supabase_url = os.getenv('SUPABASE_URL')
         self.supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
 
-        if not self.supabase_url or not self.supabase_key:
-            raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY are required")
+        if db is None:
+            if not self.supabase_url or not self.supabase_key:
+                raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY are required")
+            db = SupabaseClient(self.supabase_url, self.supabase_key)
 
-        self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+        self.db = db
+        self.supabase: Client = self.db.client
+        # 実行リース（同じ対象を別の実行が処理中ならスキップ。ランナーは実行全体で共有）
+        self.run_lock = run_lock or RunLock(self.db)
 
         # キャッシュ
         self._asp_info: Optional[Dict] = None
@@ -147,42 +229,105 @@ class BaseScraper(ABC):
     @staticmethod
     def parse_yen(value: str) -> int:
         """¥123,456 形式の文字列を整数に変換"""
-        if not value:
-            return 0
-        cleaned = value.replace('¥', '').replace('\\', '').replace(',', '').strip()
-        if not cleaned:
-            return 0
-        try:
-            return int(cleaned)
-        except ValueError:
-            return 0
+        return parsing.parse_amount(value)
 
     @staticmethod
     def parse_date_jp(value: str) -> Optional[str]:
         """2025年11月01日 形式を 2025-11-01 に変換"""
-        try:
-            parts = value.replace('年', '-').replace('月', '-').replace('日', '')
-            year, month, day = parts.split('-')
-            return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-        except:
-            return None
+        return parsing.parse_date(value)
 
     @staticmethod
     def parse_month_jp(value: str) -> Optional[str]:
         """2025年01月 形式を 2025-01-01 に変換"""
+        month = parsing.parse_month(value)
+        return f"{month}-01" if month else None
+
+    def capture_response(
+        self,
+        page: Page,
+        url_pattern: str,
+        trigger: Callable[[], Any],
+        items: str,
+        date: str,
+        amount: str,
+        monthly: bool = False,
+        method: Optional[str] = None,
+        timeout_ms: int = 30000,
+    ) -> List[Dict[str, Any]]:
+        """レポートAPIのJSONレスポンスから日付・金額を取得（DOMを読まない）
+
+        例:
+            records = self.capture_response(
+                page, r"reportApi/stats", lambda: page.goto(REPORT_URL),
+                items="list[*]", date="date", amount="commission",
+            )
+
+        Args:
+            url_pattern: レスポンスURLに対する正規表現
+            trigger: リクエストを発生させる操作（遷移・クリック等）
+            items / date / amount: パス式（core/response_capture.py 参照）
+            monthly: True の場合は月（YYYY-MM-01）として解釈
+        """
+        payload = response_capture.capture_json(
+            page, url_pattern, trigger, method=method, timeout_ms=timeout_ms
+        )
+        records = response_capture.extract_records(payload, items, date, amount, monthly=monthly)
+        if monthly:
+            # BaseScraper のスクレイパーは月次を月初の日付で保存する
+            records = [{"date": f"{r['period']}-01", "amount": r["amount"]} for r in records]
+        return records
+
+    def settle(self, page: Page, step: str, default_ms: int):
+        """画面の読み込み完了を待つ（固定の wait_for_timeout の代わり）
+
+        短い待機のあと、ネットワークが落ち着くまで待つ。上限は (ASP, step) ごとに
+        過去の所要時間の p99 × margin から学習した値で、学習前は default_ms。
+        """
+        latency = get_latency_model()
+        key = type(self).__name__
+        learned = latency.timeout_ms(key, step, default_ms, self.timeout_config)
+        limit = self.deadline.timeout_ms(learned)
+        if not self.timeout_config.adaptive:
+            page.wait_for_timeout(limit)
+            return
+        # 上限まで待っても続行する（固定待機と同じ）。上限に達した回は ok=False で記録し、
+        # 所要時間には使わず次回の上限を一時的に引き上げる（時間予算で短くした上限は除く）
+        elapsed_ms, timed_out = adaptive_timeouts.settle(page, limit, self.timeout_config.min_wait_ms)
+        if not timed_out or limit >= learned:
+            latency.record(key, step, elapsed_ms, ok=not timed_out)
+
+    def check_budget(self, records: Optional[List[Dict]] = None):
+        """時間予算を使い切っていれば BudgetExceeded を送出（長いループの各周回の先頭で呼ぶ）
+
+        records にそれまでに取得したレコードを渡すと、打ち切り時もその分は保存される
+        （期間は partial、置き換え範囲は取得できた日付の範囲のみ）。
+        予算が残っていれば、操作のタイムアウトを残り時間で制限し直す。
+        """
         try:
-            parts = value.replace('年', '-').replace('月', '')
-            year, month = parts.split('-')
-            return f"{year}-{month.zfill(2)}-01"
-        except:
-            return None
+            self.deadline.check()
+        except BudgetExceeded as e:
+            raise BudgetExceeded(str(e), records) from None
+        # 残り時間が操作のタイムアウトより短くなってからは毎回制限し直す
+        remaining = self.deadline.remaining()
+        if (self._context is not None and remaining is not None
+                and remaining * 1000 < self.budget_config.action_timeout_ms):
+            self._apply_budget(self._context)
 
     def create_download_dir(self, prefix: str = "download") -> Path:
-        """一時ダウンロードディレクトリを作成"""
-        download_dir = Path(f"/tmp/{prefix}_{int(time.time())}")
-        download_dir.mkdir(parents=True, exist_ok=True)
+        """一時ダウンロードディレクトリを作成（実行終了時に削除される）
+
+        CSVは core.downloads.open_csv でダウンロードから直接読めるため、
+        ファイルとして残す必要がある場合のみ使用する。
+        """
+        download_dir = Path(tempfile.mkdtemp(prefix=f"{prefix}_"))
+        self._download_dirs.append(download_dir)
         return download_dir
 
+    def _cleanup_download_dirs(self):
+        """この実行で作成した一時ダウンロードディレクトリを削除"""
+        while self._download_dirs:
+            shutil.rmtree(self._download_dirs.pop(), ignore_errors=True)
+
     # ==================== 抽象メソッド ====================
 
     @abstractmethod
@@ -218,185 +363,546 @@ class BaseScraper(ABC):
 
     def run_daily(self) -> Dict[str, Any]:
         """日次スクレイピングを実行"""
-        return self._run_with_retry(self._execute_daily)
+        return self._run_single("daily")
 
     def run_monthly(self) -> Dict[str, Any]:
         """月次スクレイピングを実行"""
-        return self._run_with_retry(self._execute_monthly)
+        return self._run_single("monthly")
+
+    def _run_single(self, name: str) -> Dict[str, Any]:
+        """1期間のみ実行（ログイン・取得・保存の流れは _execute_periods と共通）"""
+        def execute() -> Dict[str, Any]:
+            return self._execute_periods([name])[name]
+
+        return self._run_locked([name], lambda: self._run_with_retry(execute, name))
+
+    def run_all_periods(self, daily: bool = True, monthly: bool = True) -> Dict[str, Any]:
+        """日次・月次を1回のブラウザ起動・ログインでまとめて実行
+
+        月次は同じコンテキストの別タブで取得し、両方の結果を1回の書き込みで保存する。
+        リトライ時は失敗した期間のみ再取得する。
+
+        Returns:
+            {"success": bool, "daily": {...}, "monthly": {...}}（指定した期間のみ）
+        """
+        periods = [name for name, enabled in (("daily", daily), ("monthly", monthly)) if enabled]
+        if not periods:
+            return {"success": True}
+        outcome = self._run_locked(periods, lambda: self._run_periods(periods))
+        if outcome.get("status") == LOCKED:
+            return {**outcome, **{name: dict(outcome) for name in periods}}
+        return outcome
+
+    def _run_periods(self, periods: List[str]) -> Dict[str, Any]:
+        """run_all_periods の本体（リース取得後に実行）"""
+        results: Dict[str, Dict[str, Any]] = {}
+
+        def execute() -> Dict[str, Any]:
+            pending = [name for name in periods if not results.get(name, {}).get("success")]
+            results.update(self._execute_periods(pending))
+            failed = [results[name] for name in periods if not results[name].get("success")]
+            if failed:
+                return {
+                    "success": False,
+                    "error": failed[0].get("error"),
+                    "error_kind": failed[0].get("error_kind"),
+                    # 保存済みの件数（時間切れで途中まで保存した期間を含む、partial として記録）
+                    "records_saved": sum(results[name].get("records_saved", 0) for name in periods),
+                }
+            return {
+                "success": True,
+                "records_saved": sum(results[name].get("records_saved", 0) for name in periods),
+                "spooled": sum(results[name].get("spooled", 0) for name in periods),
+            }
+
+        outcome = self._run_with_retry(
+            execute, periods[0] if len(periods) == 1 else "daily", {"periods": periods}
+        )
+        for name in periods:
+            if outcome.get("status") == SPOOLED and results.get(name, {}).get("spooled"):
+                results[name] = {**outcome, "records_saved": 0, "spooled": results[name]["spooled"]}
+            elif not results.get(name, {}).get("success"):
+                results[name] = {
+                    "success": False,
+                    "error": outcome.get("error"),
+                    "error_kind": outcome.get("error_kind"),
+                    "records_saved": results.get(name, {}).get("records_saved", 0),
+                }
+        return {"success": outcome.get("success", False), **results}
+
+    def _run_locked(self, periods: List[str], execute_func: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """実行リースを取得して実行
+
+        同じ (ASP, メディア, 期間) を別の実行が処理中の場合は、重複して取得せずに
+        status="locked" の結果を返す（execution_logs・サーキットブレーカーには記録しない）。
+        実行中にリースを失った場合（更新できず別の実行に渡った）は、時間予算のキャンセルで
+        次の check_budget・操作のタイムアウトで打ち切る。
+        """
+        lease_deadline = budget.get_run_deadline().child(None, f"{type(self).__name__} lease")
+        with self.run_lock.hold(self.asp_id, self.media_id, *periods, deadline=lease_deadline) as lease:
+            if not lease.acquired:
+                print(f"⏭ {self.asp_name} / {self.media_name}: スキップ（{lease.describe()}）")
+                return {
+                    "success": False,
+                    "status": LOCKED,
+                    "skipped": True,
+                    "error": lease.describe(),
+                    "error_kind": LOCKED,
+                }
+            self._lease_deadline = lease_deadline
+            try:
+                with self._profiled(periods):
+                    return execute_func()
+            finally:
+                self._lease_deadline = None
+                if lease.lost.is_set():
+                    print(f"⚠️  {self.asp_name} / {self.media_name}: 実行中にリースを失ったため打ち切りました")
+
+    @contextmanager
+    def _profiled(self, periods: List[str]) -> Iterator[None]:
+        """--profile 指定時（SCRAPER_PROFILE_DIR）は実行を cProfile・サンプリングで計測（core/profiling.py）"""
+        if profiling.profile_dir() is None:
+            yield
+            return
+        profiler = profiling.RunProfiler(
+            profiling.profile_name(self.asp_name, "+".join(periods), self.media_name)
+        )
+        try:
+            with profiler:
+                yield
+        finally:
+            print(profiler.report())
+
+    def _run_with_retry(
+        self, execute_func, execution_type: str = "manual", metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """リトライ付き実行（結果は execution_logs に記録し、サーキットブレーカーの判定に使う）
+
+        時間予算（BUDGET の asp_seconds と実行全体の制限時間）を使い切った場合は
+        リトライせずに終了する。
+        """
+        self.deadline = (self._lease_deadline or budget.get_run_deadline()).child(
+            self.budget_config.asp_seconds, f"{type(self).__name__}/{execution_type}"
+        )
+        self.call_stats = CallStats() if instrumentation.enabled() else None
+        log_metadata = {
+            "asp_name": self.asp_name,
+            "media_id": self.media_id,
+            "scraper": type(self).__name__,
+            "max_retries": self.max_retries,
+            **(metadata or {}),
+        }
+        log_id = self.db.create_execution_log(
+            asp_id=self.asp_id,
+            execution_type=execution_type,
+            metadata=log_metadata,
+        )
+        started = time.monotonic()
 
-    def _run_with_retry(self, execute_func) -> Dict[str, Any]:
-        """リトライ付き実行"""
         for attempt in range(1, self.max_retries + 1):
             print(f"\n=== Attempt {attempt}/{self.max_retries} ===")
             print(f"ASP: {self.asp_name}, Media: {self.media_name}")
 
             try:
+                self.deadline.check()
                 result = execute_func()
+                if result.get("success") and result.get("spooled"):
+                    return self._record_spooled(result, log_id, log_metadata, execution_type, started)
                 if result.get("success"):
                     self._update_asp_status("success")
+                    self.db.update_execution_log(
+                        log_id, status="success", records_saved=result.get("records_saved", 0)
+                    )
+                    self._report_calls(log_id, log_metadata)
+                    metrics.observe_run(
+                        self.asp_name, execution_type, "success",
+                        time.monotonic() - started, result.get("records_saved", 0),
+                    )
                     return result
             except Exception as e:
                 print(f"Attempt {attempt} failed: {e}")
-                result = {"success": False, "error": str(e)}
+                result = {"success": False, "error": str(e), "error_kind": retry_policy.classify(e)}
 
-            if attempt < self.max_retries:
-                wait_time = 10 * attempt
-                print(f"Waiting {wait_time} seconds before retry...")
-                time.sleep(wait_time)
-
-        self._update_asp_status("failed", str(result.get("error", "Unknown error")))
-        return {"success": False, "error": f"Failed after {self.max_retries} attempts"}
-
-    def _execute_daily(self) -> Dict[str, Any]:
-        """日次スクレイピング実行"""
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=self.headless,
-                slow_mo=1000 if not self.headless else 0
+            # エラー種別ごとに再試行・バックオフ・即失敗を判定
+            # （毎回ブラウザを起動し直してログインするため、relogin は通常の再試行と同じ）
+            decision = self.retry_policy.decide(
+                result.get("error_kind") or result.get("error"), attempt
             )
-            context = browser.new_context(accept_downloads=True)
-            page = context.new_page()
+            result["error_kind"] = decision.kind
+            if not decision.should_retry:
+                if attempt < self.max_retries:
+                    print(f"Not retrying ({decision.kind})")
+                break
+
+            print(f"{decision.kind}: waiting {decision.delay:.0f} seconds before retry...")
+            metrics.RETRIES.inc(asp=self.asp_name, kind=decision.kind)
+            try:
+                self.deadline.sleep(decision.delay)
+            except BudgetExceeded as e:
+                print(f"Not retrying: {e}")
+                result["error_kind"] = retry_policy.BUDGET_EXCEEDED
+                break
+
+        error = str(result.get("error", "Unknown error"))
+        self._update_asp_status("failed", error)
+        # 時間切れ・一部の期間の失敗でも、保存済みのデータがあれば partial
+        status = "partial" if result.get("records_saved") else "failed"
+        self.db.update_execution_log(
+            log_id,
+            status=status,
+            records_saved=result.get("records_saved", 0),
+            error_message=error[:1000],
+        )
+        self._report_calls(log_id, log_metadata)
+        metrics.observe_run(
+            self.asp_name, execution_type, status, time.monotonic() - started, result.get("records_saved", 0)
+        )
+        return {
+            "success": False,
+            "error": f"Failed after {attempt} attempts: {error}",
+            "error_kind": result.get("error_kind"),
+        }
+
+    def _record_spooled(
+        self,
+        result: Dict[str, Any],
+        log_id: Optional[str],
+        log_metadata: Dict[str, Any],
+        execution_type: str,
+        started: float,
+    ) -> Dict[str, Any]:
+        """取得は成功したがDBに書き込めずスプールに残った実行を記録
+
+        データはスプールから後で再送されるため再取得はしない。成功としては扱わず
+        （partial として記録）、ASPの障害ではないのでサーキットブレーカーにも記録しない。
+        """
+        spooled = result["spooled"]
+        written = max(0, result.get("records_saved", 0) - spooled)
+        error = f"Database write failed, {spooled} records kept in local spool"
+        print(f"⚠️  {error}")
+        self._update_asp_status("partial", error)
+        self.db.update_execution_log(
+            log_id, status="partial", records_saved=written, error_message=error
+        )
+        self._report_calls(log_id, log_metadata)
+        metrics.observe_run(
+            self.asp_name, execution_type, SPOOLED, time.monotonic() - started, written
+        )
+        return {
+            **result,
+            "success": False,
+            "status": SPOOLED,
+            "records_saved": written,
+            "error": error,
+            "error_kind": SPOOLED,
+        }
+
+    def _report_calls(self, log_id: Optional[str], log_metadata: Dict[str, Any]):
+        """Playwright 呼び出しの集計を表示し、execution_logs の metadata に追加"""
+        if self.call_stats is None:
+            return
+        print(self.call_stats.report())
+        self.db.update_execution_log_metadata(
+            log_id, {**log_metadata, "playwright_calls": self.call_stats.summary()}
+        )
+
+    def _execute_periods(self, periods: List[str]) -> Dict[str, Dict[str, Any]]:
+        """1回のログインで期間（日次・月次）を取得し、まとめて保存
+
+        run_daily / run_monthly / run_all_periods に共通のログイン・取得・保存の流れ。
+        """
+        scrapers = {"daily": self.scrape_daily, "monthly": self.scrape_monthly}
+        with self._browser_session() as browser:
+            context = self._new_context(browser)
+            page = self._new_page(context)
 
             try:
-                # ログイン
+                # ログイン（全期間で共有）
                 print(f"Logging in to {self.asp_name}...")
-                if not self.login(page):
-                    return {"success": False, "error": "Login failed"}
+                with metrics.phase(self.asp_name, "login"):
+                    logged_in = self.login(page)
+                if not logged_in:
+                    failure = {
+                        "success": False,
+                        "error": "Login failed",
+                        "error_kind": self._login_failure_kind(page),
+                    }
+                    return {name: dict(failure) for name in periods}
 
                 print("Login successful")
                 self.human_delay(1000, 2000)
 
-                # スクレイピング
-                print("Scraping daily data...")
-                records = self.scrape_daily(page)
-
-                # データ保存
-                if records:
-                    saved_count = self._save_daily_records(records)
-                    return {"success": True, "records_saved": saved_count}
-                else:
-                    print("No records found")
-                    return {"success": True, "records_saved": 0}
+                # 期間ごとに新しいタブで取得（Cookieは同じコンテキストで共有）
+                # sync API はスレッドセーフではないため、タブは順番に処理する
+                results: Dict[str, Dict[str, Any]] = {}
+                scraped: Dict[str, List[Dict]] = {}
+                # 時間切れで途中まで取得した期間（取得できた分だけ保存し、partial とする）
+                truncated: Dict[str, str] = {}
+                for index, name in enumerate(periods):
+                    tab = page if index == 0 else self._new_page(context)
+                    print(f"Scraping {name} data...")
+                    try:
+                        # 時間切れ以降の期間は取得せず、取得済みの期間だけ保存する
+                        self._apply_budget(context)
+                        with metrics.phase(self.asp_name, "scrape"):
+                            scraped[name] = scrapers[name](tab) or []
+                        metrics.RECORDS.inc(len(scraped[name]), asp=self.asp_name, stage="scraped")
+                    except BudgetExceeded as e:
+                        print(f"Scraping {name} stopped: {e} ({len(e.records)} records kept)")
+                        if e.records:
+                            scraped[name] = e.records
+                            truncated[name] = str(e)
+                        else:
+                            results[name] = {
+                                "success": False, "error": str(e),
+                                "error_kind": retry_policy.BUDGET_EXCEEDED,
+                            }
+                    except Exception as e:
+                        print(f"Scraping {name} failed: {e}")
+                        self._take_error_screenshot(tab)
+                        # 予算切れで操作がタイムアウトした場合は時間切れとして扱う
+                        kind = (
+                            retry_policy.BUDGET_EXCEEDED if self.deadline.expired()
+                            else retry_policy.classify(e)
+                        )
+                        results[name] = {"success": False, "error": str(e), "error_kind": kind}
+                    finally:
+                        if tab is not page:
+                            tab.close()
+
+                # データ保存（取得できた期間をまとめて1回で書き込み）
+                with metrics.phase(self.asp_name, "save"):
+                    counts = self._save_period_records(scraped, partial=truncated)
+                for name, records in scraped.items():
+                    if not records:
+                        print(f"No {name} records found")
+                    results[name] = {"success": True, "records_saved": len(records), **counts[name]}
+                    if name in truncated:
+                        results[name].update(
+                            success=False,
+                            error=truncated[name],
+                            error_kind=retry_policy.BUDGET_EXCEEDED,
+                        )
+                return results
 
             except Exception as e:
                 print(f"Scraping failed: {e}")
                 self._take_error_screenshot(page)
-                return {"success": False, "error": str(e)}
+                failure = {"success": False, "error": str(e), "error_kind": retry_policy.classify(e)}
+                return {name: dict(failure) for name in periods}
             finally:
-                browser.close()
-
-    def _execute_monthly(self) -> Dict[str, Any]:
-        """月次スクレイピング実行"""
+                self._log_resource_savings()
+                self._context = None
+                context.close()
+                self._cleanup_download_dirs()
+
+    @contextmanager
+    def _browser_session(self) -> Iterator[Browser]:
+        """実行に使うブラウザ（共有ブラウザが渡されていれば起動せずに使い、閉じない）"""
+        if self.browser is not None:
+            yield self.browser
+            return
         with sync_playwright() as p:
             browser = p.chromium.launch(
                 headless=self.headless,
                 slow_mo=1000 if not self.headless else 0
             )
-            context = browser.new_context(accept_downloads=True)
-            page = context.new_page()
+            metrics.BROWSER_LAUNCHES.inc()
+            try:
+                yield browser
+            finally:
+                browser.close()
+
+    def _new_context(self, browser: Browser) -> BrowserContext:
+        """ダウンロード許可・リソースブロック設定済みのコンテキストを作成"""
+        context = browser.new_context(accept_downloads=True)
+        self.resource_policy = ResourcePolicy.from_config(self.RESOURCE_POLICY)
+        self.resource_policy.install(context)
+        try:
+            self._apply_budget(context)
+        except BudgetExceeded:
+            context.close()
+            raise
+        self._context = context
+        return context
+
+    def _new_page(self, context: BrowserContext) -> Page:
+        """新しいタブを作成（計測が有効なら呼び出しを記録するプロキシで包む）
+
+        ページ遷移のたびに操作のタイムアウトを残り時間で制限し直すため、
+        1回の取得で何ページも移動しても予算を超えて待たない。
+        """
+        page = context.new_page()
 
+        def on_navigated(frame):
+            if frame != page.main_frame:
+                return
             try:
-                # ログイン
-                print(f"Logging in to {self.asp_name}...")
-                if not self.login(page):
-                    return {"success": False, "error": "Login failed"}
+                self._apply_budget(context)
+            except BudgetExceeded:
+                # イベントハンドラからは送出できないため、次の操作がすぐ失敗するようにする
+                context.set_default_timeout(1)
 
-                print("Login successful")
-                self.human_delay(1000, 2000)
+        page.on("framenavigated", on_navigated)
+        return instrumentation.instrument(page, self.call_stats)
 
-                # スクレイピング
-                print("Scraping monthly data...")
-                records = self.scrape_monthly(page)
+    def _apply_budget(self, context: BrowserContext):
+        """操作のタイムアウトを残り時間で制限（予算を使い切っていれば BudgetExceeded）
 
-                # データ保存
-                if records:
-                    saved_count = self._save_monthly_records(records)
-                    return {"success": True, "records_saved": saved_count}
-                else:
-                    print("No records found")
-                    return {"success": True, "records_saved": 0}
+        取得の開始時・ページ遷移ごと・check_budget ごとに呼ばれる。
+        """
+        context.set_default_timeout(self.deadline.timeout_ms(self.budget_config.action_timeout_ms))
 
-            except Exception as e:
-                print(f"Scraping failed: {e}")
-                self._take_error_screenshot(page)
-                return {"success": False, "error": str(e)}
-            finally:
-                browser.close()
+    def _log_resource_savings(self):
+        """ブロックしたリクエスト数と削減できた転送量（推定）を表示"""
+        policy = self.resource_policy
+        if policy and policy.enabled and policy.stats['routed']:
+            print(f"Resource policy: {policy.summary()}")
 
     # ==================== データ保存 ====================
 
-    def _save_daily_records(self, records: List[Dict]) -> int:
-        """日次レコードを保存"""
-        # レコードにメタデータを追加
-        enriched_records = []
-        for record in records:
-            enriched_records.append({
+    def _enrich_records(self, records: List[Dict]) -> List[Dict]:
+        """レコードにメタデータを追加"""
+        return [
+            {
                 'date': record['date'],
                 'amount': record['amount'],
                 'media_id': self.media_id,
                 'asp_id': self.asp_id,
                 'account_item_id': self.account_item_id,
-            })
+            }
+            for record in records
+        ]
+
+    def _daily_window(self, records: List[Dict], partial: bool = False) -> Optional[tuple]:
+        """日次の置き換え範囲: 今月1日〜今日（取得データがはみ出す場合はその範囲まで）
 
+        partial（時間切れで途中まで取得）の場合は、取得できなかった日を消さないよう
+        取得したデータの日付範囲のみ。
+        """
+        enriched_records = self._enrich_records(records)
         if not enriched_records:
-            return 0
+            return None
 
-        # 既存データを削除（今月分）
+        dates = [str(r['date'])[:10] for r in enriched_records]
+        if partial:
+            return ('daily_actuals', enriched_records, min(dates), max(dates))
         now = datetime.now()
-        start_date = now.strftime('%Y-%m-01')
-        end_date = now.strftime('%Y-%m-%d')
-
-        print(f"Deleting existing records from {start_date} to {end_date}...")
-        try:
-            self.supabase.table('daily_actuals').delete().eq(
-                'asp_id', self.asp_id
-            ).eq(
-                'media_id', self.media_id
-            ).gte('date', start_date).lte('date', end_date).execute()
-        except Exception as e:
-            print(f"Delete failed (might be OK): {e}")
-
-        # 新規データを挿入
-        print(f"Inserting {len(enriched_records)} records...")
-        result = self.supabase.table('daily_actuals').insert(enriched_records).execute()
-
-        return len(result.data)
-
-    def _save_monthly_records(self, records: List[Dict]) -> int:
-        """月次レコードを保存"""
-        enriched_records = []
-        for record in records:
-            enriched_records.append({
-                'date': record['date'],
-                'amount': record['amount'],
-                'media_id': self.media_id,
-                'asp_id': self.asp_id,
-                'account_item_id': self.account_item_id,
-            })
+        start_date = min([now.strftime('%Y-%m-01')] + dates)
+        end_date = max([now.strftime('%Y-%m-%d')] + dates)
+        return ('daily_actuals', enriched_records, start_date, end_date)
 
+    def _monthly_window(self, records: List[Dict]) -> Optional[tuple]:
+        """月次の置き換え範囲: 取得したデータの日付範囲"""
+        enriched_records = self._enrich_records(records)
         if not enriched_records:
-            return 0
-
-        # 取得したデータの日付範囲を計算
-        dates = [r['date'] for r in enriched_records]
-        start_date = min(dates)
-        end_date = max(dates)
+            return None
 
-        print(f"Deleting existing records from {start_date} to {end_date}...")
-        try:
-            self.supabase.table('actuals').delete().eq(
-                'asp_id', self.asp_id
-            ).eq(
-                'media_id', self.media_id
-            ).gte('date', start_date).lte('date', end_date).execute()
-        except Exception as e:
-            print(f"Delete failed (might be OK): {e}")
+        dates = [str(r['date'])[:10] for r in enriched_records]
+        return ('actuals', enriched_records, min(dates), max(dates))
 
-        # 新規データを挿入
-        print(f"Inserting {len(enriched_records)} records...")
-        result = self.supabase.table('actuals').insert(enriched_records).execute()
+    def _save_daily_records(self, records: List[Dict]) -> Dict[str, int]:
+        """
+        日次レコードを保存（差分のみ書き込み）
 
-        return len(result.data)
+        今月1日〜今日（取得データがはみ出す場合はその範囲まで）を対象に、
+        既存データと比較して追加・変更・削除分だけを1トランザクションで反映する。
+        """
+        window = self._daily_window(records)
+        if window is None:
+            return {"added": 0, "changed": 0, "unchanged": 0, "deleted": 0}
+        return self._replace_window(*window)
+
+    def _save_monthly_records(self, records: List[Dict]) -> Dict[str, int]:
+        """月次レコードを保存（差分のみ書き込み）"""
+        window = self._monthly_window(records)
+        if window is None:
+            return {"added": 0, "changed": 0, "unchanged": 0, "deleted": 0}
+        return self._replace_window(*window)
+
+    def _save_period_records(
+        self, records_by_period: Dict[str, List[Dict]], partial: Iterable[str] = ()
+    ) -> Dict[str, Dict[str, int]]:
+        """日次・月次のレコードを1回の書き込み（1トランザクション）で保存
+
+        partial の期間（時間切れで途中まで取得）は取得できた日付の範囲だけを置き換える。
+        """
+        empty = {"added": 0, "changed": 0, "unchanged": 0, "deleted": 0}
+        counts = {name: dict(empty) for name in records_by_period}
+        windows = {}
+        for name, records in records_by_period.items():
+            if name == "daily":
+                window = self._daily_window(records, partial=name in partial)
+            else:
+                window = self._monthly_window(records)
+            if window is not None:
+                windows[name] = window
+
+        if len(windows) < 2 or self.write_buffer is not None:
+            for name, window in windows.items():
+                counts[name] = self._replace_window(*window)
+            return counts
+
+        print(f"Replacing {', '.join(w[0] for w in windows.values())} in one transaction...")
+        batch_ids = {
+            name: self.spool.enqueue(
+                table_name,
+                asp_id=self.asp_id,
+                media_id=self.media_id,
+                records=records,
+                start_date=start_date,
+                end_date=end_date,
+            )
+            for name, (table_name, records, start_date, end_date) in windows.items()
+        }
+        drained = self.spool.drain_together(self.db, list(batch_ids.values()))
+        for name, batch_id in batch_ids.items():
+            batch_counts = drained["results"].get(batch_id)
+            if batch_counts is None:
+                print(
+                    f"Database write failed, {len(windows[name][1])} {name} records kept in spool: "
+                    f"{drained['last_error']}"
+                )
+                counts[name] = {"spooled": len(windows[name][1])}
+            else:
+                counts[name] = batch_counts
+        return counts
+
+    def _replace_window(
+        self, table_name: str, records: List[Dict], start_date: str, end_date: str
+    ) -> Dict[str, int]:
+        """期間内のデータをサーバー側で1トランザクションで置き換える（差分のみ書き込み）"""
+        if self.write_buffer is not None:
+            # 遅延書き込み：upsertのみ（取得結果から消えた行は削除しない）
+            buffered = self.write_buffer.push(table_name, records)
+            print(f"Buffered {buffered} records for {table_name}")
+            return {"buffered": buffered}
+
+        print(f"Replacing {table_name} from {start_date} to {end_date} with {len(records)} records...")
+
+        # 送信前にスプールへ保存し、同じASP/メディアの未送信分と合わせて古い順に送信
+        batch_id = self.spool.enqueue(
+            table_name,
+            asp_id=self.asp_id,
+            media_id=self.media_id,
+            records=records,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        drained = self.spool.drain(
+            self.db, key=(table_name, self.asp_id, self.media_id), respect_backoff=False
+        )
+        counts = drained["results"].get(batch_id)
+        if counts is None:
+            # DB書き込みに失敗してもデータはスプールに残り、後で再送される
+            print(f"Database write failed, {len(records)} records kept in spool: {drained['last_error']}")
+            return {"spooled": len(records)}
+
+        print(
+            f"Added: {counts['added']}, Changed: {counts['changed']}, "
+            f"Unchanged: {counts['unchanged']}, Deleted: {counts['deleted']}"
+        )
+        return counts
 
     # ==================== ステータス更新 ====================
 
@@ -414,6 +920,15 @@ class BaseScraper(ABC):
         except Exception as e:
             print(f"Note: Could not update ASP status: {e}")
 
+    def _login_failure_kind(self, page: Page) -> str:
+        """ログイン失敗の種別を判定（ログインフォームが残っていれば認証エラー）"""
+        try:
+            if page.locator("input[type='password']").first.is_visible():
+                return retry_policy.AUTH_REJECTED
+        except Exception:
+            pass
+        return retry_policy.UNKNOWN
+
     def _take_error_screenshot(self, page: Page):
         """エラー時のスクリーンショットを保存"""
         try:
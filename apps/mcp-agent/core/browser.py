@@ -2,7 +2,11 @@
 
 import logging
 from typing import Optional
-from playwright.sync_api import sync_playwright, Browser, Page, Playwright
+from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page, Playwright
+
+from . import instrumentation, metrics
+from .instrumentation import CallStats
+from .resource_policy import ResourcePolicy
 
 logger = logging.getLogger(__name__)
 
@@ -19,21 +23,42 @@ class BrowserController:
         self.headless = headless
         self.playwright: Optional[Playwright] = None
         self.browser: Optional[Browser] = None
+        self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
+        self.resource_policy: Optional[ResourcePolicy] = None
+
+    def start(
+        self,
+        resource_policy: Optional[ResourcePolicy] = None,
+        call_stats: Optional[CallStats] = None,
+    ) -> None:
+        """Start browser instance.
 
-    def start(self) -> None:
-        """Start browser instance."""
+        Args:
+            resource_policy: Request blocking policy. Defaults to the
+                conservative default policy (fonts, media, trackers)
+            call_stats: If given, page calls are counted and timed there
+                (see core.instrumentation)
+        """
         logger.info("Starting browser...")
         self.playwright = sync_playwright().start()
         self.browser = self.playwright.chromium.launch(headless=self.headless)
-        self.page = self.browser.new_page()
+        metrics.BROWSER_LAUNCHES.inc()
+        self.context = self.browser.new_context(accept_downloads=True)
+        self.resource_policy = resource_policy or ResourcePolicy()
+        self.resource_policy.install(self.context)
+        self.page = instrumentation.instrument(self.context.new_page(), call_stats)
         logger.info("Browser started successfully")
 
     def stop(self) -> None:
         """Stop browser instance and clean up resources."""
         logger.info("Stopping browser...")
+        if self.resource_policy:
+            self.resource_policy.log_summary()
         if self.page:
             self.page.close()
+        if self.context:
+            self.context.close()
         if self.browser:
             self.browser.close()
         if self.playwright:
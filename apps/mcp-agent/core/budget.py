@@ -0,0 +1,211 @@
+"""Time budgets with cooperative cancellation.
+
+Budgets nest: the run deadline (``--deadline`` of the runners) bounds every
+ASP budget, and an ASP budget bounds the timeout of each browser action:
+
+    run = budget.set_run_deadline(3600)
+    asp = run.child(600, "afb")
+    page.set_default_timeout(asp.timeout_ms(30000))
+    asp.check()   # raises BudgetExceeded once the budget is spent
+
+Work is never interrupted mid-call. Scrapers call :meth:`Deadline.check`
+between steps and cap their waits with :meth:`Deadline.timeout_ms`, so a
+cancelled run stops at the next step boundary and keeps what it collected.
+
+Per-ASP values come from the ``budget`` section of the scenario YAML
+(orchestrator and generated scripts) or ``BaseScraper.BUDGET``:
+
+    budget:
+      asp_seconds: 600          # whole ASP run, retries included
+      action_timeout_ms: 20000  # default timeout of each browser action
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default timeout of a browser action (Playwright's own default)
+DEFAULT_ACTION_TIMEOUT_MS = 30000
+
+# Environment variable carrying the deadline (epoch seconds) to subprocesses
+DEADLINE_ENV = "SCRAPER_DEADLINE"
+
+
+class BudgetExceeded(Exception):
+    """Raised at a cancellation point once a budget is spent or cancelled.
+
+    ``records`` carries what the interrupted work collected before the
+    cancellation point, so the caller can keep it.
+    """
+
+    def __init__(self, message: str = "", records: Optional[List[Any]] = None):
+        super().__init__(message)
+        self.records: List[Any] = list(records or [])
+
+
+@dataclass
+class BudgetConfig:
+    """Per-ASP budget settings."""
+
+    asp_seconds: Optional[float] = None
+    action_timeout_ms: int = DEFAULT_ACTION_TIMEOUT_MS
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "BudgetConfig":
+        """Build from a ``budget`` config section (missing keys use defaults)."""
+        config = config or {}
+        asp_seconds = config.get("asp_seconds")
+        return cls(
+            asp_seconds=float(asp_seconds) if asp_seconds else None,
+            action_timeout_ms=int(config.get("action_timeout_ms", DEFAULT_ACTION_TIMEOUT_MS)),
+        )
+
+
+class Deadline:
+    """A point in time after which work is cancelled (None = unbounded)."""
+
+    def __init__(
+        self,
+        seconds: Optional[float] = None,
+        name: str = "run",
+        parent: Optional["Deadline"] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize deadline.
+
+        Args:
+            seconds: Budget from now (None = only bounded by the parent)
+            name: Label used in error messages
+            parent: Enclosing deadline; this one never outlives it
+            clock: Monotonic clock (seconds)
+        """
+        self.name = name
+        self.parent = parent
+        self.clock = clock
+        self.expires_at = clock() + seconds if seconds is not None else None
+        if parent is not None and parent.expires_at is not None:
+            if self.expires_at is None or parent.expires_at < self.expires_at:
+                self.expires_at = parent.expires_at
+        self._cancelled = threading.Event()
+
+    def child(self, seconds: Optional[float], name: str) -> "Deadline":
+        """Nested budget bounded by this one."""
+        return Deadline(seconds, name=name, parent=self, clock=self.clock)
+
+    def cancel(self) -> None:
+        """Cancel this deadline and its children at their next check."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (None if unbounded, 0 once cancelled)."""
+        if self.cancelled:
+            return 0.0
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - self.clock())
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def check(self) -> None:
+        """Cancellation point.
+
+        Raises:
+            BudgetExceeded: The budget is spent or was cancelled
+        """
+        if self.expired():
+            reason = "cancelled" if self.cancelled else "time budget exceeded"
+            raise BudgetExceeded(f"{self.name}: {reason}")
+
+    def timeout_ms(self, default_ms: int = DEFAULT_ACTION_TIMEOUT_MS) -> int:
+        """Timeout for one action: ``default_ms`` capped by the remaining time.
+
+        Raises:
+            BudgetExceeded: Nothing is left
+        """
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return int(default_ms)
+        return max(1, min(int(default_ms), int(remaining * 1000)))
+
+    def sleep(self, seconds: float) -> None:
+        """Sleep, but never past the deadline.
+
+        Raises:
+            BudgetExceeded: The deadline passed while sleeping
+        """
+        remaining = self.remaining()
+        time.sleep(seconds if remaining is None else min(seconds, remaining))
+        self.check()
+
+    def to_env(self) -> Dict[str, str]:
+        """Environment for a subprocess: the deadline as epoch seconds."""
+        remaining = self.remaining()
+        if remaining is None:
+            return {}
+        return {DEADLINE_ENV: f"{time.time() + remaining:.3f}"}
+
+
+# ==================== Run deadline ====================
+
+_run_deadline = Deadline()
+
+
+def get_run_deadline() -> Deadline:
+    """Deadline of the whole run (unbounded unless a runner set one).
+
+    A subprocess started with :meth:`Deadline.to_env` inherits its parent's
+    deadline.
+    """
+    return _run_deadline
+
+
+def set_run_deadline(seconds: Optional[float]) -> Deadline:
+    """Start the run deadline ``seconds`` from now (None = unbounded)."""
+    global _run_deadline
+    _run_deadline = Deadline(seconds)
+    if seconds is not None:
+        logger.info(f"Run deadline: {seconds:.0f}s")
+    return _run_deadline
+
+
+@contextmanager
+def job_deadline(name: str) -> Iterator[Deadline]:
+    """Run deadline for one job of a long-lived worker.
+
+    The block runs under a child of the current run deadline, so cancelling
+    the yielded deadline stops that job's scrapers without affecting the jobs
+    that follow.
+    """
+    global _run_deadline
+    parent = _run_deadline
+    _run_deadline = parent.child(None, name)
+    try:
+        yield _run_deadline
+    finally:
+        _run_deadline = parent
+
+
+def _from_env() -> None:
+    value = os.environ.get(DEADLINE_ENV)
+    if not value:
+        return
+    try:
+        set_run_deadline(max(0.0, float(value) - time.time()))
+    except ValueError:
+        logger.warning(f"Ignoring invalid {DEADLINE_ENV}={value!r}")
+
+
+_from_env()
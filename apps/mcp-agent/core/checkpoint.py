@@ -0,0 +1,125 @@
+"""Step checkpoints for resuming a scenario in the same browser.
+
+:class:`AgentLoop` records a checkpoint after every successful step. When a
+step fails, the run resumes from the last checkpoint in the live browser
+context instead of relaunching the browser and replaying the whole scenario:
+
+* the page is restored to the URL of the last *anchor* (a step that landed on
+  a new page, e.g. ``navigate`` or the login submit) and the steps after it
+  are replayed, so in-page state such as hovers and filled forms is rebuilt;
+* the login steps are replayed only if the session has expired (the page is
+  back on the login URL or shows a password field).
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+# Actions that submit the login form once the password is filled
+_SUBMIT_ACTIONS = ("click", "keyboard")
+
+
+def find_login_end(steps: List[Any]) -> Optional[int]:
+    """Index of the step that submits the login form.
+
+    Only structured (dict) steps are inspected: the submit is the first
+    click/keyboard step after a fill of a password field or a
+    ``{SECRET:..PASSWORD}`` value.
+
+    Returns:
+        0-based step index, or None if the scenario has no recognizable login
+    """
+    password_filled = False
+    for index, step in enumerate(steps):
+        if not isinstance(step, dict):
+            return None
+        action = step.get("action")
+        if action == "fill":
+            selector = str(step.get("selector", "")).lower()
+            value = str(step.get("value", "")).upper()
+            if "password" in selector or ("{SECRET:" in value and "PASSWORD" in value):
+                password_filled = True
+        elif password_filled and action in _SUBMIT_ACTIONS:
+            return index
+    return None
+
+
+def _same_page(a: Optional[str], b: Optional[str]) -> bool:
+    """Compare URLs without query string and fragment."""
+    if not a or not b:
+        return False
+    a_parts, b_parts = urlsplit(a), urlsplit(b)
+    return (a_parts.netloc, a_parts.path.rstrip("/")) == (b_parts.netloc, b_parts.path.rstrip("/"))
+
+
+@dataclass
+class ScenarioCheckpoint:
+    """Progress of one scenario run."""
+
+    steps: List[Any]
+    login_url: Optional[str] = None
+    login_end: Optional[int] = None
+
+    # Last step that succeeded (-1 before the first step)
+    last_index: int = -1
+    last_url: Optional[str] = None
+    # Last step that landed on a page the run can return to with goto
+    anchor_index: int = -1
+    anchor_url: Optional[str] = None
+    resumes: int = 0
+    # Step last retried in place (without replaying from the anchor)
+    in_place_retry: Optional[int] = None
+    history: List[Dict[str, Any]] = field(default_factory=list, repr=False)
+
+    @classmethod
+    def for_steps(cls, steps: List[Any]) -> "ScenarioCheckpoint":
+        """Build a checkpoint tracker, detecting the login steps."""
+        login_end = find_login_end(steps)
+        login_url = None
+        if login_end is not None:
+            for step in steps[:login_end]:
+                if step.get("action") == "navigate":
+                    login_url = step.get("value") or step.get("selector")
+        return cls(steps=steps, login_url=login_url, login_end=login_end)
+
+    @property
+    def logged_in(self) -> bool:
+        """Whether the login steps have completed in this run."""
+        return self.logged_in_at(self.last_index)
+
+    def logged_in_at(self, index: int) -> bool:
+        """Whether the login has completed once step ``index`` succeeded."""
+        return self.login_end is not None and index >= self.login_end
+
+    def record(self, index: int, url: Optional[str]) -> None:
+        """Record a successful step and the page it left the browser on."""
+        step = self.steps[index]
+        action = step.get("action") if isinstance(step, dict) else None
+        new_page = action == "navigate" or index == self.login_end or not _same_page(url, self.last_url)
+        # After login the login page is not a place to return to (the submit
+        # click may not have redirected yet; the next step will)
+        if new_page and not (self.logged_in_at(index) and self.is_login_page(url)):
+            self.anchor_index = index
+            self.anchor_url = url
+        self.last_index = index
+        self.last_url = url
+        self.history.append({"index": index, "action": action, "url": url, "at": time.time()})
+
+    def is_login_page(self, url: Optional[str]) -> bool:
+        """Whether ``url`` is the scenario's login page."""
+        return _same_page(url, self.login_url)
+
+    def login_steps(self) -> range:
+        """Indexes of the steps that (re-)authenticate the session."""
+        return range(0, (self.login_end or -1) + 1)
+
+    def resume_index(self) -> int:
+        """First step to replay after restoring the anchor page."""
+        return self.anchor_index + 1
+
+    def describe(self) -> str:
+        """Short description for logs and execution-log messages."""
+        if self.last_index < 0:
+            return "no checkpoint"
+        return f"last good step {self.last_index + 1} ({self.last_url}), resumed {self.resumes}x"
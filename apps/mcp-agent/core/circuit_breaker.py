@@ -0,0 +1,214 @@
+"""Per-ASP circuit breaker for scheduled scraping.
+
+A scraper that is broken (typically at login) otherwise burns every retry,
+browser launch and backoff sleep on every run before it gives up. The breaker
+looks at the recent run history of each ASP and decides up front:
+
+* ``closed``    - fewer than ``failure_threshold`` consecutive failures: run
+  normally
+* ``open``      - the last ``failure_threshold`` runs failed and the last
+  failure is younger than ``cooldown_hours``: skip the ASP
+* ``half_open`` - open, but the cooldown has elapsed: run a single cheap
+  probe (one attempt, no retries). Success closes the breaker, failure opens
+  it again for another cooldown.
+
+History is read from ``execution_logs`` (consecutive ``failed`` runs, newest
+first). When that table is unavailable, ``asps.last_scrape_status`` is used,
+which only knows about the most recent run.
+"""
+
+import logging
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from .database import SupabaseClient
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Decisions returned by CircuitBreaker.decide()
+RUN = "run"
+PROBE = "probe"
+SKIP = "skip"
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class BreakerStatus:
+    """Breaker state of one ASP."""
+
+    asp_id: str
+    asp_name: str = ""
+    state: str = CLOSED
+    consecutive_failures: int = 0
+    last_failure_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    # What happened in this run: skipped / probe_succeeded / probe_failed
+    outcome: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        if self.last_failure_at:
+            data["last_failure_at"] = self.last_failure_at.isoformat()
+        return data
+
+
+class CircuitBreaker:
+    """Decides per ASP whether to run, probe or skip a scraper."""
+
+    def __init__(
+        self,
+        db: "SupabaseClient",
+        failure_threshold: int = 3,
+        cooldown_hours: float = 12.0,
+        lookback_days: int = 14,
+    ):
+        """Initialize circuit breaker.
+
+        Args:
+            db: Supabase client used to read the run history
+            failure_threshold: Consecutive failures that open the breaker
+            cooldown_hours: Time after the last failure before a probe is allowed
+            lookback_days: How far back execution_logs are read
+        """
+        self.db = db
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = timedelta(hours=cooldown_hours)
+        self.lookback = timedelta(days=lookback_days)
+        self.statuses: Dict[str, BreakerStatus] = {}
+
+    # ==================== History ====================
+
+    def load(self, asps: Dict[str, str]) -> Dict[str, BreakerStatus]:
+        """Read the run history of ASPs and compute their states.
+
+        Args:
+            asps: Mapping of ASP ID to ASP name
+
+        Returns:
+            Breaker status per ASP ID
+        """
+        asp_ids = [asp_id for asp_id in asps if asp_id]
+        if not asp_ids:
+            return self.statuses
+
+        now = datetime.now(timezone.utc)
+        logs = self.db.get_recent_execution_logs(asp_ids, (now - self.lookback).isoformat())
+        if logs is None:
+            logger.warning("Circuit breaker: execution_logs unavailable, using asps.last_scrape_status")
+            logs = self._history_from_asps(asp_ids)
+
+        for asp_id in asp_ids:
+            status = self._status_from_history(asp_id, logs.get(asp_id, []))
+            status.asp_name = asps[asp_id] or ""
+            status.state = self._state(status, now)
+            self.statuses[asp_id] = status
+
+        opened = [s for s in self.statuses.values() if s.state != CLOSED]
+        if opened:
+            logger.info(
+                "Circuit breaker: "
+                + ", ".join(f"{s.asp_name or s.asp_id}={s.state}" for s in opened)
+            )
+        return self.statuses
+
+    def _history_from_asps(self, asp_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        rows = self.db.get_asp_scrape_statuses(asp_ids)
+        return {
+            asp_id: [{
+                "status": row.get("last_scrape_status"),
+                "started_at": row.get("last_scrape_at"),
+                "error_message": row.get("scrape_notes"),
+            }]
+            for asp_id, row in rows.items()
+            if row.get("last_scrape_status")
+        }
+
+    @staticmethod
+    def _status_from_history(asp_id: str, history: Iterable[Dict[str, Any]]) -> BreakerStatus:
+        """Count consecutive failures from the newest run backwards."""
+        status = BreakerStatus(asp_id=asp_id)
+        for run in history:
+            if run.get("status") != "failed":
+                break
+            if status.consecutive_failures == 0:
+                status.last_failure_at = _parse_timestamp(run.get("started_at"))
+                status.last_error = run.get("error_message")
+            status.consecutive_failures += 1
+        return status
+
+    def _state(self, status: BreakerStatus, now: datetime) -> str:
+        if status.consecutive_failures < self.failure_threshold:
+            return CLOSED
+        if status.last_failure_at and now - status.last_failure_at < self.cooldown:
+            return OPEN
+        return HALF_OPEN
+
+    # ==================== Decisions ====================
+
+    def decide(self, asp_id: Optional[str]) -> str:
+        """Decide how to handle an ASP in this run.
+
+        Returns:
+            RUN (normal run), PROBE (single attempt) or SKIP
+        """
+        status = self.statuses.get(asp_id) if asp_id else None
+        if status is None or status.state == CLOSED:
+            return RUN
+        if status.state == HALF_OPEN:
+            return PROBE
+        status.outcome = status.outcome or "skipped"
+        return SKIP
+
+    def record(self, asp_id: Optional[str], success: bool, error: Optional[str] = None) -> None:
+        """Update the breaker with the result of a run (or probe)."""
+        status = self.statuses.get(asp_id) if asp_id else None
+        if status is None:
+            return
+
+        probing = status.state == HALF_OPEN
+        if success:
+            if status.state != CLOSED:
+                logger.info(f"Circuit breaker closed for {status.asp_name or asp_id}")
+            status.state = CLOSED
+            status.consecutive_failures = 0
+            if probing:
+                status.outcome = "probe_succeeded"
+            return
+
+        status.consecutive_failures += 1
+        status.last_failure_at = datetime.now(timezone.utc)
+        status.last_error = error or status.last_error
+        if probing:
+            status.outcome = "probe_failed"
+        if status.consecutive_failures >= self.failure_threshold:
+            if status.state != OPEN:
+                logger.warning(
+                    f"Circuit breaker open for {status.asp_name or asp_id} "
+                    f"after {status.consecutive_failures} consecutive failures"
+                )
+            status.state = OPEN
+
+    # ==================== Reporting ====================
+
+    def report(self) -> List[Dict[str, Any]]:
+        """States of the ASPs that are not plainly closed (for summaries)."""
+        return [
+            status.to_dict()
+            for status in self.statuses.values()
+            if status.state != CLOSED or status.outcome
+        ]
@@ -6,6 +6,8 @@ import base64
 from typing import Dict, Any, Optional
 from anthropic import Anthropic
 
+from . import metrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -74,7 +76,8 @@ class ClaudeClient:
             })
 
         try:
-            response = self.client.messages.create(
+            response = metrics.track_llm(
+                "anthropic", "interpret", self.client.messages.create,
                 model=self.model_name,
                 max_tokens=1024,
                 messages=messages
@@ -216,7 +219,8 @@ class ClaudeClient:
 """
 
         try:
-            response = self.client.messages.create(
+            response = metrics.track_llm(
+                "anthropic", "extract", self.client.messages.create,
                 model=self.model_name,
                 max_tokens=2048,
                 messages=[{
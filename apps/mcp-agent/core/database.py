@@ -1,11 +1,65 @@
 """Supabase client for database operations."""
 
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from supabase import create_client, Client
 
+from . import metrics
+
 logger = logging.getLogger(__name__)
 
+# Tables holding scraped actuals and their unique key
+ACTUALS_TABLES = ("daily_actuals", "actuals")
+ACTUALS_CONFLICT_KEY = "date,media_id,account_item_id,asp_id"
+
+
+def diff_actuals(
+    existing: List[Dict[str, Any]],
+    incoming: List[Dict[str, Any]],
+    delete_missing: bool = True,
+) -> Tuple[List[Dict[str, Any]], List[str], Dict[str, int]]:
+    """Compare stored actuals with freshly scraped rows.
+
+    Args:
+        existing: Rows currently stored for the window (id, date, amount, account_item_id)
+        incoming: Rows to store (date, amount, media_id, account_item_id, asp_id)
+        delete_missing: Whether stored rows absent from ``incoming`` should be deleted
+
+    Returns:
+        Tuple of (rows to upsert, row ids to delete, counts) where counts has
+        the keys added, changed, unchanged and deleted
+    """
+    stored = {
+        (str(row["date"])[:10], row.get("account_item_id")): row for row in existing
+    }
+
+    # Later rows win when the scrape yields the same date twice
+    wanted: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+    for row in incoming:
+        key = (str(row["date"])[:10], row.get("account_item_id"))
+        wanted[key] = {**row, "date": key[0]}
+
+    to_upsert = []
+    counts = {"added": 0, "changed": 0, "unchanged": 0, "deleted": 0}
+
+    for key, row in wanted.items():
+        current = stored.get(key)
+        if current is None:
+            counts["added"] += 1
+            to_upsert.append(row)
+        elif float(current.get("amount") or 0) != float(row["amount"] or 0):
+            counts["changed"] += 1
+            to_upsert.append(row)
+        else:
+            counts["unchanged"] += 1
+
+    to_delete = []
+    if delete_missing:
+        to_delete = [row["id"] for key, row in stored.items() if key not in wanted]
+        counts["deleted"] = len(to_delete)
+
+    return to_upsert, to_delete, counts
+
 
 class SupabaseClient:
     """Client for interacting with Supabase database."""
@@ -18,6 +72,7 @@ class SupabaseClient:
             service_role_key: Service role key for admin access
         """
         self.client: Client = create_client(url, service_role_key)
+        metrics.instrument_supabase(self.client)
         logger.info("Supabase client initialized")
 
     def get_asp_scenario(self, asp_name: str) -> Optional[Dict[str, Any]]:
@@ -109,6 +164,7 @@ class SupabaseClient:
 
         except Exception as e:
             logger.error(f"Error saving daily actual: {e}")
+            self._spool_failed_rows("daily_actuals", [data])
             return False
 
     def save_monthly_actual(
@@ -150,6 +206,7 @@ class SupabaseClient:
 
         except Exception as e:
             logger.error(f"Error saving monthly actual: {e}")
+            self._spool_failed_rows("actuals", [data])
             return False
 
     def save_actual(
@@ -174,6 +231,253 @@ class SupabaseClient:
         """
         return self.save_monthly_actual(date, amount, media_id, account_item_id, asp_id)
 
+    def sync_actuals(
+        self,
+        table_name: str,
+        asp_id: str,
+        media_id: str,
+        records: List[Dict[str, Any]],
+        start_date: str,
+        end_date: str,
+        delete_missing: bool = True,
+    ) -> Dict[str, int]:
+        """Write only the rows of a date window that actually changed.
+
+        Fetches the stored (date, amount) for the window in one query, diffs
+        it in memory, then sends a single upsert for added/changed rows and a
+        single delete for rows that disappeared from the scrape.
+
+        Args:
+            table_name: 'daily_actuals' or 'actuals'
+            asp_id: ASP UUID
+            media_id: Media UUID
+            records: Rows with date, amount, media_id, account_item_id, asp_id
+            start_date: First date of the window (YYYY-MM-DD)
+            end_date: Last date of the window (YYYY-MM-DD)
+            delete_missing: Delete stored rows in the window that were not scraped
+
+        Returns:
+            Counts with the keys added, changed, unchanged and deleted
+        """
+        if table_name not in ACTUALS_TABLES:
+            raise ValueError(f"Unknown actuals table: {table_name}")
+
+        response = (
+            self.client.table(table_name)
+            .select("id, date, amount, account_item_id")
+            .eq("asp_id", asp_id)
+            .eq("media_id", media_id)
+            .gte("date", start_date)
+            .lte("date", end_date)
+            .execute()
+        )
+
+        to_upsert, to_delete, counts = diff_actuals(
+            response.data or [], records, delete_missing=delete_missing
+        )
+
+        if to_upsert:
+            self.client.table(table_name).upsert(
+                to_upsert, on_conflict=ACTUALS_CONFLICT_KEY
+            ).execute()
+
+        if to_delete:
+            self.client.table(table_name).delete().in_("id", to_delete).execute()
+
+        logger.info(
+            f"Synced {table_name} {start_date}..{end_date}: "
+            f"added={counts['added']}, changed={counts['changed']}, "
+            f"unchanged={counts['unchanged']}, deleted={counts['deleted']}"
+        )
+        return counts
+
+    def _spool_failed_rows(self, table_name: str, rows: List[Dict[str, Any]]) -> None:
+        """Keep rows that could not be written in the local spool for redelivery."""
+        from .spool import get_record_spool
+
+        try:
+            dates = [str(row["date"])[:10] for row in rows]
+            batch_id = get_record_spool().enqueue(
+                table_name,
+                asp_id=rows[0]["asp_id"],
+                media_id=rows[0]["media_id"],
+                records=rows,
+                start_date=min(dates),
+                end_date=max(dates),
+                operation="merge",
+            )
+            logger.warning(f"Spooled {len(rows)} {table_name} rows as batch {batch_id}")
+        except Exception as e:
+            logger.error(f"Failed to spool {table_name} rows: {e}")
+
+    def upsert_actuals(self, table_name: str, rows: List[Dict[str, Any]]) -> int:
+        """Upsert many actuals rows with a single request.
+
+        Args:
+            table_name: 'daily_actuals' or 'actuals'
+            rows: Rows with date, amount, media_id, account_item_id, asp_id
+
+        Returns:
+            Number of rows sent
+
+        Raises:
+            Exception: If the upsert fails (callers decide whether to retry)
+        """
+        if table_name not in ACTUALS_TABLES:
+            raise ValueError(f"Unknown actuals table: {table_name}")
+        if not rows:
+            return 0
+
+        self.client.table(table_name).upsert(
+            rows, on_conflict=ACTUALS_CONFLICT_KEY
+        ).execute()
+        logger.info(f"Upserted {len(rows)} rows into {table_name}")
+        return len(rows)
+
+    def replace_actuals_window(
+        self,
+        table_name: str,
+        asp_id: str,
+        media_id: str,
+        records: List[Dict[str, Any]],
+        start_date: str,
+        end_date: str,
+    ) -> Dict[str, int]:
+        """Replace a date window of actuals in one server-side transaction.
+
+        Calls the ``replace_actuals_window`` Postgres function, which inserts
+        new rows, updates changed amounts and deletes rows missing from
+        ``records`` atomically, so readers never see a half-written window.
+        Falls back to :meth:`sync_actuals` if the migration is not applied yet.
+
+        Args:
+            table_name: 'daily_actuals' or 'actuals'
+            asp_id: ASP UUID
+            media_id: Media UUID
+            records: Rows with date, amount and account_item_id
+            start_date: First date of the window (YYYY-MM-DD)
+            end_date: Last date of the window (YYYY-MM-DD)
+
+        Returns:
+            Counts with the keys added, changed, unchanged and deleted
+        """
+        if table_name not in ACTUALS_TABLES:
+            raise ValueError(f"Unknown actuals table: {table_name}")
+
+        payload = self._window_payload(records)
+
+        try:
+            response = self.client.rpc(
+                "replace_actuals_window",
+                {
+                    "p_table": table_name,
+                    "p_asp_id": asp_id,
+                    "p_media_id": media_id,
+                    "p_start_date": start_date,
+                    "p_end_date": end_date,
+                    "p_records": payload,
+                },
+            ).execute()
+        except Exception as e:
+            # Function not deployed yet: keep working with the client-side diff
+            if "replace_actuals_window" in str(e) and (
+                "PGRST202" in str(e) or "not exist" in str(e).lower()
+            ):
+                logger.warning(
+                    f"replace_actuals_window function not found, using client-side sync: {e}"
+                )
+                return self.sync_actuals(
+                    table_name, asp_id, media_id, records, start_date, end_date
+                )
+            raise
+
+        row = (response.data or [{}])[0]
+        counts = {
+            key: int(row.get(key) or 0)
+            for key in ("added", "changed", "unchanged", "deleted")
+        }
+        logger.info(
+            f"Replaced {table_name} {start_date}..{end_date}: "
+            f"added={counts['added']}, changed={counts['changed']}, "
+            f"unchanged={counts['unchanged']}, deleted={counts['deleted']}"
+        )
+        return counts
+
+    @staticmethod
+    def _window_payload(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Rows in the p_records format of the replace functions."""
+        return [
+            {
+                "date": str(record["date"])[:10],
+                "amount": record["amount"],
+                "account_item_id": record["account_item_id"],
+            }
+            for record in records
+        ]
+
+    def replace_actuals_windows(self, windows: List[Dict[str, Any]]) -> List[Dict[str, int]]:
+        """Replace several actuals windows in one request and one transaction.
+
+        Calls the ``replace_actuals_windows`` Postgres function (migration
+        027). Falls back to one :meth:`replace_actuals_window` call per window
+        if the function is not deployed yet.
+
+        Args:
+            windows: Dicts with table_name, asp_id, media_id, records,
+                start_date and end_date (the arguments of
+                :meth:`replace_actuals_window`)
+
+        Returns:
+            Counts per window, in input order
+        """
+        for window in windows:
+            if window["table_name"] not in ACTUALS_TABLES:
+                raise ValueError(f"Unknown actuals table: {window['table_name']}")
+
+        payload = [
+            {
+                "table": window["table_name"],
+                "asp_id": window["asp_id"],
+                "media_id": window["media_id"],
+                "start_date": window["start_date"],
+                "end_date": window["end_date"],
+                "records": self._window_payload(window["records"]),
+            }
+            for window in windows
+        ]
+
+        try:
+            response = self.client.rpc(
+                "replace_actuals_windows", {"p_windows": payload}
+            ).execute()
+        except Exception as e:
+            if "replace_actuals_windows" in str(e) and (
+                "PGRST202" in str(e) or "not exist" in str(e).lower()
+            ):
+                logger.warning(
+                    f"replace_actuals_windows function not found, replacing windows one by one: {e}"
+                )
+                return [self.replace_actuals_window(**window) for window in windows]
+            raise
+
+        counts: List[Dict[str, int]] = [
+            {"added": 0, "changed": 0, "unchanged": 0, "deleted": 0} for _ in windows
+        ]
+        for row in response.data or []:
+            counts[int(row["window_index"])] = {
+                key: int(row.get(key) or 0)
+                for key in ("added", "changed", "unchanged", "deleted")
+            }
+        logger.info(
+            f"Replaced {len(windows)} windows in one transaction: "
+            + ", ".join(
+                f"{w['table_name']} {w['start_date']}..{w['end_date']} "
+                f"(+{c['added']} ~{c['changed']} -{c['deleted']})"
+                for w, c in zip(windows, counts)
+            )
+        )
+        return counts
+
     def get_affiliate_account_item_id(self, media_id: str) -> Optional[str]:
         """Get the 'アフィリエイト' account_item_id for a given media.
 
@@ -298,3 +602,241 @@ class SupabaseClient:
                 return True
             logger.error(f"Error updating execution log: {e}")
             return False
+
+    def update_execution_log_metadata(self, log_id: Optional[str], metadata: Dict[str, Any]) -> bool:
+        """Replace the metadata of an execution log entry.
+
+        Args:
+            log_id: Execution log UUID (None is skipped, as in update_execution_log)
+            metadata: Full metadata dict (replaces the stored one)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not log_id:
+            return True
+
+        try:
+            self.client.table("execution_logs").update({"metadata": metadata}).eq("id", log_id).execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error updating execution log metadata: {e}")
+            return False
+
+    # ==================== Scrape job queue ====================
+
+    def enqueue_scrape_jobs(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Enqueue scrape jobs (see migration 028).
+
+        Targets that already have a queued or running job of the same type
+        are skipped.
+
+        Args:
+            jobs: Dicts with asp_id, media_id, job_type and optionally
+                priority, max_attempts, run_after
+
+        Returns:
+            The jobs that were created
+        """
+        response = self.client.rpc("enqueue_scrape_jobs", {"p_jobs": jobs}).execute()
+        return response.data or []
+
+    def claim_scrape_jobs(
+        self, worker_id: str, limit: int = 1, lease_seconds: int = 300
+    ) -> List[Dict[str, Any]]:
+        """Claim due jobs for a worker (FOR UPDATE SKIP LOCKED).
+
+        Expired leases of other workers are requeued first.
+
+        Returns:
+            Claimed job rows, status 'running'
+        """
+        response = self.client.rpc(
+            "claim_scrape_jobs",
+            {"p_worker_id": worker_id, "p_limit": limit, "p_lease_seconds": lease_seconds},
+        ).execute()
+        return response.data or []
+
+    def heartbeat_scrape_job(self, job_id: str, worker_id: str, lease_seconds: int = 300) -> bool:
+        """Extend a job lease.
+
+        Returns:
+            False if the worker no longer holds the job
+        """
+        response = self.client.rpc(
+            "heartbeat_scrape_job",
+            {"p_job_id": job_id, "p_worker_id": worker_id, "p_lease_seconds": lease_seconds},
+        ).execute()
+        return bool(response.data)
+
+    def complete_scrape_job(
+        self,
+        job_id: str,
+        worker_id: str,
+        success: bool,
+        error: Optional[str] = None,
+        result: Optional[Dict[str, Any]] = None,
+        retry: bool = True,
+        retry_delay_seconds: int = 300,
+    ) -> Optional[str]:
+        """Finish a claimed job.
+
+        Returns:
+            New status ('succeeded', 'queued' or 'failed'), or None if the
+            worker no longer held the job
+        """
+        response = self.client.rpc(
+            "complete_scrape_job",
+            {
+                "p_job_id": job_id,
+                "p_worker_id": worker_id,
+                "p_success": success,
+                "p_error": error,
+                "p_result": result,
+                "p_retry": retry,
+                "p_retry_delay_seconds": retry_delay_seconds,
+            },
+        ).execute()
+        return response.data or None
+
+    # ==================== Run leases ====================
+
+    def acquire_scrape_lease(
+        self,
+        asp_id: str,
+        media_id: str,
+        job_type: str,
+        holder: str,
+        ttl_seconds: int = 900,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Take the run lease of a target (see migration 029).
+
+        Returns:
+            Row with acquired, holder and expires_at, or None if the lease
+            was taken concurrently by another run
+        """
+        response = self.client.rpc(
+            "acquire_scrape_lease",
+            {
+                "p_asp_id": asp_id,
+                "p_media_id": media_id,
+                "p_job_type": job_type,
+                "p_holder": holder,
+                "p_ttl_seconds": ttl_seconds,
+                "p_metadata": metadata or {},
+            },
+        ).execute()
+        return (response.data or [None])[0]
+
+    def renew_scrape_lease(
+        self, asp_id: str, media_id: str, job_type: str, holder: str, ttl_seconds: int = 900
+    ) -> bool:
+        """Extend a held run lease; False if it was lost."""
+        response = self.client.rpc(
+            "renew_scrape_lease",
+            {
+                "p_asp_id": asp_id,
+                "p_media_id": media_id,
+                "p_job_type": job_type,
+                "p_holder": holder,
+                "p_ttl_seconds": ttl_seconds,
+            },
+        ).execute()
+        return bool(response.data)
+
+    def release_scrape_lease(self, asp_id: str, media_id: str, job_type: str, holder: str) -> bool:
+        """Release a run lease held by ``holder``."""
+        response = self.client.rpc(
+            "release_scrape_lease",
+            {"p_asp_id": asp_id, "p_media_id": media_id, "p_job_type": job_type, "p_holder": holder},
+        ).execute()
+        return bool(response.data)
+
+    def get_active_scrape_leases(self) -> List[Dict[str, Any]]:
+        """Get the run leases that have not expired."""
+        response = (
+            self.client.table("active_scrape_leases")
+            .select("*")
+            .order("acquired_at")
+            .execute()
+        )
+        return response.data or []
+
+    def get_recent_execution_logs(
+        self, asp_ids: List[str], since: str
+    ) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """Get finished execution logs per ASP, newest first.
+
+        Args:
+            asp_ids: ASP UUIDs
+            since: ISO timestamp; older logs are ignored
+
+        Returns:
+            Dict mapping ASP ID to its logs, or None if execution_logs is not
+            available
+        """
+        try:
+            response = (
+                self.client.table("execution_logs")
+                .select("asp_id, execution_type, status, started_at, error_message")
+                .in_("asp_id", list(asp_ids))
+                .neq("status", "running")
+                .gte("started_at", since)
+                .order("started_at", desc=True)
+                .execute()
+            )
+        except Exception as e:
+            logger.warning(f"Could not read execution_logs: {e}")
+            return None
+
+        logs: Dict[str, List[Dict[str, Any]]] = {asp_id: [] for asp_id in asp_ids}
+        for row in response.data or []:
+            logs.setdefault(row["asp_id"], []).append(row)
+        return logs
+
+    def get_execution_durations(self, asp_ids: List[str], since: str) -> List[Dict[str, Any]]:
+        """Get start/end times of finished runs (for duration estimates).
+
+        Args:
+            asp_ids: ASP UUIDs
+            since: ISO timestamp; older logs are ignored
+
+        Returns:
+            Rows with asp_id, status, started_at, completed_at and metadata;
+            empty if execution_logs is not available
+        """
+        try:
+            response = (
+                self.client.table("execution_logs")
+                .select("asp_id, status, started_at, completed_at, metadata")
+                .in_("asp_id", list(asp_ids))
+                .in_("status", ["success", "partial"])
+                .gte("started_at", since)
+                .execute()
+            )
+        except Exception as e:
+            logger.warning(f"Could not read execution_logs: {e}")
+            return []
+        return [row for row in response.data or [] if row.get("completed_at")]
+
+    def get_asp_scrape_statuses(self, asp_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get the last scrape status columns of ASPs.
+
+        Args:
+            asp_ids: ASP UUIDs
+
+        Returns:
+            Dict mapping ASP ID to last_scrape_at / last_scrape_status / scrape_notes
+        """
+        try:
+            response = (
+                self.client.table("asps")
+                .select("id, last_scrape_at, last_scrape_status, scrape_notes")
+                .in_("id", list(asp_ids))
+                .execute()
+            )
+            return {row["id"]: row for row in response.data or []}
+        except Exception as e:
+            logger.error(f"Error reading ASP scrape status: {e}")
+            return {}
@@ -0,0 +1,131 @@
+"""Read report downloads without copying them to scratch directories.
+
+Playwright already streams every download into its own artifacts directory
+and removes it when the browser closes. Instead of ``download.save_as()`` into
+a fresh ``/tmp/<prefix>_<ts>`` directory and reopening the copy, scrapers open
+the artifact directly and feed it to the ``csv`` module as a text stream:
+
+    with page.expect_download() as download_info:
+        page.click("text=CSVダウンロード")
+    with downloads.open_csv(download_info.value) as f:
+        for row in csv.DictReader(f):
+            ...
+
+The encoding is detected on the first block of the file (UTF-8 with or
+without BOM, then CP932 for Shift_JIS reports), so rows are decoded as they
+are read. Set ``SCRAPER_DOWNLOAD_ARCHIVE`` to keep a copy of every report for
+debugging.
+"""
+
+import codecs
+import io
+import logging
+import os
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Iterator, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+# UTF-8 (BOM is stripped by utf-8-sig), then Shift_JIS with Windows extensions
+DEFAULT_ENCODINGS = ("utf-8-sig", "cp932")
+
+# Bytes inspected to pick the encoding
+_SNIFF_BYTES = 64 * 1024
+
+ARCHIVE_ENV = "SCRAPER_DOWNLOAD_ARCHIVE"
+
+
+def _artifact_path(source) -> Path:
+    """Local file behind a Playwright Download (or a plain path)."""
+    if isinstance(source, (str, Path)):
+        return Path(source)
+    # Download.path() waits for the download to finish and returns the
+    # artifact Playwright wrote; it is deleted when the browser closes
+    return Path(source.path())
+
+
+def _suggested_name(source) -> str:
+    if isinstance(source, (str, Path)):
+        return Path(source).name
+    return getattr(source, "suggested_filename", None) or "download"
+
+
+def detect_encoding(sample: bytes, encodings: Sequence[str] = DEFAULT_ENCODINGS) -> str:
+    """Pick the first encoding that decodes ``sample``.
+
+    The sample may end in the middle of a multi-byte character, so an
+    incremental decoder is used.
+    """
+    for encoding in encodings:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    raise UnicodeDecodeError(
+        encodings[-1], sample[:16], 0, 1, f"none of {', '.join(encodings)} can decode the file"
+    )
+
+
+def archive(source, label: str, archive_dir: Optional[Union[str, Path]] = None) -> Optional[Path]:
+    """Copy a download into the archive directory, if one is configured.
+
+    Args:
+        source: Playwright Download or file path
+        label: Subdirectory / filename prefix (e.g. "moshimo_daily")
+        archive_dir: Archive root (defaults to $SCRAPER_DOWNLOAD_ARCHIVE)
+
+    Returns:
+        Archived file path, or None if archiving is off
+    """
+    root = archive_dir or os.getenv(ARCHIVE_ENV)
+    if not root:
+        return None
+
+    safe_label = re.sub(r"[^\w.-]+", "_", label)
+    target_dir = Path(root) / safe_label
+    target_dir.mkdir(parents=True, exist_ok=True)
+    target = target_dir / f"{datetime.now():%Y%m%d_%H%M%S}_{_suggested_name(source)}"
+    if isinstance(source, (str, Path)):
+        target.write_bytes(Path(source).read_bytes())
+    else:
+        source.save_as(target)
+    logger.info(f"Archived download to {target}")
+    return target
+
+
+@contextmanager
+def open_csv(
+    source,
+    encodings: Sequence[str] = DEFAULT_ENCODINGS,
+    archive_label: Optional[str] = None,
+) -> Iterator[IO[str]]:
+    """Open a downloaded CSV as a text stream for the ``csv`` module.
+
+    Args:
+        source: Playwright Download or file path
+        encodings: Candidate encodings, tried in order
+        archive_label: Archive a copy under this label when archiving is on
+
+    Yields:
+        Text stream opened with ``newline=""`` as the csv module expects
+    """
+    path = _artifact_path(source)
+    if archive_label:
+        try:
+            archive(source, archive_label)
+        except Exception as e:
+            logger.warning(f"Could not archive download: {e}")
+
+    with open(path, "rb", buffering=_SNIFF_BYTES) as raw:
+        # peek() fills the buffer without consuming it
+        encoding = detect_encoding(raw.peek(_SNIFF_BYTES)[:_SNIFF_BYTES], encodings)
+        logger.info(f"Reading {_suggested_name(source)} as {encoding}")
+        text = io.TextIOWrapper(raw, encoding=encoding, newline="")
+        try:
+            yield text
+        finally:
+            text.detach()
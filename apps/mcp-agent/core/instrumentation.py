@@ -0,0 +1,305 @@
+"""Opt-in call counting and timing of Playwright Page/Locator calls.
+
+Shows which scrapers are "chatty": every call made through an instrumented
+page is counted and timed per method and per call site (the scraper line that
+made it). Locators, frames and element handles returned by the page are
+wrapped too, so ``page.locator("tr").all()[i].inner_text()`` is attributed to
+the line of the ``inner_text()`` call:
+
+    stats = CallStats()
+    page = instrument(context.new_page(), stats)
+    ...
+    print(stats.report())                    # per-run histogram
+    metadata["playwright_calls"] = stats.summary()
+
+A call site that makes the same round trip many times in one run (e.g.
+``inner_text()`` per table cell inside a loop) is flagged as an N+1 pattern,
+with the batched call that replaces it.
+
+Enabled by ``SCRAPER_INSTRUMENT=1`` (``--instrument`` of the runners). Off by
+default: the frame walk per call costs a few microseconds.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Environment variable enabling instrumentation (inherited by subprocesses)
+INSTRUMENT_ENV = "SCRAPER_INSTRUMENT"
+
+# Calls from one site in one run above which a round trip is flagged as N+1
+N_PLUS_ONE_THRESHOLD = 20
+
+# Upper bounds (ms) of the latency histogram buckets
+BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000, float("inf"))
+
+# Playwright objects wrapped when returned from an instrumented call
+_WRAPPED_TYPES = frozenset({
+    "Page", "Frame", "Locator", "FrameLocator", "ElementHandle", "Keyboard", "Mouse",
+})
+
+# Calls that build a locator or register a handler without a browser round trip
+LAZY_METHODS = frozenset({
+    "locator", "frame_locator", "get_by_role", "get_by_text", "get_by_label",
+    "get_by_placeholder", "get_by_alt_text", "get_by_title", "get_by_test_id",
+    "nth", "filter", "and_", "or_", "frame",
+    "on", "once", "remove_listener", "set_default_timeout", "set_default_navigation_timeout",
+})
+
+# Batched replacement suggested for a flagged call
+_BATCH_HINTS = {
+    "inner_text": "locator.all_inner_texts()",
+    "text_content": "locator.all_text_contents()",
+    "get_attribute": "locator.evaluate_all(...)",
+    "inner_html": "locator.evaluate_all(...)",
+    "count": "one locator.all() before the loop",
+    "is_visible": "one locator.evaluate_all(...)",
+}
+
+_ROOT = Path(__file__).parent.parent
+_THIS_FILE = os.path.normcase(os.path.abspath(__file__))
+_PLAYWRIGHT_DIR = f"{os.sep}playwright{os.sep}"
+
+
+def enabled() -> bool:
+    """Whether instrumentation is on for this process."""
+    return os.environ.get(INSTRUMENT_ENV, "").lower() in ("1", "true", "yes")
+
+
+def enable() -> None:
+    """Turn instrumentation on for this process and its subprocesses."""
+    os.environ[INSTRUMENT_ENV] = "1"
+
+
+def _call_site() -> str:
+    """First frame outside this module and Playwright, as ``path:line (function)``."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if os.path.normcase(os.path.abspath(filename)) != _THIS_FILE and _PLAYWRIGHT_DIR not in filename:
+            break
+        frame = frame.f_back
+    if frame is None:
+        return "<unknown>"
+    path = Path(frame.f_code.co_filename)
+    try:
+        path = path.resolve().relative_to(_ROOT.resolve())
+    except ValueError:
+        path = Path(path.name)
+    return f"{path.as_posix()}:{frame.f_lineno} ({frame.f_code.co_name})"
+
+
+@dataclass
+class SiteStats:
+    """Calls of one method from one call site."""
+
+    method: str
+    site: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    @property
+    def round_trip(self) -> bool:
+        return self.method.rsplit(".", 1)[-1] not in LAZY_METHODS
+
+
+@dataclass
+class MethodStats:
+    """Calls of one method from all sites, with a latency histogram."""
+
+    count: int = 0
+    total_ms: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * len(BUCKETS_MS))
+
+    def add(self, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        for index, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[index] += 1
+                break
+
+
+class CallStats:
+    """Counts and times instrumented calls of one run."""
+
+    def __init__(self, n_plus_one_threshold: int = N_PLUS_ONE_THRESHOLD):
+        """Initialize call stats.
+
+        Args:
+            n_plus_one_threshold: Calls from one site above which a round
+                trip is flagged as an N+1 pattern
+        """
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.started = time.monotonic()
+        self._sites: Dict[Tuple[str, str], SiteStats] = {}
+        self._methods: Dict[str, MethodStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, site: str, ms: float) -> None:
+        """Record one call of ``method`` (e.g. ``Locator.inner_text``) from ``site``."""
+        with self._lock:
+            stats = self._sites.get((method, site))
+            if stats is None:
+                stats = self._sites[(method, site)] = SiteStats(method, site)
+            stats.count += 1
+            stats.total_ms += ms
+            stats.max_ms = max(stats.max_ms, ms)
+            self._methods.setdefault(method, MethodStats()).add(ms)
+
+    @property
+    def calls(self) -> int:
+        return sum(stats.count for stats in self._methods.values())
+
+    @property
+    def total_ms(self) -> float:
+        return sum(stats.total_ms for stats in self._methods.values())
+
+    # ==================== Analysis ====================
+
+    def n_plus_one(self) -> List[Dict[str, Any]]:
+        """Call sites repeating a round trip at least ``n_plus_one_threshold`` times."""
+        with self._lock:
+            flagged = [
+                stats for stats in self._sites.values()
+                if stats.round_trip and stats.count >= self.n_plus_one_threshold
+            ]
+        flagged.sort(key=lambda stats: stats.total_ms, reverse=True)
+        return [
+            {
+                "method": stats.method,
+                "site": stats.site,
+                "count": stats.count,
+                "total_ms": round(stats.total_ms, 1),
+                "hint": _BATCH_HINTS.get(
+                    stats.method.rsplit(".", 1)[-1], "one locator.evaluate_all(...) for all elements"
+                ),
+            }
+            for stats in flagged
+        ]
+
+    def top_sites(self, limit: int = 10) -> List[SiteStats]:
+        """Call sites that spent the most time."""
+        with self._lock:
+            sites = list(self._sites.values())
+        return sorted(sites, key=lambda stats: stats.total_ms, reverse=True)[:limit]
+
+    def summary(self, limit: int = 10) -> Dict[str, Any]:
+        """JSON-serializable summary for execution log metadata."""
+        with self._lock:
+            methods = sorted(self._methods.items(), key=lambda item: item[1].total_ms, reverse=True)
+        return {
+            "calls": self.calls,
+            "total_ms": round(self.total_ms, 1),
+            "wall_ms": round((time.monotonic() - self.started) * 1000, 1),
+            "methods": {
+                method: {"count": stats.count, "total_ms": round(stats.total_ms, 1)}
+                for method, stats in methods[:limit]
+            },
+            "top_sites": [
+                {
+                    "method": stats.method,
+                    "site": stats.site,
+                    "count": stats.count,
+                    "total_ms": round(stats.total_ms, 1),
+                }
+                for stats in self.top_sites(limit)
+            ],
+            "n_plus_one": self.n_plus_one(),
+        }
+
+    def report(self, limit: int = 10) -> str:
+        """Human-readable histogram of the run."""
+        with self._lock:
+            methods = sorted(self._methods.items(), key=lambda item: item[1].total_ms, reverse=True)
+        headers = [f"<={bound:g}" if bound != float("inf") else ">5000" for bound in BUCKETS_MS]
+        lines = [
+            f"Playwright calls: {self.calls} in {self.total_ms / 1000:.1f}s "
+            f"(wall {time.monotonic() - self.started:.1f}s)",
+            f"  {'method':<28} {'count':>6} {'total':>8}  " + " ".join(f"{h:>6}" for h in headers),
+        ]
+        for method, stats in methods[:limit]:
+            lines.append(
+                f"  {method:<28} {stats.count:>6} {stats.total_ms / 1000:>7.1f}s  "
+                + " ".join(f"{n:>6}" for n in stats.buckets)
+            )
+        lines.append("  top call sites:")
+        for stats in self.top_sites(limit):
+            lines.append(
+                f"    {stats.count:>6}x {stats.total_ms / 1000:>7.1f}s  {stats.method}  {stats.site}"
+            )
+        for flagged in self.n_plus_one():
+            lines.append(
+                f"  N+1: {flagged['method']} called {flagged['count']}x at {flagged['site']}"
+                f" ({flagged['total_ms'] / 1000:.1f}s) -> use {flagged['hint']}"
+            )
+        return "\n".join(lines)
+
+
+# ==================== Proxies ====================
+
+
+class _Instrumented:
+    """Proxy forwarding to a Playwright object and recording its method calls."""
+
+    __slots__ = ("_target", "_stats", "_kind")
+
+    def __init__(self, target: Any, stats: CallStats):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_stats", stats)
+        object.__setattr__(self, "_kind", type(target).__name__)
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._target, name)
+        if name.startswith("_") or not callable(value):
+            return _wrap(value, self._stats)
+        method = f"{self._kind}.{name}"
+        stats = self._stats
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            args = tuple(unwrap(arg) for arg in args)
+            kwargs = {key: unwrap(arg) for key, arg in kwargs.items()}
+            site = _call_site()
+            started = time.perf_counter()
+            try:
+                return _wrap(value(*args, **kwargs), stats)
+            finally:
+                stats.record(method, site, (time.perf_counter() - started) * 1000)
+
+        return call
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._target, name, value)
+
+    def __repr__(self) -> str:
+        return f"<instrumented {self._target!r}>"
+
+
+def _wrap(value: Any, stats: CallStats) -> Any:
+    if type(value).__name__ in _WRAPPED_TYPES:
+        return _Instrumented(value, stats)
+    if isinstance(value, list) and value and type(value[0]).__name__ in _WRAPPED_TYPES:
+        return [_Instrumented(item, stats) for item in value]
+    return value
+
+
+def unwrap(value: Any) -> Any:
+    """The Playwright object behind a proxy (other values unchanged)."""
+    if isinstance(value, _Instrumented):
+        return object.__getattribute__(value, "_target")
+    return value
+
+
+def instrument(page: Any, stats: Optional[CallStats]) -> Any:
+    """Wrap a page so its calls are recorded in ``stats`` (unchanged if None)."""
+    if stats is None or page is None:
+        return page
+    return _Instrumented(page, stats)
@@ -0,0 +1,243 @@
+"""Distributed scrape job queue backed by the ``scrape_jobs`` table.
+
+The scheduler enqueues one job per (asp_id, media_id, job_type) and any
+number of worker processes, on any machine, claim them:
+
+    queue = JobQueue(db)
+    for job in queue.claim():
+        with budget.job_deadline(job.id) as deadline, queue.lease(job, deadline) as lease:
+            result = run(job)
+        queue.complete(job, result, lease)
+
+Claims use ``FOR UPDATE SKIP LOCKED`` (``claim_scrape_jobs``, migration 028),
+so a job is handed to exactly one worker. While a job runs, a heartbeat thread
+extends its lease; if the worker dies, the lease expires and the next claim
+puts the job back in the queue (or fails it once ``max_attempts`` is used up).
+A worker that loses its lease cancels the run through its deadline, so the
+scraper stops at its next budget check instead of racing the new owner.
+
+Jobs carry no date window: the scrapers always fetch their current period, so
+a job only names the target and whether to run daily or monthly. Enqueueing is
+idempotent: a target that already has a queued or running job of the same
+type is skipped, so a scheduler that fires twice does not double-scrape.
+
+``tests/test_job_queue_pg.py`` runs the SQL side against a real Postgres
+(``SCRAPE_JOBS_TEST_DSN``); the queue itself only talks to Postgres through RPC.
+"""
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional
+
+from . import retry_policy
+
+if TYPE_CHECKING:
+    from .budget import Deadline
+    from .database import SupabaseClient
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPES = ("daily", "monthly")
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+def default_worker_id() -> str:
+    """Unique ID of this worker process (host, pid and a random suffix)."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+@dataclass
+class ScrapeJob:
+    """A claimed row of ``scrape_jobs``."""
+
+    id: str
+    asp_id: str
+    media_id: str
+    job_type: str
+    attempts: int = 0
+    max_attempts: int = 3
+    priority: int = 0
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "ScrapeJob":
+        return cls(**{name: row[name] for name in cls.__dataclass_fields__ if name in row})
+
+    def describe(self) -> str:
+        return f"job {self.id[:8]} {self.job_type} (attempt {self.attempts}/{self.max_attempts})"
+
+
+class Lease:
+    """Keeps a job lease alive from a background thread."""
+
+    def __init__(self, queue: "JobQueue", job: ScrapeJob, deadline: Optional["Deadline"] = None):
+        self.queue = queue
+        self.job = job
+        # Deadline of the run, cancelled when the lease is lost
+        self.deadline = deadline
+        # Set when a heartbeat reports that another worker owns the job now
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"lease-{job.id[:8]}", daemon=True
+        )
+
+    def start(self) -> "Lease":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        # Renew well before expiry so one failed heartbeat does not lose the job
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while not self._stop.wait(interval):
+            try:
+                held = self.queue.db.heartbeat_scrape_job(
+                    self.job.id, self.queue.worker_id, self.queue.lease_seconds
+                )
+            except Exception as e:
+                logger.warning(f"Heartbeat for {self.job.describe()} failed: {e}")
+                continue
+            if not held:
+                logger.error(f"Lease lost for {self.job.describe()}")
+                self.lost.set()
+                if self.deadline is not None:
+                    self.deadline.cancel()
+                return
+
+
+class JobQueue:
+    """Producer and consumer side of the scrape job queue."""
+
+    def __init__(
+        self,
+        db: "SupabaseClient",
+        worker_id: Optional[str] = None,
+        lease_seconds: int = 300,
+        retry_delay_seconds: int = 300,
+    ):
+        """Initialize job queue.
+
+        Args:
+            db: Supabase client
+            worker_id: ID recorded on claimed jobs (defaults to host:pid:random)
+            lease_seconds: Lease length; heartbeats renew it every third of it
+            retry_delay_seconds: Delay before a failed job can be claimed again
+        """
+        self.db = db
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.retry_delay_seconds = retry_delay_seconds
+
+    # ==================== Producer ====================
+
+    def enqueue(
+        self,
+        targets: Iterable[Dict[str, Any]],
+        job_type: str,
+        priority: int = 0,
+        max_attempts: int = 3,
+    ) -> List[Dict[str, Any]]:
+        """Enqueue one job per target.
+
+        Args:
+            targets: Dicts with asp_id and media_id
+            job_type: 'daily' or 'monthly'
+            priority: Higher priorities are claimed first
+            max_attempts: Claims allowed before the job fails
+
+        Returns:
+            Created jobs (targets with an open job are skipped)
+        """
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"Unknown job type: {job_type}")
+        jobs = [
+            {
+                "asp_id": target["asp_id"],
+                "media_id": target["media_id"],
+                "job_type": job_type,
+                "priority": priority,
+                "max_attempts": max_attempts,
+            }
+            for target in targets
+        ]
+        if not jobs:
+            return []
+        created = self.db.enqueue_scrape_jobs(jobs)
+        logger.info(f"Enqueued {len(created)} {job_type} jobs ({len(jobs) - len(created)} already open)")
+        return created
+
+    # ==================== Consumer ====================
+
+    def claim(self, limit: int = 1) -> List[ScrapeJob]:
+        """Claim up to ``limit`` due jobs for this worker."""
+        rows = self.db.claim_scrape_jobs(self.worker_id, limit, self.lease_seconds)
+        jobs = [ScrapeJob.from_row(row) for row in rows]
+        for job in jobs:
+            logger.info(f"Claimed {job.describe()}")
+        return jobs
+
+    @contextmanager
+    def lease(self, job: ScrapeJob, deadline: Optional["Deadline"] = None) -> Iterator[Lease]:
+        """Heartbeat the job lease while the block runs.
+
+        Args:
+            job: The claimed job
+            deadline: Deadline of the run, cancelled if the lease is lost
+        """
+        lease = Lease(self, job, deadline).start()
+        try:
+            yield lease
+        finally:
+            lease.stop()
+
+    def complete(
+        self, job: ScrapeJob, result: Dict[str, Any], lease: Optional[Lease] = None
+    ) -> Optional[str]:
+        """Record the outcome of a job.
+
+        Failures whose kind is not retryable (e.g. rejected credentials) fail
+        the job at once; others are queued again after ``retry_delay_seconds``
+        while attempts remain.
+
+        Args:
+            job: The claimed job
+            result: Scraper result with success, error and error_kind
+            lease: Lease used while running; a lost lease is not completed
+
+        Returns:
+            New job status, or None if this worker no longer holds the job
+        """
+        if lease is not None and lease.lost.is_set():
+            logger.warning(f"Not completing {job.describe()}: lease was lost")
+            return None
+
+        success = bool(result.get("success"))
+        kind = result.get("error_kind") or retry_policy.classify(result.get("error"))
+        retry = retry_policy.DEFAULT_ACTIONS.get(kind, retry_policy.BACKOFF) != retry_policy.FAIL
+        status = self.db.complete_scrape_job(
+            job.id,
+            self.worker_id,
+            success=success,
+            error=None if success else str(result.get("error") or "Unknown error")[:1000],
+            result={k: v for k, v in result.items() if k != "error"},
+            retry=retry,
+            retry_delay_seconds=self.retry_delay_seconds,
+        )
+        if status is None:
+            logger.warning(f"{job.describe()} was no longer held by {self.worker_id}")
+        else:
+            logger.info(f"{job.describe()} -> {status}")
+        return status
@@ -0,0 +1,116 @@
+"""Run the media of one ASP in shared browsers.
+
+``asp_credentials`` holds several media per ASP (e.g. one Webridge login per
+site). Launching Chromium for every (ASP, media) pair repeats the browser
+start-up for each of them. Instead, targets are grouped by ASP and every ASP
+group is split into at most ``concurrency`` lanes:
+
+* each lane launches one browser and runs its media one after another, each
+  in its own isolated ``BrowserContext`` (cookies, storage and logins never
+  leak between media);
+* lanes of the same ASP run in parallel threads. Playwright's sync API is
+  bound to the thread that started it, so every lane owns its own Playwright
+  instance and browser.
+
+With ``concurrency=1`` an ASP costs one browser launch regardless of how many
+media it has.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Runs one target with the lane's browser and returns its result
+RunTarget = Callable[[Dict[str, Any], Any], Dict[str, Any]]
+
+
+def group_by_asp(targets: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group targets by ``asp_id``, keeping the order of first appearance."""
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for target in targets:
+        groups.setdefault(target["asp_id"], []).append(target)
+    return groups
+
+
+def split_lanes(targets: List[Dict[str, Any]], concurrency: int) -> List[List[Dict[str, Any]]]:
+    """Deal targets round-robin into at most ``concurrency`` lanes."""
+    lane_count = max(1, min(concurrency, len(targets)))
+    return [targets[i::lane_count] for i in range(lane_count)]
+
+
+def _run_lane(
+    lane: List[Dict[str, Any]],
+    run_target: RunTarget,
+    headless: bool,
+    on_result: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]],
+) -> List[Dict[str, Any]]:
+    from playwright.sync_api import sync_playwright
+
+    results = []
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=headless, slow_mo=0 if headless else 1000)
+        metrics.BROWSER_LAUNCHES.inc()
+        try:
+            for target in lane:
+                if not browser.is_connected():
+                    # A crashed browser would fail every remaining media
+                    logger.warning("Shared browser disconnected, relaunching")
+                    browser = p.chromium.launch(headless=headless, slow_mo=0 if headless else 1000)
+                    metrics.BROWSER_LAUNCHES.inc()
+                result = run_target(target, browser)
+                results.append(result)
+                if on_result:
+                    on_result(target, result)
+        finally:
+            browser.close()
+    return results
+
+
+def run_asp_group(
+    targets: List[Dict[str, Any]],
+    run_target: RunTarget,
+    concurrency: int = 1,
+    headless: bool = True,
+    on_result: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """Run all media targets of one ASP in shared browsers.
+
+    Args:
+        targets: Targets of a single ASP
+        run_target: ``run_target(target, browser)`` runs one media in a new
+            context of ``browser`` and returns its result
+        concurrency: Maximum number of media logged in at the same time
+        headless: Launch browsers headless
+        on_result: Called with (target, result) as each target finishes;
+            calls are serialized, so it may update shared counters
+
+    Returns:
+        Results in the order of ``targets``
+    """
+    lanes = split_lanes(targets, concurrency)
+    lock = threading.Lock()
+
+    def report(target: Dict[str, Any], result: Dict[str, Any]) -> None:
+        if on_result:
+            with lock:
+                on_result(target, result)
+
+    if len(lanes) == 1:
+        lane_results = [_run_lane(lanes[0], run_target, headless, report)]
+    else:
+        logger.info(f"Running {len(targets)} media in {len(lanes)} parallel browsers")
+        with ThreadPoolExecutor(max_workers=len(lanes), thread_name_prefix="media-lane") as pool:
+            futures = [pool.submit(_run_lane, lane, run_target, headless, report) for lane in lanes]
+            lane_results = [future.result() for future in futures]
+
+    # Undo the round-robin split so results line up with targets
+    ordered: List[Dict[str, Any]] = [{} for _ in targets]
+    for lane_index, results in enumerate(lane_results):
+        for position, result in enumerate(results):
+            ordered[lane_index + position * len(lanes)] = result
+    return ordered
@@ -0,0 +1,427 @@
+"""Prometheus metrics of scrape runs.
+
+Counters and histograms are recorded in-process and exposed either as a
+textfile for node_exporter's textfile collector (``--metrics-file`` of the
+runners, written at the end of the run) or over HTTP for long-running
+workers (``job_worker.py --metrics-port``):
+
+    metrics.RUNS.inc(asp="A8.net", type="daily", status="success")
+    with metrics.phase("A8.net", "login"):
+        scraper.login(page)
+    metrics.write_textfile("/var/lib/node_exporter/scraper.prom")
+
+Recorded:
+
+- scraper_runs_total / scraper_run_duration_seconds: per ASP, type and status
+- scraper_phase_duration_seconds: login / scrape / save (BaseScraper) and
+  scenario actions (AgentLoop)
+- scraper_records_total: records scraped and saved
+- scraper_retries_total: retries per failure kind
+- scraper_browser_launches_total
+- scraper_llm_calls_total / scraper_llm_tokens_total / scraper_llm_call_seconds
+- scraper_db_round_trips_total / scraper_db_round_trip_seconds: Supabase
+  REST calls per table or RPC
+
+Values are totals since the process started, as Prometheus expects.
+"""
+
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default buckets (seconds) of a whole ASP run
+RUN_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+# Default buckets (seconds) of a phase, a request or an LLM call
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """A metric family with a fixed set of label names."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (e.g. a timestamp)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Per label set: [per-bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the block (also when it raises)."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - started, **labels)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+        return int(state[-1]) if state else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        for key, state in items:
+            cumulative = 0.0
+            for index, bound in enumerate(self.buckets):
+                cumulative += state[index]
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {_format_value(cumulative)}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(state[-1])}")
+        return lines
+
+
+class Registry:
+    """Named metrics rendered together in the text exposition format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type, name: str, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+# ==================== Default registry ====================
+
+REGISTRY = Registry()
+
+RUNS = REGISTRY.counter(
+    "scraper_runs_total", "Finished scrape runs.", ("asp", "type", "status")
+)
+RUN_DURATION = REGISTRY.histogram(
+    "scraper_run_duration_seconds", "Duration of a scrape run, retries included.",
+    ("asp", "type", "status"), RUN_BUCKETS,
+)
+LAST_SUCCESS = REGISTRY.gauge(
+    "scraper_last_success_timestamp_seconds", "Unix time of the last successful run.", ("asp", "type")
+)
+PHASE_DURATION = REGISTRY.histogram(
+    "scraper_phase_duration_seconds", "Duration of one phase of a run (login, scrape, save, scenario action).",
+    ("asp", "phase"),
+)
+RECORDS = REGISTRY.counter(
+    "scraper_records_total", "Records scraped from the ASP or saved to the database.", ("asp", "stage")
+)
+RETRIES = REGISTRY.counter(
+    "scraper_retries_total", "Retries of a run or scenario step, by failure kind.", ("asp", "kind")
+)
+BROWSER_LAUNCHES = REGISTRY.counter(
+    "scraper_browser_launches_total", "Browser processes launched."
+)
+LLM_CALLS = REGISTRY.counter(
+    "scraper_llm_calls_total", "LLM API calls.", ("provider", "operation", "status")
+)
+LLM_TOKENS = REGISTRY.counter(
+    "scraper_llm_tokens_total", "LLM tokens used.", ("provider", "kind")
+)
+LLM_DURATION = REGISTRY.histogram(
+    "scraper_llm_call_seconds", "Duration of an LLM API call.", ("provider", "operation")
+)
+DB_ROUND_TRIPS = REGISTRY.counter(
+    "scraper_db_round_trips_total", "Supabase REST requests.", ("method", "resource", "status")
+)
+DB_DURATION = REGISTRY.histogram(
+    "scraper_db_round_trip_seconds", "Duration of a Supabase REST request.", ("method", "resource")
+)
+
+
+# ==================== Recording helpers ====================
+
+
+def phase(asp: str, name: str):
+    """Context manager observing the duration of a phase of a run."""
+    return PHASE_DURATION.time(asp=asp, phase=name)
+
+
+def observe_run(asp: str, execution_type: str, status: str, seconds: float, records_saved: int = 0) -> None:
+    """Record a finished run (status: success / partial / failed)."""
+    RUNS.inc(asp=asp, type=execution_type, status=status)
+    RUN_DURATION.observe(seconds, asp=asp, type=execution_type, status=status)
+    if records_saved:
+        RECORDS.inc(records_saved, asp=asp, stage="saved")
+    if status == "success":
+        LAST_SUCCESS.set(time.time(), asp=asp, type=execution_type)
+
+
+def _token_counts(response: Any) -> Tuple[int, int]:
+    """(input, output) tokens of a Gemini or Anthropic response (0 if unknown)."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        return (
+            getattr(usage, "prompt_token_count", 0) or 0,
+            getattr(usage, "candidates_token_count", 0) or 0,
+        )
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        return getattr(usage, "input_tokens", 0) or 0, getattr(usage, "output_tokens", 0) or 0
+    return 0, 0
+
+
+def track_llm(provider: str, operation: str, call: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Make an LLM API call, recording its count, duration and tokens."""
+    started = time.monotonic()
+    try:
+        response = call(*args, **kwargs)
+    except Exception:
+        LLM_CALLS.inc(provider=provider, operation=operation, status="error")
+        raise
+    finally:
+        LLM_DURATION.observe(time.monotonic() - started, provider=provider, operation=operation)
+    LLM_CALLS.inc(provider=provider, operation=operation, status="ok")
+    input_tokens, output_tokens = _token_counts(response)
+    if input_tokens:
+        LLM_TOKENS.inc(input_tokens, provider=provider, kind="input")
+    if output_tokens:
+        LLM_TOKENS.inc(output_tokens, provider=provider, kind="output")
+    return response
+
+
+def _resource(path: str) -> str:
+    """Table or RPC name of a PostgREST path (``/rest/v1/rpc/x`` -> ``rpc/x``)."""
+    parts = [part for part in path.split("/") if part]
+    if "v1" in parts:
+        parts = parts[parts.index("v1") + 1:]
+    return "/".join(parts[:2] if parts[:1] == ["rpc"] else parts[:1]) or "/"
+
+
+def instrument_supabase(client: Any) -> None:
+    """Count and time the REST requests of a supabase-py client.
+
+    Hooks the httpx session of its PostgREST client. Clients of other
+    versions without that session are left as they are.
+    """
+    try:
+        session = client.postgrest.session
+        hooks = session.event_hooks
+    except AttributeError as e:
+        logger.debug(f"Supabase client not instrumented: {e}")
+        return
+
+    def on_request(request: Any) -> None:
+        request.extensions["metrics_started"] = time.monotonic()
+
+    def on_response(response: Any) -> None:
+        request = response.request
+        resource = _resource(request.url.path)
+        started = request.extensions.get("metrics_started")
+        DB_ROUND_TRIPS.inc(method=request.method, resource=resource, status=str(response.status_code))
+        if started is not None:
+            DB_DURATION.observe(time.monotonic() - started, method=request.method, resource=resource)
+
+    hooks.setdefault("request", []).append(on_request)
+    hooks.setdefault("response", []).append(on_response)
+    session.event_hooks = hooks
+
+
+# ==================== Exposition ====================
+
+
+def write_textfile(path: Any, registry: Registry = REGISTRY) -> Path:
+    """Write the metrics for node_exporter's textfile collector (atomic replace)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(registry.render())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return path
+
+
+def write_textfile_at_exit(path: Any, registry: Registry = REGISTRY) -> None:
+    """Write the textfile when the process exits (also after sys.exit)."""
+    import atexit
+
+    def write() -> None:
+        try:
+            write_textfile(path, registry)
+        except OSError as e:
+            logger.error(f"Could not write metrics to {path}: {e}")
+
+    atexit.register(write)
+
+
+def serve(port: int, host: str = "0.0.0.0", registry: Registry = REGISTRY) -> Any:
+    """Serve ``/metrics`` over HTTP from a daemon thread.
+
+    Returns:
+        The running ThreadingHTTPServer (call ``shutdown()`` to stop it)
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logger.debug(format % args)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_port}/metrics")
+    return server
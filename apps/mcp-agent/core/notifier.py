@@ -1,7 +1,7 @@
 """Notification system for sending alerts about scraper execution."""
 
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import os
 import requests
 
@@ -20,13 +20,18 @@ class Notifier:
         self.slack_webhook_url = slack_webhook_url or os.getenv("SLACK_WEBHOOK_URL")
 
     def send_execution_summary(
-        self, results: Dict[str, bool], execution_type: str = "manual"
+        self,
+        results: Dict[str, bool],
+        execution_type: str = "manual",
+        breaker: Optional[List[Dict[str, Any]]] = None,
     ) -> None:
         """Send execution summary notification.
 
         Args:
             results: Dictionary mapping ASP names to success status
             execution_type: Type of execution ('daily', 'monthly', 'manual')
+            breaker: Circuit breaker states (CircuitBreaker.report()) of
+                skipped and probed ASPs
         """
         successful = sum(1 for success in results.values() if success)
         total = len(results)
@@ -41,6 +46,7 @@ class Notifier:
             successful=successful,
             failed=failed,
             failed_asps=failed_asps,
+            breaker=breaker or [],
         )
 
         # Send to Slack if webhook is configured
@@ -78,6 +84,7 @@ class Notifier:
         successful: int,
         failed: int,
         failed_asps: list[str],
+        breaker: Optional[List[Dict[str, Any]]] = None,
     ) -> str:
         """Format execution summary message.
 
@@ -87,6 +94,7 @@ class Notifier:
             successful: Number of successful executions
             failed: Number of failed executions
             failed_asps: List of failed ASP names
+            breaker: Circuit breaker states of skipped and probed ASPs
 
         Returns:
             Formatted message string
@@ -116,6 +124,22 @@ class Notifier:
                 f"• {asp}" for asp in failed_asps
             )
 
+        if breaker:
+            outcome_map = {
+                "skipped": "⛔ スキップ",
+                "probe_succeeded": "✅ 試行成功（復旧）",
+                "probe_failed": "❌ 試行失敗",
+            }
+            lines = []
+            for status in breaker:
+                label = outcome_map.get(status.get("outcome"), status.get("state"))
+                failures = status.get("consecutive_failures", 0)
+                lines.append(
+                    f"• {status.get('asp_name') or status.get('asp_id')}: {label}"
+                    + (f"（{failures}回連続失敗）" if failures else "")
+                )
+            message += "\n\n**サーキットブレーカー:**\n" + "\n".join(lines)
+
         return message
 
     def _format_error_message(
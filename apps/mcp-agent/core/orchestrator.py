@@ -3,12 +3,28 @@
 import logging
 import re
 import time
-from typing import Optional, List, Dict, Any
-from .database import SupabaseClient
-from .browser import BrowserController
-from .ai_client import GeminiClient
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Tuple
+from . import adaptive_timeouts, budget, circuit_breaker, instrumentation, metrics, parsing, response_capture, retry_policy, scheduling, sharding
+from .adaptive_timeouts import TimeoutConfig, get_latency_model
+from .budget import BudgetConfig, BudgetExceeded, Deadline
+from .instrumentation import CallStats
 from .notifier import Notifier
+from .resource_policy import ResourcePolicy
+from .retry_policy import RetryDecision, RetryPolicy
+from .run_lock import LeaseResult
+from .checkpoint import ScenarioCheckpoint
 from .scenario_loader import get_scenario_loader
+from .spool import SPOOLED, get_record_spool
+
+if TYPE_CHECKING:
+    # Type-only imports: the concrete clients are injected by the caller, so
+    # importing AgentLoop should not load Supabase, Playwright or Gemini.
+    from .database import SupabaseClient
+    from .browser import BrowserController
+    from .ai_client import GeminiClient
+    from .circuit_breaker import CircuitBreaker
+    from .run_lock import RunLock
+    from .write_buffer import WriteBehindBuffer
 
 logger = logging.getLogger(__name__)
 
@@ -19,17 +35,23 @@ DEFAULT_RETRY_CONFIG = {
     "retry_on": ["timeout", "element_not_found"],
 }
 
+# Actions whose latency is learned (their timeouts come from core.adaptive_timeouts)
+ADAPTIVE_ACTIONS = ("click", "hover", "wait", "capture_response")
+
 
 class AgentLoop:
     """Main agent loop that orchestrates the autonomous scraping process."""
 
     def __init__(
         self,
-        supabase_client: SupabaseClient,
-        browser: BrowserController,
-        gemini_client: GeminiClient,
+        supabase_client: "SupabaseClient",
+        browser: "BrowserController",
+        gemini_client: "GeminiClient",
         notifier: Optional[Notifier] = None,
         debug_mode: bool = False,
+        write_buffer: Optional["WriteBehindBuffer"] = None,
+        breaker: Optional["CircuitBreaker"] = None,
+        run_lock: Optional["RunLock"] = None,
     ):
         """Initialize agent loop.
 
@@ -39,6 +61,12 @@ class AgentLoop:
             gemini_client: Gemini client for AI interpretation
             notifier: Optional notifier for sending alerts
             debug_mode: Enable debug mode with extra logging and screenshots
+            write_buffer: Optional run-level buffer; extracted rows are queued
+                there instead of being written immediately
+            breaker: Optional circuit breaker; ASPs that keep failing are
+                skipped or probed once in run_all_asps
+            run_lock: Optional run lock; a daily/monthly run whose target is
+                being scraped by another run is skipped (see core.run_lock)
         """
         self.supabase = supabase_client
         self.browser = browser
@@ -47,7 +75,28 @@ class AgentLoop:
         self.current_asp_data: Optional[Dict[str, Any]] = None
         self.current_media_id: Optional[str] = None
         self.debug_mode = debug_mode
+        self.write_buffer = write_buffer
+        self.breaker = breaker
+        self.run_lock = run_lock
+        # Lease conflict of the last run_asp_scraper call (None if it ran)
+        self.last_lock_conflict: Optional[LeaseResult] = None
+        # Outcome of the last run_asp_scraper call: success, partial, spooled or failed
+        self.last_status: Optional[str] = None
+        # Rows of the current run that only reached the local spool (database write failed)
+        self.records_spooled = 0
         self.retry_config = DEFAULT_RETRY_CONFIG
+        # Error of the last failed command, used to classify step failures
+        self.last_error: Optional[BaseException] = None
+        # Time budget of the current ASP run (bounded by the run deadline)
+        self.budget_config = BudgetConfig()
+        self.deadline = Deadline()
+        # Learned timeouts of the current ASP (see core.adaptive_timeouts)
+        self.timeout_config = TimeoutConfig()
+        self.latency_key = ""
+        # ``asp`` label of the metrics: the DB name (asps.name), as in BaseScraper
+        self.metrics_asp = ""
+        # Playwright call counts of the current ASP run (SCRAPER_INSTRUMENT=1 only)
+        self.call_stats: Optional[CallStats] = None
         self.scenario_loader = get_scenario_loader()
 
     def run_asp_scraper(
@@ -56,6 +105,7 @@ class AgentLoop:
         execution_type: str = "daily",
         media_id: Optional[str] = None,
         use_yaml: bool = True,
+        probe: bool = False,
     ) -> bool:
         """Run scraper for a specific ASP.
 
@@ -64,11 +114,22 @@ class AgentLoop:
             execution_type: Type of execution ('daily', 'monthly')
             media_id: Media ID to use for this scraper run
             use_yaml: If True, load scenario from YAML file first
+            probe: Single attempt without checkpoint resumes (circuit
+                breaker half-open trial)
 
         Returns:
-            True if successful, False otherwise
+            True if successful, False otherwise (``last_lock_conflict`` is set
+            when the run was skipped because another run holds the lease, and
+            ``last_status`` is "spooled" when the scrape worked but its rows
+            could only be kept in the local spool)
         """
         logger.info(f"Starting scraper for ASP: {asp_name} (type: {execution_type})")
+        self.last_lock_conflict = None
+        self.last_status = "failed"
+        self.records_spooled = 0
+        # Unbounded until this ASP's budget starts, so a failure before that is
+        # never judged against the previous ASP's spent deadline
+        self.deadline = Deadline()
 
         scenario = None
         asp_data = None
@@ -134,114 +195,139 @@ class AgentLoop:
 
         asp_id = asp_data.get("id")
 
-        # Create execution log
-        log_id = self.supabase.create_execution_log(
-            asp_id=asp_id,
-            execution_type=execution_type,
-            metadata={"asp_name": asp_name}
+        # Per-ASP budget from the scenario, bounded by the run deadline
+        self.budget_config = BudgetConfig.from_config(
+            self.scenario_loader.get_budget(yaml_name) if use_yaml else None
         )
+        self.deadline = budget.get_run_deadline().child(self.budget_config.asp_seconds, asp_name)
+        self.timeout_config = TimeoutConfig.from_config(
+            self.scenario_loader.get_timeouts(yaml_name) if use_yaml else None
+        )
+        self.latency_key = yaml_name if use_yaml else asp_name
+        self.metrics_asp = asp_data.get("name") or asp_name
+
+        # Skip targets another run is scraping (manual runs are not locked)
+        lease = LeaseResult(acquired=True)
+        if self.run_lock and asp_id and execution_type in ("daily", "monthly"):
+            # A lease lost mid-run cancels the ASP deadline, so the loop stops at its next check
+            lease = self.run_lock.acquire(asp_id, self.current_media_id, [execution_type], self.deadline)
+            if not lease.acquired:
+                logger.warning(f"Skipping {asp_name}: {lease.describe()}")
+                self.last_lock_conflict = lease
+                return False
 
-        # Parse scenario into steps
-        steps = self._parse_scenario(scenario)
-        logger.info(f"Parsed {len(steps)} steps from scenario")
-
-        # Start browser
-        self.browser.start()
-
+        log_id = None
         records_saved = 0
+        started = time.monotonic()
+        log_metadata = {"asp_name": asp_name}
+        self.call_stats = CallStats() if instrumentation.enabled() else None
         try:
-            # Execute each step
-            for i, step in enumerate(steps, 1):
-                # Check if step is already a command dict (JSON format)
-                if isinstance(step, dict):
-                    # Direct action from JSON scenario - skip AI interpretation
-                    logger.info(f"Step {i}/{len(steps)}: {step.get('action')} - {step.get('selector', '')}")
-                    command = step
-                else:
-                    # Natural language step - needs AI interpretation
-                    logger.info(f"Step {i}/{len(steps)}: {step}")
-
-                    # Get current page context
-                    page_context = self.browser.get_page_content()
-
-                    # Get page screenshot for vision
-                    screenshot_base64 = self.browser.get_page_screenshot_base64()
-
-                    # Ask Gemini to interpret the step
-                    command = self.gemini.interpret_scenario_step(
-                        step, page_context, screenshot_base64
-                    )
-
-                # Handle case where Gemini returns multiple commands
-                if isinstance(command, list):
-                    logger.info(f"Gemini returned {len(command)} commands for this step")
-                    success = True
-                    for i, cmd in enumerate(command):
-                        logger.info(f"  Executing command {i+1}/{len(command)}: {cmd.get('action')}")
-                        if not self._execute_command(cmd):
-                            success = False
-                            break
-                        # Track records saved from extract commands
-                        if cmd.get("action") == "extract":
-                            records_saved = cmd.get("records_saved", 0)
-                else:
-                    # Execute single command
-                    success = self._execute_command(command)
-
-                    # Track records saved from extract commands
-                    if success and command.get("action") == "extract":
-                        records_saved = command.get("records_saved", 0)
-
-                # If command failed and it was a click action, try fallback with text extraction
-                # Only for natural language steps (string), not JSON steps (dict)
-                if not success and not isinstance(command, list) and command.get("action") == "click" and isinstance(step, str):
-                    logger.warning(f"Command failed, trying fallback with text extraction from step")
-                    # Extract text from step description (e.g., "「日別」タブをクリック" -> "日別")
-                    import re
-                    text_match = re.search(r'[「『](.+?)[」』]', step)
-                    fallback_texts = []
-
-                    if text_match:
-                        fallback_texts.append(text_match.group(1))
-
-                    # Also try to extract keywords before "ボタン", "リンク", "タブ" etc.
-                    keyword_match = re.search(r'([^\s]+)(?:ボタン|リンク|タブ|メニュー)', step)
-                    if keyword_match:
-                        keyword = keyword_match.group(1)
-                        # Remove common prefixes/particles
-                        keyword = keyword.replace('の', '').replace('を', '').replace('に', '').replace('が', '')
-                        if keyword and keyword not in fallback_texts:
-                            fallback_texts.append(keyword)
-
-                    # Try each fallback text
-                    for extracted_text in fallback_texts:
-                        logger.info(f"Trying fallback with text: {extracted_text}")
-                        fallback_command = {
-                            "action": "click",
-                            "selector": f"text={extracted_text}"
-                        }
-                        success = self._execute_command(fallback_command)
-                        if success:
-                            logger.info(f"Fallback succeeded with text={extracted_text}")
-                            break
-
-                if not success:
-                    error_msg = f"Failed to execute step: {step}"
+            # Create execution log
+            log_id = self.supabase.create_execution_log(
+                asp_id=asp_id,
+                execution_type=execution_type,
+                metadata=log_metadata
+            )
+
+            # Parse scenario into steps
+            steps = self._parse_scenario(scenario)
+            logger.info(f"Parsed {len(steps)} steps from scenario")
+
+            # Start browser with this ASP's request blocking policy
+            policy_config = self.scenario_loader.get_resource_policy(yaml_name) if use_yaml else None
+            self.browser.start(
+                resource_policy=ResourcePolicy.from_config(policy_config),
+                call_stats=self.call_stats,
+            )
+
+            checkpoint = ScenarioCheckpoint.for_steps(steps)
+            # Failed steps are retried / resumed per failure kind, sharing the
+            # retry budget of the scenario
+            policy = RetryPolicy.from_config(self.retry_config)
+            if probe:
+                policy.max_attempts = 1
+
+            # Execute each step, resuming from the last checkpoint on failure
+            index = 0
+            while index < len(steps):
+                step = steps[index]
+                i = index + 1
+                try:
+                    self._apply_budget()
+                except BudgetExceeded as e:
+                    # Rows extracted by earlier steps are already saved
+                    error_msg = f"{e} before step {i}/{len(steps)}"
                     logger.error(error_msg)
-                    # Update execution log with failure
                     if log_id:
                         self.supabase.update_execution_log(
                             log_id=log_id,
-                            status="failed",
+                            status="partial" if records_saved else "failed",
                             records_saved=records_saved,
                             error_message=error_msg
                         )
                     return False
+                try:
+                    success, saved = self._run_step(step, i, len(steps))
+                except Exception as e:
+                    logger.error(f"Step {i} raised: {e}")
+                    self.last_error = e
+                    success, saved = False, None
+                if saved is not None:
+                    records_saved = saved
 
-                # Take screenshot for debugging
-                self.browser.get_page_screenshot(
-                    f"screenshots/step_{i}_{asp_name}.png"
+                if success:
+                    checkpoint.record(index, self._current_url())
+                    # Take screenshot for debugging
+                    self.browser.get_page_screenshot(
+                        f"screenshots/step_{i}_{asp_name}.png"
+                    )
+                    index += 1
+                    continue
+
+                if self.deadline.expired():
+                    # Out of time: stop at the cancellation point above
+                    continue
+
+                decision = policy.decide(
+                    self._classify_step_failure(checkpoint), checkpoint.resumes + 1
+                )
+                if decision.should_retry:
+                    metrics.RETRIES.inc(asp=self.metrics_asp, kind=decision.kind)
+                    resume_at = self._resume_from_checkpoint(checkpoint, index, decision)
+                    if resume_at is not None:
+                        index = resume_at
+                        continue
+
+                error_msg = (
+                    f"Failed to execute step: {step} [{decision.kind}] ({checkpoint.describe()})"
+                )
+                logger.error(error_msg)
+                # Update execution log with failure
+                if log_id:
+                    self.supabase.update_execution_log(
+                        log_id=log_id,
+                        status="failed",
+                        records_saved=records_saved,
+                        error_message=error_msg
+                    )
+                return False
+
+            if self.records_spooled:
+                # The scrape worked but the database did not take the rows:
+                # they are redelivered from the spool, the run is not a success
+                error_msg = (
+                    f"Database write failed, {self.records_spooled} records kept in local spool"
                 )
+                logger.warning(f"{asp_name}: {error_msg}")
+                self.last_status = SPOOLED
+                if log_id:
+                    self.supabase.update_execution_log(
+                        log_id=log_id,
+                        status="partial",
+                        records_saved=records_saved,
+                        error_message=error_msg
+                    )
+                return False
 
             # Update execution log with success
             if log_id:
@@ -252,6 +338,7 @@ class AgentLoop:
                 )
 
             logger.info(f"Successfully completed scraper for: {asp_name}")
+            self.last_status = "success"
             return True
 
         except Exception as e:
@@ -269,33 +356,140 @@ class AgentLoop:
 
         finally:
             self.browser.stop()
+            if lease.keys:
+                self.run_lock.release(lease.keys)
+            if self.last_status == "failed" and records_saved:
+                self.last_status = "partial"
+            metrics.observe_run(
+                self.metrics_asp,
+                execution_type,
+                self.last_status,
+                time.monotonic() - started,
+                records_saved,
+            )
+            if self.call_stats is not None:
+                logger.info(f"{asp_name}: {self.call_stats.report()}")
+                self.supabase.update_execution_log_metadata(
+                    log_id, {**log_metadata, "playwright_calls": self.call_stats.summary()}
+                )
+
+    def _apply_budget(self) -> None:
+        """Cancellation point: cap the page's default timeout by the remaining budget.
 
-    def run_all_asps(self, execution_type: str = "manual") -> Dict[str, bool]:
+        Raises:
+            BudgetExceeded: The ASP or run budget is spent
+        """
+        timeout_ms = self.deadline.timeout_ms(self.budget_config.action_timeout_ms)
+        if self.browser.page:
+            self.browser.page.set_default_timeout(timeout_ms)
+
+    def _timeout_ms(self, command: Dict[str, Any], default_ms: int) -> int:
+        """Timeout of a command, capped by the budget.
+
+        The learned timeout of the command once it has enough history,
+        otherwise its ``timeout`` (or ``default_ms``).
+        """
+        timeout_ms = get_latency_model().timeout_ms(
+            self.latency_key,
+            self._command_key(command),
+            int(command.get("timeout", default_ms)),
+            self.timeout_config,
+        )
+        return self.deadline.timeout_ms(timeout_ms)
+
+    @staticmethod
+    def _command_key(command: Dict[str, Any]) -> str:
+        """Stable latency key of a command (its action and target)."""
+        target = command.get("selector") or command.get("url_pattern") or command.get("value") or ""
+        return f"{command.get('action')}:{target}"[:200]
+
+    def run_all_asps(
+        self,
+        execution_type: str = "manual",
+        shard: Optional[Tuple[int, int]] = None,
+        deadline_seconds: Optional[float] = None,
+        prioritize: bool = True,
+    ) -> Dict[str, bool]:
         """Run scrapers for all ASPs that have scenarios defined.
 
         Args:
             execution_type: Type of execution ('daily', 'monthly', 'manual')
+            shard: Optional 0-based (index, count); only the ASPs hashing to
+                this shard are run (see core.sharding)
+            deadline_seconds: Optional time budget; ASPs whose expected
+                duration no longer fits are dropped (see core.scheduling)
+            prioritize: Run active, most stale and longest ASPs first instead
+                of in database order
 
         Returns:
             Dictionary mapping ASP names to success status
         """
         asps = self.supabase.get_all_asps()
+        if shard is not None:
+            index, count = shard
+            asps = [asp for asp in asps if sharding.shard_of(sharding.shard_key(asp["id"]), count) == index]
+            logger.info(f"Shard {index + 1}/{count}: {len(asps)} ASPs")
+
+        if deadline_seconds:
+            # The ASP running at the deadline stops at its next step
+            budget.set_run_deadline(deadline_seconds)
+        durations = {}
+        if asps and (prioritize or deadline_seconds):
+            durations = sharding.historical_durations(self.supabase, [asp["id"] for asp in asps])
+        if prioritize:
+            ordered = scheduling.order(
+                [
+                    {
+                        "asp_id": asp["id"],
+                        "is_active": asp.get("is_active", True),
+                        "last_scrape_at": asp.get("last_scrape_at"),
+                        "asp": asp,
+                    }
+                    for asp in asps
+                ],
+                durations,
+            )
+            asps = [target["asp"] for target in ordered]
+        scheduler = scheduling.Scheduler(durations, deadline_seconds)
         results = {}
 
+        if self.breaker:
+            self.breaker.load({asp["id"]: asp["name"] for asp in asps})
+
         for asp in asps:
             asp_name = asp["name"]
             logger.info(f"\n{'='*60}")
             logger.info(f"Processing ASP: {asp_name}")
             logger.info(f"{'='*60}\n")
 
-            success = self.run_asp_scraper(asp_name, execution_type)
+            decision = self.breaker.decide(asp["id"]) if self.breaker else circuit_breaker.RUN
+            if decision == circuit_breaker.SKIP:
+                logger.warning(f"Circuit breaker open, skipping: {asp_name}")
+                continue
+            if not scheduler.admit({"asp_id": asp["id"], "asp_name": asp_name}):
+                continue
+
+            success = self.run_asp_scraper(
+                asp_name, execution_type, probe=decision == circuit_breaker.PROBE
+            )
+            if self.last_lock_conflict:
+                # Another run is scraping this ASP: neither a failure nor a breaker sample
+                continue
             results[asp_name] = success
+            # A database outage or a spent time budget says nothing about the
+            # ASP: no breaker sample
+            if self.breaker and self.last_status != SPOOLED and (success or not self.deadline.expired()):
+                self.breaker.record(asp["id"], success)
 
             # Send error notification for failed ASPs
             if not success and self.notifier:
                 self.notifier.send_error_notification(
                     asp_name=asp_name,
-                    error_message=f"スクレイピングが失敗しました。ログを確認してください。",
+                    error_message=(
+                        f"データベースへの書き込みに失敗しました（{self.records_spooled}件をスプールに保存、後で再送されます）。"
+                        if self.last_status == SPOOLED
+                        else "スクレイピングが失敗しました。ログを確認してください。"
+                    ),
                     execution_type=execution_type,
                 )
 
@@ -310,14 +504,211 @@ class AgentLoop:
 
         logger.info(f"\n{'='*60}")
         logger.info(f"Scraping Summary: {successful}/{total} successful")
+        if scheduler.dropped:
+            names = ", ".join(target["asp_name"] for target in scheduler.dropped)
+            logger.warning(f"Dropped {len(scheduler.dropped)} ASPs at the deadline: {names}")
         logger.info(f"{'='*60}\n")
 
         # Send summary notification
         if self.notifier:
-            self.notifier.send_execution_summary(results, execution_type)
+            self.notifier.send_execution_summary(
+                results,
+                execution_type,
+                breaker=self.breaker.report() if self.breaker else None,
+            )
 
         return results
 
+    def _run_step(self, step: Any, i: int, total: int) -> Tuple[bool, Optional[int]]:
+        """Interpret (if needed) and execute one scenario step.
+
+        Args:
+            step: Command dict (JSON/YAML scenario) or natural language step
+            i: 1-based step number for logging
+            total: Number of steps in the scenario
+
+        Returns:
+            Tuple of (success, records saved by an extract command or None)
+        """
+        records_saved = None
+
+        # Check if step is already a command dict (JSON format)
+        if isinstance(step, dict):
+            # Direct action from JSON scenario - skip AI interpretation
+            logger.info(f"Step {i}/{total}: {step.get('action')} - {step.get('selector', '')}")
+            command = step
+        else:
+            # Natural language step - needs AI interpretation
+            logger.info(f"Step {i}/{total}: {step}")
+
+            # Get current page context
+            page_context = self.browser.get_page_content()
+
+            # Get page screenshot for vision
+            screenshot_base64 = self.browser.get_page_screenshot_base64()
+
+            # Ask Gemini to interpret the step
+            command = self.gemini.interpret_scenario_step(
+                step, page_context, screenshot_base64
+            )
+
+        # Handle case where Gemini returns multiple commands
+        if isinstance(command, list):
+            logger.info(f"Gemini returned {len(command)} commands for this step")
+            success = True
+            for n, cmd in enumerate(command):
+                logger.info(f"  Executing command {n+1}/{len(command)}: {cmd.get('action')}")
+                if not self._execute_command(cmd):
+                    success = False
+                    break
+                # Track records saved from extract commands
+                if cmd.get("action") == "extract":
+                    records_saved = cmd.get("records_saved", 0)
+        else:
+            # Execute single command
+            success = self._execute_command(command)
+
+            # Track records saved from extract commands
+            if success and command.get("action") == "extract":
+                records_saved = command.get("records_saved", 0)
+
+        # If command failed and it was a click action, try fallback with text extraction
+        # Only for natural language steps (string), not JSON steps (dict)
+        if not success and not isinstance(command, list) and command.get("action") == "click" and isinstance(step, str):
+            logger.warning(f"Command failed, trying fallback with text extraction from step")
+            # Extract text from step description (e.g., "「日別」タブをクリック" -> "日別")
+            text_match = re.search(r'[「『](.+?)[」』]', step)
+            fallback_texts = []
+
+            if text_match:
+                fallback_texts.append(text_match.group(1))
+
+            # Also try to extract keywords before "ボタン", "リンク", "タブ" etc.
+            keyword_match = re.search(r'([^\s]+)(?:ボタン|リンク|タブ|メニュー)', step)
+            if keyword_match:
+                keyword = keyword_match.group(1)
+                # Remove common prefixes/particles
+                keyword = keyword.replace('の', '').replace('を', '').replace('に', '').replace('が', '')
+                if keyword and keyword not in fallback_texts:
+                    fallback_texts.append(keyword)
+
+            # Try each fallback text
+            for extracted_text in fallback_texts:
+                logger.info(f"Trying fallback with text: {extracted_text}")
+                fallback_command = {
+                    "action": "click",
+                    "selector": f"text={extracted_text}"
+                }
+                success = self._execute_command(fallback_command)
+                if success:
+                    logger.info(f"Fallback succeeded with text={extracted_text}")
+                    break
+
+        return success, records_saved
+
+    def _current_url(self) -> Optional[str]:
+        """URL of the live page, or None if the browser is gone."""
+        try:
+            return self.browser.page.url if self.browser.page else None
+        except Exception:
+            return None
+
+    def _session_expired(self, checkpoint: ScenarioCheckpoint) -> bool:
+        """Check whether a logged-in run has been sent back to the login form."""
+        if not checkpoint.logged_in or not self.browser.page:
+            return False
+        if checkpoint.is_login_page(self._current_url()):
+            return True
+        try:
+            return self.browser.page.locator("input[type='password']").first.is_visible()
+        except Exception:
+            return False
+
+    def _classify_step_failure(self, checkpoint: ScenarioCheckpoint) -> str:
+        """Classify why the current step failed (see core.retry_policy)."""
+        if (
+            checkpoint.logged_in
+            and checkpoint.anchor_index < checkpoint.login_end
+            and self._session_expired(checkpoint)
+        ):
+            # The login submit never left the login form: credentials rejected
+            return retry_policy.AUTH_REJECTED
+        return retry_policy.classify(self.last_error)
+
+    def _resume_from_checkpoint(
+        self, checkpoint: ScenarioCheckpoint, failed_index: int, decision: RetryDecision
+    ) -> Optional[int]:
+        """Restore the live page to the last checkpoint after a failed step.
+
+        ``retry`` decisions retry the failed step in place if the page has not
+        moved since the last good step. Otherwise the page returns to the
+        anchor of the last checkpoint and the steps after it are replayed.
+        The login steps are replayed only for ``relogin`` decisions or when
+        the session has expired. The browser is never relaunched.
+
+        Args:
+            checkpoint: Progress of the current run
+            failed_index: 0-based index of the step that failed
+            decision: Retry decision for the failure
+
+        Returns:
+            0-based index of the step to continue from, or None if the run
+            cannot be resumed
+        """
+        if not self.browser.page:
+            return None
+
+        checkpoint.resumes += 1
+        logger.warning(
+            f"Step {failed_index + 1} failed ({decision.kind}), {decision.action} "
+            f"from checkpoint ({checkpoint.describe()}) after {decision.delay:.1f}s"
+        )
+        remaining = self.deadline.remaining()
+        time.sleep(decision.delay if remaining is None else min(decision.delay, remaining))
+        if self.deadline.expired():
+            # The caller's next cancellation point ends the run
+            return failed_index
+
+        try:
+            relogin = decision.action == retry_policy.RELOGIN or self._session_expired(checkpoint)
+            if relogin and checkpoint.login_end is not None and checkpoint.logged_in:
+                logger.info("Session expired, replaying login steps")
+                for index in checkpoint.login_steps():
+                    success, _ = self._run_step(
+                        checkpoint.steps[index], index + 1, len(checkpoint.steps)
+                    )
+                    if not success:
+                        logger.error("Re-authentication failed")
+                        return None
+                if checkpoint.anchor_index <= checkpoint.login_end:
+                    # The failure happened right after login: continue from the
+                    # page the fresh login landed on
+                    checkpoint.anchor_index = checkpoint.login_end
+                    checkpoint.anchor_url = self._current_url()
+            elif (
+                decision.action == retry_policy.RETRY
+                and checkpoint.in_place_retry != failed_index
+                and self._current_url() == checkpoint.last_url
+            ):
+                # Once per step; a second failure replays from the anchor
+                checkpoint.in_place_retry = failed_index
+                logger.info(f"Retrying step {failed_index + 1} in place")
+                return failed_index
+
+            if checkpoint.anchor_index < 0:
+                # Nothing succeeded yet: start over in the same browser
+                return 0
+
+            if checkpoint.anchor_url and self._current_url() != checkpoint.anchor_url:
+                self.browser.navigate(checkpoint.anchor_url)
+        except Exception as e:
+            logger.error(f"Failed to restore checkpoint: {e}")
+            return None
+
+        resume_at = checkpoint.resume_index()
+        logger.info(f"Resuming at step {resume_at + 1}/{len(checkpoint.steps)}")
+        return resume_at
+
     def _parse_scenario(self, scenario: str) -> List:
         """Parse scenario text into individual steps.
 
@@ -355,59 +746,36 @@ class AgentLoop:
 
         return steps
 
-    def _execute_command_with_retry(
-        self, command: Dict[str, Any], step_desc: str = ""
-    ) -> bool:
-        """Execute a command with retry logic.
-
-        Args:
-            command: Command dictionary to execute
-            step_desc: Description of the step for logging
+    def _execute_command(self, command: Dict[str, Any]) -> bool:
+        """Execute a command and record its latency for adaptive timeouts.
 
-        Returns:
-            True if successful, False otherwise
+        Successful runs feed the learned quantile; runs that failed with a
+        timeout are recorded as timeouts, which raise the next timeout by a
+        bounded factor that decays once the command succeeds again.
         """
-        max_attempts = self.retry_config.get("max_attempts", 3)
-        delay_ms = self.retry_config.get("delay_ms", 2000)
-        retry_on = self.retry_config.get("retry_on", ["timeout", "element_not_found"])
-
-        for attempt in range(1, max_attempts + 1):
-            try:
-                success = self._execute_command(command)
-                if success:
-                    return True
-
-                # Check if error is retryable
-                error_type = command.get("last_error_type", "unknown")
-                if error_type not in retry_on and attempt < max_attempts:
-                    logger.warning(
-                        f"Error type '{error_type}' not in retry list, failing immediately"
-                    )
-                    return False
-
-            except Exception as e:
-                error_str = str(e).lower()
-                is_retryable = any(
-                    err_type in error_str for err_type in retry_on
+        started = time.monotonic()
+        success = self._dispatch_command(command)
+        if self.metrics_asp:
+            metrics.PHASE_DURATION.observe(
+                time.monotonic() - started, asp=self.metrics_asp, phase=command.get("action") or "unknown"
+            )
+        if command.get("action") in ADAPTIVE_ACTIONS and self.latency_key:
+            # _dispatch_command resets last_error, so it belongs to this command
+            timed_out = (
+                not success
+                and self.last_error is not None
+                and retry_policy.classify(self.last_error) == retry_policy.TIMEOUT
+            )
+            if success or timed_out:
+                get_latency_model().record(
+                    self.latency_key,
+                    self._command_key(command),
+                    (time.monotonic() - started) * 1000,
+                    ok=success,
                 )
+        return success
 
-                if not is_retryable:
-                    logger.error(f"Non-retryable error: {e}")
-                    return False
-
-                logger.warning(f"Retryable error on attempt {attempt}: {e}")
-
-            if attempt < max_attempts:
-                logger.info(
-                    f"Retrying {step_desc} (attempt {attempt + 1}/{max_attempts}) "
-                    f"after {delay_ms}ms..."
-                )
-                time.sleep(delay_ms / 1000)
-
-        logger.error(f"All {max_attempts} attempts failed for: {step_desc}")
-        return False
-
-    def _execute_command(self, command: Dict[str, Any]) -> bool:
+    def _dispatch_command(self, command: Dict[str, Any]) -> bool:
         """Execute a command returned by Gemini.
 
         Args:
@@ -419,6 +787,7 @@ class AgentLoop:
         import re  # Import at method level to avoid local variable conflict
 
         action = command.get("action")
+        self.last_error = None
 
         if action == "error":
             logger.error(f"Command error: {command.get('message')}")
@@ -433,7 +802,7 @@ class AgentLoop:
         elif action == "click":
             selector = command.get("selector")
             no_wait_after = command.get("no_wait_after", False)
-            click_timeout = command.get("timeout", 10000)
+            click_timeout = self._timeout_ms(command, 10000)
             if not self.browser.page:
                 return False
             try:
@@ -468,6 +837,7 @@ class AgentLoop:
                     self.browser.page.locator(selector).first.click(**click_opts)
                     logger.info(f"Clicked {selector}")
                 except Exception as e:
+                    self.last_error = e
                     # If click failed due to visibility, try the last matching element (often the visible one)
                     if "not visible" in str(e).lower() or "timeout" in str(e).lower():
                         logger.warning(f"First element not visible, trying last element: {e}")
@@ -475,6 +845,7 @@ class AgentLoop:
                             self.browser.page.locator(selector).last.click(**click_opts)
                             logger.info(f"Clicked last {selector}")
                         except Exception as e2:
+                            self.last_error = e2
                             # Final fallback: force click the first element
                             logger.warning(f"Last element also failed, force clicking first: {e2}")
                             click_opts["force"] = True
@@ -486,6 +857,7 @@ class AgentLoop:
                 self.browser.page.wait_for_timeout(2000)
                 return True
             except Exception as e:
+                self.last_error = e
                 logger.error(f"Click failed: {e}")
                 return False
 
@@ -515,6 +887,7 @@ class AgentLoop:
                 logger.info(f"Filled {selector} with value")
                 return True
             except Exception as e:
+                self.last_error = e
                 logger.error(f"Fill failed: {e}")
                 return False
 
@@ -522,7 +895,12 @@ class AgentLoop:
             duration = int(command.get("milliseconds") or command.get("value", 2000))
             if not self.browser.page:
                 return False
-            self.browser.page.wait_for_timeout(duration)
+            # The fixed duration is the cold-start limit of a settle wait
+            limit = self._timeout_ms(command, duration)
+            if self.timeout_config.adaptive:
+                adaptive_timeouts.settle(self.browser.page, limit, self.timeout_config.min_wait_ms)
+            else:
+                self.browser.page.wait_for_timeout(limit)
             return True
 
         elif action == "keyboard":
@@ -534,6 +912,7 @@ class AgentLoop:
                 logger.info(f"Pressed keyboard key: {key}")
                 return True
             except Exception as e:
+                self.last_error = e
                 logger.error(f"Keyboard press failed: {e}")
                 return False
 
@@ -546,6 +925,7 @@ class AgentLoop:
                 logger.info(f"Screenshot saved to: {path}")
                 return True
             except Exception as e:
+                self.last_error = e
                 logger.error(f"Screenshot failed: {e}")
                 return False
 
@@ -572,16 +952,18 @@ class AgentLoop:
                 selectors = [s.strip() for s in selector.split(',')]
                 for sel in selectors:
                     try:
-                        self.browser.page.hover(sel, timeout=5000)
+                        self.browser.page.hover(sel, timeout=self._timeout_ms(command, 5000))
                         logger.info(f"Hovered over {sel}")
                         return True
                     except Exception as e:
+                        self.last_error = e
                         logger.warning(f"Hover failed for {sel}: {e}")
                         continue
 
                 # All selectors failed
                 raise Exception(f"All hover selectors failed: {selectors}")
             except Exception as e:
+                self.last_error = e
                 logger.error(f"Hover failed: {e}")
                 return False
 
@@ -597,6 +979,7 @@ class AgentLoop:
                 self.browser.page.wait_for_timeout(1000)
                 return True
             except Exception as e:
+                self.last_error = e
                 logger.error(f"Scroll failed: {e}")
                 return False
 
@@ -610,6 +993,7 @@ class AgentLoop:
                 logger.info(f"Selected '{value}' in {selector}")
                 return True
             except Exception as e:
+                self.last_error = e
                 logger.error(f"Select failed: {e}")
                 return False
 
@@ -684,12 +1068,7 @@ class AgentLoop:
                                 month = month_match.group(1).zfill(2)
                                 period = f"{year}-{month}"
 
-                                # Parse amount
-                                amount_str = re.sub(r'[¥,円$\s]', '', amount_text)
-                                try:
-                                    amount = int(amount_str) if amount_str else 0
-                                except:
-                                    amount = 0
+                                amount = parsing.parse_amount(amount_text)
 
                                 extracted_records.append({
                                     "period": period,
@@ -764,9 +1143,9 @@ class AgentLoop:
                                 continue
                             cell_texts = [cell.inner_text().strip() for cell in cells]
 
-                            # Check if first cell looks like a date (YYYY/MM/DD or YYYY年MM月DD日 format)
+                            # Check if first cell looks like a date (YYYY/MM/DD, YYYY年MM月DD日, ...)
                             first_cell = cell_texts[0]
-                            if re.match(r'\d{4}[/-]\d{1,2}[/-]\d{1,2}', first_cell) or re.match(r'\d{4}年\d{1,2}月\d{1,2}日', first_cell):
+                            if parsing.parse_date(first_cell) is not None:
                                 header_row = i - 1
                                 logger.info(f"  Found data row at index {i}, header should be at {header_row}")
                                 break
@@ -798,18 +1177,12 @@ class AgentLoop:
                             cells = row.locator("td, th").all()
                             cell_texts = [cell.inner_text().strip() for cell in cells]
 
-                            # Try to parse each column as a number
-                            for col_idx in range(1, len(cell_texts)):  # Skip column 0 (date)
-                                try:
-                                    # Remove common separators and currency symbols
-                                    value_str = re.sub(r'[¥,円$]', '', cell_texts[col_idx])
-                                    value = int(value_str)
-
-                                    if col_idx not in column_sums:
-                                        column_sums[col_idx] = 0
-                                    column_sums[col_idx] += value
-                                except:
-                                    pass
+                            # Parse the row's cells in one call, skipping column 0 (date);
+                            # non-numeric cells parse to None and are left out of the sums
+                            values = parsing.parse_amounts(cell_texts[1:], default=None)
+                            for col_idx, value in enumerate(values, start=1):
+                                if value is not None:
+                                    column_sums[col_idx] = column_sums.get(col_idx, 0) + value
 
                         # Find the column with the largest sum
                         if column_sums:
@@ -978,13 +1351,14 @@ class AgentLoop:
                         extracted_data, actual_table, command
                     )
                     command["records_saved"] = saved_count
-                    return saved_count > 0
+                    return saved_count > 0 or bool(command.get("records_spooled"))
                 else:
                     logger.warning(f"Unknown target table: {target_table}")
                     command["records_saved"] = 0
                     return False
 
             except Exception as e:
+                self.last_error = e
                 logger.error(f"Extract failed: {e}")
                 import traceback
                 logger.error(traceback.format_exc())
@@ -1008,6 +1382,7 @@ class AgentLoop:
                 logger.info(f"Downloaded file to: {download_path}")
                 return True
             except Exception as e:
+                self.last_error = e
                 logger.error(f"Download failed: {e}")
                 return False
 
@@ -1112,15 +1487,77 @@ class AgentLoop:
                 extracted_data = json.dumps(extracted_records, ensure_ascii=False)
                 saved_count = self._save_extracted_data(extracted_data, target_table, command)
                 command["records_saved"] = saved_count
-                return saved_count > 0
+                return saved_count > 0 or bool(command.get("records_spooled"))
 
             except Exception as e:
+                self.last_error = e
                 logger.error(f"Extract CSV failed: {e}")
                 import traceback
                 logger.error(traceback.format_exc())
                 command["records_saved"] = 0
                 return False
 
+        elif action == "capture_response":
+            # Read the report from the JSON API call behind the page instead of the DOM
+            url_pattern = command.get("url_pattern")
+            target_table = command.get("target", "daily_actuals")
+            page = self.browser.page
+            if not page or not url_pattern:
+                logger.error("capture_response requires an open page and url_pattern")
+                command["records_saved"] = 0
+                return False
+
+            # Trigger: navigate to value, click selector, or reload the current page
+            url = command.get("value")
+            selector = command.get("selector")
+            if url:
+                def trigger():
+                    self.browser.navigate(url)
+            elif selector:
+                def trigger():
+                    page.locator(selector).first.click()
+            else:
+                trigger = page.reload
+
+            try:
+                payload = response_capture.capture_json(
+                    page,
+                    url_pattern,
+                    trigger,
+                    method=command.get("method"),
+                    timeout_ms=self._timeout_ms(command, 30000),
+                )
+                extracted_records = response_capture.extract_records(
+                    payload,
+                    items=command.get("items", "[*]"),
+                    date=command.get("date_field", "date"),
+                    amount=command.get("amount_field", "amount"),
+                    monthly=target_table == "actuals",
+                )
+                if not extracted_records:
+                    logger.warning(f"No records in response matching {url_pattern}")
+                    command["records_saved"] = 0
+                    return False
+
+                if self.current_asp_data:
+                    command["media_id"] = self.current_media_id
+                    command["account_item_id"] = self.current_asp_data.get(
+                        "account_item_id", "a6df5fab-2df4-4263-a888-ab63348cccd5"
+                    )
+                    command["asp_id"] = self.current_asp_data.get("id")
+
+                import json
+                extracted_data = json.dumps(extracted_records, ensure_ascii=False)
+                saved_count = self._save_extracted_data(extracted_data, target_table, command)
+                command["records_saved"] = saved_count
+                return saved_count > 0 or bool(command.get("records_spooled"))
+
+            except Exception as e:
+                self.last_error = e
+                logger.error(f"Capture response failed: {e}")
+                command["records_saved"] = 0
+                return False
+
         else:
             logger.warning(f"Unknown action: {action}")
             return False
@@ -1191,46 +1628,13 @@ class AgentLoop:
         Returns:
             Date in YYYY-MM-DD format, or None if parsing fails
         """
-        import re
         from datetime import datetime
 
-        # Remove whitespace
-        date_str = date_str.strip()
-
-        # Remove weekday suffix like (月), (火), (日) etc.
-        date_str = re.sub(r'\s*\([日月火水木金土曜]\)\s*', '', date_str)
-
-        # Try Japanese format first: YYYY年MM月DD日
-        jp_match = re.match(r'(\d{4})年(\d{1,2})月(\d{1,2})日', date_str)
-        if jp_match:
-            year = jp_match.group(1)
-            month = jp_match.group(2).zfill(2)
-            day = jp_match.group(3).zfill(2)
-            return f"{year}-{month}-{day}"
-
-        # Try various date formats
-        formats = [
-            "%Y/%m/%d",
-            "%Y-%m-%d",
-            "%m/%d",  # Will use current year
-            "%m-%d",  # Will use current year
-        ]
-
-        for fmt in formats:
-            try:
-                if "%Y" not in fmt:
-                    # Add current year
-                    current_year = datetime.now().year
-                    date_str_with_year = f"{current_year}/{date_str}"
-                    parsed = datetime.strptime(date_str_with_year, f"%Y/{fmt}")
-                else:
-                    parsed = datetime.strptime(date_str, fmt)
-                return parsed.strftime("%Y-%m-%d")
-            except ValueError:
-                continue
-
-        logger.warning(f"Failed to parse date: {date_str}")
-        return None
+        # Dates without a year (e.g., "11/25") use the current year
+        parsed = parsing.parse_date(date_str, default_year=datetime.now().year)
+        if parsed is None:
+            logger.warning(f"Failed to parse date: {date_str}")
+        return parsed
 
     def _parse_period(self, period_str: str) -> str:
         """Parse period string to YYYY-MM format.
@@ -1241,34 +1645,10 @@ class AgentLoop:
         Returns:
             Period in YYYY-MM format, or None if parsing fails
         """
-        import re
-
-        # Remove whitespace
-        period_str = period_str.strip()
-
-        # Try pattern: YYYY年MM月 (Japanese format)
-        match = re.match(r"(\d{4})年(\d{1,2})月", period_str)
-        if match:
-            year = match.group(1)
-            month = match.group(2).zfill(2)
-            return f"{year}-{month}"
-
-        # Try pattern: YYYY/MM or YYYY-MM
-        match = re.match(r"(\d{4})[/-](\d{1,2})", period_str)
-        if match:
-            year = match.group(1)
-            month = match.group(2).zfill(2)
-            return f"{year}-{month}"
-
-        # Try pattern: YYYYMM
-        match = re.match(r"(\d{4})(\d{2})", period_str)
-        if match:
-            year = match.group(1)
-            month = match.group(2)
-            return f"{year}-{month}"
-
-        logger.warning(f"Failed to parse period: {period_str}")
-        return None
+        parsed = parsing.parse_month(period_str)
+        if parsed is None:
+            logger.warning(f"Failed to parse period: {period_str}")
+        return parsed
 
     def _parse_amount(self, amount_str: str) -> int:
         """Parse amount string to integer.
@@ -1279,18 +1659,7 @@ class AgentLoop:
         Returns:
             Amount as integer (0 if parsing fails)
         """
-        import re
-
-        # Remove whitespace, currency symbols, and separators
-        amount_str = amount_str.strip()
-        amount_str = re.sub(r"[¥,円$]", "", amount_str)
-
-        try:
-            # Handle decimal numbers (e.g., 444553.0)
-            return int(float(amount_str))
-        except ValueError:
-            logger.warning(f"Failed to parse amount: {amount_str}")
-            return 0
+        return parsing.parse_amount(amount_str)
 
     def _save_extracted_data(
         self, extracted_data: str, table_name: str, command: Dict[str, Any]
@@ -1303,10 +1672,13 @@ class AgentLoop:
             command: Command object containing metadata
 
         Returns:
-            Number of records successfully saved
+            Number of records written (or queued in the write buffer); rows
+            that only reached the local spool are not counted here but added
+            to ``records_spooled``
         """
         import json
 
+        command.pop("records_spooled", None)
         try:
             # Parse JSON data
             data_obj = json.loads(extracted_data)
@@ -1334,73 +1706,86 @@ class AgentLoop:
                 )
                 return 0
 
-            # Save each record
-            saved_count = 0
-            for record in records:
-                # Handle both daily (date) and monthly (period) records
-                date_value = record.get("date")
-                period_value = record.get("period")
-                amount = record.get("amount")
+            if table_name not in ("daily_actuals", "actuals"):
+                logger.error(f"Unsupported table for extracted data: {table_name}")
+                return 0
 
-                # Check if we have either date or period
-                if not (date_value or period_value) or amount is None:
+            # Handle both daily (date) and monthly (period) records
+            valid = []
+            for record in records:
+                if not (record.get("date") or record.get("period")) or record.get("amount") is None:
                     logger.warning(f"Skipping invalid record: {record}")
                     continue
+                valid.append(record)
+
+            # Normalize each column in one call, then write only what changed in one batch
+            from calendar import monthrange
+            from datetime import datetime
+
+            dates = parsing.parse_dates(
+                [record.get("date") for record in valid], default_year=datetime.now().year
+            )
+            periods = parsing.parse_months([record.get("period") for record in valid])
+            amounts = parsing.parse_amounts([record["amount"] for record in valid])
+            rows = []
+            for record, date_value, period_value, amount in zip(valid, dates, periods, amounts):
+                if not record.get("date") and period_value:
+                    # Monthly actuals are stored at the last day of the month
+                    year, month = map(int, period_value.split("-"))
+                    date_value = f"{period_value}-{monthrange(year, month)[1]:02d}"
+                if date_value is None:
+                    logger.warning(f"Skipping record with unparseable date: {record}")
+                    continue
 
-                # If monthly record (period field), convert to end-of-month date
-                if period_value and not date_value:
-                    # period is in YYYY-MM format, convert to last day of month
-                    from datetime import datetime
-                    try:
-                        year, month = period_value.split("-")
-                        # Get last day of month
-                        if int(month) == 12:
-                            next_month = datetime(int(year) + 1, 1, 1)
-                        else:
-                            next_month = datetime(int(year), int(month) + 1, 1)
-                        from datetime import timedelta
-                        last_day = next_month - timedelta(days=1)
-                        date_value = last_day.strftime("%Y-%m-%d")
-                        logger.info(f"Converted period {period_value} to date {date_value}")
-                    except Exception as e:
-                        logger.warning(f"Failed to convert period {period_value}: {e}")
-                        continue
+                rows.append({
+                    "date": date_value,
+                    "amount": amount,
+                    "media_id": media_id,
+                    "account_item_id": account_item_id,
+                    "asp_id": asp_id,
+                })
 
-                # Normalize date format (support Japanese date format)
-                # e.g., "2025年11月01日" -> "2025-11-01"
-                date_match = re.match(r'(\d{4})年(\d{1,2})月(\d{1,2})日', str(date_value))
-                if date_match:
-                    year = date_match.group(1)
-                    month = date_match.group(2).zfill(2)
-                    day = date_match.group(3).zfill(2)
-                    date_value = f"{year}-{month}-{day}"
-                    logger.info(f"Normalized Japanese date format: {date_value}")
-
-                # Save to Supabase
-                if table_name == "daily_actuals":
-                    success = self.supabase.save_daily_actual(
-                        date=date_value,
-                        amount=int(float(amount)),  # Convert to integer
-                        media_id=media_id,
-                        account_item_id=account_item_id,
-                        asp_id=asp_id,
-                    )
-                elif table_name == "actuals":
-                    # Monthly data goes to actuals table
-                    success = self.supabase.save_actual(
-                        date=date_value,  # For monthly, date is end of month (YYYY-MM-DD)
-                        amount=int(float(amount)),  # Convert to integer
-                        media_id=media_id,
-                        account_item_id=account_item_id,
-                        asp_id=asp_id,
-                    )
-                else:
-                    success = False
+            if not rows:
+                logger.info(f"Saved 0/{len(records)} records to {table_name}")
+                return 0
 
-                if success:
-                    saved_count += 1
+            if self.write_buffer is not None:
+                queued = self.write_buffer.push(table_name, rows)
+                logger.info(f"Queued {queued}/{len(records)} records for {table_name}")
+                return queued
+
+            # Spool the batch first so a failed write never needs a re-scrape.
+            # Scenario steps may extract a partial window, so never delete here.
+            dates = [row["date"] for row in rows]
+            spool = get_record_spool()
+            batch_id = spool.enqueue(
+                table_name,
+                asp_id=asp_id,
+                media_id=media_id,
+                records=rows,
+                start_date=min(dates),
+                end_date=max(dates),
+                operation="merge",
+            )
+            drained = spool.drain(
+                self.supabase, key=(table_name, asp_id, media_id), respect_backoff=False
+            )
+            counts = drained["results"].get(batch_id)
+            if counts is None:
+                logger.warning(
+                    f"Database write failed, {len(rows)} records kept in spool: "
+                    f"{drained['last_error']}"
+                )
+                self.records_spooled += len(rows)
+                command["records_spooled"] = len(rows)
+                return 0
 
-            logger.info(f"Saved {saved_count}/{len(records)} records to {table_name}")
+            saved_count = counts["added"] + counts["changed"] + counts["unchanged"]
+            logger.info(
+                f"Saved {saved_count}/{len(records)} records to {table_name} "
+                f"(added={counts['added']}, changed={counts['changed']}, "
+                f"unchanged={counts['unchanged']})"
+            )
             return saved_count
 
         except json.JSONDecodeError as e:
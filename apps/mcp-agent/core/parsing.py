@@ -0,0 +1,223 @@
+"""Fast parsing of Japanese dates and yen amounts from ASP reports.
+
+All scrapers and the orchestrator share these parsers. Patterns are compiled
+once at import time, full-width characters are normalized with a single
+``str.translate`` table, and one tokenizer regex recognizes every date layout
+seen in ASP reports:
+
+* ``2025年11月06日``, ``2025/11/06``, ``2025-11-06``, ``2025.11.06``
+* ``2025/11/06(木)``, ``2025年11月6日（木）``
+* ``20251106`` and, with a default year, ``11/06`` or ``11月06日``
+* month periods: ``2025年11月``, ``2025/11``, ``2025-11``, ``202511``
+
+The ``parse_*s`` functions parse a whole column in one call, which is how
+CSV/table scrapers should use them.
+"""
+
+import re
+from typing import Iterable, List, Optional, Tuple
+
+# Full-width digits/punctuation -> ASCII (faster than unicodedata.normalize).
+# "ー" (katakana long vowel) is often typed instead of a dash in report cells.
+_FULLWIDTH_CHARS = "０１２３４５６７８９／－．，：（）￥＄　−‐―ー"
+_FULLWIDTH = str.maketrans(_FULLWIDTH_CHARS, "0123456789/-.,:()¥$ ----")
+# str.translate is slow, so only translate text that needs it
+_FULLWIDTH_RE = re.compile(f"[{_FULLWIDTH_CHARS}]")
+
+_DATE_RE = re.compile(
+    r"""
+    \s*
+    (?:
+        # YYYY年MM月DD日 / YYYY/MM/DD / YYYY-MM-DD / YYYY年MM月 / YYYY/MM
+        (?P<y>\d{4}) \s* [年/.\-] \s* (?P<m>\d{1,2}) \s*
+        (?: [月/.\-] \s* (?P<d>\d{1,2}) \s* 日? | 月 )?
+      |
+        # YYYYMMDD / YYYYMM
+        (?P<cy>\d{4}) (?P<cm>\d{2}) (?P<cd>\d{2})?
+      |
+        # MM月DD日 / MM/DD (year supplied by the caller)
+        (?P<sm>\d{1,2}) \s* [月/\-] \s* (?P<sd>\d{1,2}) \s* 日?
+    )
+    (?!\d)
+    """,
+    re.VERBOSE,
+)
+
+# First number in a cell: optional sign (incl. △/▲ used in Japanese reports),
+# digits with thousands separators, optional decimals
+_AMOUNT_RE = re.compile(r"([-△▲]?)\s*[¥$]?\s*(\d[\d,]*(?:\.\d+)?)")
+
+# Days per month; February handled with the leap-year rule
+_DAYS_IN_MONTH = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+DateToken = Tuple[Optional[int], int, Optional[int]]
+
+
+def normalize(text: str) -> str:
+    """Convert full-width digits and punctuation to ASCII and strip spaces."""
+    if not text.isascii() and _FULLWIDTH_RE.search(text):
+        text = text.translate(_FULLWIDTH)
+    return text.strip()
+
+
+def _valid(year: int, month: int, day: Optional[int]) -> bool:
+    if not 1 <= month <= 12:
+        return False
+    if day is None:
+        return True
+    if month == 2 and day == 29:
+        return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    return 1 <= day <= _DAYS_IN_MONTH[month]
+
+
+def _tokenize(text: str) -> Optional[DateToken]:
+    """Split an already-normalized date cell into (year, month, day).
+
+    Year is None for ``MM/DD`` cells, day is None for month periods.
+    """
+    match = _DATE_RE.match(text)
+    if not match:
+        return None
+    y, m, d, cy, cm, cd, sm, sd = match.groups()
+    if y:
+        return int(y), int(m), int(d) if d else None
+    if cy:
+        return int(cy), int(cm), int(cd) if cd else None
+    return None, int(sm), int(sd)
+
+
+def tokenize_date(text: str) -> Optional[DateToken]:
+    """Split a date/period cell into ``(year, month, day)``.
+
+    Args:
+        text: Cell text (full-width characters allowed)
+
+    Returns:
+        Tuple with year None for ``MM/DD`` cells and day None for month
+        periods, or None if the cell is not a date
+    """
+    if not text:
+        return None
+    return _tokenize(normalize(str(text)))
+
+
+def _format_date(token: Optional[DateToken], default_year: Optional[int]) -> Optional[str]:
+    if token is None:
+        return None
+    year, month, day = token
+    if day is None:
+        return None
+    if year is None:
+        if default_year is None:
+            return None
+        year = default_year
+    if not _valid(year, month, day):
+        return None
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+def _format_month(token: Optional[DateToken]) -> Optional[str]:
+    if token is None:
+        return None
+    year, month, _ = token
+    if year is None or not 1 <= month <= 12:
+        return None
+    return f"{year:04d}-{month:02d}"
+
+
+def _parse_amount(text: str, default: int) -> int:
+    # Fast path: plain digits once currency marks and separators are removed
+    cleaned = text.replace(",", "").replace("¥", "").replace("円", "")
+    if cleaned.isascii() and cleaned.isdigit():
+        return int(cleaned)
+    if not cleaned or cleaned == "-":
+        return default
+    match = _AMOUNT_RE.search(text)
+    if not match:
+        return default
+    sign, digits = match.groups()
+    digits = digits.replace(",", "")
+    value = int(digits) if "." not in digits else int(float(digits))
+    return -value if sign else value
+
+
+# ==================== Single values ====================
+
+
+def parse_date(text: str, default_year: Optional[int] = None) -> Optional[str]:
+    """Parse a date cell to ``YYYY-MM-DD``.
+
+    Args:
+        text: Date text such as "2025年11月06日" or "2025/11/06(木)"
+        default_year: Year used for cells without one (e.g. "11/06")
+
+    Returns:
+        ISO date, or None for month periods, invalid dates and non-dates
+    """
+    return _format_date(tokenize_date(text), default_year)
+
+
+def parse_month(text: str) -> Optional[str]:
+    """Parse a period cell to ``YYYY-MM`` (a full date yields its month).
+
+    Args:
+        text: Period text such as "2025年11月", "2025/11" or "202511"
+
+    Returns:
+        Year-month, or None if the cell is not a period
+    """
+    return _format_month(tokenize_date(text))
+
+
+def parse_amount(text, default: int = 0) -> int:
+    """Parse a yen amount cell to an integer.
+
+    Handles "¥1,234", "1,234円", "１，２３４", "444553.0", "-500" and "△500".
+    Decimals are truncated.
+
+    Args:
+        text: Amount text (numbers are returned as int)
+        default: Value for empty cells, "-" and non-numeric text
+
+    Returns:
+        Amount in yen
+    """
+    if text is None:
+        return default
+    if isinstance(text, (int, float)):
+        return int(text)
+    return _parse_amount(normalize(text), default)
+
+
+# ==================== Whole columns ====================
+
+
+def _normalize_column(values: Iterable) -> List[str]:
+    """Normalize a column with one translate call over the joined text."""
+    cells = ["" if v is None else str(v).replace("\n", " ") for v in values]
+    if not cells:
+        return []
+    joined = "\n".join(cells)
+    if not joined.isascii() and _FULLWIDTH_RE.search(joined):
+        joined = joined.translate(_FULLWIDTH)
+    return [cell.strip() for cell in joined.split("\n")]
+
+
+def parse_dates(values: Iterable, default_year: Optional[int] = None) -> List[Optional[str]]:
+    """Parse a column of date cells (see :func:`parse_date`)."""
+    tokenize = _tokenize
+    return [
+        _format_date(tokenize(cell), default_year) if cell else None
+        for cell in _normalize_column(values)
+    ]
+
+
+def parse_months(values: Iterable) -> List[Optional[str]]:
+    """Parse a column of period cells (see :func:`parse_month`)."""
+    tokenize = _tokenize
+    return [_format_month(tokenize(cell)) if cell else None for cell in _normalize_column(values)]
+
+
+def parse_amounts(values: Iterable, default: int = 0) -> List[int]:
+    """Parse a column of amount cells (see :func:`parse_amount`)."""
+    return [_parse_amount(cell, default) for cell in _normalize_column(values)]
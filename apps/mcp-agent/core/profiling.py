@@ -0,0 +1,278 @@
+"""Profiling of scraper runs (``--profile`` of the runners).
+
+Each run is profiled twice at once:
+
+- cProfile, for exact per-function Python costs, saved as ``<name>.prof``
+  (open with ``python -m pstats`` or snakeviz)
+- a sampling profiler reading the run thread's stack every few milliseconds,
+  saved as collapsed stacks in ``<name>.collapsed.txt`` (one ``a;b;c count``
+  line per stack, the input of flamegraph.pl / speedscope)
+
+Python-side cost and browser wait are separated with the run thread's CPU
+time: the browser and the Playwright driver are other processes, so time in
+this thread that is not CPU time is spent waiting for them (or for the
+network and sleeps). The Python side is further split by the module the time
+was spent in (parsing, logging, json, DB client, Playwright's own Python):
+
+    with RunProfiler(profile_name("A8.net", "daily")) as profiler:
+        scraper.run_daily()
+    print(profiler.report())
+
+Files go to ``var/profiles`` unless another directory is given. Runners
+enable profiling with :func:`enable`, which also reaches the generated
+scripts that ``ScraperExecutor`` starts (through
+``python core/profiling.py --name N script.py``).
+
+Only the standard library is used so that this file also runs as a script.
+"""
+
+import argparse
+import cProfile
+import logging
+import os
+import pstats
+import re
+import runpy
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_DIR = Path(__file__).parent.parent / "var" / "profiles"
+
+# Environment variable carrying the profile directory (inherited by subprocesses)
+PROFILE_ENV = "SCRAPER_PROFILE_DIR"
+
+# Built-in functions where the thread blocks on the browser, network or a sleep
+_WAIT_FUNCTIONS = (
+    "greenlet", "acquire", "time.sleep", "select", "poll", "epoll", "kqueue", "recv", "wait",
+)
+
+# Python-side categories by the path of the function's file (first match wins)
+_CATEGORIES = (
+    ("playwright", f"{os.sep}playwright{os.sep}"),
+    ("db client", f"{os.sep}postgrest{os.sep}"),
+    ("db client", f"{os.sep}supabase{os.sep}"),
+    ("db client", f"{os.sep}httpx{os.sep}"),
+    ("db client", f"{os.sep}httpcore{os.sep}"),
+    ("parsing", f"core{os.sep}parsing.py"),
+    ("logging", f"{os.sep}logging{os.sep}"),
+    ("json", f"{os.sep}json{os.sep}"),
+)
+
+
+def enable(out_dir: Optional[Path] = None) -> Path:
+    """Profile scraper runs of this process and its subprocesses."""
+    path = Path(out_dir or DEFAULT_PROFILE_DIR)
+    os.environ[PROFILE_ENV] = str(path)
+    return path
+
+
+def profile_dir() -> Optional[Path]:
+    """Directory profiles are written to, or None if profiling is off."""
+    value = os.environ.get(PROFILE_ENV)
+    return Path(value) if value else None
+
+
+def profile_name(asp: str, execution_type: str, media: Optional[str] = None) -> str:
+    """File name stem of a run: ``<asp>-<type>[-<media>]-<timestamp>``."""
+    parts = [asp, execution_type] + ([media] if media else [])
+    slugs = [re.sub(r"[^\w.+]+", "_", part).strip("_") or "_" for part in parts]
+    return "-".join(slugs + [datetime.now().strftime("%Y%m%d-%H%M%S")])
+
+
+def _frame_label(code: Any) -> str:
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})".replace(";", ",")
+
+
+def _category(filename: str, function: str) -> str:
+    if filename == "~":
+        return "wait" if any(name in function for name in _WAIT_FUNCTIONS) else "builtins"
+    for category, marker in _CATEGORIES:
+        if marker in filename:
+            return category
+    return "other python"
+
+
+class RunProfiler:
+    """cProfile plus a stack sampler around one scraper run (one thread)."""
+
+    def __init__(
+        self,
+        name: str,
+        out_dir: Optional[Path] = None,
+        interval: float = 0.005,
+        top: int = 15,
+    ):
+        """Initialize run profiler.
+
+        Args:
+            name: File name stem (see profile_name)
+            out_dir: Output directory (defaults to $SCRAPER_PROFILE_DIR or var/profiles)
+            interval: Sampling interval in seconds
+            top: Hotspots shown by report()
+        """
+        self.name = name
+        self.out_dir = Path(out_dir or profile_dir() or DEFAULT_PROFILE_DIR)
+        self.interval = interval
+        self.top = top
+        self.paths: Dict[str, Path] = {}
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self._profile: Optional[cProfile.Profile] = None
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "RunProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    # ==================== Start / stop ====================
+
+    def start(self) -> None:
+        """Start profiling the calling thread."""
+        self._ident = threading.get_ident()
+        self._profile = cProfile.Profile()
+        try:
+            self._profile.enable()
+        except ValueError as e:
+            # Python 3.12+ allows one cProfile at a time; concurrent runs keep the sampler
+            logger.warning(f"cProfile unavailable for {self.name}, sampling only: {e}")
+            self._profile = None
+        self._sampler = threading.Thread(target=self._sample, name=f"profiler-{self.name}", daemon=True)
+        self._sampler.start()
+        self._started_wall = time.perf_counter()
+        self._started_cpu = time.thread_time()
+
+    def stop(self) -> None:
+        """Stop profiling and write the profile files."""
+        self.wall_s = time.perf_counter() - self._started_wall
+        self.cpu_s = time.thread_time() - self._started_cpu
+        if self._profile is not None:
+            self._profile.disable()
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        try:
+            self._write()
+        except OSError as e:
+            # Profiling is diagnostic; never fail a scrape over it
+            logger.warning(f"Could not write profile {self.name}: {e}")
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._ident)
+            stack: List[str] = []
+            while frame is not None and len(stack) < 128:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self._stacks[";".join(reversed(stack))] += 1
+
+    def _write(self) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        if self._profile is not None:
+            self.paths["prof"] = self.out_dir / f"{self.name}.prof"
+            self._profile.dump_stats(str(self.paths["prof"]))
+        self.paths["collapsed"] = self.out_dir / f"{self.name}.collapsed.txt"
+        with open(self.paths["collapsed"], "w", encoding="utf-8") as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    # ==================== Analysis ====================
+
+    def _stats(self) -> Dict[Tuple[str, int, str], Tuple]:
+        if self._profile is None:
+            return {}
+        return pstats.Stats(self._profile).stats  # type: ignore[attr-defined]
+
+    def categories(self) -> Dict[str, float]:
+        """Seconds of Python time (cProfile tottime) per category, wait excluded."""
+        totals: Dict[str, float] = Counter()
+        for (filename, _, function), (_, _, tottime, _, _) in self._stats().items():
+            category = _category(filename, function)
+            if category != "wait":
+                totals[category] += tottime
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def hotspots(self) -> List[Dict[str, Any]]:
+        """Functions with the most own Python time (blocking waits excluded)."""
+        rows = []
+        for (filename, line, function), (_, calls, tottime, cumtime, _) in self._stats().items():
+            if _category(filename, function) == "wait":
+                continue
+            location = function if filename == "~" else f"{Path(filename).name}:{line}({function})"
+            rows.append({"function": location, "calls": calls, "tottime": tottime, "cumtime": cumtime})
+        rows.sort(key=lambda row: row["tottime"], reverse=True)
+        return rows[:self.top]
+
+    def summary(self) -> Dict[str, Any]:
+        """Wall, Python (CPU) and wait seconds of the run."""
+        return {
+            "wall_s": round(self.wall_s, 3),
+            "python_s": round(self.cpu_s, 3),
+            "wait_s": round(max(0.0, self.wall_s - self.cpu_s), 3),
+            "samples": sum(self._stacks.values()),
+        }
+
+    def report(self) -> str:
+        """Human-readable summary: time split, categories and top hotspots."""
+        summary = self.summary()
+        lines = [
+            f"Profile {self.name}: wall {summary['wall_s']:.1f}s = "
+            f"Python {summary['python_s']:.1f}s + browser/network wait {summary['wait_s']:.1f}s",
+        ]
+        categories = self.categories()
+        if categories:
+            lines.append("  Python time by category: " + ", ".join(
+                f"{category} {seconds:.2f}s" for category, seconds in categories.items()
+            ))
+            lines.append(f"  {'own':>8} {'cumulative':>10} {'calls':>8}  function")
+            for row in self.hotspots():
+                lines.append(
+                    f"  {row['tottime']:>7.3f}s {row['cumtime']:>9.3f}s {row['calls']:>8}  {row['function']}"
+                )
+        for kind, path in self.paths.items():
+            lines.append(f"  {kind}: {path}")
+        return "\n".join(lines)
+
+
+def command(script_path: Path, name: str) -> List[str]:
+    """Command running a script under a RunProfiler (for subprocesses)."""
+    return [sys.executable, str(Path(__file__).resolve()), "--name", name, str(script_path)]
+
+
+def main() -> int:
+    """Run a script as ``__main__`` under a RunProfiler."""
+    parser = argparse.ArgumentParser(description="Profile a scraper script")
+    parser.add_argument("--name", help="Profile file name stem (defaults to the script name)")
+    parser.add_argument("--out", type=Path, help="Output directory")
+    parser.add_argument("script", type=Path)
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    # Same module search path and argv as `python script.py args`
+    sys.path[0] = str(args.script.resolve().parent)
+    sys.argv = [str(args.script)] + args.args
+    code = 0
+    profiler = RunProfiler(args.name or profile_name(args.script.parent.name, args.script.stem), args.out)
+    with profiler:
+        try:
+            runpy.run_path(str(args.script), run_name="__main__")
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    print(profiler.report())
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""Per-ASP request blocking at the Playwright route layer.
+
+ASP dashboards load banners, web fonts, videos and analytics beacons that the
+scrapers never look at. A :class:`ResourcePolicy` installed on a browser
+context aborts those requests through ``context.route`` before they hit the
+network.
+
+Only URLs that can be blocked are routed: the policy registers one regular
+expression built from the file extensions of the blocked resource types and
+the tracker hosts, so every other request stays inside the browser instead of
+making a round trip through Python. Resource types without known extensions
+(e.g. ``xhr``) can only be recognized per request and make the policy route
+everything; avoid them in ``block_types`` unless the savings are worth it.
+
+The default policy is conservative: fonts, media and well-known tracker
+domains are blocked, images are left alone (some login pages render CAPTCHAs
+or buttons as images). Policies are configured per ASP with a
+``resource_policy`` section in the scenario YAML or a ``RESOURCE_POLICY``
+class attribute on a BaseScraper subclass:
+
+    resource_policy:
+      block_types: [image]          # added to the defaults
+      block_domains: [ads.example.com]
+      allow: [cdn.example.com/report-assets]
+      # enabled: false              # turn blocking off for this ASP
+
+Allowlist entries are URL substrings and always win over block rules.
+"""
+
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Resource types blocked unless the ASP configures otherwise
+DEFAULT_BLOCK_TYPES = ("font", "media")
+
+# Analytics / advertising hosts (suffix match on the request host)
+DEFAULT_TRACKER_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "connect.facebook.net",
+    "analytics.twitter.com",
+    "ads-twitter.com",
+    "bat.bing.com",
+    "clarity.ms",
+    "hotjar.com",
+    "mouseflow.com",
+    "ptengine.jp",
+    "ptengine.com",
+    "criteo.com",
+    "criteo.net",
+    "nr-data.net",
+    "yjtag.yahoo.co.jp",
+    "b92.yahoo.co.jp",
+)
+
+# Never blocked: bot checks must load for logins to succeed
+DEFAULT_ALLOW = (
+    "/recaptcha/",
+    "recaptcha.net",
+    "hcaptcha.com",
+    "challenges.cloudflare.com",
+)
+
+# File extensions by resource type, used to route only blockable URLs
+EXTENSIONS_BY_TYPE = {
+    "font": ("woff2", "woff", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "ogg", "ogv", "mp3", "wav", "m4a", "mov", "m3u8"),
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "stylesheet": ("css",),
+    "script": ("js", "mjs"),
+}
+
+# Rough transfer size per blocked request (the saving is an estimate, not measured)
+ESTIMATED_BYTES = {
+    "image": 30_000,
+    "font": 40_000,
+    "media": 500_000,
+    "script": 40_000,
+    "xhr": 2_000,
+    "fetch": 2_000,
+    "ping": 500,
+    "other": 5_000,
+}
+
+
+@dataclass
+class ResourcePolicy:
+    """Which requests a browser context aborts."""
+
+    enabled: bool = True
+    block_types: Set[str] = field(default_factory=lambda: set(DEFAULT_BLOCK_TYPES))
+    block_domains: List[str] = field(default_factory=lambda: list(DEFAULT_TRACKER_DOMAINS))
+    allow: List[str] = field(default_factory=lambda: list(DEFAULT_ALLOW))
+
+    # Per-context counters, filled while the route handler runs
+    stats: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.block_domains = [d.lower().lstrip(".") for d in self.block_domains]
+        self.reset_stats()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "ResourcePolicy":
+        """Build a policy from a YAML/class-attribute dict.
+
+        Lists extend the defaults unless ``extend_defaults: false`` is set.
+
+        Args:
+            config: Policy settings, or None for the default policy
+        """
+        if isinstance(config, ResourcePolicy):
+            return config
+        config = config or {}
+        extend = config.get("extend_defaults", True)
+
+        def merged(key: str, defaults: Iterable[str]) -> List[str]:
+            values = list(config.get(key) or [])
+            return (list(defaults) + values) if extend else values
+
+        return cls(
+            enabled=config.get("enabled", True),
+            block_types=set(merged("block_types", DEFAULT_BLOCK_TYPES)),
+            block_domains=merged("block_domains", DEFAULT_TRACKER_DOMAINS),
+            allow=merged("allow", DEFAULT_ALLOW),
+        )
+
+    # ==================== Matching ====================
+
+    def should_block(self, url: str, resource_type: str) -> Optional[str]:
+        """Return the reason to block a request, or None to let it through."""
+        if not self.enabled or url.startswith("data:"):
+            return None
+        if any(entry in url for entry in self.allow):
+            return None
+        if resource_type in self.block_types:
+            return resource_type
+
+        host = (urlsplit(url).hostname or "").lower()
+        for domain in self.block_domains:
+            if host == domain or host.endswith("." + domain):
+                return "tracker"
+        return None
+
+    # ==================== Playwright integration ====================
+
+    def route_pattern(self) -> Optional[re.Pattern]:
+        """URLs that may be blocked, or None if nothing can be.
+
+        Matching URLs are checked again per request (resource type and
+        allowlist) by the route handler.
+        """
+        if not self.enabled:
+            return None
+        if any(t not in EXTENSIONS_BY_TYPE for t in self.block_types):
+            # Only the request's resource type tells; route everything
+            return re.compile(r".*")
+
+        alternatives = []
+        extensions = sorted({ext for t in self.block_types for ext in EXTENSIONS_BY_TYPE[t]})
+        if extensions:
+            alternatives.append(
+                r"^[^?#]*\.(?:" + "|".join(map(re.escape, extensions)) + r")(?:[?#].*)?$"
+            )
+        if self.block_domains:
+            hosts = "|".join(re.escape(domain) for domain in self.block_domains)
+            alternatives.append(r"^[a-z][a-z0-9+.-]*://(?:[^/?#@]*@)?(?:[^/?#:]*\.)?(?:" + hosts + r")(?::\d+)?(?:[/?#].*)?$")
+        if not alternatives:
+            return None
+        return re.compile("|".join(f"(?:{alt})" for alt in alternatives), re.IGNORECASE)
+
+    def install(self, context) -> None:
+        """Route the blockable requests of a BrowserContext through this policy."""
+        pattern = self.route_pattern()
+        if pattern is not None:
+            context.route(pattern, self._handle_route)
+
+    def _handle_route(self, route) -> None:
+        request = route.request
+        resource_type = request.resource_type
+        reason = self.should_block(request.url, resource_type)
+
+        with self._lock:
+            self.stats["routed"] += 1
+            if reason:
+                self.stats["blocked"] += 1
+                self.stats["by_reason"][reason] = self.stats["by_reason"].get(reason, 0) + 1
+                self.stats["estimated_bytes_saved"] += ESTIMATED_BYTES.get(resource_type, 5_000)
+
+        if reason:
+            route.abort("blockedbyclient")
+        else:
+            route.continue_()
+
+    def reset_stats(self) -> None:
+        """Clear counters (call between runs when a policy is reused)."""
+        self.stats = {"routed": 0, "blocked": 0, "estimated_bytes_saved": 0, "by_reason": {}}
+
+    def summary(self) -> str:
+        """One-line description of what was blocked."""
+        reasons = ", ".join(f"{k}={v}" for k, v in sorted(self.stats["by_reason"].items()))
+        return (
+            f"blocked {self.stats['blocked']}/{self.stats['routed']} routed requests "
+            f"(estimated ~{self.stats['estimated_bytes_saved'] / 1024:.0f} KB saved)"
+            f"{': ' + reasons if reasons else ''}"
+        )
+
+    def log_summary(self, label: str = "") -> None:
+        """Log the per-run blocked requests and estimated bytes saved."""
+        if self.enabled and self.stats["routed"]:
+            logger.info(f"Resource policy{' for ' + label if label else ''}: {self.summary()}")
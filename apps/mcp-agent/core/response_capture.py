@@ -0,0 +1,185 @@
+"""Read report data from the JSON responses behind ASP dashboards.
+
+Many report pages fetch their figures from an XHR/fetch endpoint and render
+the table client-side. Waiting for that response and reading its JSON body is
+faster than waiting for the table to render and sturdier than DOM selectors:
+
+    payload = response_capture.capture_json(
+        page, r"reportApi/stats", lambda: page.goto(report_url)
+    )
+    records = response_capture.extract_records(
+        payload, items="list[*]", date="date", amount="commission"
+    )
+
+Fields are addressed with a small path expression: dotted keys, ``[n]`` for
+a list index and ``[*]`` for every element of a list, e.g.
+``data.report.rows[*]`` or ``summary[0].total``.
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from . import parsing
+
+logger = logging.getLogger(__name__)
+
+# Path tokens: a key (str), a list index (int) or WILDCARD
+WILDCARD = "*"
+
+_TOKEN_RE = re.compile(r"\[(\*|-?\d+)\]|([^.\[\]]+)")
+
+
+class PathError(ValueError):
+    """Raised for malformed path expressions."""
+
+
+@lru_cache(maxsize=128)
+def compile_path(expression: str) -> Tuple[Union[str, int], ...]:
+    """Split a path expression into keys, indexes and wildcards.
+
+    Args:
+        expression: Path such as ``data.list[*].amount`` ("" selects the root)
+
+    Returns:
+        Tuple of tokens; list indexes are ints, ``[*]`` is WILDCARD
+    """
+    tokens: List[Union[str, int]] = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        if expression[position] == "." and tokens:
+            position += 1
+        match = _TOKEN_RE.match(expression, position)
+        if not match:
+            raise PathError(f"Invalid path expression {expression!r} at position {position}")
+        index, key = match.groups()
+        if key is not None:
+            tokens.append(key)
+        elif index == WILDCARD:
+            tokens.append(WILDCARD)
+        else:
+            tokens.append(int(index))
+        position = match.end()
+    return tuple(tokens)
+
+
+def select(data: Any, expression: str) -> List[Any]:
+    """Every value matched by a path expression.
+
+    Missing keys and out-of-range indexes match nothing instead of raising.
+    """
+    values = [data]
+    for token in compile_path(expression):
+        matched = []
+        for value in values:
+            if token == WILDCARD:
+                if isinstance(value, list):
+                    matched.extend(value)
+                elif isinstance(value, dict):
+                    matched.extend(value.values())
+            elif isinstance(token, int):
+                if isinstance(value, list) and -len(value) <= token < len(value):
+                    matched.append(value[token])
+            elif isinstance(value, dict) and token in value:
+                matched.append(value[token])
+        values = matched
+    return values
+
+
+def select_one(data: Any, expression: str, default: Any = None) -> Any:
+    """First value matched by a path expression, or ``default``."""
+    values = select(data, expression)
+    return values[0] if values else default
+
+
+def extract_records(
+    payload: Any,
+    items: str,
+    date: str,
+    amount: str,
+    monthly: bool = False,
+    default_year: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Map JSON report rows to ``{"date", "amount"}`` records.
+
+    Monthly rows become ``{"period": "YYYY-MM", "amount"}`` records, which
+    AgentLoop stores at the month's last day like table-extracted months.
+
+    Rows whose date does not parse (totals, headers) are skipped. Rows that
+    share a date (e.g. one row per program) are summed.
+
+    Args:
+        payload: Decoded JSON body
+        items: Path to the report rows (e.g. ``list[*]``)
+        date: Path to the date (or month) inside a row
+        amount: Path to the amount inside a row
+        monthly: Parse the date as a month (``period`` records)
+        default_year: Year for dates without one (e.g. "11/06")
+
+    Returns:
+        Records in the order their dates first appear
+    """
+    totals: Dict[str, int] = {}
+    rows = select(payload, items)
+    for row in rows:
+        raw_date = select_one(row, date)
+        if raw_date is None:
+            continue
+        if monthly:
+            key = parsing.parse_month(str(raw_date))
+        else:
+            key = parsing.parse_date(str(raw_date), default_year)
+        if not key:
+            continue
+        totals[key] = totals.get(key, 0) + parsing.parse_amount(select_one(row, amount))
+
+    logger.info(f"Mapped {len(rows)} JSON rows to {len(totals)} records")
+    field = "period" if monthly else "date"
+    return [{field: key, "amount": a} for key, a in totals.items()]
+
+
+def _matcher(url_pattern: str, method: Optional[str]) -> Callable[[Any], bool]:
+    pattern = re.compile(url_pattern)
+    method = method.upper() if method else None
+
+    def matches(response) -> bool:
+        if not pattern.search(response.url):
+            return False
+        return method is None or response.request.method == method
+
+    return matches
+
+
+def capture_json(
+    page,
+    url_pattern: str,
+    trigger: Callable[[], Any],
+    method: Optional[str] = None,
+    timeout_ms: int = 30000,
+) -> Any:
+    """Run ``trigger`` and return the JSON body of the matching response.
+
+    Args:
+        page: Playwright Page
+        url_pattern: Regular expression searched in the response URL
+        trigger: Action that makes the page request the report (navigate,
+            click, ...); the listener is registered before it runs
+        method: Only match requests with this HTTP method
+        timeout_ms: How long to wait for the response
+
+    Returns:
+        Decoded JSON body
+
+    Raises:
+        RuntimeError: The response has an error status (the message carries
+            the status so retry_policy can classify it)
+    """
+    with page.expect_response(_matcher(url_pattern, method), timeout=timeout_ms) as response_info:
+        trigger()
+    response = response_info.value
+    if not response.ok:
+        raise RuntimeError(f"HTTP {response.status} from {response.url}")
+    logger.info(f"Captured JSON response from {response.url}")
+    return response.json()
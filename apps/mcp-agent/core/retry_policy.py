@@ -0,0 +1,192 @@
+"""Failure classification and retry decisions shared by all scrapers.
+
+Failures are classified into a small taxonomy and each kind maps to an
+action:
+
+==================  =============================================  ========
+Kind                Typical cause                                  Action
+==================  =============================================  ========
+timeout             page load / navigation timed out               retry
+element_not_found   selector missing or not visible                retry
+session_expired     bounced back to the login form mid-run         relogin
+network             connection reset, DNS, 5xx                     backoff
+rate_limited        HTTP 429 / "too many requests"                 backoff
+auth_rejected       wrong or missing credentials                   fail
+parse_error         report layout changed, unparsable values       fail
+budget_exceeded     run / ASP time budget spent (core.budget)      fail
+unknown             anything else                                  backoff
+==================  =============================================  ========
+
+``retry`` waits ``base_delay``, ``backoff`` waits exponentially longer with
+jitter, ``relogin`` restores the session before retrying and ``fail`` stops
+at once (retrying a rejected password only risks locking the account).
+
+The kind names ``timeout`` and ``element_not_found`` match the ``retry_on``
+entries of the scenario YAML ``retry`` section.
+"""
+
+import random
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Union
+
+# Failure kinds
+TIMEOUT = "timeout"
+ELEMENT_NOT_FOUND = "element_not_found"
+SESSION_EXPIRED = "session_expired"
+NETWORK = "network"
+RATE_LIMITED = "rate_limited"
+AUTH_REJECTED = "auth_rejected"
+PARSE_ERROR = "parse_error"
+BUDGET_EXCEEDED = "budget_exceeded"
+UNKNOWN = "unknown"
+
+# Actions
+RETRY = "retry"
+BACKOFF = "backoff"
+RELOGIN = "relogin"
+FAIL = "fail"
+
+DEFAULT_ACTIONS = {
+    TIMEOUT: RETRY,
+    ELEMENT_NOT_FOUND: RETRY,
+    SESSION_EXPIRED: RELOGIN,
+    NETWORK: BACKOFF,
+    RATE_LIMITED: BACKOFF,
+    AUTH_REJECTED: FAIL,
+    PARSE_ERROR: FAIL,
+    BUDGET_EXCEEDED: FAIL,
+    UNKNOWN: BACKOFF,
+}
+
+# Checked in order: the first matching kind wins. Auth comes first so a
+# "login failed: timeout waiting for dashboard" is not retried as a timeout.
+# A spent budget comes before everything: retrying it cannot succeed.
+_PATTERNS = [
+    (BUDGET_EXCEEDED, re.compile(r"budgetexceeded|budget exceeded|budget_exceeded")),
+    (AUTH_REJECTED, re.compile(
+        r"credentials not found|invalid (?:password|credentials|login)|incorrect password"
+        r"|wrong password|authentication failed|unauthorized|\b401\b|auth_rejected"
+        r"|パスワードが(?:違|正し|間違)|ログインできません|認証に失敗|IDまたはパスワード"
+    )),
+    (SESSION_EXPIRED, re.compile(
+        r"session (?:expired|timed out)|logged out|セッション(?:が|の)?(?:切|タイムアウト)|再ログイン"
+    )),
+    (RATE_LIMITED, re.compile(
+        r"\b429\b|too many requests|rate.?limit|アクセスが集中"
+    )),
+    (NETWORK, re.compile(
+        r"net::err_|econnreset|econnrefused|connection (?:reset|refused|aborted|closed)"
+        r"|name_not_resolved|name or service not known|temporary failure in name resolution"
+        r"|\b50[234]\b|bad gateway|service unavailable|target (?:page|closed)"
+    )),
+    (ELEMENT_NOT_FOUND, re.compile(
+        r"waiting for (?:locator|selector)|element not found|no element|not visible"
+        r"|not attached|strict mode violation|element_not_found"
+    )),
+    (TIMEOUT, re.compile(r"timeout|timed out")),
+    (PARSE_ERROR, re.compile(
+        r"could not parse|unable to parse|invalid literal|unicodedecodeerror|codec can't decode"
+        r"|parse_error|列が見つかりません"
+    )),
+]
+
+_PARSE_EXCEPTIONS = (ValueError, KeyError, IndexError, UnicodeDecodeError)
+
+
+def classify(error: Union[BaseException, str, None]) -> str:
+    """Classify an exception or error message into a failure kind.
+
+    Args:
+        error: Exception, error message, or None
+
+    Returns:
+        One of the failure kind constants
+    """
+    if error is None:
+        return UNKNOWN
+    text = f"{type(error).__name__}: {error}" if isinstance(error, BaseException) else str(error)
+    lowered = text.lower()
+    for kind, pattern in _PATTERNS:
+        if pattern.search(lowered) or pattern.search(text):
+            return kind
+    if isinstance(error, _PARSE_EXCEPTIONS):
+        return PARSE_ERROR
+    return UNKNOWN
+
+
+@dataclass
+class RetryDecision:
+    """What to do after a failed attempt."""
+
+    kind: str
+    action: str
+    delay: float = 0.0
+
+    @property
+    def should_retry(self) -> bool:
+        return self.action != FAIL
+
+
+@dataclass
+class RetryPolicy:
+    """Maps failure kinds to retry actions and delays."""
+
+    max_attempts: int = 3
+    base_delay: float = 2.0
+    max_delay: float = 60.0
+    actions: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_ACTIONS))
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]], **defaults) -> "RetryPolicy":
+        """Build a policy from a scenario ``retry`` section.
+
+        Understands ``max_attempts``, ``delay_ms``, ``max_delay_ms``, the
+        legacy ``retry_on`` list (listed kinds are retried even if their
+        default action is ``fail``) and an ``actions`` mapping that overrides
+        the action per kind.
+
+        Args:
+            config: Retry section, or None for the defaults
+            **defaults: Field defaults used when the config omits them
+        """
+        policy = cls(**defaults)
+        config = config or {}
+        if "max_attempts" in config:
+            policy.max_attempts = int(config["max_attempts"])
+        if "delay_ms" in config:
+            policy.base_delay = int(config["delay_ms"]) / 1000
+        if "max_delay_ms" in config:
+            policy.max_delay = int(config["max_delay_ms"]) / 1000
+        for kind in config.get("retry_on") or []:
+            if policy.actions.get(kind, FAIL) == FAIL:
+                policy.actions[kind] = RETRY
+        policy.actions.update(config.get("actions") or {})
+        return policy
+
+    def decide(self, error: Union[BaseException, str, None], attempt: int) -> RetryDecision:
+        """Decide whether and when to retry after a failed attempt.
+
+        Args:
+            error: Exception, error message, or an already classified kind
+            attempt: 1-based number of the attempt that just failed
+
+        Returns:
+            RetryDecision; ``action`` is FAIL when the kind is not retryable
+            or the attempts are used up
+        """
+        kind = error if error in self.actions else classify(error)
+        action = self.actions.get(kind, BACKOFF)
+        if attempt >= self.max_attempts:
+            action = FAIL
+        return RetryDecision(kind=kind, action=action, delay=self.delay(action, attempt))
+
+    def delay(self, action: str, attempt: int) -> float:
+        """Seconds to wait before the next attempt."""
+        if action == FAIL:
+            return 0.0
+        if action == BACKOFF:
+            # Exponential backoff with jitter so parallel runs do not retry in lockstep
+            delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+            return delay * random.uniform(0.5, 1.0)
+        return self.base_delay
@@ -0,0 +1,199 @@
+"""Run-level leases so overlapping runs do not scrape the same target twice.
+
+A run takes the lease for (asp_id, media_id, job_type) before scraping
+(``acquire_scrape_lease``, migration 029). A second run that finds the lease
+held skips the target with status ``locked`` instead of scraping it again and
+racing the first run's window replacement:
+
+    lock = RunLock(db)
+    with lock.hold(asp_id, media_id, "daily") as lease:
+        if not lease.acquired:
+            return {"success": False, "status": "locked", ...}
+        ...
+
+Held leases are renewed from a background thread. A run that crashes stops
+renewing, and its lease expires after ``ttl_seconds``. If a renewal finds the
+lease taken over (e.g. the run stalled past the TTL), the lease is marked
+``lost`` and the deadline passed to ``acquire`` is cancelled, so the scraper
+stops at its next budget check instead of scraping alongside the new holder. Current holders are
+listed in the ``active_scrape_leases`` view and by ``scraper_cli.py locks``.
+
+If the migration is not applied yet, locking is disabled with a warning so
+scraping keeps working.
+"""
+
+import logging
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+from .job_queue import default_worker_id
+
+if TYPE_CHECKING:
+    from .budget import Deadline
+    from .database import SupabaseClient
+
+logger = logging.getLogger(__name__)
+
+# Status reported for targets skipped because another run holds the lease
+LOCKED = "locked"
+
+
+@dataclass
+class LeaseResult:
+    """Outcome of an acquire attempt."""
+
+    acquired: bool
+    holder: Optional[str] = None
+    expires_at: Optional[str] = None
+    keys: List[Tuple[str, str, str]] = field(default_factory=list)
+    # Set when a renewal finds that another run took the lease over
+    lost: threading.Event = field(default_factory=threading.Event)
+
+    def describe(self) -> str:
+        if self.acquired:
+            return "lease acquired"
+        if self.holder:
+            return f"locked by {self.holder} until {self.expires_at}"
+        return "locked by another run"
+
+
+class RunLock:
+    """Takes, renews and releases scrape leases for one run."""
+
+    def __init__(
+        self,
+        db: "SupabaseClient",
+        holder: Optional[str] = None,
+        ttl_seconds: int = 900,
+        enabled: bool = True,
+    ):
+        """Initialize run lock.
+
+        Args:
+            db: Supabase client
+            holder: Holder ID shown to other runs (defaults to host:pid:random)
+            ttl_seconds: Lease lifetime; renewed every third of it while held
+            enabled: False disables locking (every acquire succeeds)
+        """
+        self.db = db
+        self.holder = holder or default_worker_id()
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.metadata = {"command": Path(sys.argv[0]).name if sys.argv else ""}
+        # Stop events of the renewal threads
+        self._held: Dict[Tuple[str, str, str], threading.Event] = {}
+        self._lock = threading.Lock()
+
+    # ==================== Acquire / release ====================
+
+    def acquire(
+        self, asp_id: str, media_id: str, job_types: List[str], deadline: Optional["Deadline"] = None
+    ) -> LeaseResult:
+        """Take the leases of all job types, or none of them.
+
+        Args:
+            asp_id: ASP UUID
+            media_id: Media UUID
+            job_types: 'daily' and/or 'monthly'
+            deadline: Deadline of the run, cancelled if a lease is lost
+
+        Returns:
+            LeaseResult; on conflict, the holder of the conflicting lease
+        """
+        keys = [(asp_id, media_id, job_type) for job_type in job_types]
+        if not self.enabled or not asp_id or not media_id:
+            return LeaseResult(acquired=True, keys=[])
+
+        taken: List[Tuple[str, str, str]] = []
+        lost = threading.Event()
+        for key in keys:
+            try:
+                row = self.db.acquire_scrape_lease(*key, self.holder, self.ttl_seconds, self.metadata)
+            except Exception as e:
+                if "acquire_scrape_lease" in str(e) and (
+                    "PGRST202" in str(e) or "not exist" in str(e).lower()
+                ):
+                    logger.warning(f"scrape_leases not deployed, run locking disabled: {e}")
+                    self.enabled = False
+                    self.release(taken)
+                    return LeaseResult(acquired=True, keys=[])
+                raise
+
+            if not row or not row.get("acquired"):
+                self.release(taken)
+                row = row or {}
+                result = LeaseResult(
+                    acquired=False, holder=row.get("holder"), expires_at=row.get("expires_at")
+                )
+                logger.info(f"{asp_id}/{media_id}/{key[2]}: {result.describe()}")
+                return result
+            taken.append(key)
+            self._start_renewal(key, lost, deadline)
+
+        return LeaseResult(acquired=True, holder=self.holder, keys=taken, lost=lost)
+
+    def release(self, keys: List[Tuple[str, str, str]]) -> None:
+        """Release leases held by this run."""
+        for key in keys:
+            with self._lock:
+                stop = self._held.pop(key, None)
+            if stop is not None:
+                stop.set()
+            try:
+                self.db.release_scrape_lease(*key, self.holder)
+            except Exception as e:
+                # The lease expires on its own
+                logger.warning(f"Could not release lease {key}: {e}")
+
+    @contextmanager
+    def hold(
+        self, asp_id: str, media_id: str, *job_types: str, deadline: Optional["Deadline"] = None
+    ) -> Iterator[LeaseResult]:
+        """Hold the leases for the duration of the block (check ``acquired``)."""
+        result = self.acquire(asp_id, media_id, list(job_types), deadline)
+        try:
+            yield result
+        finally:
+            if result.acquired:
+                self.release(result.keys)
+
+    # ==================== Renewal ====================
+
+    def _start_renewal(
+        self, key: Tuple[str, str, str], lost: threading.Event, deadline: Optional["Deadline"]
+    ) -> None:
+        stop = threading.Event()
+        with self._lock:
+            self._held[key] = stop
+        threading.Thread(
+            target=self._renew, args=(key, stop, lost, deadline), name=f"run-lock-{key[2]}", daemon=True
+        ).start()
+
+    def _renew(
+        self,
+        key: Tuple[str, str, str],
+        stop: threading.Event,
+        lost: threading.Event,
+        deadline: Optional["Deadline"],
+    ) -> None:
+        interval = max(1.0, self.ttl_seconds / 3)
+        while not stop.wait(interval):
+            try:
+                if not self.db.renew_scrape_lease(*key, self.holder, self.ttl_seconds):
+                    logger.error(f"Lease {key} was taken over by another run")
+                    lost.set()
+                    if deadline is not None:
+                        deadline.cancel()
+                    return
+            except Exception as e:
+                logger.warning(f"Could not renew lease {key}: {e}")
+
+    # ==================== Visibility ====================
+
+    def active(self) -> List[Dict[str, Any]]:
+        """Leases currently held by any run."""
+        return self.db.get_active_scrape_leases()
@@ -117,6 +117,51 @@ class ScenarioLoader:
 
         return scenario.get("retry", default_config)
 
+    def get_resource_policy(self, asp_name: str) -> Optional[Dict[str, Any]]:
+        """Get request blocking configuration for an ASP.
+
+        Args:
+            asp_name: Name of the ASP
+
+        Returns:
+            ``resource_policy`` section of the scenario, or None for defaults
+        """
+        scenario = self.load_scenario(asp_name)
+        if not scenario:
+            return None
+
+        return scenario.get("resource_policy")
+
+    def get_budget(self, asp_name: str) -> Optional[Dict[str, Any]]:
+        """Get time budget configuration for an ASP.
+
+        Args:
+            asp_name: Name of the ASP
+
+        Returns:
+            ``budget`` section of the scenario, or None for defaults
+        """
+        scenario = self.load_scenario(asp_name)
+        if not scenario:
+            return None
+
+        return scenario.get("budget")
+
+    def get_timeouts(self, asp_name: str) -> Optional[Dict[str, Any]]:
+        """Get adaptive timeout configuration for an ASP.
+
+        Args:
+            asp_name: Name of the ASP
+
+        Returns:
+            ``timeouts`` section of the scenario, or None for defaults
+        """
+        scenario = self.load_scenario(asp_name)
+        if not scenario:
+            return None
+
+        return scenario.get("timeouts")
+
     def to_json_actions(
         self, asp_name: str, execution_type: str = "daily"
     ) -> Optional[str]:
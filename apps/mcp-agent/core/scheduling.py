@@ -0,0 +1,131 @@
+"""Priority ordering of scrape targets and deadline-aware admission.
+
+Targets are run in this order:
+
+1. active ASPs before inactive ones
+2. most stale data first (``asps.last_scrape_at``; never scraped comes
+   first), bucketed so that targets scraped around the same time tie
+3. longest expected duration first within a tie (longest-processing-time
+   first), so long runs start early instead of becoming the tail of the run
+
+Expected durations are the historical medians of :func:`core.sharding.historical_durations`.
+
+With a deadline, :class:`Scheduler` admits a target only while its expected
+duration still fits in the remaining time. Targets that no longer fit are
+dropped and reported; because targets run in priority order, the dropped
+ones are the lowest-priority work.
+"""
+
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .sharding import default_duration, estimate
+
+logger = logging.getLogger(__name__)
+
+# Targets whose last scrape falls in the same window of this many hours tie
+STALE_BUCKET_HOURS = 6.0
+
+Durations = Dict[Tuple[str, Optional[str]], float]
+
+
+def staleness_hours(last_scrape_at: Any, now: Optional[datetime] = None) -> float:
+    """Hours since the last scrape (infinite if never scraped or unparseable)."""
+    if not last_scrape_at:
+        return math.inf
+    try:
+        scraped = datetime.fromisoformat(str(last_scrape_at).replace("Z", "+00:00"))
+    except ValueError:
+        return math.inf
+    if scraped.tzinfo is None:
+        # BaseScraper writes naive local timestamps
+        scraped = scraped.astimezone()
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (now - scraped).total_seconds() / 3600)
+
+
+def order(
+    targets: List[Dict[str, Any]],
+    durations: Optional[Durations] = None,
+    now: Optional[datetime] = None,
+    bucket_hours: float = STALE_BUCKET_HOURS,
+) -> List[Dict[str, Any]]:
+    """Sort targets by priority (highest first).
+
+    Args:
+        targets: Dicts with asp_id and optional media_id, is_active and
+            last_scrape_at
+        durations: Historical durations (see sharding.historical_durations)
+        now: Reference time for staleness
+        bucket_hours: Width of the staleness windows that tie
+
+    Returns:
+        New list in run order
+    """
+    durations = durations or {}
+    now = now or datetime.now(timezone.utc)
+    default = default_duration(durations)
+
+    def key(target: Dict[str, Any]) -> Tuple[int, float, float]:
+        stale = staleness_hours(target.get("last_scrape_at"), now)
+        bucket = math.inf if math.isinf(stale) else math.floor(stale / bucket_hours)
+        return (
+            0 if target.get("is_active", True) else 1,
+            -bucket,
+            -estimate(target, durations, default),
+        )
+
+    # sorted() is stable: equal keys keep their original order
+    return sorted(targets, key=key)
+
+
+class Scheduler:
+    """Admits targets while their expected duration fits before the deadline."""
+
+    def __init__(
+        self,
+        durations: Optional[Durations] = None,
+        deadline_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize scheduler.
+
+        Args:
+            durations: Historical durations used to estimate each target
+            deadline_seconds: Time budget of the whole run (None = no deadline)
+            clock: Monotonic clock (seconds)
+        """
+        self.durations = durations or {}
+        self.default = default_duration(self.durations)
+        self.clock = clock
+        self.deadline = clock() + deadline_seconds if deadline_seconds else None
+        # Targets dropped because they no longer fit
+        self.dropped: List[Dict[str, Any]] = []
+
+    def estimate(self, target: Dict[str, Any]) -> float:
+        """Expected duration of a target in seconds."""
+        return estimate(target, self.durations, self.default)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (None without a deadline)."""
+        if self.deadline is None:
+            return None
+        return self.deadline - self.clock()
+
+    def admit(self, target: Dict[str, Any]) -> bool:
+        """Whether to start a target now; records it as dropped otherwise."""
+        remaining = self.remaining()
+        if remaining is None:
+            return True
+        expected = self.estimate(target)
+        if expected <= remaining:
+            return True
+        logger.info(
+            f"Dropping {target.get('asp_name') or target['asp_id']}: "
+            f"expected {expected:.0f}s, {max(remaining, 0):.0f}s left"
+        )
+        self.dropped.append(target)
+        return False
@@ -1,18 +1,29 @@
 """Scraper executor that runs generated Python scraper scripts."""
 
 import logging
+import os
 import subprocess
 import sys
+import time
 import json
 from pathlib import Path
 from typing import Dict, Any, Optional
 from datetime import datetime
 
+from . import budget, metrics, profiling
+from .budget import BudgetConfig, Deadline
 from .database import SupabaseClient
+from .scenario_loader import get_scenario_loader
 from .scraper_generator import ScraperGenerator
 
 logger = logging.getLogger(__name__)
 
+# Script time limit when the scenario has no budget.asp_seconds
+DEFAULT_SCRIPT_SECONDS = 300
+
+# Time a script gets to save its partial results after SIGTERM
+TERMINATE_GRACE_SECONDS = 15
+
 
 class ExecutionResult:
     """Result of a scraper execution."""
@@ -105,15 +116,27 @@ class ScraperExecutor:
             metadata={"asp_name": asp_name, "script_path": str(script_path)}
         )
 
-        # Run script
+        # Run script within the ASP budget (and the run deadline)
+        config = BudgetConfig.from_config(get_scenario_loader().get_budget(asp_name))
+        deadline = budget.get_run_deadline().child(
+            config.asp_seconds or DEFAULT_SCRIPT_SECONDS, f"{asp_name}/{execution_type}"
+        )
+        started = time.monotonic()
         try:
-            result = self._run_script(script_path)
+            result = self._run_script(script_path, deadline)
+            if result.success:
+                status = "success"
+            else:
+                status = "partial" if result.records_saved else "failed"
+            metrics.observe_run(
+                asp_name, execution_type, status, time.monotonic() - started, result.records_saved
+            )
             
             # Update execution log
             if log_id:
                 self.supabase.update_execution_log(
                     log_id=log_id,
-                    status="success" if result.success else "failed",
+                    status=status,
                     records_saved=result.records_saved,
                     error_message=result.error
                 )
@@ -140,71 +163,96 @@ class ScraperExecutor:
 
             return ExecutionResult(success=False, error=error_msg)
 
-    def _run_script(self, script_path: Path) -> ExecutionResult:
+    def _run_script(self, script_path: Path, deadline: Optional[Deadline] = None) -> ExecutionResult:
         """Run a Python script as a subprocess.
 
+        The script receives the deadline in ``SCRAPER_DEADLINE``. When the
+        deadline passes it gets SIGTERM and ``TERMINATE_GRACE_SECONDS`` to
+        save and print its partial results before it is killed. With
+        profiling enabled (``--profile``) the script runs under
+        ``core/profiling.py``.
+
         Args:
             script_path: Path to the script to run
+            deadline: Time budget (defaults to DEFAULT_SCRIPT_SECONDS)
 
         Returns:
             ExecutionResult object
         """
         logger.info(f"Running script: {script_path}")
+        deadline = deadline or budget.get_run_deadline().child(DEFAULT_SCRIPT_SECONDS, script_path.stem)
+        if deadline.expired():
+            return ExecutionResult(success=False, error=f"Not started: {deadline.name}: time budget exceeded")
+
+        cmd = [sys.executable, str(script_path)]
+        if profiling.profile_dir() is not None:
+            cmd = profiling.command(
+                script_path, profiling.profile_name(script_path.parent.name, script_path.stem)
+            )
 
         try:
             # Run script as subprocess
-            result = subprocess.run(
-                [sys.executable, str(script_path)],
-                capture_output=True,
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=300,  # 5 minute timeout
-                cwd=script_path.parent
+                cwd=script_path.parent,
+                env={**os.environ, **deadline.to_env()},
             )
-
-            output = result.stdout
-            error_output = result.stderr
+            try:
+                output, error_output = process.communicate(timeout=deadline.remaining())
+            except subprocess.TimeoutExpired:
+                process.terminate()
+                try:
+                    output, error_output = process.communicate(timeout=TERMINATE_GRACE_SECONDS)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    output, error_output = process.communicate()
+                error_msg = f"Script execution cancelled: {deadline.name}: time budget exceeded"
+                logger.error(error_msg)
+                return ExecutionResult(
+                    success=False,
+                    records_saved=self._parse_records_saved(output or ""),
+                    error=error_msg,
+                    output=output or "",
+                )
 
             logger.info(f"Script output:\n{output}")
             if error_output:
                 logger.warning(f"Script stderr:\n{error_output}")
 
             # Check return code
-            if result.returncode != 0:
-                error_msg = f"Script exited with code {result.returncode}\n{error_output}"
+            if process.returncode != 0:
+                error_msg = f"Script exited with code {process.returncode}\n{error_output}"
                 return ExecutionResult(
                     success=False,
                     error=error_msg,
                     output=output
                 )
 
-            # Try to parse result from output
-            # Look for JSON output in the last line
-            records_saved = 0
-            for line in output.split("\n"):
-                if line.strip().startswith("{") and "records_saved" in line:
-                    try:
-                        result_data = json.loads(line.strip())
-                        records_saved = result_data.get("records_saved", 0)
-                        break
-                    except json.JSONDecodeError:
-                        pass
-
             return ExecutionResult(
                 success=True,
-                records_saved=records_saved,
+                records_saved=self._parse_records_saved(output),
                 output=output
             )
 
-        except subprocess.TimeoutExpired:
-            error_msg = "Script execution timed out (5 minutes)"
-            logger.error(error_msg)
-            return ExecutionResult(success=False, error=error_msg)
-
         except Exception as e:
             error_msg = f"Failed to run script: {e}"
             logger.error(error_msg)
             return ExecutionResult(success=False, error=error_msg)
 
+    @staticmethod
+    def _parse_records_saved(output: str) -> int:
+        """Read records_saved from the JSON result line a script prints."""
+        for line in output.split("\n"):
+            if line.strip().startswith("{") and "records_saved" in line:
+                try:
+                    return json.loads(line.strip()).get("records_saved", 0)
+                except json.JSONDecodeError:
+                    pass
+        return 0
+
     def _get_script_path(self, asp_name: str, execution_type: str) -> Path:
         """Get path to scraper script.
 
@@ -242,6 +290,10 @@ class ScraperExecutor:
             asp_name = asp_dir.name
             script_path = asp_dir / f"{execution_type}.py"
 
+            if budget.get_run_deadline().expired():
+                logger.warning(f"Run deadline reached, not starting {asp_name} and the rest")
+                break
+
             if not script_path.exists():
                 logger.info(f"No {execution_type} script for {asp_name}, skipping")
                 continue
@@ -254,7 +306,6 @@ class ScraperExecutor:
             results[asp_name] = result
 
             # Wait between executions to avoid rate limiting
-            import time
             time.sleep(5)
 
         # Summary
@@ -8,6 +8,8 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 import google.generativeai as genai
 
+from . import metrics
+
 from .scenario_loader import get_scenario_loader
 
 logger = logging.getLogger(__name__)
@@ -92,7 +94,7 @@ class ScraperGenerator:
         # Generate code using LLM
         try:
             logger.info("Calling LLM to generate scraper code...")
-            response = self.model.generate_content(prompt)
+            response = metrics.track_llm("gemini", "generate", self.model.generate_content, prompt)
             
             if not response.candidates or not response.parts:
                 logger.error("LLM response was blocked or empty")
@@ -161,6 +163,8 @@ class ScraperGenerator:
 6. run_scraper() 関数を実装し、以下の形式で結果を返す:
    {{"success": True/False, "records_saved": int, "error": str (optional)}}
 7. if __name__ == "__main__": ブロックで run_scraper() を実行
+8. 環境変数 SCRAPER_DEADLINE（UNIX時刻）が設定されている場合は、その時刻を過ぎたら次の操作に進まず、
+   取得済みのデータを保存して結果を出力すること。SIGTERM を受けた場合も同様に終了すること
 
 【データベーススキーマ】
 - daily_actuals テーブル: date (DATE), amount (INTEGER), media_id (UUID), asp_id (UUID), account_item_id (UUID)
@@ -169,6 +173,7 @@ class ScraperGenerator:
 【環境変数】
 - SUPABASE_URL: Supabase URL
 - SUPABASE_SERVICE_ROLE_KEY: Supabase サービスロールキー
+- SCRAPER_DEADLINE: 実行期限（UNIX時刻、任意）
 - {credentials.get('username_key', 'USERNAME')}: ログインユーザー名
 - {credentials.get('password_key', 'PASSWORD')}: ログインパスワード
 
@@ -5,6 +5,8 @@ from pathlib import Path
 from typing import Optional
 import google.generativeai as genai
 
+from . import metrics
+
 from .scraper_generator import ScraperGenerator
 
 logger = logging.getLogger(__name__)
@@ -84,7 +86,7 @@ class ScraperHealer:
         # Generate fix
         try:
             logger.info("Calling LLM to generate fix...")
-            response = self.model.generate_content(prompt_parts)
+            response = metrics.track_llm("gemini", "heal", self.model.generate_content, prompt_parts)
             
             if not response.candidates or not response.parts:
                 logger.error("LLM response was blocked or empty")
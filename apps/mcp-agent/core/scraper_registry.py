@@ -0,0 +1,276 @@
+"""Registry of BaseScraper implementations keyed by ASP name patterns.
+
+Scrapers join the registry in one of two ways:
+
+* a ``"scraper"`` section in ``scrapers/<key>/metadata.json`` (discovered
+  without importing the scraper module), or
+* the :func:`register_scraper` decorator for classes defined elsewhere.
+
+ASP names are matched once against a compiled index (exact names in a dict,
+substring patterns in an Aho-Corasick automaton), and a scraper module is only
+imported when its scraper is actually selected.
+"""
+
+import importlib
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Scrapers directory path
+SCRAPERS_DIR = Path(__file__).parent.parent / "scrapers"
+
+
+@dataclass
+class ScraperSpec:
+    """Declaration of a scraper and the ASP names it handles."""
+
+    key: str
+    module: str
+    class_name: str
+    asp_patterns: List[str] = field(default_factory=list)
+    asp_names: List[str] = field(default_factory=list)
+    supports_daily: bool = True
+    supports_monthly: bool = True
+    uses_browser: bool = True
+    _cls: Optional[type] = field(default=None, repr=False, compare=False)
+
+    def load(self) -> type:
+        """Import the scraper module (once) and return the scraper class."""
+        if self._cls is None:
+            module = importlib.import_module(self.module)
+            self._cls = getattr(module, self.class_name)
+        return self._cls
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the dict shape used by the runners."""
+        return {
+            "key": self.key,
+            "module": self.module,
+            "class_name": self.class_name,
+            "asp_patterns": list(self.asp_patterns),
+            "supports_daily": self.supports_daily,
+            "supports_monthly": self.supports_monthly,
+            "uses_browser": self.uses_browser,
+        }
+
+
+class _PatternMatcher:
+    """Aho-Corasick automaton over lowercase substring patterns."""
+
+    def __init__(self, patterns: Iterable[Tuple[str, int]]):
+        # Node 0 is the root; each node has goto edges, a fail link and outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, int]]] = [[]]
+
+        for pattern, value in patterns:
+            if not pattern:
+                continue
+            node = 0
+            for char in pattern:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append((len(pattern), value))
+
+        # Breadth-first construction of fail links
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def search(self, text: str) -> List[Tuple[int, int]]:
+        """Return ``(pattern_length, value)`` for every pattern found in text."""
+        matches = []
+        node = 0
+        for char in text:
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            if self._out[node]:
+                matches.extend(self._out[node])
+        return matches
+
+
+class ScraperRegistry:
+    """Lookup table from ASP names to scraper specs."""
+
+    def __init__(self, scrapers_dir: Optional[Path] = None):
+        """Initialize scraper registry.
+
+        Args:
+            scrapers_dir: Path to scrapers directory. Defaults to ./scrapers/
+        """
+        self.scrapers_dir = scrapers_dir or SCRAPERS_DIR
+        self._specs: Dict[str, ScraperSpec] = {}
+        self._discovered = False
+        self._exact: Optional[Dict[str, int]] = None
+        self._matcher: Optional[_PatternMatcher] = None
+        self._order: List[str] = []
+
+    # ==================== Registration ====================
+
+    def register(self, spec: ScraperSpec) -> ScraperSpec:
+        """Add or replace a scraper spec and invalidate the compiled index."""
+        if spec.key in self._specs:
+            logger.debug(f"Replacing scraper registration: {spec.key}")
+        self._specs[spec.key] = spec
+        self._exact = None
+        self._matcher = None
+        return spec
+
+    def discover(self) -> None:
+        """Load scraper declarations from ``scrapers/*/metadata.json``."""
+        self._discovered = True
+        if not self.scrapers_dir.exists():
+            logger.warning(f"Scrapers directory not found: {self.scrapers_dir}")
+            return
+
+        for metadata_path in sorted(self.scrapers_dir.glob("*/metadata.json")):
+            key = metadata_path.parent.name
+            if key in self._specs:
+                continue
+            try:
+                with open(metadata_path, "r", encoding="utf-8") as f:
+                    section = json.load(f).get("scraper")
+            except Exception as e:
+                logger.error(f"Failed to load {metadata_path}: {e}")
+                continue
+
+            if not section:
+                continue
+
+            self.register(
+                ScraperSpec(
+                    key=key,
+                    module=section.get("module", f"scrapers.{key}.scraper"),
+                    class_name=section["class_name"],
+                    asp_patterns=section.get("asp_patterns", []),
+                    asp_names=section.get("asp_names", []),
+                    supports_daily=section.get("supports_daily", True),
+                    supports_monthly=section.get("supports_monthly", True),
+                    uses_browser=section.get("uses_browser", True),
+                )
+            )
+
+    def _ensure_index(self) -> None:
+        """Build the exact-name dict and substring automaton once."""
+        if not self._discovered:
+            self.discover()
+        if self._matcher is not None:
+            return
+
+        self._order = list(self._specs)
+        self._exact = {}
+        patterns = []
+        for idx, key in enumerate(self._order):
+            spec = self._specs[key]
+            self._exact.setdefault(key.lower(), idx)
+            for name in spec.asp_names:
+                self._exact.setdefault(name.lower(), idx)
+            for pattern in spec.asp_patterns:
+                patterns.append((pattern.lower(), idx))
+        self._matcher = _PatternMatcher(patterns)
+
+    # ==================== Lookup ====================
+
+    def specs(self) -> List[ScraperSpec]:
+        """Return all registered specs in registration order."""
+        self._ensure_index()
+        return [self._specs[key] for key in self._order]
+
+    def get(self, key: str) -> Optional[ScraperSpec]:
+        """Return the spec registered under ``key``."""
+        self._ensure_index()
+        return self._specs.get(key)
+
+    def match(self, asp_name: str) -> Optional[ScraperSpec]:
+        """Find the scraper for a DB ASP name.
+
+        Exact names win; otherwise the longest matching substring pattern is
+        used, with registration order breaking ties.
+        """
+        self._ensure_index()
+        name = asp_name.lower()
+
+        idx = self._exact.get(name)
+        if idx is None:
+            matches = self._matcher.search(name)
+            if not matches:
+                return None
+            _, idx = max(matches, key=lambda m: (m[0], -m[1]))
+
+        return self._specs[self._order[idx]]
+
+    def get_scraper_class(self, asp_name: str) -> Optional[type]:
+        """Return the scraper class for an ASP name, importing it on demand."""
+        spec = self.match(asp_name)
+        if not spec:
+            return None
+        try:
+            return spec.load()
+        except (ImportError, AttributeError) as e:
+            logger.warning(f"Could not load scraper {spec.module}.{spec.class_name}: {e}")
+            return None
+
+
+# Singleton instance for convenience
+_registry: Optional[ScraperRegistry] = None
+
+
+def get_scraper_registry() -> ScraperRegistry:
+    """Get singleton scraper registry instance."""
+    global _registry
+    if _registry is None:
+        _registry = ScraperRegistry()
+    return _registry
+
+
+def register_scraper(
+    key: str,
+    asp_patterns: Iterable[str] = (),
+    asp_names: Iterable[str] = (),
+    supports_daily: bool = True,
+    supports_monthly: bool = True,
+    uses_browser: bool = True,
+):
+    """Class decorator that registers a scraper with the default registry.
+
+    Usage:
+        @register_scraper("example", asp_patterns=["example"])
+        class ExampleScraper(BaseScraper):
+            ...
+    """
+
+    def decorator(cls: type) -> type:
+        spec = ScraperSpec(
+            key=key,
+            module=cls.__module__,
+            class_name=cls.__name__,
+            asp_patterns=list(asp_patterns),
+            asp_names=list(asp_names),
+            supports_daily=supports_daily,
+            supports_monthly=supports_monthly,
+            uses_browser=uses_browser,
+        )
+        spec._cls = cls
+        get_scraper_registry().register(spec)
+        return cls
+
+    return decorator
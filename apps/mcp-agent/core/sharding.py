@@ -0,0 +1,153 @@
+"""Deterministic sharding of scrape targets across machines.
+
+A lighter alternative to the job queue (:mod:`core.job_queue`): every machine
+runs the same command with its own ``--shard i/N`` and keeps only the targets
+that hash to its shard. No coordination is needed, and the assignment is
+stable across runs and machines.
+
+Targets are assigned with rendezvous (highest-random-weight) hashing, so
+changing N only moves about 1/N of the targets. With ASP affinity (the
+default) the hash key is the ASP alone, so all media of one ASP land on the
+same shard and can share its browser (see :mod:`core.media_batch`).
+
+:func:`plan` estimates the load of each shard from historical run durations
+in ``execution_logs``.
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from statistics import median
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .database import SupabaseClient
+
+logger = logging.getLogger(__name__)
+
+# Assumed duration of targets without history (seconds)
+DEFAULT_DURATION = 120.0
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse ``"i/N"`` (1-based, e.g. ``"2/3"``) into a 0-based (index, count).
+
+    Raises:
+        ValueError: Malformed value or index out of range
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard {value!r}: expected i/N, e.g. 1/3") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard {value!r}: i must be between 1 and N")
+    return index - 1, count
+
+
+def _weight(key: str, shard: int) -> int:
+    # Python's hash() is salted per process; blake2b is stable across machines
+    digest = hashlib.blake2b(f"{key}#{shard}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def shard_key(asp_id: str, media_id: Optional[str] = None, asp_affinity: bool = True) -> str:
+    """Hash key of a target (the ASP alone with affinity)."""
+    return str(asp_id) if asp_affinity or not media_id else f"{asp_id}:{media_id}"
+
+
+def shard_of(key: str, count: int) -> int:
+    """0-based shard of a key (rendezvous hashing)."""
+    return max(range(count), key=lambda shard: _weight(key, shard))
+
+
+def select(
+    targets: Iterable[Dict[str, Any]],
+    index: int,
+    count: int,
+    asp_affinity: bool = True,
+) -> List[Dict[str, Any]]:
+    """Targets (dicts with asp_id and optional media_id) of one shard."""
+    return [
+        target
+        for target in targets
+        if shard_of(shard_key(target["asp_id"], target.get("media_id"), asp_affinity), count) == index
+    ]
+
+
+# ==================== Load planning ====================
+
+
+def historical_durations(
+    db: "SupabaseClient", asp_ids: Iterable[str], days: int = 14
+) -> Dict[Tuple[str, Optional[str]], float]:
+    """Median run duration per target from finished execution logs.
+
+    Returns:
+        Seconds keyed by (asp_id, media_id) for logs that recorded a media
+        and by (asp_id, None) for every ASP with history
+    """
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+    rows = db.get_execution_durations(list(asp_ids), since)
+    samples: Dict[Tuple[str, Optional[str]], List[float]] = {}
+    for row in rows:
+        try:
+            started = datetime.fromisoformat(str(row["started_at"]).replace("Z", "+00:00"))
+            completed = datetime.fromisoformat(str(row["completed_at"]).replace("Z", "+00:00"))
+        except (KeyError, TypeError, ValueError):
+            continue
+        seconds = (completed - started).total_seconds()
+        if seconds <= 0:
+            continue
+        media_id = (row.get("metadata") or {}).get("media_id")
+        samples.setdefault((row["asp_id"], None), []).append(seconds)
+        if media_id:
+            samples.setdefault((row["asp_id"], media_id), []).append(seconds)
+    return {key: median(values) for key, values in samples.items()}
+
+
+def default_duration(durations: Dict[Tuple[str, Optional[str]], float]) -> float:
+    """Estimate for targets without history: the median of the known ASPs."""
+    known = [seconds for (_, media_id), seconds in durations.items() if media_id is None]
+    return median(known) if known else DEFAULT_DURATION
+
+
+def estimate(
+    target: Dict[str, Any],
+    durations: Dict[Tuple[str, Optional[str]], float],
+    default: float = DEFAULT_DURATION,
+) -> float:
+    """Expected duration of a target: its own history, else its ASP's, else ``default``."""
+    asp_id = target["asp_id"]
+    return durations.get((asp_id, target.get("media_id")), durations.get((asp_id, None), default))
+
+
+@dataclass
+class ShardLoad:
+    """Expected work of one shard."""
+
+    index: int
+    targets: List[Dict[str, Any]] = field(default_factory=list)
+    seconds: float = 0.0
+    unknown: int = 0  # targets without history (estimated with the default)
+
+
+def plan(
+    targets: List[Dict[str, Any]],
+    count: int,
+    durations: Optional[Dict[Tuple[str, Optional[str]], float]] = None,
+    asp_affinity: bool = True,
+) -> List[ShardLoad]:
+    """Assign every target to its shard and sum the expected durations."""
+    durations = durations or {}
+    default = default_duration(durations)
+
+    loads = [ShardLoad(index=i) for i in range(count)]
+    for target in targets:
+        key = shard_key(target["asp_id"], target.get("media_id"), asp_affinity)
+        load = loads[shard_of(key, count)]
+        load.targets.append(target)
+        load.seconds += estimate(target, durations, default)
+        if (target["asp_id"], None) not in durations:
+            load.unknown += 1
+    return loads
@@ -0,0 +1,448 @@
+"""Local durable spool for scraped actuals.
+
+Every scraped batch is stored in a local SQLite database before it is sent to
+Supabase and is only removed once the write succeeded. When Supabase is slow
+or unreachable the batch stays in the spool and is delivered later by a
+:class:`SpoolDrainer` (exponential backoff) or ``scraper_cli.py replay-spool``,
+so a failed database write never costs a re-scrape of the ASP.
+
+Within one process, batches for the same (table, asp_id, media_id) are
+delivered in the order they were spooled, so an old batch does not overwrite
+newer data. Deliveries of different keys run in parallel. The locks are per
+process: two processes draining the same SQLite file (e.g. a run and
+``scraper_cli.py replay-spool``) can still deliver one key out of order.
+
+A batch that no delivery has tried yet belongs to the run that spooled it,
+which delivers it right away and reads the write counts. The background
+:class:`SpoolDrainer` leaves such batches alone until they are ``fresh_seconds``
+old (the run crashed before delivering).
+"""
+
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .database import SupabaseClient
+
+logger = logging.getLogger(__name__)
+
+# Default spool location (runtime data, ignored by git)
+DEFAULT_SPOOL_PATH = Path(__file__).parent.parent / "var" / "spool.sqlite3"
+
+# How a batch is written once delivered:
+#   replace - replace_actuals_window (rows missing from the batch are deleted)
+#   merge   - sync_actuals without deletions
+OPERATIONS = ("replace", "merge")
+
+# Run status when the scrape worked but its rows only reached the spool
+SPOOLED = "spooled"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    asp_id TEXT NOT NULL,
+    media_id TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    records TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_batches_key ON batches (table_name, asp_id, media_id, id);
+"""
+
+
+class RecordSpool:
+    """SQLite-backed queue of actuals batches waiting for delivery."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        base_delay: float = 30.0,
+        max_delay: float = 3600.0,
+    ):
+        """Initialize record spool.
+
+        Args:
+            path: SQLite file. Defaults to $SCRAPER_SPOOL_PATH or var/spool.sqlite3
+            base_delay: Backoff after the first failed delivery (seconds)
+            max_delay: Upper bound for the backoff (seconds)
+        """
+        self.path = Path(path or os.getenv("SCRAPER_SPOOL_PATH") or DEFAULT_SPOOL_PATH)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # One lock per (table, asp_id, media_id): deliveries of a key never
+        # overlap, so two drainers cannot reorder it
+        self._key_locks: Dict[Tuple[str, str, str], threading.RLock] = {}
+        self._key_locks_guard = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=FULL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ==================== Queue operations ====================
+
+    def enqueue(
+        self,
+        table_name: str,
+        asp_id: str,
+        media_id: str,
+        records: List[Dict[str, Any]],
+        start_date: str,
+        end_date: str,
+        operation: str = "replace",
+    ) -> int:
+        """Persist a batch before it is sent to Supabase.
+
+        Returns:
+            Spool batch ID
+        """
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown spool operation: {operation}")
+
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO batches (table_name, operation, asp_id, media_id, start_date,"
+                " end_date, records, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    table_name,
+                    operation,
+                    asp_id,
+                    media_id,
+                    start_date,
+                    end_date,
+                    json.dumps(records, ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+            return cursor.lastrowid
+
+    def ack(self, batch_id: int) -> None:
+        """Remove a delivered batch."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM batches WHERE id = ?", (batch_id,))
+
+    def fail(self, batch_id: int, error: str) -> float:
+        """Record a failed delivery and schedule the next attempt.
+
+        Returns:
+            Seconds until the batch is due again
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT attempts FROM batches WHERE id = ?", (batch_id,)
+            ).fetchone()
+            if row is None:
+                return 0.0
+            attempts = row["attempts"] + 1
+            # Exponential backoff with jitter so drainers do not retry in lockstep
+            delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+            delay *= random.uniform(0.5, 1.0)
+            conn.execute(
+                "UPDATE batches SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (attempts, time.time() + delay, error[:1000], batch_id),
+            )
+            return delay
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Summaries of all spooled batches (without their records)."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, table_name, operation, asp_id, media_id, start_date, end_date,"
+                " created_at, attempts, next_attempt_at, last_error,"
+                " json_array_length(records) AS record_count"
+                " FROM batches ORDER BY id"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM batches").fetchone()[0]
+
+    # ==================== Delivery ====================
+
+    def _key_lock(self, key: Tuple[str, str, str]) -> threading.RLock:
+        with self._key_locks_guard:
+            return self._key_locks.setdefault(key, threading.RLock())
+
+    def deliver_batch(self, db: "SupabaseClient", batch: sqlite3.Row) -> Dict[str, int]:
+        """Write one spooled batch to Supabase (raises on failure)."""
+        records = json.loads(batch["records"])
+        if batch["operation"] == "replace":
+            return db.replace_actuals_window(
+                batch["table_name"],
+                asp_id=batch["asp_id"],
+                media_id=batch["media_id"],
+                records=records,
+                start_date=batch["start_date"],
+                end_date=batch["end_date"],
+            )
+        return db.sync_actuals(
+            batch["table_name"],
+            asp_id=batch["asp_id"],
+            media_id=batch["media_id"],
+            records=records,
+            start_date=batch["start_date"],
+            end_date=batch["end_date"],
+            delete_missing=False,
+        )
+
+    def drain(
+        self,
+        db: "SupabaseClient",
+        key: Optional[Tuple[str, str, str]] = None,
+        respect_backoff: bool = True,
+        fresh_seconds: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Deliver spooled batches in order.
+
+        A failure blocks the remaining batches of the same
+        (table, asp_id, media_id) key until the failed one is delivered.
+
+        Args:
+            db: Supabase client
+            key: Only drain this (table_name, asp_id, media_id)
+            respect_backoff: Skip keys whose oldest batch is not due yet
+            fresh_seconds: Skip keys whose oldest batch has never been tried
+                and is younger than this (its run is about to deliver it)
+
+        Returns:
+            Dict with delivered/failed counts, the last error and the write
+            counts of each delivered batch under ``results`` (batch ID -> counts)
+        """
+        result = {"delivered": 0, "failed": 0, "last_error": None, "results": {}}
+
+        if key is not None:
+            keys = [key]
+        else:
+            with self._connect() as conn:
+                keys = [
+                    tuple(row)
+                    for row in conn.execute(
+                        "SELECT table_name, asp_id, media_id FROM batches"
+                        " GROUP BY table_name, asp_id, media_id ORDER BY MIN(id)"
+                    ).fetchall()
+                ]
+
+        for batch_key in keys:
+            with self._key_lock(batch_key):
+                self._drain_key(db, batch_key, respect_backoff, fresh_seconds, result)
+
+        if result["delivered"] or result["failed"]:
+            logger.info(
+                f"Spool drain: delivered={result['delivered']}, failed={result['failed']}, "
+                f"remaining={len(self)}"
+            )
+        return result
+
+    def _drain_key(
+        self,
+        db: "SupabaseClient",
+        key: Tuple[str, str, str],
+        respect_backoff: bool,
+        fresh_seconds: Optional[float],
+        result: Dict[str, Any],
+    ) -> None:
+        """Deliver the batches of one key in order (caller holds the key's lock)."""
+        with self._connect() as conn:
+            batches = conn.execute(
+                "SELECT * FROM batches WHERE table_name = ? AND asp_id = ? AND media_id = ?"
+                " ORDER BY id",
+                key,
+            ).fetchall()
+
+        now = time.time()
+        for batch in batches:
+            if respect_backoff and batch["next_attempt_at"] > now:
+                return
+            if (fresh_seconds is not None and batch["attempts"] == 0
+                    and batch["created_at"] > now - fresh_seconds):
+                return
+
+            try:
+                counts = self.deliver_batch(db, batch)
+            except Exception as e:
+                delay = self.fail(batch["id"], str(e))
+                result["failed"] += 1
+                result["last_error"] = str(e)
+                logger.warning(
+                    f"Spool batch {batch['id']} ({batch['table_name']}) failed, "
+                    f"next attempt in {delay:.0f}s: {e}"
+                )
+                return
+
+            self.ack(batch["id"])
+            result["delivered"] += 1
+            result["results"][batch["id"]] = counts
+
+    def drain_together(self, db: "SupabaseClient", batch_ids: List[int]) -> Dict[str, Any]:
+        """Deliver several spooled ``replace`` batches in one transaction.
+
+        Used when one scraper run produced batches for different keys (e.g.
+        daily_actuals and actuals). If a key still has older batches waiting,
+        or a batch is not a ``replace``, the batches are drained key by key
+        instead so the per-key order is kept.
+
+        Returns:
+            Same shape as :meth:`drain`
+        """
+        result = {"delivered": 0, "failed": 0, "last_error": None, "results": {}}
+
+        placeholders = ", ".join("?" for _ in batch_ids)
+        with self._connect() as conn:
+            locked_keys = sorted({
+                tuple(row)
+                for row in conn.execute(
+                    f"SELECT table_name, asp_id, media_id FROM batches WHERE id IN ({placeholders})",
+                    tuple(batch_ids),
+                ).fetchall()
+            })
+
+        # Lock every key involved (in a fixed order, so two callers cannot deadlock)
+        with ExitStack() as stack:
+            for key in locked_keys:
+                stack.enter_context(self._key_lock(key))
+            with self._connect() as conn:
+                batches = conn.execute(
+                    f"SELECT * FROM batches WHERE id IN ({placeholders}) ORDER BY id",
+                    tuple(batch_ids),
+                ).fetchall()
+                keys = [(b["table_name"], b["asp_id"], b["media_id"]) for b in batches]
+                backlog = any(
+                    conn.execute(
+                        "SELECT 1 FROM batches WHERE table_name = ? AND asp_id = ?"
+                        " AND media_id = ? AND id < ? LIMIT 1",
+                        (*key, batch["id"]),
+                    ).fetchone()
+                    for key, batch in zip(keys, batches)
+                )
+
+            if backlog or len(set(keys)) < len(keys) or any(
+                b["operation"] != "replace" for b in batches
+            ):
+                for key in dict.fromkeys(keys):
+                    drained = self.drain(db, key=key, respect_backoff=False)
+                    result["delivered"] += drained["delivered"]
+                    result["failed"] += drained["failed"]
+                    result["last_error"] = drained["last_error"] or result["last_error"]
+                    result["results"].update(drained["results"])
+                return result
+
+            windows = [
+                {
+                    "table_name": batch["table_name"],
+                    "asp_id": batch["asp_id"],
+                    "media_id": batch["media_id"],
+                    "records": json.loads(batch["records"]),
+                    "start_date": batch["start_date"],
+                    "end_date": batch["end_date"],
+                }
+                for batch in batches
+            ]
+            try:
+                counts = db.replace_actuals_windows(windows)
+            except Exception as e:
+                for batch in batches:
+                    self.fail(batch["id"], str(e))
+                result["failed"] = len(batches)
+                result["last_error"] = str(e)
+                logger.warning(f"Spool batches {batch_ids} failed together: {e}")
+                return result
+
+            for batch, batch_counts in zip(batches, counts):
+                self.ack(batch["id"])
+                result["results"][batch["id"]] = batch_counts
+            result["delivered"] = len(batches)
+
+        return result
+
+
+class SpoolDrainer:
+    """Background thread that keeps delivering due spool batches."""
+
+    def __init__(
+        self,
+        spool: RecordSpool,
+        db: "SupabaseClient",
+        interval: float = 30.0,
+        fresh_seconds: float = 600.0,
+    ):
+        """Initialize spool drainer.
+
+        Args:
+            spool: Spool to drain
+            db: Supabase client
+            interval: Seconds between drain passes
+            fresh_seconds: Batches never tried and younger than this are left
+                to the run that spooled them
+        """
+        self.spool = spool
+        self.db = db
+        self.interval = interval
+        self.fresh_seconds = fresh_seconds
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SpoolDrainer":
+        """Start draining in the background."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="spool-drainer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, final_drain: bool = True) -> int:
+        """Stop the thread, optionally trying once more for due batches.
+
+        Returns:
+            Number of batches still in the spool
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if final_drain:
+            self.spool.drain(self.db)
+        return len(self.spool)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.spool.drain(self.db, fresh_seconds=self.fresh_seconds)
+            except Exception as e:
+                logger.error(f"Spool drainer error: {e}")
+
+
+# Singleton instance for convenience
+_spool: Optional[RecordSpool] = None
+
+
+def get_record_spool() -> RecordSpool:
+    """Get singleton record spool instance."""
+    global _spool
+    if _spool is None:
+        _spool = RecordSpool()
+    return _spool
@@ -0,0 +1,271 @@
+"""Run-level write-behind buffer for scraped actuals.
+
+Scrapers and the orchestrator push rows into one shared buffer instead of
+writing to Supabase themselves. A background thread coalesces the rows per
+target table and sends one bulk upsert per table every ``flush_interval``
+seconds, or sooner once a table has ``max_rows`` pending rows.
+
+Every push is appended to an on-disk JSONL journal (fsynced) before it is
+acknowledged, and the journal is only trimmed after the rows were written.
+A buffer created on an existing journal replays it, so a crash loses nothing.
+
+Buffered writes are upserts: rows that disappeared from an ASP's report are
+not deleted. Use the direct save path when the window must be replaced.
+"""
+
+import json
+import logging
+import os
+import signal
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .database import SupabaseClient
+
+logger = logging.getLogger(__name__)
+
+# Default journal location (runtime data, ignored by git)
+DEFAULT_JOURNAL_PATH = Path(__file__).parent.parent / "var" / "write_behind.jsonl"
+
+# Columns forming the unique key of daily_actuals / actuals
+_KEY_COLUMNS = ("date", "media_id", "account_item_id", "asp_id")
+
+
+def _row_key(row: Dict[str, Any]) -> Tuple:
+    return tuple(str(row.get(column)) for column in _KEY_COLUMNS)
+
+
+class WriteBehindBuffer:
+    """Coalesces actuals writes from a whole run into bulk upserts."""
+
+    def __init__(
+        self,
+        db: "SupabaseClient",
+        journal_path: Optional[Path] = None,
+        flush_interval: float = 5.0,
+        max_rows: int = 500,
+    ):
+        """Initialize write-behind buffer.
+
+        Args:
+            db: Supabase client used for the bulk upserts
+            journal_path: JSONL journal path. Defaults to var/write_behind.jsonl
+            flush_interval: Seconds between background flushes
+            max_rows: Pending rows per table that trigger an early flush
+        """
+        self.db = db
+        self.journal_path = Path(journal_path or DEFAULT_JOURNAL_PATH)
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+
+        # table -> {row key -> row}; later pushes for the same key win
+        self._pending: Dict[str, Dict[Tuple, Dict[str, Any]]] = {}
+        self._lock = threading.RLock()
+        self._flush_lock = threading.RLock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._journal = None
+
+        self.stats = {"pushed": 0, "written": 0, "flushes": 0, "failed_flushes": 0}
+
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self._replay_journal()
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    # ==================== Lifecycle ====================
+
+    def start(self) -> "WriteBehindBuffer":
+        """Start the background flusher thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="write-behind-flusher", daemon=True
+            )
+            self._thread.start()
+            logger.info(
+                f"Write-behind buffer started (interval={self.flush_interval}s, "
+                f"max_rows={self.max_rows}, journal={self.journal_path})"
+            )
+        return self
+
+    def close(self) -> bool:
+        """Stop the flusher and write everything still pending.
+
+        Returns:
+            True if nothing is left in the journal
+        """
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+        delivered = self.flush()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+        if delivered:
+            logger.info(
+                f"Write-behind buffer closed: {self.stats['written']} rows written "
+                f"in {self.stats['flushes']} flushes"
+            )
+        else:
+            logger.error(
+                f"Write-behind buffer closed with {self.pending_count()} rows undelivered; "
+                f"they will be replayed from {self.journal_path}"
+            )
+        return delivered
+
+    def install_signal_handlers(self) -> None:
+        """Flush the buffer before the process exits on SIGTERM."""
+        previous = signal.getsignal(signal.SIGTERM)
+
+        def _handle_sigterm(signum, frame):
+            logger.warning("SIGTERM received, flushing write-behind buffer")
+            self.close()
+            if callable(previous):
+                previous(signum, frame)
+            raise SystemExit(128 + signum)
+
+        signal.signal(signal.SIGTERM, _handle_sigterm)
+
+    def __enter__(self) -> "WriteBehindBuffer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # ==================== Writes ====================
+
+    def push(self, table_name: str, rows: List[Dict[str, Any]]) -> int:
+        """Queue rows for ``table_name`` once they are durable in the journal.
+
+        Args:
+            table_name: Target table (daily_actuals or actuals)
+            rows: Rows with date, amount, media_id, account_item_id, asp_id
+
+        Returns:
+            Number of rows queued
+        """
+        if not rows:
+            return 0
+
+        with self._lock:
+            if self._journal is None:
+                raise RuntimeError("Write-behind buffer is closed")
+            self._journal.write(
+                json.dumps({"table": table_name, "rows": rows}, ensure_ascii=False) + "\n"
+            )
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+
+            table = self._pending.setdefault(table_name, {})
+            for row in rows:
+                table[_row_key(row)] = row
+            self.stats["pushed"] += len(rows)
+            full = len(table) >= self.max_rows
+
+        if full:
+            self._wake.set()
+        return len(rows)
+
+    def flush(self) -> bool:
+        """Send one bulk upsert per table for everything pending.
+
+        Returns:
+            True if all pending rows were written
+        """
+        with self._flush_lock:
+            with self._lock:
+                batches = {
+                    table: list(rows.values()) for table, rows in self._pending.items() if rows
+                }
+                self._pending = {}
+
+            if not batches:
+                return True
+
+            delivered = True
+            for table_name, rows in batches.items():
+                try:
+                    self.db.upsert_actuals(table_name, rows)
+                    self.stats["written"] += len(rows)
+                except Exception as e:
+                    delivered = False
+                    self.stats["failed_flushes"] += 1
+                    logger.error(f"Write-behind flush to {table_name} failed: {e}")
+                    # Put the rows back unless newer values arrived meanwhile
+                    with self._lock:
+                        table = self._pending.setdefault(table_name, {})
+                        for row in rows:
+                            table.setdefault(_row_key(row), row)
+
+            self.stats["flushes"] += 1
+            self._rewrite_journal()
+            return delivered
+
+    def pending_count(self) -> int:
+        """Number of rows waiting to be written."""
+        with self._lock:
+            return sum(len(rows) for rows in self._pending.values())
+
+    # ==================== Internals ====================
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            self.flush()
+
+    def _replay_journal(self) -> None:
+        """Load rows left in the journal by a previous run."""
+        if not self.journal_path.exists():
+            return
+
+        replayed = 0
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn final line from a crash mid-write
+                    logger.warning(f"Skipping corrupt journal line in {self.journal_path}")
+                    continue
+                table = self._pending.setdefault(entry["table"], {})
+                for row in entry["rows"]:
+                    table[_row_key(row)] = row
+                    replayed += 1
+
+        if replayed:
+            logger.info(f"Replaying {replayed} rows from {self.journal_path}")
+
+    def _rewrite_journal(self) -> None:
+        """Trim the journal down to the rows that are still pending."""
+        with self._lock:
+            if self._journal is None:
+                return
+            tmp_path = self.journal_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for table_name, rows in self._pending.items():
+                    if rows:
+                        f.write(
+                            json.dumps(
+                                {"table": table_name, "rows": list(rows.values())},
+                                ensure_ascii=False,
+                            )
+                            + "\n"
+                        )
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._journal.close()
+            os.replace(tmp_path, self.journal_path)
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+スクレイプジョブのワーカー
+
+scrape_jobs テーブル（migration 028）からジョブを取得して実行する。
+複数のプロセス・マシンで同時に起動しても、同じジョブが重複して実行されることはない
+（FOR UPDATE SKIP LOCKED で取得し、実行中はハートビートでリースを延長）。
+リースを失った場合はジョブの時間予算をキャンセルし、スクレイパーを次の区切りで止める。
+
+ジョブの投入:
+    python run_all_scrapers.py --daily --enqueue
+
+Usage:
+    # キューが空になるまで実行して終了
+    python job_worker.py --drain
+
+    # 常駐してジョブを待ち受け（30秒ごとにポーリング）
+    python job_worker.py --poll 30
+
+    # 最大10件で終了
+    python job_worker.py --max-jobs 10
+
+    # 常駐中は http://localhost:9464/metrics で Prometheus のメトリクスを公開
+    python job_worker.py --poll 30 --metrics-port 9464
+"""
+import os
+import sys
+import time
+import signal
+import argparse
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dotenv import load_dotenv
+load_dotenv(Path(__file__).resolve().parent.parent / '.env')
+
+from core import budget, metrics
+from core.database import SupabaseClient
+from core.job_queue import JobQueue, ScrapeJob
+from runners.run_all_scrapers import get_scraper_for_asp, run_scraper
+
+
+def lookup_names(db: SupabaseClient, job: ScrapeJob) -> tuple:
+    """ジョブのASP名・メディア名を取得"""
+    asp = db.client.table('asps').select('name').eq('id', job.asp_id).execute()
+    media = db.client.table('media').select('name').eq('id', job.media_id).execute()
+    asp_name = asp.data[0]['name'] if asp.data else job.asp_id
+    media_name = media.data[0]['name'] if media.data else job.media_id
+    return asp_name, media_name
+
+
+def run_job(db: SupabaseClient, job: ScrapeJob, headless: bool, max_retries: int) -> dict:
+    """ジョブを1件実行し、結果（success / error / error_kind）を返す"""
+    asp_name, media_name = lookup_names(db, job)
+    print(f"\n▶ {asp_name} / {media_name}: {job.describe()}")
+
+    scraper_info = get_scraper_for_asp(asp_name)
+    if not scraper_info:
+        return {'success': False, 'error': f'No scraper for ASP: {asp_name}', 'error_kind': 'parse_error'}
+
+    results = run_scraper(
+        scraper_info=scraper_info,
+        asp_id=job.asp_id,
+        media_id=job.media_id,
+        asp_name=asp_name,
+        media_name=media_name,
+        run_daily=job.job_type == 'daily',
+        run_monthly=job.job_type == 'monthly',
+        headless=headless,
+        max_retries=max_retries,
+    )
+    result = results.get(job.job_type)
+    if not result:
+        # 初期化エラー、またはスクレイパーが日次/月次に未対応（再試行しても変わらない）
+        error = results.get('error') or f"{scraper_info['key']} does not support {job.job_type}"
+        result = {'success': False, 'error': error, 'error_kind': 'parse_error'}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="スクレイプジョブのワーカー")
+    parser.add_argument('--drain', action='store_true', help='キューが空になったら終了')
+    parser.add_argument('--poll', type=float, default=30.0, help='キューが空のときの待機秒数')
+    parser.add_argument('--max-jobs', type=int, help='この件数を実行したら終了')
+    parser.add_argument('--lease', type=int, default=300, help='ジョブのリース秒数（ハートビートで延長）')
+    parser.add_argument('--retry-delay', type=int, default=300, help='失敗したジョブを再実行するまでの秒数')
+    parser.add_argument('--retries', type=int, default=1,
+                        help='ワーカー内のリトライ回数（ジョブ自体も max_attempts まで再投入される）')
+    parser.add_argument('--no-headless', action='store_true', help='ブラウザを表示')
+    parser.add_argument('--worker-id', help='ワーカーID（デフォルト: ホスト名:PID:ランダム）')
+    parser.add_argument('--metrics-port', type=int, help='Prometheus のメトリクスを公開するポート（/metrics）')
+    parser.add_argument('--metrics-file', metavar='PATH',
+                        help='ジョブごとに Prometheus 形式のメトリクスを書き出すファイル（textfile collector 用）')
+    args = parser.parse_args()
+
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+        print(f"📈 メトリクス: http://localhost:{args.metrics_port}/metrics")
+
+    db = SupabaseClient(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_SERVICE_ROLE_KEY'))
+    queue = JobQueue(
+        db,
+        worker_id=args.worker_id,
+        lease_seconds=args.lease,
+        retry_delay_seconds=args.retry_delay,
+    )
+
+    # SIGTERM では実行中のジョブを終えてから停止
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        print("\n停止要求を受信: 実行中のジョブ完了後に終了します")
+
+    signal.signal(signal.SIGTERM, request_stop)
+
+    print(f"👷 ワーカー起動: {queue.worker_id}")
+    done = 0
+    counts = {'succeeded': 0, 'queued': 0, 'failed': 0, 'lost': 0}
+
+    while not stopping and (args.max_jobs is None or done < args.max_jobs):
+        jobs = queue.claim()
+        if not jobs:
+            if args.drain:
+                break
+            time.sleep(args.poll)
+            continue
+
+        job = jobs[0]
+        # リースを失ったら（別のワーカーに再割り当て）実行中のスクレイパーを打ち切る
+        with budget.job_deadline(f"job {job.id[:8]}") as deadline, queue.lease(job, deadline) as lease:
+            try:
+                result = run_job(db, job, headless=not args.no_headless, max_retries=args.retries)
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+        status = queue.complete(job, result, lease)
+        counts[status or 'lost'] += 1
+        done += 1
+        mark = '✅' if status == 'succeeded' else '🔁' if status == 'queued' else '❌'
+        print(f"{mark} {job.describe()}: {status or 'lease lost'}")
+        if args.metrics_file:
+            metrics.write_textfile(args.metrics_file)
+
+    print(f"\n👷 ワーカー終了: {done}件実行 "
+          f"(成功 {counts['succeeded']}, 再投入 {counts['queued']}, 失敗 {counts['failed']}, "
+          f"リース喪失 {counts['lost']})")
+
+
+if __name__ == "__main__":
+    main()
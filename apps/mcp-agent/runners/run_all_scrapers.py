@@ -23,11 +23,30 @@ Usage:
 
     # ブラウザ表示モード
     python run_all_scrapers.py --daily --no-headless
+
+    # 保存をまとめて遅延書き込み（write-behind）
+    python run_all_scrapers.py --daily --write-behind
+
+    # サーキットブレーカーを無視して全件実行
+    python run_all_scrapers.py --daily --no-breaker
+
+    # 60分以内に終わるよう、優先度の低い対象を必要に応じて省略
+    python run_all_scrapers.py --daily --deadline 60
+
+    # Playwright 呼び出しの回数・時間を計測（N+1 パターンを検出）
+    python run_all_scrapers.py --daily --asp accesstrade --instrument
+
+    # 実行ごとに cProfile とフレームグラフ用のスタックを保存（var/profiles）
+    python run_all_scrapers.py --daily --asp accesstrade --profile
+
+    # 終了時に Prometheus のメトリクスを書き出し（node_exporter の textfile collector 用）
+    python run_all_scrapers.py --daily --metrics-file /var/lib/node_exporter/textfile/scraper.prom
 """
 import os
 import sys
 import argparse
 import json
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
@@ -40,102 +59,7 @@ load_dotenv(Path(__file__).resolve().parent.parent / '.env')
 
 from supabase import create_client
 
-
-# 利用可能なスクレイパーとASP名のマッピング
-# すべて新形式（BaseScraper使用、asp_credentialsテーブルから認証情報取得）
-AVAILABLE_SCRAPERS = {
-    'moshimo': {
-        'module': 'scrapers.moshimo.scraper',
-        'class_name': 'MoshimoScraper',
-        'asp_patterns': ['もしも', 'moshimo'],
-        'supports_daily': True,
-        'supports_monthly': True,
-    },
-    'accesstrade': {
-        'module': 'scrapers.accesstrade.scraper',
-        'class_name': 'AccesstradeScraper',
-        'asp_patterns': ['アクセストレード', 'accesstrade'],
-        'supports_daily': True,
-        'supports_monthly': True,
-    },
-    'ultelo': {
-        'module': 'scrapers.ultelo.scraper',
-        'class_name': 'UlteloScraper',
-        'asp_patterns': ['ultelo', 'アルテガ'],
-        'supports_daily': True,
-        'supports_monthly': True,
-    },
-    'valuecommerce': {
-        'module': 'scrapers.valuecommerce.scraper',
-        'class_name': 'ValueCommerceScraper',
-        'asp_patterns': ['valuecommerce', 'バリューコマース'],
-        'supports_daily': False,  # 日次はまだ未実装
-        'supports_monthly': True,
-    },
-    'a8net': {
-        'module': 'scrapers.a8net.scraper',
-        'class_name': 'A8netScraper',
-        'asp_patterns': ['a8.net', 'a8（'],
-        'supports_daily': True,
-        'supports_monthly': True,
-    },
-    'a8app': {
-        'module': 'scrapers.a8app.scraper',
-        'class_name': 'A8appScraper',
-        'asp_patterns': ['seedapp', 'a8app'],
-        'supports_daily': True,
-        'supports_monthly': False,
-    },
-    'afb': {
-        'module': 'scrapers.afb.scraper',
-        'class_name': 'AfbScraper',
-        'asp_patterns': ['afb', 'アフィリエイトb'],
-        'supports_daily': True,
-        'supports_monthly': False,
-    },
-    'affitown': {
-        'module': 'scrapers.affitown.scraper',
-        'class_name': 'AffitownScraper',
-        'asp_patterns': ['affitown', 'アフィタウン'],
-        'supports_daily': True,
-        'supports_monthly': True,
-    },
-    'circuitx': {
-        'module': 'scrapers.circuitx.scraper',
-        'class_name': 'CircuitxScraper',
-        'asp_patterns': ['circuitx', 'サーキットx'],
-        'supports_daily': True,
-        'supports_monthly': False,
-    },
-    'felmat': {
-        'module': 'scrapers.felmat.scraper',
-        'class_name': 'FelmatScraper',
-        'asp_patterns': ['felmat', 'フェルマ'],
-        'supports_daily': True,
-        'supports_monthly': True,
-    },
-    'gmosmaaffi': {
-        'module': 'scrapers.gmosmaaffi.scraper',
-        'class_name': 'GmoSmaaffiScraper',
-        'asp_patterns': ['smaad', 'gmo', 'スマートアフィリ'],
-        'supports_daily': True,
-        'supports_monthly': True,
-    },
-    'linkag': {
-        'module': 'scrapers.linkag.scraper',
-        'class_name': 'LinkagScraper',
-        'asp_patterns': ['link-ag', 'linkag', 'リンクエージ'],
-        'supports_daily': True,
-        'supports_monthly': False,
-    },
-    'webridge': {
-        'module': 'scrapers.webridge.scraper',
-        'class_name': 'WebridgeScraper',
-        'asp_patterns': ['webridge', 'ウェブリッジ'],
-        'supports_daily': True,
-        'supports_monthly': True,
-    },
-}
+from core.scraper_registry import get_scraper_registry
 
 
 def get_supabase():
@@ -147,19 +71,14 @@ def get_supabase():
 
 
 def get_scraper_for_asp(asp_name: str) -> Optional[dict]:
-    """ASP名からスクレイパー情報を取得"""
-    asp_lower = asp_name.lower()
-    for scraper_key, scraper_info in AVAILABLE_SCRAPERS.items():
-        for pattern in scraper_info['asp_patterns']:
-            if pattern.lower() in asp_lower:
-                return {**scraper_info, 'key': scraper_key}
-    return None
+    """ASP名からスクレイパー情報を取得（scrapers/*/metadata.json から登録）"""
+    spec = get_scraper_registry().match(asp_name)
+    return spec.to_dict() if spec else None
 
 
 def load_scraper_class(scraper_info: dict):
-    """スクレイパークラスを動的にロード"""
-    module = __import__(scraper_info['module'], fromlist=[''])
-    return getattr(module, scraper_info['class_name'])
+    """スクレイパークラスを動的にロード（選択されたスクレイパーのみインポート）"""
+    return get_scraper_registry().get(scraper_info['key']).load()
 
 
 def get_all_credentials_with_asps():
@@ -182,9 +101,18 @@ def run_scraper(
     run_daily: bool,
     run_monthly: bool,
     headless: bool,
-    max_retries: int
+    max_retries: int,
+    write_buffer=None,
+    browser=None,
+    run_lock=None,
+    db=None
 ) -> dict:
-    """スクレイパーを実行"""
+    """スクレイパーを実行（browser 指定時は共有ブラウザに新しいコンテキストを作って実行）
+
+    run_lock 指定時は実行全体で同じリース保持者を使う。別の実行が同じ対象を処理中の場合、
+    その期間の結果は status="locked"（スキップ）になる。
+    db 指定時は BaseScraper にそのDBクライアントを渡す（tools/load_test.py の疑似DB）。
+    """
     results = {
         'asp_name': asp_name,
         'media_name': media_name,
@@ -192,29 +120,77 @@ def run_scraper(
         'daily': None,
         'monthly': None,
     }
+    lease = None
 
     try:
         ScraperClass = load_scraper_class(scraper_info)
 
-        # ValueCommerceは特殊なので別処理
-        if scraper_info['key'] == 'valuecommerce':
+        # ブラウザを使わないスクレイパー（metadata.json の uses_browser: false）は別処理
+        if not scraper_info.get('uses_browser', True):
             scraper = ScraperClass(asp_id=asp_id, media_id=media_id)
+            if run_lock is not None:
+                # BaseScraper を継承しないため、ランナー側でリースを取得
+                periods = [p for p in ('daily', 'monthly')
+                           if (run_daily if p == 'daily' else run_monthly) and scraper_info[f'supports_{p}']]
+                lease = run_lock.acquire(asp_id, media_id, periods)
+                if not lease.acquired:
+                    print(f"    ⏭ スキップ（{lease.describe()}）")
+                    for period in periods:
+                        results[period] = {
+                            'success': False, 'status': 'locked', 'skipped': True,
+                            'error': lease.describe(), 'error_kind': 'locked',
+                        }
+                    return results
         else:
             scraper = ScraperClass(
                 asp_id=asp_id,
                 media_id=media_id,
                 headless=headless,
-                max_retries=max_retries
+                max_retries=max_retries,
+                write_buffer=write_buffer,
+                browser=browser,
+                run_lock=run_lock,
+                db=db
             )
 
+        do_daily = run_daily and scraper_info['supports_daily']
+        do_monthly = run_monthly and scraper_info['supports_monthly']
+
+        # 日次・月次の両方を取得する場合は1回のログインでまとめて実行
+        if do_daily and do_monthly and hasattr(scraper, 'run_all_periods'):
+            print("    📊 日次・月次データ取得中（同一セッション）...")
+            try:
+                result = scraper.run_all_periods()
+            except Exception as e:
+                result = {
+                    'daily': {'success': False, 'error': str(e)},
+                    'monthly': {'success': False, 'error': str(e)},
+                }
+            for period, label in (('daily', '日次'), ('monthly', '月次')):
+                period_result = result[period]
+                results[period] = period_result
+                if period_result.get('success'):
+                    print(f"    ✅ {label}: 成功 ({period_result.get('records_saved', 0)}件)")
+                elif period_result.get('status') == 'locked':
+                    print(f"    ⏭ {label}: スキップ - {period_result.get('error')}")
+                elif period_result.get('status') == 'spooled':
+                    print(f"    📦 {label}: DB書き込み失敗 - {period_result.get('spooled', 0)}件をスプールに保存（後で再送）")
+                else:
+                    print(f"    ❌ {label}: 失敗 - {period_result.get('error', 'Unknown error')}")
+            return results
+
         # 日次データ取得
-        if run_daily and scraper_info['supports_daily']:
+        if do_daily:
             print(f"    📊 日次データ取得中...")
             try:
                 result = scraper.run_daily()
                 results['daily'] = result
                 if result.get('success'):
                     print(f"    ✅ 日次: 成功 ({result.get('records_count', 0)}件)")
+                elif result.get('status') == 'locked':
+                    print(f"    ⏭ 日次: スキップ - {result.get('error')}")
+                elif result.get('status') == 'spooled':
+                    print(f"    📦 日次: DB書き込み失敗 - {result.get('spooled', 0)}件をスプールに保存（後で再送）")
                 else:
                     print(f"    ❌ 日次: 失敗 - {result.get('error', 'Unknown error')}")
             except Exception as e:
@@ -222,13 +198,17 @@ def run_scraper(
                 print(f"    ❌ 日次: エラー - {e}")
 
         # 月次データ取得
-        if run_monthly and scraper_info['supports_monthly']:
+        if do_monthly:
             print(f"    📈 月次データ取得中...")
             try:
                 result = scraper.run_monthly()
                 results['monthly'] = result
                 if result.get('success'):
                     print(f"    ✅ 月次: 成功 ({result.get('records_count', 0)}件)")
+                elif result.get('status') == 'locked':
+                    print(f"    ⏭ 月次: スキップ - {result.get('error')}")
+                elif result.get('status') == 'spooled':
+                    print(f"    📦 月次: DB書き込み失敗 - {result.get('spooled', 0)}件をスプールに保存（後で再送）")
                 else:
                     print(f"    ❌ 月次: 失敗 - {result.get('error', 'Unknown error')}")
             except Exception as e:
@@ -238,6 +218,9 @@ def run_scraper(
     except Exception as e:
         print(f"    ❌ スクレイパー初期化エラー: {e}")
         results['error'] = str(e)
+    finally:
+        if lease is not None and lease.acquired:
+            run_lock.release(lease.keys)
 
     return results
 
@@ -265,6 +248,25 @@ Examples:
 
   # アクティブなASPのみ実行
   python run_all_scrapers.py --daily --active-only
+
+  # 保存をまとめて遅延書き込み（5秒または500件ごとにテーブル単位で一括upsert）
+  python run_all_scrapers.py --daily --write-behind
+
+  # 5回連続失敗でASPを停止し、24時間ごとに1回だけ試行
+  python run_all_scrapers.py --daily --breaker-threshold 5 --breaker-cooldown 24
+
+  # 3台で分担（各マシンで 1/3, 2/3, 3/3 を指定）。分担前に予想負荷を確認
+  python run_all_scrapers.py --daily --plan 3
+  python run_all_scrapers.py --daily --shard 1/3
+
+  # 実行せずにジョブキューへ投入（複数マシンの job_worker.py で実行）
+  python run_all_scrapers.py --daily --enqueue
+
+  # 同じASPのメディアを1つずつ実行（ブラウザはASPごとに1回だけ起動）
+  python run_all_scrapers.py --daily --media-concurrency 1
+
+  # 60分で打ち切り（優先度順に実行し、間に合わない見込みの対象はスキップ）
+  python run_all_scrapers.py --daily --deadline 60
         """
     )
 
@@ -283,8 +285,68 @@ Examples:
     parser.add_argument('--dry-run', action='store_true', help='実行せずに対象を確認')
     parser.add_argument('--output', help='結果をJSONファイルに保存')
 
+    # 遅延書き込み
+    parser.add_argument('--write-behind', action='store_true',
+                        help='保存をバッファしテーブル単位で一括upsert（ジャーナルで永続化、削除は行わない）')
+    parser.add_argument('--flush-interval', type=float, default=5.0, help='遅延書き込みのフラッシュ間隔（秒）')
+    parser.add_argument('--flush-rows', type=int, default=500, help='この件数たまったらフラッシュ')
+
+    # サーキットブレーカー
+    parser.add_argument('--breaker-threshold', type=int, default=3,
+                        help='この回数連続で失敗したASPをスキップ（クールダウン後は1回だけ試行）')
+    parser.add_argument('--breaker-cooldown', type=float, default=12.0,
+                        help='停止したASPを再試行するまでの時間（時間）')
+    parser.add_argument('--no-breaker', action='store_true', help='サーキットブレーカーを使わない')
+
+    # シャーディング（複数マシンで分担）
+    parser.add_argument('--shard', help='N台で分担する場合の担当分 i/N（例: 2/3）。ASP単位の一貫性ハッシュで分割')
+    parser.add_argument('--plan', type=int, metavar='N',
+                        help='N台で分担した場合の各シャードの対象と予想実行時間を表示して終了')
+    parser.add_argument('--no-asp-affinity', action='store_true',
+                        help='(ASP, メディア) 単位で分割（デフォルトは同じASPのメディアを同じシャードに割り当て）')
+
+    # ジョブキュー
+    parser.add_argument('--enqueue', action='store_true',
+                        help='実行せずに scrape_jobs へジョブを投入（job_worker.py で実行）')
+    parser.add_argument('--priority', type=int, default=0, help='投入するジョブの優先度（大きいほど先に実行）')
+
+    # 重複実行の防止
+    parser.add_argument('--no-lock', action='store_true',
+                        help='実行リースを使わない（同じ対象を別の実行が処理中でもスキップしない）')
+    parser.add_argument('--lock-ttl', type=int, default=900,
+                        help='実行リースの有効期限（秒）。実行中は自動延長し、異常終了時はこの時間で失効')
+
+    # 優先度順の実行
+    parser.add_argument('--deadline', type=float, metavar='MINUTES',
+                        help='実行全体の制限時間（分）。予想実行時間が残り時間を超える対象はスキップし、'
+                             '時間切れの実行は次の区切りで打ち切る')
+    parser.add_argument('--no-priority', action='store_true',
+                        help='優先度で並べ替えない（認証情報の登録順に実行）')
+
+    # メディアの並列実行
+    parser.add_argument('--media-concurrency', type=int, default=2,
+                        help='同じASPで同時に実行するメディア数の上限（スクレイパーの MAX_MEDIA_CONCURRENCY が優先）')
+
+    # 計測
+    parser.add_argument('--instrument', action='store_true',
+                        help='Playwright 呼び出しの回数・時間を呼び出し元ごとに集計（execution_logs の metadata にも記録）')
+    parser.add_argument('--profile', nargs='?', const='', metavar='DIR',
+                        help='(ASP, 期間, メディア) ごとに cProfile とフレームグラフ用スタックを保存（デフォルト var/profiles）')
+    parser.add_argument('--metrics-file', metavar='PATH',
+                        help='終了時に Prometheus 形式のメトリクスを書き出すファイル（textfile collector 用）')
+
     args = parser.parse_args()
 
+    if args.instrument:
+        from core import instrumentation
+        instrumentation.enable()
+    if args.profile is not None:
+        from core import profiling
+        print(f"🔬 プロファイル出力先: {profiling.enable(args.profile or None)}")
+    if args.metrics_file:
+        from core import metrics
+        metrics.write_textfile_at_exit(args.metrics_file)
+
     # 必須チェック
     if not args.daily and not args.monthly:
         parser.print_help()
@@ -348,6 +410,55 @@ Examples:
             'is_active': is_active,
         })
 
+    if args.plan:
+        from core import sharding
+        from core.database import SupabaseClient
+
+        db = SupabaseClient(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_SERVICE_ROLE_KEY'))
+        durations = sharding.historical_durations(db, {t['asp_id'] for t in targets})
+        loads = sharding.plan(targets, args.plan, durations, asp_affinity=not args.no_asp_affinity)
+        # 履歴のない対象は plan() と同じく既知ASPの中央値で見積もる
+        default = sharding.default_duration(durations)
+        print(f"\n🗂  シャード計画: {args.plan}台（予想時間は execution_logs の過去14日の中央値）")
+        for load in loads:
+            unknown = f"、履歴なし {load.unknown}件" if load.unknown else ""
+            print(f"\n   [{load.index + 1}/{args.plan}] {len(load.targets)}件 / 約{load.seconds / 60:.1f}分{unknown}")
+            for target in load.targets:
+                seconds = sharding.estimate(target, durations, default)
+                print(f"      - {target['asp_name']} / {target['media_name']} ({seconds:.0f}秒)")
+        busiest = max(load.seconds for load in loads)
+        total = sum(load.seconds for load in loads)
+        if busiest:
+            print(f"\n   最長シャード: 約{busiest / 60:.1f}分（均等分割なら約{total / args.plan / 60:.1f}分）")
+        sys.exit(0)
+
+    if args.shard:
+        from core import sharding
+
+        try:
+            shard_index, shard_count = sharding.parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        targets = sharding.select(targets, shard_index, shard_count, asp_affinity=not args.no_asp_affinity)
+        print(f"\n🗂  シャード {shard_index + 1}/{shard_count}: 担当 {len(targets)}件")
+
+    from core import scheduling
+    from core.database import SupabaseClient
+
+    db = SupabaseClient(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_SERVICE_ROLE_KEY'))
+
+    # 優先度順に並べ替え（稼働中のASP → データが古い順 → 予想実行時間が長い順）
+    durations = {}
+    if targets and (args.deadline or not args.no_priority):
+        from core import sharding
+
+        durations = sharding.historical_durations(db, {t['asp_id'] for t in targets})
+    if targets and not args.no_priority:
+        statuses = db.get_asp_scrape_statuses({t['asp_id'] for t in targets})
+        for target in targets:
+            target['last_scrape_at'] = (statuses.get(target['asp_id']) or {}).get('last_scrape_at')
+        targets = scheduling.order(targets, durations)
+
     print(f"\n🎯 実行対象: {len(targets)}件")
     for i, target in enumerate(targets, 1):
         status = "🟢" if target['is_active'] else "⚪"
@@ -365,6 +476,22 @@ Examples:
         print("\n🔍 ドライラン終了（実際の実行はスキップ）")
         sys.exit(0)
 
+    if args.enqueue:
+        from core.job_queue import JobQueue
+
+        queue = JobQueue(db)
+        for job_type, enabled, support_key in (
+            ('daily', args.daily, 'supports_daily'),
+            ('monthly', args.monthly, 'supports_monthly'),
+        ):
+            if not enabled:
+                continue
+            supported = [t for t in targets if t['scraper_info'][support_key]]
+            created = queue.enqueue(supported, job_type, priority=args.priority)
+            print(f"\n📮 {job_type}: {len(created)}件のジョブを投入（実行中・待機中の {len(supported) - len(created)}件はスキップ）")
+        print("   python runners/job_worker.py でワーカーを起動してください")
+        sys.exit(0)
+
     # 実行
     print("\n" + "=" * 60)
     print("📥 スクレイピング開始")
@@ -373,11 +500,81 @@ Examples:
     all_results = []
     success_count = 0
     fail_count = 0
-
-    for i, target in enumerate(targets, 1):
-        print(f"\n[{i}/{len(targets)}] {target['asp_name']} / {target['media_name']}")
-
-        result = run_scraper(
+    skip_count = 0
+
+    from core import circuit_breaker, media_batch
+    from core.retry_policy import BUDGET_EXCEEDED
+    from core.run_lock import LOCKED, RunLock
+    from core.spool import SPOOLED, SpoolDrainer, get_record_spool
+
+    # 前回までにDBへ書き込めなかったスプール分をバックグラウンドで再送
+    spool = get_record_spool()
+    drainer = SpoolDrainer(spool, db).start()
+    if len(spool):
+        print(f"📦 スプール未送信: {len(spool)}バッチ（バックグラウンドで再送）")
+
+    # 連続失敗中のASPを判定（スキップ or 1回だけ試行）
+    breaker = None
+    if not args.no_breaker:
+        breaker = circuit_breaker.CircuitBreaker(
+            db,
+            failure_threshold=args.breaker_threshold,
+            cooldown_hours=args.breaker_cooldown,
+        )
+        breaker.load({t['asp_id']: t['asp_name'] for t in targets})
+
+    write_buffer = None
+    if args.write_behind:
+        from core.write_buffer import WriteBehindBuffer
+
+        write_buffer = WriteBehindBuffer(
+            db,
+            flush_interval=args.flush_interval,
+            max_rows=args.flush_rows,
+        ).start()
+        write_buffer.install_signal_handlers()
+        print(f"📝 遅延書き込み: 有効（{args.flush_interval}秒 / {args.flush_rows}件ごと）")
+
+    # 同じ対象を別の実行（cron の重複起動など）が処理中ならスキップ
+    run_lock = RunLock(db, ttl_seconds=args.lock_ttl, enabled=not args.no_lock)
+    locked_count = 0
+    spooled_count = 0
+
+    # 制限時間内に終わらない見込みの対象をスキップ（優先度順なので低い対象から省かれる）
+    scheduler = scheduling.Scheduler(durations, args.deadline * 60 if args.deadline else None)
+    if args.deadline:
+        from core import budget
+
+        # 制限時間を過ぎたら実行中のスクレイパーも次の区切りで打ち切る（取得済みの期間は保存）
+        budget.set_run_deadline(args.deadline * 60)
+        print(f"⏰ 制限時間: {args.deadline:.0f}分")
+    dropped_count = 0
+
+    # 進捗番号は並列レーンから採番されるためロックで保護
+    started = 0
+    started_lock = threading.Lock()
+
+    def announce(target):
+        nonlocal started
+        with started_lock:
+            started += 1
+            print(f"\n[{started}/{len(targets)}] {target['asp_name']} / {target['media_name']}")
+
+    def run_target(target, browser):
+        announce(target)
+        if not scheduler.admit(target):
+            print(f"    ⏰ スキップ: 予想 {scheduler.estimate(target):.0f}秒 > 残り {max(scheduler.remaining(), 0):.0f}秒")
+            return {
+                'asp_name': target['asp_name'],
+                'media_name': target['media_name'],
+                'scraper': target['scraper_info']['key'],
+                'dropped': True,
+                'daily': None,
+                'monthly': None,
+            }
+        if target['probe']:
+            print("    🔎 サーキットブレーカー: 復旧確認のため1回だけ試行")
+        return run_scraper(
             scraper_info=target['scraper_info'],
             asp_id=target['asp_id'],
             media_id=target['media_id'],
@@ -386,18 +583,123 @@ Examples:
             run_daily=args.daily,
             run_monthly=args.monthly,
             headless=not args.no_headless,
-            max_retries=args.retries,
+            max_retries=1 if target['probe'] else args.retries,
+            write_buffer=write_buffer,
+            browser=browser,
+            run_lock=run_lock,
         )
 
+    def record_result(target, result):
+        nonlocal success_count, fail_count, locked_count, dropped_count, spooled_count
         all_results.append(result)
+        if result.get('dropped'):
+            dropped_count += 1
+            return
 
         # 成功/失敗カウント
         daily_result = result.get('daily') or {}
         monthly_result = result.get('monthly') or {}
-        if daily_result.get('success') or monthly_result.get('success'):
+        period_results = [r for r in (daily_result, monthly_result) if r]
+        if period_results and all(r.get('status') == LOCKED for r in period_results):
+            # 別の実行が処理中：失敗扱いにせず、サーキットブレーカーにも記録しない
+            result['locked'] = True
+            locked_count += 1
+            return
+        succeeded = bool(daily_result.get('success') or monthly_result.get('success'))
+        spooled = any(r.get('status') == SPOOLED for r in period_results)
+        if succeeded:
             success_count += 1
+        elif spooled:
+            # 取得はできたがDBに書き込めなかった：ASPの障害ではないのでブレーカーに記録しない
+            spooled_count += 1
+            return
         else:
             fail_count += 1
+        # 時間予算の使い切りもASPの障害ではないのでブレーカーに記録しない
+        budget_exceeded = any(r.get('error_kind') == BUDGET_EXCEEDED for r in period_results)
+        if breaker and (succeeded or not budget_exceeded):
+            error = result.get('error') or daily_result.get('error') or monthly_result.get('error')
+            breaker.record(target['asp_id'], succeeded, error)
+
+    def skip_target(target):
+        nonlocal skip_count
+        status = breaker.statuses[target['asp_id']]
+        announce(target)
+        print(f"    ⛔ サーキットブレーカー: スキップ（{status.consecutive_failures}回連続失敗）")
+        all_results.append({
+            'asp_name': target['asp_name'],
+            'media_name': target['media_name'],
+            'scraper': target['scraper_info']['key'],
+            'skipped': True,
+            'breaker': status.to_dict(),
+        })
+        skip_count += 1
+
+    def run_group(runnable):
+        scraper_info = runnable[0]['scraper_info']
+        if not scraper_info.get('uses_browser', True):
+            # APIベースなどブラウザを使わないスクレイパーは共有ブラウザを起動しない
+            for target in runnable:
+                record_result(target, run_target(target, None))
+            return
+
+        try:
+            cap = getattr(load_scraper_class(scraper_info), 'MAX_MEDIA_CONCURRENCY', None)
+        except Exception:
+            cap = None
+        concurrency = min(args.media_concurrency, cap or args.media_concurrency)
+        if len(runnable) > 1:
+            print(f"\n🌐 {runnable[0]['asp_name']}: {len(runnable)}メディアを共有ブラウザで実行"
+                  f"（同時実行 {min(concurrency, len(runnable))}）")
+        try:
+            media_batch.run_asp_group(
+                runnable,
+                run_target,
+                concurrency=concurrency,
+                headless=not args.no_headless,
+                on_result=record_result,
+            )
+        except Exception as e:
+            # ブラウザ起動失敗など：未実行のメディアを失敗として記録
+            print(f"    ❌ 共有ブラウザエラー: {e}")
+            done = {(r.get('asp_name'), r.get('media_name')) for r in all_results}
+            for target in runnable:
+                if (target['asp_name'], target['media_name']) not in done:
+                    record_result(target, {
+                        'asp_name': target['asp_name'],
+                        'media_name': target['media_name'],
+                        'scraper': scraper_info['key'],
+                        'daily': None,
+                        'monthly': None,
+                        'error': str(e),
+                    })
+
+    try:
+        # ASPごとにまとめ、メディアごとのコンテキストを共有ブラウザで実行
+        for asp_id, group in media_batch.group_by_asp(targets).items():
+            pending = list(group)
+            # 復旧確認中のASPは1メディアずつ試行し、結果が出るまで残りは実行しない
+            # （成功すればブレーカーが閉じて残りは通常実行、失敗すれば開いて残りはスキップ）
+            while pending and breaker and breaker.decide(asp_id) == circuit_breaker.PROBE:
+                run_group([{**pending.pop(0), 'probe': True}])
+            if not pending:
+                continue
+            if breaker and breaker.decide(asp_id) == circuit_breaker.SKIP:
+                for target in pending:
+                    skip_target(target)
+                continue
+            run_group([{**target, 'probe': False} for target in pending])
+    finally:
+        # 実行終了時に残りを書き込む
+        if write_buffer is not None:
+            if write_buffer.close():
+                print(f"\n📝 遅延書き込み完了: {write_buffer.stats['written']}件")
+            else:
+                print(f"\n⚠️  未書き込みのデータがあります（次回実行時に再送）: {write_buffer.journal_path}")
+        remaining = drainer.stop()
+        if remaining:
+            print(f"\n⚠️  スプールに未送信のバッチがあります: {remaining}件"
+                  f"（python tools/scraper_cli.py replay-spool で再送）")
 
     # サマリー
     print("\n" + "=" * 60)
@@ -406,13 +708,43 @@ Examples:
     print(f"   終了時刻: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"   成功: {success_count}件")
     print(f"   失敗: {fail_count}件")
+    if skip_count:
+        print(f"   スキップ（サーキットブレーカー）: {skip_count}件")
+    if locked_count:
+        print(f"   スキップ（別の実行が処理中）: {locked_count}件")
+    if spooled_count:
+        print(f"   スプール保存（DB書き込み失敗、後で再送）: {spooled_count}件")
+    if dropped_count:
+        print(f"   スキップ（制限時間）: {dropped_count}件")
+
+    breaker_report = breaker.report() if breaker else []
+    if breaker_report:
+        print("\nサーキットブレーカー:")
+        for status in breaker_report:
+            print(f"   {status['asp_name']}: {status['outcome'] or status['state']}"
+                  f"（連続失敗 {status['consecutive_failures']}回）")
 
     # 詳細結果
     print("\n詳細:")
     for result in all_results:
         daily_r = result.get('daily') or {}
         monthly_r = result.get('monthly') or {}
-        status = "✅" if daily_r.get('success') or monthly_r.get('success') else "❌"
+        if result.get('skipped'):
+            print(f"   ⛔ {result['asp_name']} / {result['media_name']}: スキップ")
+            continue
+        if result.get('dropped'):
+            print(f"   ⏰ {result['asp_name']} / {result['media_name']}: 制限時間のためスキップ")
+            continue
+        if result.get('locked'):
+            print(f"   ⏭ {result['asp_name']} / {result['media_name']}: "
+                  f"ロック中（{(daily_r or monthly_r).get('error')}）")
+            continue
+        if daily_r.get('success') or monthly_r.get('success'):
+            status = "✅"
+        elif SPOOLED in (daily_r.get('status'), monthly_r.get('status')):
+            status = "📦"
+        else:
+            status = "❌"
         daily_count = daily_r.get('records_count', '-') if daily_r else '-'
         monthly_count = monthly_r.get('records_count', '-') if monthly_r else '-'
         print(f"   {status} {result['asp_name']} / {result['media_name']}: 日次={daily_count}, 月次={monthly_count}")
@@ -426,13 +758,18 @@ Examples:
                     'total': len(targets),
                     'success': success_count,
                     'fail': fail_count,
+                    'skipped': skip_count,
+                    'locked': locked_count,
+                    'spooled': spooled_count,
+                    'dropped': dropped_count,
                 },
+                'circuit_breaker': breaker_report,
                 'results': all_results,
             }, f, ensure_ascii=False, indent=2)
         print(f"\n💾 結果を保存: {args.output}")
 
     # 終了コード
-    sys.exit(0 if fail_count == 0 else 1)
+    sys.exit(0 if fail_count == 0 and spooled_count == 0 else 1)
 
 
 if __name__ == "__main__":
@@ -14,6 +14,12 @@ Usage:
 
     # ブラウザ表示
     python run_scraper.py --asp "A8.net" --media "ReRe" --daily --no-headless
+
+    # Playwright 呼び出しの回数・時間を計測
+    python run_scraper.py --asp "A8.net" --media "ReRe" --daily --instrument
+
+    # cProfile とフレームグラフ用のスタックを保存（var/profiles）
+    python run_scraper.py --asp "A8.net" --media "ReRe" --daily --profile
 """
 import os
 import sys
@@ -26,11 +32,12 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from dotenv import load_dotenv
 load_dotenv(Path(__file__).resolve().parent.parent / '.env')
 
-from supabase import create_client
-
 
 def get_supabase():
     """Supabaseクライアントを取得"""
+    # --list などの情報表示で supabase を読み込まないよう遅延インポート
+    from supabase import create_client
+
     return create_client(
         os.getenv('SUPABASE_URL'),
         os.getenv('SUPABASE_SERVICE_ROLE_KEY')
@@ -76,59 +83,23 @@ def resolve_ids(asp_name: str = None, media_name: str = None, asp_id: str = None
 
 
 def get_scraper_class(asp_name: str):
-    """ASP名からスクレイパークラスを取得"""
-    # ASP名とスクレイパーモジュールのマッピング
-    scraper_mapping = {
-        'もしも': 'scrapers.moshimo.scraper',
-        'moshimo': 'scrapers.moshimo.scraper',
-        'アクセストレード': 'scrapers.accesstrade.scraper',
-        'accesstrade': 'scrapers.accesstrade.scraper',
-        'a8.net': 'scrapers.a8net.scraper',
-        'a8（ビギナーズ）': 'scrapers.a8net.scraper',
-        'afb': 'scrapers.afb.scraper',
-        'affitown': 'scrapers.affitown.scraper',
-        'circuitx': 'scrapers.circuitx.scraper',
-        'felmat': 'scrapers.felmat.scraper',
-        'link-ag': 'scrapers.linkag.scraper',
-        'seedapp': 'scrapers.a8app.scraper',
-        'smaad': 'scrapers.gmosmaaffi.scraper',
-        'webridge': 'scrapers.webridge.scraper',
-        'ultelo': 'scrapers.ultelo.scraper',
-        'valuecommerce': 'scrapers.valuecommerce.scraper',
-        'バリューコマース': 'scrapers.valuecommerce.scraper',
-    }
-
-    asp_lower = asp_name.lower()
-    for key, module_path in scraper_mapping.items():
-        if key in asp_lower:
-            try:
-                module = __import__(module_path, fromlist=[''])
-                # スクレイパークラスを探す
-                for attr_name in dir(module):
-                    attr = getattr(module, attr_name)
-                    if isinstance(attr, type) and attr_name.endswith('Scraper') and attr_name != 'BaseScraper':
-                        return attr
-            except ImportError as e:
-                print(f"Warning: Could not import {module_path}: {e}")
-                continue
-
-    return None
+    """ASP名からスクレイパークラスを取得（選択されたモジュールのみインポート）"""
+    from core.scraper_registry import get_scraper_registry
+
+    return get_scraper_registry().get_scraper_class(asp_name)
 
 
 def list_available_scrapers():
     """利用可能なスクレイパーを一覧表示"""
-    scrapers_dir = Path(__file__).resolve().parent.parent / 'scrapers'
+    from core.scraper_registry import get_scraper_registry
+
     print("\n利用可能なスクレイパー:")
 
-    for asp_dir in scrapers_dir.iterdir():
-        if asp_dir.is_dir() and not asp_dir.name.startswith('_'):
-            scraper_file = asp_dir / 'scraper.py'
-            if scraper_file.exists():
-                print(f"  ✓ {asp_dir.name}")
-            else:
-                daily_file = asp_dir / 'daily.py'
-                if daily_file.exists():
-                    print(f"  △ {asp_dir.name} (旧形式)")
+    for spec in get_scraper_registry().specs():
+        daily_support = "D" if spec.supports_daily else "-"
+        monthly_support = "M" if spec.supports_monthly else "-"
+        patterns = ", ".join(spec.asp_patterns)
+        print(f"  ✓ {spec.key} [{daily_support}{monthly_support}] ({patterns})")
 
 
 def list_asps_with_credentials(media_name: str = None):
@@ -189,6 +160,12 @@ Examples:
     # オプション
     parser.add_argument('--no-headless', action='store_true', help='ブラウザを表示')
     parser.add_argument('--retries', type=int, default=3, help='リトライ回数')
+    parser.add_argument('--instrument', action='store_true',
+                        help='Playwright 呼び出しの回数・時間を呼び出し元ごとに集計')
+    parser.add_argument('--profile', nargs='?', const='', metavar='DIR',
+                        help='cProfile とフレームグラフ用スタックを保存（デフォルト var/profiles）')
+    parser.add_argument('--metrics-file', metavar='PATH',
+                        help='終了時に Prometheus 形式のメトリクスを書き出すファイル（textfile collector 用）')
 
     # 情報表示
     parser.add_argument('--list', action='store_true', help='利用可能なスクレイパーを表示')
@@ -196,6 +173,16 @@ Examples:
 
     args = parser.parse_args()
 
+    if args.instrument:
+        from core import instrumentation
+        instrumentation.enable()
+    if args.profile is not None:
+        from core import profiling
+        print(f"プロファイル出力先: {profiling.enable(args.profile or None)}")
+    if args.metrics_file:
+        from core import metrics
+        metrics.write_textfile_at_exit(args.metrics_file)
+
     # 情報表示
     if args.list:
         list_available_scrapers()
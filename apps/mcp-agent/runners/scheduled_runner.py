@@ -5,12 +5,17 @@ import sys
 import argparse
 import os
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import Settings
 from core import SupabaseClient, BrowserController, GeminiClient, AgentLoop, Notifier
+from core import instrumentation, metrics, sharding
+from core.circuit_breaker import CircuitBreaker
+from core.run_lock import RunLock
+from core.write_buffer import WriteBehindBuffer
 
 
 # Configure logging
@@ -23,11 +28,25 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def run_daily_fetch():
+def run_daily_fetch(
+    write_behind: bool = False,
+    use_breaker: bool = True,
+    shard: Optional[Tuple[int, int]] = None,
+    use_lock: bool = True,
+    deadline_minutes: Optional[float] = None,
+):
     """Run daily data fetch for all ASPs.
 
     This should be run every day at 9:00 AM JST.
     Fetches previous business day's data.
+
+    Args:
+        write_behind: Queue extracted rows in a run-level write-behind buffer
+        use_breaker: Skip (or probe once) ASPs that failed repeatedly
+        shard: Optional 0-based (index, count); run only this shard's ASPs
+        use_lock: Skip ASPs another run is scraping (run leases)
+        deadline_minutes: Optional time budget; low-priority ASPs that would
+            overrun it are dropped
     """
     logger.info("=" * 60)
     logger.info("Daily ASP Data Fetch - Starting")
@@ -53,17 +72,33 @@ def run_daily_fetch():
 
         notifier = Notifier()
 
+        write_buffer = None
+        if write_behind:
+            write_buffer = WriteBehindBuffer(supabase_client).start()
+            write_buffer.install_signal_handlers()
+
         # Create agent loop
         agent = AgentLoop(
             supabase_client=supabase_client,
             browser=browser,
             gemini_client=gemini_client,
             notifier=notifier,
+            write_buffer=write_buffer,
+            breaker=CircuitBreaker(supabase_client) if use_breaker else None,
+            run_lock=RunLock(supabase_client, enabled=use_lock),
         )
 
         # Run scrapers for all ASPs
         logger.info("Fetching daily data for all ASPs...")
-        results = agent.run_all_asps(execution_type="daily")
+        try:
+            results = agent.run_all_asps(
+                execution_type="daily",
+                shard=shard,
+                deadline_seconds=deadline_minutes * 60 if deadline_minutes else None,
+            )
+        finally:
+            if write_buffer is not None and not write_buffer.close():
+                logger.error("Some rows are still in the write-behind journal")
 
         # Print summary
         successful = sum(1 for success in results.values() if success)
@@ -82,11 +117,25 @@ def run_daily_fetch():
         sys.exit(1)
 
 
-def run_monthly_fetch():
+def run_monthly_fetch(
+    write_behind: bool = False,
+    use_breaker: bool = True,
+    shard: Optional[Tuple[int, int]] = None,
+    use_lock: bool = True,
+    deadline_minutes: Optional[float] = None,
+):
     """Run monthly data fetch for all ASPs.
 
     This should be run on the 1st day of each month at 10:00 AM JST.
     Fetches previous month's aggregated data.
+
+    Args:
+        write_behind: Queue extracted rows in a run-level write-behind buffer
+        use_breaker: Skip (or probe once) ASPs that failed repeatedly
+        shard: Optional 0-based (index, count); run only this shard's ASPs
+        use_lock: Skip ASPs another run is scraping (run leases)
+        deadline_minutes: Optional time budget; low-priority ASPs that would
+            overrun it are dropped
     """
     logger.info("=" * 60)
     logger.info("Monthly ASP Data Fetch - Starting")
@@ -112,17 +161,33 @@ def run_monthly_fetch():
 
         notifier = Notifier()
 
+        write_buffer = None
+        if write_behind:
+            write_buffer = WriteBehindBuffer(supabase_client).start()
+            write_buffer.install_signal_handlers()
+
         # Create agent loop
         agent = AgentLoop(
             supabase_client=supabase_client,
             browser=browser,
             gemini_client=gemini_client,
             notifier=notifier,
+            write_buffer=write_buffer,
+            breaker=CircuitBreaker(supabase_client) if use_breaker else None,
+            run_lock=RunLock(supabase_client, enabled=use_lock),
         )
 
         # Run scrapers for all ASPs
         logger.info("Fetching monthly data for all ASPs...")
-        results = agent.run_all_asps(execution_type="monthly")
+        try:
+            results = agent.run_all_asps(
+                execution_type="monthly",
+                shard=shard,
+                deadline_seconds=deadline_minutes * 60 if deadline_minutes else None,
+            )
+        finally:
+            if write_buffer is not None and not write_buffer.close():
+                logger.error("Some rows are still in the write-behind journal")
 
         # Print summary
         successful = sum(1 for success in results.values() if success)
@@ -149,13 +214,72 @@ def main():
         choices=["daily", "monthly"],
         help="Execution mode: daily or monthly"
     )
+    parser.add_argument(
+        "--write-behind",
+        action="store_true",
+        help="Buffer saves and write them in bulk per table (journaled, no deletions)",
+    )
+    parser.add_argument(
+        "--no-breaker",
+        action="store_true",
+        help="Run every ASP even if it failed on the last runs (disable the circuit breaker)",
+    )
+    parser.add_argument(
+        "--no-lock",
+        action="store_true",
+        help="Do not take run leases (scrape ASPs even if another run is scraping them)",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="MINUTES",
+        help="Time budget of the run; ASPs run by priority and those that would overrun are dropped",
+    )
+    parser.add_argument(
+        "--shard",
+        help="Run only shard i of N (e.g. 2/3); ASPs are split by consistent hashing",
+    )
+    parser.add_argument(
+        "--instrument",
+        action="store_true",
+        help="Count and time Playwright calls per call site (logged and stored in execution_logs metadata)",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="PATH",
+        help="Write Prometheus metrics to this file on exit (node_exporter textfile collector)",
+    )
 
     args = parser.parse_args()
 
+    if args.instrument:
+        instrumentation.enable()
+    if args.metrics_file:
+        metrics.write_textfile_at_exit(args.metrics_file)
+
+    shard = None
+    if args.shard:
+        try:
+            shard = sharding.parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+
     if args.mode == "daily":
-        run_daily_fetch()
+        run_daily_fetch(
+            write_behind=args.write_behind,
+            use_breaker=not args.no_breaker,
+            shard=shard,
+            use_lock=not args.no_lock,
+            deadline_minutes=args.deadline,
+        )
     elif args.mode == "monthly":
-        run_monthly_fetch()
+        run_monthly_fetch(
+            write_behind=args.write_behind,
+            use_breaker=not args.no_breaker,
+            shard=shard,
+            use_lock=not args.no_lock,
+            deadline_minutes=args.deadline,
+        )
     else:
         logger.error(f"Unknown mode: {args.mode}")
         sys.exit(1)
@@ -55,6 +55,7 @@ class A8netScraper(BaseScraper):
         print(f"Found {len(rows)} table rows")
 
         for row in rows:
+            self.check_budget(records)
             cells = row.locator("td").all()
             if len(cells) < 2:
                 continue
@@ -119,6 +120,7 @@ class A8netScraper(BaseScraper):
         rows = page.locator("table tbody tr, table tr").all()
 
         for row in rows:
+            self.check_budget(records)
             cells = row.locator("td").all()
             if len(cells) < 3:
                 continue
@@ -12,6 +12,7 @@ from playwright.sync_api import Page
 import sys
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
 
+from core import parsing
 from core.base_scraper import BaseScraper, get_scraper_params
 
 
@@ -59,6 +60,7 @@ class AccesstradeScraper(BaseScraper):
         rows = table.locator('tr').all()
 
         for row in rows[1:]:  # ヘッダー行をスキップ
+            self.check_budget(records)
             try:
                 cells = row.locator('td').all()
                 if len(cells) < 6:  # 最低6カラム必要
@@ -103,6 +105,7 @@ class AccesstradeScraper(BaseScraper):
         rows = table.locator('tr').all()
 
         for row in rows[1:]:  # ヘッダー行をスキップ
+            self.check_budget(records)
             try:
                 cells = row.locator('td').all()
                 if len(cells) < 6:  # 最低6カラム必要
@@ -134,16 +137,7 @@ class AccesstradeScraper(BaseScraper):
 
     def _parse_amount(self, text: str) -> int:
         """金額文字列をパース（例: ￥1,234 → 1234）"""
-        if not text:
-            return 0
-        # ￥、円、カンマを除去
-        cleaned = re.sub(r'[￥¥円,\s]', '', text)
-        if not cleaned or cleaned == '-':
-            return 0
-        try:
-            return int(cleaned)
-        except ValueError:
-            return 0
+        return parsing.parse_amount(text)
 
 
 def run_daily(asp_id: str = None, media_id: str = None, headless: bool = True):
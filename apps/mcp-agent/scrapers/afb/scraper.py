@@ -58,6 +58,7 @@ class AfbScraper(BaseScraper):
         print(f"Found {len(rows)} table rows")
 
         for row in rows:
+            self.check_budget(records)
             cells = row.locator("td").all()
             if len(cells) < 2:
                 continue
@@ -8,11 +8,12 @@ import re
 import csv
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
-from playwright.sync_api import Page
+from typing import List, Dict, Any, Optional
+from playwright.sync_api import Download, Page
 
 import sys
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from core import downloads, parsing
 from core.base_scraper import BaseScraper
 
 
@@ -43,35 +44,22 @@ class AffitownScraper(BaseScraper):
 
     def _parse_amount(self, text: str) -> int:
         """金額文字列を整数に変換"""
-        cleaned = re.sub(r'[^\d]', '', str(text))
-        return int(cleaned) if cleaned else 0
+        return parsing.parse_amount(text)
 
     def _parse_date(self, text: str, year: str = None) -> str:
-        """日付文字列をYYYY-MM-DD形式に変換"""
-        # "2025年11月06日" or "2025/11/06" -> "2025-11-06"
-        match = re.match(r'(\d{4})[年/](\d{1,2})[月/](\d{1,2})', text)
-        if match:
-            y, m, d = match.groups()
-            return f"{y}-{int(m):02d}-{int(d):02d}"
-
-        # "11月06日" -> "2025-11-06" (年がない場合)
-        match = re.match(r'(\d{1,2})月(\d{1,2})日', text)
-        if match and year:
-            m, d = match.groups()
-            return f"{year}-{int(m):02d}-{int(d):02d}"
-
-        return None
-
-    def _parse_csv_file(self, filepath: Path) -> List[Dict[str, Any]]:
-        """CSVファイルをパースしてレコードリストを返す"""
+        """日付文字列をYYYY-MM-DD形式に変換（年がない場合は year を使用）"""
+        return parsing.parse_date(text, default_year=int(year) if year else None)
+
+    def _parse_csv_file(self, source, year: str = None) -> List[Dict[str, Any]]:
+        """CSV（ダウンロードまたはファイル）をパースしてレコードリストを返す"""
         records = []
 
-        # ファイル名から年を取得 (daily_2025-11.csv -> 2025)
-        filename = filepath.stem
-        year_match = re.search(r'(\d{4})', filename)
-        year = year_match.group(1) if year_match else None
+        # 年の指定がなければファイル名から取得 (daily_2025-11.csv -> 2025)
+        if year is None and isinstance(source, Path):
+            year_match = re.search(r'(\d{4})', source.stem)
+            year = year_match.group(1) if year_match else None
 
-        with open(filepath, 'r', encoding='utf-8-sig') as f:
+        with downloads.open_csv(source, encodings=('utf-8-sig',), archive_label="affitown_daily") as f:
             reader = csv.reader(f)
             headers = next(reader, None)
 
@@ -97,20 +85,17 @@ class AffitownScraper(BaseScraper):
             print(f"    Headers: {headers}")
             print(f"    Date column: {date_idx}, Amount column: {amount_idx}, Year: {year}")
 
-            for row in reader:
-                if len(row) <= max(date_idx, amount_idx):
-                    continue
-
-                date_text = row[date_idx]
-                amount_text = row[amount_idx]
-
-                # 合計行をスキップ
-                if '合計' in date_text:
-                    continue
-
-                date = self._parse_date(date_text, year)
-                amount = self._parse_amount(amount_text)
-
+            # 合計行・列不足の行を除いてから、日付・金額を列ごとにまとめて変換
+            rows = [
+                row for row in reader
+                if len(row) > max(date_idx, amount_idx) and '合計' not in row[date_idx]
+            ]
+            dates = parsing.parse_dates(
+                [row[date_idx] for row in rows], default_year=int(year) if year else None
+            )
+            amounts = parsing.parse_amounts([row[amount_idx] for row in rows])
+
+            for date, amount in zip(dates, amounts):
                 if date and amount > 0:
                     records.append({
                         'date': date,
@@ -119,8 +104,8 @@ class AffitownScraper(BaseScraper):
 
         return records
 
-    def _download_daily_csv(self, page: Page, year_month: str, download_dir: Path) -> Path:
-        """指定月の日次CSVをダウンロード"""
+    def _download_daily_csv(self, page: Page, year_month: str) -> Optional[Download]:
+        """指定月の日次CSVをダウンロード（ファイルはコピーせずダウンロードから直接読む）"""
         # 時系列レポートページに移動
         page.goto(self.MONTHLY_REPORT_URL)
         page.wait_for_timeout(3000)
@@ -155,15 +140,12 @@ class AffitownScraper(BaseScraper):
             csv_button.click()
 
         download = download_info.value
-        csv_path = download_dir / f"daily_{year_month}.csv"
-        download.save_as(csv_path)
-        print(f"  Downloaded: {csv_path}")
+        print(f"  Downloaded: {download.suggested_filename}")
 
-        return csv_path
+        return download
 
     def scrape_daily(self, page: Page) -> List[Dict[str, Any]]:
         """日次データのスクレイピング"""
-        download_dir = self.create_download_dir("affitown_daily")
         all_records = []
 
         # 2025年のデータを取得（1月〜現在月）
@@ -171,9 +153,11 @@ class AffitownScraper(BaseScraper):
         months = [f'2025-{m:02d}' for m in range(1, current_month + 1)]
 
         for month in months:
-            csv_path = self._download_daily_csv(page, month, download_dir)
-            if csv_path and csv_path.exists():
-                records = self._parse_csv_file(csv_path)
+            # 時間切れの場合は取得済みの月だけ保存する
+            self.check_budget(all_records)
+            download = self._download_daily_csv(page, month)
+            if download:
+                records = self._parse_csv_file(download, year=month[:4])
                 all_records.extend(records)
                 print(f"    Found {len(records)} records for {month}")
 
@@ -192,6 +176,7 @@ class AffitownScraper(BaseScraper):
         print(f"Found {len(rows)} rows in table")
 
         for row in rows:
+            self.check_budget(records)
             cells = row.locator("td").all()
             if len(cells) < 2:
                 continue
@@ -51,6 +51,7 @@ class CircuitxScraper(BaseScraper):
         print(f"Found {len(rows)} table rows")
 
         for row in rows:
+            self.check_budget(records)
             cells = row.locator("td").all()
             if len(cells) < 2:
                 continue
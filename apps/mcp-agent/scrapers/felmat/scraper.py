@@ -10,10 +10,11 @@ import time
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any
-from playwright.sync_api import Page
+from playwright.sync_api import Download, Page
 
 import sys
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from core import downloads
 from core.base_scraper import BaseScraper
 
 
@@ -53,6 +54,7 @@ class FelmatScraper(BaseScraper):
         print(f"Found {len(rows)} table rows")
 
         for row in rows:
+            self.check_budget(records)
             cells = row.locator("td").all()
             if len(cells) < 2:
                 continue
@@ -110,53 +112,38 @@ class FelmatScraper(BaseScraper):
         """月次データのスクレイピング（CSV経由）"""
         self._navigate_to_report(page, "月別")
 
-        # ダウンロードディレクトリを作成
-        download_dir = self.create_download_dir("felmat_monthly")
-
         # CSVダウンロードボタンをクリック
         print("Downloading CSV...")
         with page.expect_download() as download_info:
             page.click("text=上記条件でCSVダウンロード")
 
         download = download_info.value
-        csv_path = download_dir / "monthly_report.csv"
-        download.save_as(csv_path)
-        print(f"CSV saved to {csv_path}")
+        print(f"CSV downloaded: {download.suggested_filename}")
 
-        # CSVを解析
-        records = self._parse_monthly_csv(csv_path)
+        # CSVを解析（ファイルはコピーせずダウンロードから直接読む）
+        records = self._parse_monthly_csv(download)
 
         return records
 
-    def _parse_monthly_csv(self, csv_path: Path) -> List[Dict[str, Any]]:
+    def _parse_monthly_csv(self, download: Download) -> List[Dict[str, Any]]:
         """月次CSVを解析"""
-        records = []
-
-        # Shift-JISで読み込み（日本語CSVの場合）
-        encodings = ['utf-8', 'shift_jis', 'cp932']
-        content = None
-
-        for encoding in encodings:
-            try:
-                with open(csv_path, 'r', encoding=encoding) as f:
-                    content = f.read()
-                break
-            except UnicodeDecodeError:
-                continue
-
-        if not content:
+        # UTF-8 / Shift-JIS（cp932）を自動判定して読み込み
+        try:
+            with downloads.open_csv(download, archive_label="felmat_monthly") as f:
+                return self._parse_monthly_rows(csv.reader(f))
+        except UnicodeDecodeError:
             print("Failed to decode CSV file")
-            return records
+            return []
 
-        # CSVを解析
-        lines = content.strip().split('\n')
-        if len(lines) < 2:
-            print("CSV file is empty or has no data")
-            return records
+    def _parse_monthly_rows(self, reader) -> List[Dict[str, Any]]:
+        """月次CSVの行を解析"""
+        records = []
 
         # ヘッダー行を取得
-        reader = csv.reader(lines)
-        headers = next(reader)
+        headers = next(reader, None)
+        if not headers:
+            print("CSV file is empty or has no data")
+            return records
         print(f"CSV Headers: {headers}")
 
         # カラムインデックスを特定
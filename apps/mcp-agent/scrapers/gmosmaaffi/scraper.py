@@ -8,10 +8,11 @@ import csv
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any
-from playwright.sync_api import Page
+from playwright.sync_api import Download, Page
 
 import sys
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from core import downloads
 from core.base_scraper import BaseScraper
 
 
@@ -66,24 +67,22 @@ class GmoSmaaffiScraper(BaseScraper):
             except Exception as e2:
                 print(f"Media selection fallback also failed: {e2}")
 
-    def _download_csv(self, page: Page, download_dir: Path) -> Path:
-        """CSVダウンロード"""
+    def _download_csv(self, page: Page) -> Download:
+        """CSVダウンロード（ファイルはコピーせずダウンロードから直接読む）"""
         print("Downloading CSV...")
         with page.expect_download() as download_info:
             page.click("button:has-text('CSVダウンロード'), a:has-text('CSVダウンロード')")
 
         download = download_info.value
-        csv_path = download_dir / download.suggested_filename
-        download.save_as(csv_path)
-        print(f"CSV downloaded to: {csv_path}")
-        return csv_path
+        print(f"CSV downloaded: {download.suggested_filename}")
+        return download
 
-    def _parse_daily_csv(self, csv_path: Path) -> List[Dict[str, Any]]:
+    def _parse_daily_csv(self, download: Download) -> List[Dict[str, Any]]:
         """日次CSVを解析"""
         records = []
 
         # エンコーディングを cp932 (Shift-JIS拡張) に設定
-        with open(csv_path, 'r', encoding='cp932') as f:
+        with downloads.open_csv(download, encodings=('cp932',), archive_label="gmosmaaffi_daily") as f:
             reader = csv.DictReader(f)
 
             for row in reader:
@@ -109,11 +108,11 @@ class GmoSmaaffiScraper(BaseScraper):
 
         return records
 
-    def _parse_monthly_csv(self, csv_path: Path) -> List[Dict[str, Any]]:
+    def _parse_monthly_csv(self, download: Download) -> List[Dict[str, Any]]:
         """月次CSVを解析"""
         records = []
 
-        with open(csv_path, 'r', encoding='cp932') as f:
+        with downloads.open_csv(download, encodings=('cp932',), archive_label="gmosmaaffi_monthly") as f:
             reader = csv.DictReader(f)
 
             for row in reader:
@@ -140,8 +139,6 @@ class GmoSmaaffiScraper(BaseScraper):
 
     def scrape_daily(self, page: Page) -> List[Dict[str, Any]]:
         """日次データのスクレイピング"""
-        download_dir = self.create_download_dir("gmosmaaffi_daily")
-
         print("Navigating to Daily Report...")
         page.goto(self.DAILY_REPORT_URL)
         page.wait_for_timeout(2000)
@@ -164,15 +161,13 @@ class GmoSmaaffiScraper(BaseScraper):
         page.wait_for_timeout(5000)
 
         # CSVダウンロード
-        csv_path = self._download_csv(page, download_dir)
-        records = self._parse_daily_csv(csv_path)
+        download = self._download_csv(page)
+        records = self._parse_daily_csv(download)
 
         return records
 
     def scrape_monthly(self, page: Page) -> List[Dict[str, Any]]:
         """月次データのスクレイピング"""
-        download_dir = self.create_download_dir("gmosmaaffi_monthly")
-
         print("Navigating to Monthly Report...")
         page.goto(self.MONTHLY_REPORT_URL)
         page.wait_for_timeout(2000)
@@ -195,8 +190,8 @@ class GmoSmaaffiScraper(BaseScraper):
         page.wait_for_timeout(5000)
 
         # CSVダウンロード
-        csv_path = self._download_csv(page, download_dir)
-        records = self._parse_monthly_csv(csv_path)
+        download = self._download_csv(page)
+        records = self._parse_monthly_csv(download)
 
         return records
 
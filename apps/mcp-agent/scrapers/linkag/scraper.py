@@ -24,13 +24,13 @@ class LinkagScraper(BaseScraper):
         """ログイン処理"""
         print(f"Navigating to {self.LOGIN_URL}...")
         page.goto(self.LOGIN_URL)
-        page.wait_for_timeout(3000)
+        self.settle(page, "login_page", 3000)
 
         print("Filling login form...")
         page.fill("input[name='login_id'], input[type='text']:first-of-type", self.username)
         page.fill("input[name='password'], input[type='password']", self.password)
         page.click("button[type='submit'], input[type='submit']")
-        page.wait_for_timeout(8000)
+        self.settle(page, "login_submit", 8000)
 
         # ログイン成功判定
         if page.locator("text=ログアウト").count() > 0 or page.locator("text=レポート").count() > 0:
@@ -51,6 +51,7 @@ class LinkagScraper(BaseScraper):
         print(f"Found {len(rows)} table rows")
 
         for row in rows:
+            self.check_budget(records)
             cells = row.locator("td").all()
             if len(cells) < 2:
                 continue
@@ -82,7 +83,7 @@ class LinkagScraper(BaseScraper):
         page.hover("a:has-text('レポート'), li:has-text('レポート')")
         page.wait_for_timeout(1500)
         page.click("a:has-text('日別')")
-        page.wait_for_timeout(5000)
+        self.settle(page, "daily_report", 5000)
 
         print("Extracting data from table...")
         records = self._extract_table_data(page)
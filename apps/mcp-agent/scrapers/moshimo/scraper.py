@@ -12,6 +12,7 @@ from playwright.sync_api import Page
 import sys
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
 
+from core import downloads
 from core.base_scraper import BaseScraper, get_scraper_params
 
 
@@ -55,18 +56,14 @@ class MoshimoScraper(BaseScraper):
 
         # CSVダウンロード
         print("Downloading CSV...")
-        download_dir = self.create_download_dir("moshimo_daily")
-
         with page.expect_download() as download_info:
             page.click('text=CSVダウンロード')
 
         download = download_info.value
-        csv_path = download_dir / download.suggested_filename
-        download.save_as(csv_path)
-        print(f"CSV downloaded to: {csv_path}")
+        print(f"CSV downloaded: {download.suggested_filename}")
 
-        # CSV解析（Shift_JISエンコーディング）
-        with open(csv_path, 'r', encoding='shift_jis') as f:
+        # CSV解析（Shift_JIS、ダウンロードから直接読み込み）
+        with downloads.open_csv(download, encodings=('cp932',), archive_label="moshimo_daily") as f:
             reader = csv.DictReader(f)
             print(f"CSV Headers: {reader.fieldnames}")
 
@@ -104,18 +101,14 @@ class MoshimoScraper(BaseScraper):
 
         # CSVダウンロード
         print("Downloading CSV...")
-        download_dir = self.create_download_dir("moshimo_monthly")
-
         with page.expect_download() as download_info:
             page.click('text=CSVダウンロード')
 
         download = download_info.value
-        csv_path = download_dir / download.suggested_filename
-        download.save_as(csv_path)
-        print(f"CSV downloaded to: {csv_path}")
+        print(f"CSV downloaded: {download.suggested_filename}")
 
-        # CSV解析（Shift_JISエンコーディング）
-        with open(csv_path, 'r', encoding='shift_jis') as f:
+        # CSV解析（Shift_JIS、ダウンロードから直接読み込み）
+        with downloads.open_csv(download, encodings=('cp932',), archive_label="moshimo_monthly") as f:
             reader = csv.DictReader(f)
             print(f"CSV Headers: {reader.fieldnames}")
 
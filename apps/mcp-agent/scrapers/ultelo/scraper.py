@@ -67,6 +67,7 @@ class UlteloScraper(BaseScraper):
         rows = table.locator('tr').all()
 
         for row in rows[1:]:  # ヘッダー行をスキップ
+            self.check_budget(records)
             try:
                 cells = row.locator('td').all()
                 if len(cells) < 8:
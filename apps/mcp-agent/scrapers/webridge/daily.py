@@ -14,6 +14,7 @@ from supabase import create_client
 # プロジェクトルートへのパスを追加
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
 from config import Settings
+from core import downloads
 
 def get_usd_jpy_rate():
     """現在のドル円レートを取得する"""
@@ -70,9 +71,6 @@ def _run_scraper_attempt(settings, username, password, headless):
     asp_id = asp_response.data[0]['id']
     login_url = asp_response.data[0]['login_url']
 
-    download_dir = Path(f"/tmp/webridge_downloads_daily_{int(time.time())}")
-    download_dir.mkdir(parents=True, exist_ok=True)
-
     records = []
 
     with sync_playwright() as p:
@@ -177,15 +175,13 @@ def _run_scraper_attempt(settings, username, password, headless):
                 page.click("button:has-text('CSVダウンロード'), a:has-text('CSVダウンロード')")
             
             download = download_info.value
-            csv_path = download_dir / download.suggested_filename
-            download.save_as(csv_path)
-            print(f"CSV downloaded to: {csv_path}")
+            print(f"CSV downloaded: {download.suggested_filename}")
             
             # 為替レート
             usd_rate = get_usd_jpy_rate()
             
             # CSV解析
-            with open(csv_path, 'r', encoding='utf-8-sig') as f:
+            with downloads.open_csv(download, encodings=('utf-8-sig',)) as f:
                 reader = csv.DictReader(f)
                 headers = reader.fieldnames
                 print(f"CSV Headers: {headers}")
@@ -14,6 +14,7 @@ from supabase import create_client
 # プロジェクトルートへのパスを追加
 sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
 from config import Settings
+from core import downloads
 
 def get_usd_jpy_rate():
     """現在のドル円レートを取得する"""
@@ -57,10 +58,6 @@ def run_scraper(headless=True):
     asp_id = asp_response.data[0]['id']
     login_url = asp_response.data[0]['login_url']
 
-    # ダウンロードディレクトリ
-    download_dir = Path(f"/tmp/webridge_downloads_{int(time.time())}")
-    download_dir.mkdir(parents=True, exist_ok=True)
-
     records = []
 
     with sync_playwright() as p:
@@ -192,9 +189,7 @@ def run_scraper(headless=True):
                 page.click("button:has-text('CSVダウンロード'), a:has-text('CSVダウンロード')")
             
             download = download_info.value
-            csv_path = download_dir / download.suggested_filename
-            download.save_as(csv_path)
-            print(f"CSV downloaded to: {csv_path}")
+            print(f"CSV downloaded: {download.suggested_filename}")
             
             # 為替レート取得
             usd_rate = get_usd_jpy_rate()
@@ -203,7 +198,7 @@ def run_scraper(headless=True):
             # 画像2枚目の表ヘッダー: 年月, デバイス, 表示数, クリック(数, CTR), 発生(数, 報酬), 承認(数, 報酬), 未承認...
             # CSVのカラム名を推測して読み込む
             
-            with open(csv_path, 'r', encoding='utf-8-sig') as f: # shift_jisの可能性もあり
+            with downloads.open_csv(download) as f:  # UTF-8 / Shift_JIS を自動判定
                 reader = csv.DictReader(f)
                 headers = reader.fieldnames
                 print(f"CSV Headers: {headers}")
@@ -9,10 +9,11 @@ import csv
 import requests
 from pathlib import Path
 from typing import List, Dict, Any
-from playwright.sync_api import Page
+from playwright.sync_api import Download, Page
 
 import sys
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from core import downloads
 from core.base_scraper import BaseScraper
 
 
@@ -23,6 +24,12 @@ class WebridgeScraper(BaseScraper):
     DAILY_REPORT_URL = 'https://mobile.webridge.co.jp/report/daily'
     MONTHLY_REPORT_URL = 'https://mobile.webridge.co.jp/report/monthly'
 
+    # reCAPTCHA v3のスコア判定で弾かれるとパスワード誤りと同じ画面に戻るため、
+    # 認証エラーでも即失敗にせずバックオフして再試行する
+    RETRY_POLICY = {"actions": {"auth_rejected": "backoff"}}
+    # 同時ログインは reCAPTCHA のスコアを下げるため、メディアは1つずつ実行
+    MAX_MEDIA_CONCURRENCY = 1
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._usd_jpy_rate = None
@@ -154,24 +161,23 @@ class WebridgeScraper(BaseScraper):
         page.wait_for_load_state("networkidle")
         self.human_delay(3000, 4000)
 
-    def _download_csv(self, page: Page, download_dir: Path) -> Path:
-        """CSVダウンロード"""
+    def _download_csv(self, page: Page) -> Download:
+        """CSVダウンロード（ファイルはコピーせずダウンロードから直接読む）"""
         print("Downloading CSV...")
         with page.expect_download() as download_info:
             page.click("button:has-text('CSVダウンロード'), a:has-text('CSVダウンロード')")
 
         download = download_info.value
-        csv_path = download_dir / download.suggested_filename
-        download.save_as(csv_path)
-        print(f"CSV downloaded to: {csv_path}")
-        return csv_path
+        print(f"CSV downloaded: {download.suggested_filename}")
+        return download
 
-    def _parse_csv(self, csv_path: Path, is_monthly: bool = False) -> List[Dict[str, Any]]:
+    def _parse_csv(self, download: Download, is_monthly: bool = False) -> List[Dict[str, Any]]:
         """CSVを解析してレコードリストを返す"""
         records = []
         usd_rate = self.usd_jpy_rate
+        label = "webridge_monthly" if is_monthly else "webridge_daily"
 
-        with open(csv_path, 'r', encoding='utf-8-sig') as f:
+        with downloads.open_csv(download, encodings=('utf-8-sig',), archive_label=label) as f:
             reader = csv.DictReader(f)
             headers = reader.fieldnames
             print(f"CSV Headers: {headers}")
@@ -219,23 +225,19 @@ class WebridgeScraper(BaseScraper):
 
     def scrape_daily(self, page: Page) -> List[Dict[str, Any]]:
         """日次データのスクレイピング"""
-        download_dir = self.create_download_dir("webridge_daily")
-
         self._navigate_to_daily_report(page)
         self._set_search_period_this_month(page)
-        csv_path = self._download_csv(page, download_dir)
-        records = self._parse_csv(csv_path, is_monthly=False)
+        download = self._download_csv(page)
+        records = self._parse_csv(download, is_monthly=False)
 
         return records
 
     def scrape_monthly(self, page: Page) -> List[Dict[str, Any]]:
         """月次データのスクレイピング"""
-        download_dir = self.create_download_dir("webridge_monthly")
-
         self._navigate_to_monthly_report(page)
         self._set_search_period_this_year(page)
-        csv_path = self._download_csv(page, download_dir)
-        records = self._parse_csv(csv_path, is_monthly=True)
+        download = self._download_csv(page)
+        records = self._parse_csv(download, is_monthly=True)
 
         return records
 
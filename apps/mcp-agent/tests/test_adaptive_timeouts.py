@@ -0,0 +1,55 @@
+"""Learned timeouts: quantile of finished steps plus a decaying timeout bump."""
+
+import pytest
+
+from core.adaptive_timeouts import LatencyModel, TimeoutConfig
+
+
+@pytest.fixture
+def model(tmp_path):
+    return LatencyModel(tmp_path / "latency.sqlite3")
+
+
+def test_timeouts_do_not_ratchet_the_limit(model):
+    config = TimeoutConfig(min_samples=5)
+    for _ in range(5):
+        model.record("asp", "report", 1000)
+    assert model.timeout_ms("asp", "report", 8000, config) == 1500
+
+    # Steps that keep hitting the limit raise it by at most max_bump
+    for _ in range(20):
+        limit = model.timeout_ms("asp", "report", 8000, config)
+        model.record("asp", "report", limit, ok=False)
+    assert model.samples("asp", "report") == [1000] * 5
+    assert model.timeout_ms("asp", "report", 8000, config) == 1500 * 3
+
+
+def test_timeout_bump_decays_with_successes(model):
+    config = TimeoutConfig(min_samples=5, bump_window=4)
+    for _ in range(5):
+        model.record("asp", "report", 2000)
+    model.record("asp", "report", 3000, ok=False)
+    assert model.timeout_ms("asp", "report", 8000, config) == int(3000 * 1.5)
+
+    for _ in range(4):
+        model.record("asp", "report", 2000)
+    assert model.recent_timeouts("asp", "report", config) == 0
+    assert model.timeout_ms("asp", "report", 8000, config) == 3000
+
+
+def test_cold_start_default_is_bumped_by_timeouts(model):
+    config = TimeoutConfig()
+    assert model.timeout_ms("asp", "wait", 8000, config) == 8000
+    model.record("asp", "wait", 8000, ok=False)
+    assert model.timeout_ms("asp", "wait", 8000, config) == 12000
+    for _ in range(5):
+        model.record("asp", "wait", 12000, ok=False)
+    assert model.timeout_ms("asp", "wait", 8000, config) == 24000
+
+
+def test_history_survives_a_new_model(model):
+    model.record("asp", "report", 1200)
+    model.record("asp", "report", 9000, ok=False)
+    reloaded = LatencyModel(model.path)
+    assert reloaded.history("asp", "report") == [(1200, True), (9000, False)]
+    assert reloaded.samples("asp", "report") == [1200]
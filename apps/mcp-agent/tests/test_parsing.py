@@ -0,0 +1,74 @@
+"""Property tests for core.parsing (random round trips over ASP cell layouts)."""
+
+import calendar
+import random
+
+import pytest
+
+from core import parsing
+from tools.parsing_benchmark import random_date, render_amount, render_date
+
+CELLS = 2000
+SEEDS = range(5)
+
+
+@pytest.fixture(params=SEEDS)
+def rng(request):
+    return random.Random(request.param)
+
+
+def test_dates_round_trip(rng):
+    dates = [random_date(rng) for _ in range(CELLS)]
+    cells = [render_date(rng, d) for d in dates]
+    for d, cell in zip(dates, cells):
+        assert parsing.parse_date(cell) == d.isoformat(), cell
+        assert parsing.parse_month(cell) == d.isoformat()[:7], cell
+
+
+def test_amounts_round_trip(rng):
+    amounts = [rng.choice([0, rng.randrange(0, 1000), rng.randrange(0, 10**9)]) for _ in range(CELLS)]
+    cells = [render_amount(rng, v) for v in amounts]
+    for value, cell in zip(amounts, cells):
+        assert parsing.parse_amount(cell) == value, cell
+        assert parsing.parse_amount("△" + cell) == -value, cell
+
+
+def test_columns_match_single_values(rng):
+    dates = [random_date(rng) for _ in range(CELLS)]
+    date_cells = [render_date(rng, d) for d in dates]
+    amount_cells = [render_amount(rng, rng.randrange(0, 10**7)) for _ in range(CELLS)]
+
+    assert parsing.parse_dates(date_cells) == [parsing.parse_date(c) for c in date_cells]
+    assert parsing.parse_months(date_cells) == [parsing.parse_month(c) for c in date_cells]
+    assert parsing.parse_amounts(amount_cells) == [parsing.parse_amount(c) for c in amount_cells]
+
+
+def test_default_year(rng):
+    for d in (random_date(rng) for _ in range(CELLS // 10)):
+        cell = f"{d.month}/{d.day}"
+        assert parsing.parse_date(cell, default_year=d.year) == d.isoformat()
+        assert parsing.parse_date(cell) is None
+
+
+def test_impossible_dates_rejected(rng):
+    for _ in range(CELLS // 10):
+        year = rng.randrange(2000, 2100)
+        month = rng.randrange(1, 13)
+        day = calendar.monthrange(year, month)[1] + 1
+        assert parsing.parse_date(f"{year}/{month:02d}/{day:02d}") is None
+        assert parsing.parse_date(f"{year}/{rng.randrange(13, 100)}/01") is None
+
+
+def test_periods_have_no_day(rng):
+    for d in (random_date(rng) for _ in range(CELLS // 10)):
+        for cell in (f"{d.year}年{d.month}月", f"{d.year}/{d.month:02d}", f"{d.year}{d.month:02d}"):
+            assert parsing.parse_month(cell) == d.isoformat()[:7], cell
+            assert parsing.parse_date(cell) is None, cell
+
+
+@pytest.mark.parametrize("cell", ["", "-", "ー", "合計", None])
+def test_non_values_use_default(cell):
+    assert parsing.parse_amount(cell) == 0
+    assert parsing.parse_amount(cell, default=None) is None
+    assert parsing.parse_date(cell) is None
+    assert parsing.parse_amounts([cell], default=None) == [None]
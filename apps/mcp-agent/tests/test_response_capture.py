@@ -0,0 +1,36 @@
+"""Tests for mapping captured JSON report rows to actuals records."""
+
+from core import response_capture
+
+PAYLOAD = {
+    "data": {
+        "rows": [
+            {"day": "2025/11/01(土)", "reward": "¥1,200"},
+            {"day": "2025/11/01(土)", "reward": "300"},
+            {"day": "2025/11/02(日)", "reward": 450},
+            {"day": "合計", "reward": "1,950"},
+        ],
+        "months": [
+            {"month": "2025年10月", "reward": "10,000"},
+            {"month": "2025-11", "reward": 2500},
+        ],
+    }
+}
+
+
+def test_daily_rows_are_summed_per_date():
+    records = response_capture.extract_records(PAYLOAD, "data.rows[*]", "day", "reward")
+    assert records == [
+        {"date": "2025-11-01", "amount": 1500},
+        {"date": "2025-11-02", "amount": 450},
+    ]
+
+
+def test_monthly_rows_become_periods():
+    records = response_capture.extract_records(
+        PAYLOAD, "data.months[*]", "month", "reward", monthly=True
+    )
+    assert records == [
+        {"period": "2025-10", "amount": 10000},
+        {"period": "2025-11", "amount": 2500},
+    ]
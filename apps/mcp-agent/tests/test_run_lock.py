@@ -0,0 +1,50 @@
+"""Run lock: a lease taken over mid-run cancels the holder's deadline."""
+
+import threading
+
+import pytest
+
+from core.budget import BudgetExceeded, Deadline
+from core.run_lock import RunLock
+
+
+class LeaseDb:
+    """Scrape lease RPCs; renewals fail once ``taken_over`` is set."""
+
+    def __init__(self):
+        self.taken_over = threading.Event()
+        self.renewed = threading.Event()
+
+    def acquire_scrape_lease(self, asp_id, media_id, job_type, holder, ttl_seconds, metadata):
+        return {"acquired": True, "holder": holder}
+
+    def renew_scrape_lease(self, asp_id, media_id, job_type, holder, ttl_seconds):
+        self.renewed.set()
+        return not self.taken_over.is_set()
+
+    def release_scrape_lease(self, asp_id, media_id, job_type, holder):
+        return True
+
+
+def test_lost_lease_cancels_the_deadline():
+    db = LeaseDb()
+    lock = RunLock(db, ttl_seconds=1)
+    deadline = Deadline(name="run")
+
+    db.taken_over.set()
+    with lock.hold("asp", "media", "daily", deadline=deadline) as lease:
+        assert lease.acquired
+        assert lease.lost.wait(timeout=5)
+        with pytest.raises(BudgetExceeded):
+            deadline.child(None, "asp").check()
+
+
+def test_renewed_lease_keeps_the_deadline():
+    db = LeaseDb()
+    lock = RunLock(db, ttl_seconds=1)
+    deadline = Deadline(name="run")
+
+    with lock.hold("asp", "media", "daily", deadline=deadline) as lease:
+        assert db.renewed.wait(timeout=5)
+        assert not lease.lost.is_set()
+        deadline.check()
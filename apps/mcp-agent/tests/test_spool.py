@@ -0,0 +1,80 @@
+"""Record spool: per-key delivery locks and batches owned by their run."""
+
+import threading
+import time
+
+import pytest
+
+from core.spool import RecordSpool
+
+COUNTS = {"added": 1, "changed": 0, "unchanged": 0, "deleted": 0}
+
+
+class SlowDb:
+    """replace_actuals_window that takes a while, like a round trip to Supabase."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.windows = []
+
+    def replace_actuals_window(self, table_name, asp_id, media_id, records, start_date, end_date):
+        time.sleep(self.delay)
+        self.windows.append((table_name, asp_id, media_id))
+        return dict(COUNTS)
+
+    def replace_actuals_windows(self, windows):
+        return [self.replace_actuals_window(**window) for window in windows]
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return RecordSpool(tmp_path / "spool.sqlite3")
+
+
+def enqueue(spool, asp_id, table_name="daily_actuals"):
+    return spool.enqueue(
+        table_name, asp_id=asp_id, media_id="media", records=[{"date": "2025-01-01", "amount": 1}],
+        start_date="2025-01-01", end_date="2025-01-01",
+    )
+
+
+def test_background_drain_leaves_fresh_batches_to_their_run(spool):
+    db = SlowDb()
+    batch_id = enqueue(spool, "asp")
+
+    # The drainer's pass between enqueue and the run's own drain takes nothing
+    assert spool.drain(db, fresh_seconds=600)["delivered"] == 0
+    drained = spool.drain(db, key=("daily_actuals", "asp", "media"), respect_backoff=False)
+    assert drained["results"][batch_id] == COUNTS
+
+    # A batch whose run crashed before delivering is picked up once it is old
+    enqueue(spool, "crashed")
+    assert spool.drain(db, fresh_seconds=0)["delivered"] == 1
+    assert len(spool) == 0
+
+
+def test_different_keys_are_delivered_in_parallel(spool):
+    db = SlowDb(delay=0.3)
+    keys = [("daily_actuals", f"asp{i}", "media") for i in range(4)]
+    for key in keys:
+        enqueue(spool, key[1])
+
+    threads = [threading.Thread(target=spool.drain, args=(db,), kwargs={"key": key}) for key in keys]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(db.windows) == 4
+    assert time.monotonic() - started < 0.3 * 3
+
+
+def test_drain_together_writes_both_tables_at_once(spool):
+    db = SlowDb()
+    daily = enqueue(spool, "asp")
+    monthly = enqueue(spool, "asp", table_name="actuals")
+
+    drained = spool.drain_together(db, [daily, monthly])
+    assert set(drained["results"]) == {daily, monthly}
+    assert len(spool) == 0
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""Synthetic ASP web app for load and scale tests.
+
+A local stand-in for an affiliate service provider (ASP), following the
+flows of the YAML scenarios (a8net, afb):
+
+- ``/``: login form (``input[name='login']``, ``input[name='passwd']``,
+  ``input[type='submit'][value='ログイン']``)
+- ``/home``: menu with レポート / 成果報酬 / 日別レポート / 月別レポート
+- ``/report/reward``: 日別 / 月別 links
+- ``/report/daily``, ``/report/monthly``: 表示 button and a report table
+  (日付 | 発生件数 | 発生報酬額 | 確定報酬額)
+- ``/report/daily.csv``, ``/report/monthly.csv``: Shift_JIS CSV downloads
+- ``/api/report/daily``, ``/api/report/monthly``: JSON (``--no-json`` disables)
+
+Media log in as ``media1`` .. ``mediaM`` with password ``pass1`` ..
+``passM``. Each media sees its own deterministic figures. Every response
+waits ``latency ± jitter`` ms, and ``error_rate`` of the requests get a 503
+page.
+
+Usage:
+    # One fake ASP on http://127.0.0.1:8800 with 5 media
+    python tools/fake_asp.py --port 8800 --media 5
+
+    # Slow and flaky
+    python tools/fake_asp.py --latency-ms 400 --jitter-ms 300 --error-rate 0.05
+
+The load-test driver (tools/load_test.py) starts many of these in-process.
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+import secrets
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import date
+from html import escape
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+WEEKDAYS = "月火水木金土日"
+
+
+@dataclass
+class FakeAspConfig:
+    """Behaviour of one fake ASP."""
+
+    name: str = "fakeasp"
+    media: int = 3
+    latency_ms: float = 50.0
+    jitter_ms: float = 50.0
+    error_rate: float = 0.0
+    json_api: bool = True
+    # Months shown by the monthly report (current month included)
+    months: int = 12
+    seed: int = 0
+
+
+@dataclass
+class ServerStats:
+    """Requests served by one fake ASP."""
+
+    requests: int = 0
+    errors: int = 0
+    logins: int = 0
+    login_failures: int = 0
+    by_path: Dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, path: str, error: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.by_path[path] = self.by_path.get(path, 0) + 1
+
+    def count_login(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.logins += 1
+            else:
+                self.login_failures += 1
+
+    def to_dict(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "logins": self.logins,
+                "login_failures": self.login_failures,
+                "by_path": dict(self.by_path),
+            }
+
+
+# ==================== Report data ====================
+
+
+def _rng(config: FakeAspConfig, user: str, key: str) -> random.Random:
+    return random.Random(zlib.crc32(f"{config.seed}:{config.name}:{user}:{key}".encode()))
+
+
+def daily_rows(config: FakeAspConfig, user: str, today: Optional[date] = None) -> List[Tuple[str, int, int, int]]:
+    """(date, count, generated amount, confirmed amount) for each day of this month so far."""
+    today = today or date.today()
+    rows = []
+    for day in range(1, today.day + 1):
+        current = today.replace(day=day)
+        rng = _rng(config, user, current.isoformat())
+        count = rng.randint(0, 40)
+        generated = count * rng.randint(300, 3000)
+        rows.append((current.isoformat(), count, generated, int(generated * rng.uniform(0.6, 1.0))))
+    return rows
+
+
+def monthly_rows(config: FakeAspConfig, user: str, today: Optional[date] = None) -> List[Tuple[str, int, int, int]]:
+    """(YYYY-MM, count, generated amount, confirmed amount) for the last ``months`` months."""
+    today = today or date.today()
+    rows = []
+    year, month = today.year, today.month
+    for _ in range(config.months):
+        rng = _rng(config, user, f"{year:04d}-{month:02d}")
+        count = rng.randint(50, 900)
+        generated = count * rng.randint(300, 3000)
+        rows.append((f"{year:04d}-{month:02d}", count, generated, int(generated * rng.uniform(0.6, 1.0))))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return rows
+
+
+def _display_date(value: str) -> str:
+    if len(value) == 7:
+        return value.replace("-", "年", 1) + "月"
+    day = date.fromisoformat(value)
+    return f"{day:%Y/%m/%d}({WEEKDAYS[day.weekday()]})"
+
+
+def _yen(amount: int) -> str:
+    return f"¥{amount:,}"
+
+
+# ==================== Pages ====================
+
+
+def _page(title: str, body: str) -> str:
+    return (
+        "<!DOCTYPE html><html lang='ja'><head><meta charset='utf-8'>"
+        f"<title>{escape(title)}</title></head><body>{body}</body></html>"
+    )
+
+
+def login_page(name: str, error: str = "") -> str:
+    message = f"<p class='error'>{escape(error)}</p>" if error else ""
+    return _page(f"{name} ログイン", (
+        f"<h1>{escape(name)}</h1>{message}"
+        "<form method='post' action='/login'>"
+        "<input type='text' name='login' placeholder='ログインID'>"
+        "<input type='password' name='passwd' placeholder='パスワード'>"
+        "<input type='submit' value='ログイン'>"
+        "</form>"
+    ))
+
+
+MENU = (
+    "<nav><ul>"
+    "<li><a href='/report'>レポート</a><ul>"
+    "<li><a href='/report/reward'>成果報酬</a></li>"
+    "<li><a href='/report/daily' title='日別レポート'>日別レポート</a></li>"
+    "<li><a href='/report/monthly'>月別レポート</a></li>"
+    "</ul></li>"
+    "<li><a href='/logout'>ログアウト</a></li>"
+    "</ul></nav>"
+)
+
+
+def report_page(kind: str, rows: List[Tuple[str, int, int, int]]) -> str:
+    label = "日別" if kind == "daily" else "月別"
+    cells = "".join(
+        f"<tr><td>{_display_date(day)}</td><td>{count}</td><td>{_yen(generated)}</td><td>{_yen(confirmed)}</td></tr>"
+        for day, count, generated, confirmed in rows
+    )
+    total = sum(row[3] for row in rows)
+    return _page(f"{label}レポート", (
+        MENU
+        + f"<h2>{label}レポート</h2>"
+        + f"<form method='get' action='/report/{kind}'>"
+        + f"<input type='submit' class='send_report' data-testid='{kind}-display-report' value='表示'>"
+        + "</form>"
+        + f"<a href='/report/{kind}.csv'>CSVダウンロード</a>"
+        + "<table class='report'><thead><tr><th>日付</th><th>発生件数</th>"
+        + "<th>発生報酬額</th><th>確定報酬額</th></tr></thead>"
+        + f"<tbody>{cells}</tbody>"
+        + f"<tfoot><tr><td>合計</td><td></td><td></td><td>{_yen(total)}</td></tr></tfoot></table>"
+    ))
+
+
+def report_csv(rows: List[Tuple[str, int, int, int]]) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\r\n")
+    writer.writerow(["日付", "発生件数", "発生報酬額", "確定報酬額"])
+    for day, count, generated, confirmed in rows:
+        writer.writerow([day.replace("-", "/"), count, generated, confirmed])
+    return out.getvalue().encode("shift_jis")
+
+
+# ==================== Server ====================
+
+
+class FakeAspServer(ThreadingHTTPServer):
+    """HTTP server of one fake ASP (sessions and stats live here)."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: FakeAspConfig):
+        super().__init__(address, FakeAspHandler)
+        self.config = config
+        self.stats = ServerStats()
+        self.sessions: Dict[str, str] = {}
+        self.users = {f"media{i}": f"pass{i}" for i in range(1, config.media + 1)}
+        self._random = random.Random(config.seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def delay(self) -> float:
+        with self._lock:
+            jitter = self._random.uniform(-self.config.jitter_ms, self.config.jitter_ms)
+        return max(0.0, self.config.latency_ms + jitter) / 1000
+
+    def fail(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.config.error_rate
+
+    def start(self) -> "FakeAspServer":
+        """Serve from a daemon thread."""
+        threading.Thread(target=self.serve_forever, name=f"fake-asp-{self.config.name}", daemon=True).start()
+        return self
+
+
+class FakeAspHandler(BaseHTTPRequestHandler):
+    server: FakeAspServer
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    # ==================== Responses ====================
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _html(self, html: str, status: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(status, html.encode("utf-8"), "text/html; charset=utf-8", headers)
+
+    def _redirect(self, location: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def _user(self) -> Optional[str]:
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        sid = cookie.get("sid")
+        return self.server.sessions.get(sid.value) if sid else None
+
+    def _prelude(self, path: str) -> bool:
+        """Latency and injected errors; False if the request was answered with an error."""
+        time.sleep(self.server.delay())
+        if self.server.fail():
+            self.server.stats.record(path, error=True)
+            self._html(_page("503", "<h1>Service Temporarily Unavailable</h1>"), status=503)
+            return False
+        self.server.stats.record(path)
+        return True
+
+    # ==================== Routes ====================
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path
+        if not self._prelude(path):
+            return
+        config = self.server.config
+        if path in ("/", "/login"):
+            self._html(login_page(config.name))
+            return
+
+        user = self._user()
+        if user is None:
+            if path.startswith("/api/"):
+                self._send(401, b'{"error": "unauthorized"}', "application/json")
+            else:
+                self._redirect("/")
+            return
+
+        if path == "/home":
+            self._html(_page(config.name, MENU + f"<p>{escape(user)} さん、ようこそ</p>"))
+        elif path == "/report":
+            self._html(_page("レポート", MENU + "<h2>レポート</h2>"))
+        elif path == "/report/reward":
+            self._html(_page("成果報酬", MENU + (
+                "<h2>成果報酬</h2><a href='/report/daily'>日別</a> <a href='/report/monthly'>月別</a>"
+            )))
+        elif path in ("/report/daily", "/report/monthly"):
+            kind = path.rsplit("/", 1)[1]
+            rows = daily_rows(config, user) if kind == "daily" else monthly_rows(config, user)
+            self._html(report_page(kind, rows))
+        elif path in ("/report/daily.csv", "/report/monthly.csv"):
+            kind = path.rsplit("/", 1)[1].split(".")[0]
+            rows = daily_rows(config, user) if kind == "daily" else monthly_rows(config, user)
+            self._send(200, report_csv(rows), "text/csv; charset=Shift_JIS", {
+                "Content-Disposition": f"attachment; filename={kind}_{date.today():%Y%m}.csv",
+            })
+        elif config.json_api and path in ("/api/report/daily", "/api/report/monthly"):
+            kind = path.rsplit("/", 1)[1]
+            rows = daily_rows(config, user) if kind == "daily" else monthly_rows(config, user)
+            body = json.dumps({"rows": [
+                {"date": day, "count": count, "generated_amount": generated, "confirmed_amount": confirmed}
+                for day, count, generated, confirmed in rows
+            ]}, ensure_ascii=False)
+            self._send(200, body.encode("utf-8"), "application/json; charset=utf-8")
+        elif path == "/logout":
+            self._redirect("/", {"Set-Cookie": "sid=; Max-Age=0; Path=/"})
+        else:
+            self._html(_page("404", "<h1>Not Found</h1>"), status=404)
+
+    def do_POST(self) -> None:
+        path = urlparse(self.path).path
+        if not self._prelude(path):
+            return
+        if path != "/login":
+            self._html(_page("404", "<h1>Not Found</h1>"), status=404)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        username = (form.get("login") or [""])[0]
+        password = (form.get("passwd") or [""])[0]
+        if self.server.users.get(username) != password or not username:
+            self.server.stats.count_login(ok=False)
+            self._html(login_page(self.server.config.name, "IDまたはパスワードが正しくありません"))
+            return
+        sid = secrets.token_hex(16)
+        self.server.sessions[sid] = username
+        self.server.stats.count_login(ok=True)
+        self._redirect("/home", {"Set-Cookie": f"sid={sid}; Path=/; HttpOnly"})
+
+
+def start_server(config: FakeAspConfig, host: str = "127.0.0.1", port: int = 0) -> FakeAspServer:
+    """Start a fake ASP in a background thread (port 0 picks a free port)."""
+    return FakeAspServer((host, port), config).start()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run a synthetic ASP web app")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--name", default="fakeasp")
+    parser.add_argument("--media", type=int, default=3, help="Media accounts (media1/pass1 ...)")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--no-json", action="store_true", help="Disable the JSON report API")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = FakeAspConfig(
+        name=args.name,
+        media=args.media,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        json_api=not args.no_json,
+        seed=args.seed,
+    )
+    server = FakeAspServer((args.host, args.port), config)
+    print(f"{config.name} on {server.base_url} (media1/pass1 .. media{config.media}/pass{config.media})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats.to_dict(), ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Import-time budget check for the ``core`` package.
+
+Runs ``python -X importtime -c "import core"`` in fresh interpreters and fails
+when the best cumulative import time exceeds the budget, or when importing
+``core`` drags in one of the heavy SDKs that should only load on demand.
+
+Usage:
+    python tools/import_time_budget.py
+    python tools/import_time_budget.py --budget-ms 80 --runs 7
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_BUDGET_MS = 50.0
+DEFAULT_RUNS = 5
+
+# Modules that must not be imported as a side effect of ``import core``
+HEAVY_MODULES = [
+    "playwright",
+    "supabase",
+    "google.generativeai",
+    "anthropic",
+    "yaml",
+    "requests",
+]
+
+
+def measure_import_us(module: str) -> Optional[int]:
+    """Return the cumulative import time of ``module`` in microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=APP_DIR,
+    )
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        return None
+
+    # Line format: "import time:  self [us] | cumulative | imported package"
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    return None
+
+
+def find_heavy_imports(module: str) -> List[str]:
+    """Return heavy modules that end up in sys.modules after importing ``module``."""
+    code = (
+        "import json, sys\n"
+        f"import {module}\n"
+        f"heavy = {HEAVY_MODULES!r}\n"
+        "print(json.dumps([m for m in heavy if m in sys.modules]))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=APP_DIR,
+    )
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        return ["<import failed>"]
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check the import-time budget of core")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(os.getenv("CORE_IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS)),
+        help=f"Maximum cumulative import time in ms (default: {DEFAULT_BUDGET_MS})",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=DEFAULT_RUNS,
+        help=f"Number of fresh interpreters to sample (default: {DEFAULT_RUNS})",
+    )
+    parser.add_argument("--module", default="core", help="Module to measure")
+    args = parser.parse_args()
+
+    samples = []
+    for _ in range(args.runs):
+        us = measure_import_us(args.module)
+        if us is None:
+            print(f"❌ Could not measure import time for {args.module}")
+            return 1
+        samples.append(us)
+
+    # The minimum is the least noisy estimate on shared CI runners
+    best_ms = min(samples) / 1000
+    print(f"import {args.module}: best {best_ms:.1f} ms over {args.runs} runs "
+          f"(samples: {', '.join(f'{s / 1000:.1f}' for s in samples)})")
+
+    failed = False
+
+    heavy = find_heavy_imports(args.module)
+    if heavy:
+        print(f"❌ import {args.module} eagerly loads: {', '.join(heavy)}")
+        failed = True
+
+    if best_ms > args.budget_ms:
+        print(f"❌ Import time {best_ms:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        failed = True
+
+    if failed:
+        return 1
+
+    print(f"✅ Within budget ({args.budget_ms:.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+"""Load and scale test of the media batch runner against fake ASPs.
+
+Starts N fake ASPs (tools/fake_asp.py) in-process and scrapes M media on
+each of them through ``core.media_batch``, the same lanes and shared
+browsers that ``run_all_scrapers.py`` uses. Every media goes through
+``run_scraper`` and a real ``BaseScraper`` (``FakeAspScraper``): retries,
+time budget, resource blocking, login, レポート → 成果報酬 → 日別/月別, and
+saving through the spool. Only the database is replaced, by an in-memory
+``StubDb`` that serves the ASP / media / credential rows and counts writes.
+
+Reported:
+    - throughput (targets per minute, records per second)
+    - per-target latency p50 / p95 / p99 / max
+    - peak RSS of this process plus its browser processes, and the RSS per
+      open context above the idle baseline (Linux /proc)
+    - requests and injected errors seen by the fake ASPs, and the actuals
+      windows written to the stub database
+
+Usage:
+    # 3 ASPs x 5 media, 2 browsers per ASP, ASPs one after another
+    python tools/load_test.py --asps 3 --media 5 --media-concurrency 2
+
+    # Several ASP groups at once (like several job workers)
+    python tools/load_test.py --asps 8 --media 10 --asp-workers 4
+
+    # Slow, flaky ASPs, reading the Shift_JIS CSV instead of the table
+    python tools/load_test.py --latency-ms 400 --jitter-ms 300 --error-rate 0.02 --source csv
+
+    # Machine-readable result
+    python tools/load_test.py --output var/load_test.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from playwright.sync_api import Page
+
+from core import downloads, media_batch
+from core.base_scraper import BaseScraper
+from core.run_lock import RunLock
+from core.scraper_registry import get_scraper_registry, register_scraper
+from fake_asp import FakeAspConfig, FakeAspServer, start_server
+from runners.run_all_scrapers import run_scraper
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+EXTRACT_ROWS = "rows => rows.map(row => Array.from(row.querySelectorAll('td')).map(td => td.innerText.trim()))"
+
+
+# ==================== Memory ====================
+
+
+def _children(pid: int) -> List[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def _rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def tree_rss_mb(pid: Optional[int] = None) -> float:
+    """RSS of a process and all its descendants (browsers, drivers) in MB."""
+    pending = [pid or os.getpid()]
+    total = 0
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        total += _rss_bytes(current)
+        pending.extend(_children(current))
+    return total / (1024 * 1024)
+
+
+class MemorySampler:
+    """Samples the process tree's RSS and the number of open contexts."""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.baseline_mb = tree_rss_mb()
+        self.peak_mb = self.baseline_mb
+        self.contexts = 0
+        self.peak_contexts = 0
+        # RSS above the baseline divided by the open contexts, per sample
+        self.per_context_mb: List[float] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memory-sampler", daemon=True)
+
+    def start(self) -> "MemorySampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def open_context(self) -> None:
+        with self._lock:
+            self.contexts += 1
+            self.peak_contexts = max(self.peak_contexts, self.contexts)
+
+    def close_context(self) -> None:
+        with self._lock:
+            self.contexts -= 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            rss = tree_rss_mb()
+            with self._lock:
+                contexts = self.contexts
+            self.peak_mb = max(self.peak_mb, rss)
+            if contexts:
+                self.per_context_mb.append((rss - self.baseline_mb) / contexts)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "baseline_mb": round(self.baseline_mb, 1),
+            "peak_mb": round(self.peak_mb, 1),
+            "peak_contexts": self.peak_contexts,
+            "mb_per_context_p50": round(percentile(self.per_context_mb, 50), 1),
+            "mb_per_context_max": round(max(self.per_context_mb, default=0.0), 1),
+        }
+
+
+# ==================== Statistics ====================
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for no values)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+# ==================== Scraper and stub database ====================
+
+
+@register_scraper("fakeasp", asp_patterns=["fakeasp"])
+class FakeAspScraper(BaseScraper):
+    """BaseScraper for tools/fake_asp.py (the base URL comes from the ASP's login_url)."""
+
+    # Short waits between attempts; the fake ASP has no rate limits
+    RETRY_POLICY = {"delay_ms": 1000, "max_delay_ms": 5000}
+    # Where the report is read from: table, csv or json (--source)
+    SOURCE = "table"
+
+    @property
+    def base_url(self) -> str:
+        return self.login_url.rstrip("/")
+
+    def _click(self, page: Page, selector: str) -> None:
+        """Click a navigation link, failing fast on the fake ASP's 503 page."""
+        page.click(selector)
+        page.wait_for_load_state("domcontentloaded")
+        if page.title() == "503":
+            raise RuntimeError(f"HTTP 503 after clicking {selector}")
+
+    def login(self, page: Page) -> bool:
+        response = page.goto(self.login_url)
+        if response is not None and response.status >= 500:
+            raise RuntimeError(f"HTTP {response.status} on login page")
+        page.fill("input[name='login']", self.username)
+        page.fill("input[name='passwd']", self.password)
+        self._click(page, "input[type='submit'][value='ログイン']")
+        return page.locator("input[name='passwd']").count() == 0
+
+    def _scrape(self, page: Page, kind: str) -> List[Dict[str, Any]]:
+        monthly = kind == "monthly"
+        for selector in ("a:text-is('レポート')", "a:text-is('成果報酬')",
+                         f"a:text-is('{'月別' if monthly else '日別'}')", "input[type='submit'][value*='表示']"):
+            self._click(page, selector)
+
+        if self.SOURCE == "json":
+            return self.capture_response(
+                page, rf"/api/report/{kind}$", lambda: page.goto(f"{self.base_url}/api/report/{kind}"),
+                items="rows[*]", date="date", amount="confirmed_amount", monthly=monthly,
+            )
+        if self.SOURCE == "csv":
+            with page.expect_download() as download_info:
+                page.click("text=CSVダウンロード")
+            with downloads.open_csv(download_info.value) as f:
+                rows = list(csv.reader(f))[1:]
+        else:
+            page.wait_for_selector("table.report tbody tr")
+            rows = page.locator("table.report tbody tr").evaluate_all(EXTRACT_ROWS)
+
+        records: List[Dict[str, Any]] = []
+        for row in rows:
+            self.check_budget(records)
+            if len(row) < 4:
+                continue
+            day = self.parse_month_jp(row[0]) if monthly else self.parse_date_jp(row[0])
+            if day:
+                records.append({"date": day, "amount": self.parse_yen(row[3])})
+        return records
+
+    def scrape_daily(self, page: Page) -> List[Dict[str, Any]]:
+        return self._scrape(page, "daily")
+
+    def scrape_monthly(self, page: Page) -> List[Dict[str, Any]]:
+        return self._scrape(page, "monthly")
+
+
+class _Query:
+    """The ``table().select/update().eq().execute()`` chain of the Supabase client."""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self.values: Optional[Dict[str, Any]] = None
+
+    def select(self, *columns: str) -> "_Query":
+        return self
+
+    def update(self, values: Dict[str, Any]) -> "_Query":
+        self.values = values
+        return self
+
+    def eq(self, column: str, value: Any) -> "_Query":
+        query = _Query([row for row in self.rows if row.get(column) == value])
+        query.values = self.values
+        return query
+
+    def execute(self) -> SimpleNamespace:
+        for row in self.rows:
+            row.update(self.values or {})
+        return SimpleNamespace(data=[dict(row) for row in self.rows])
+
+
+class StubDb:
+    """In-memory stand-in for SupabaseClient: targets in, written actuals counted.
+
+    Serves the asps / media / asp_credentials / account_items rows BaseScraper
+    reads and accepts the execution logs and actuals windows it writes.
+    """
+
+    def __init__(self, targets: List[Dict[str, Any]]):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {
+            "asps": [], "media": [], "asp_credentials": [], "account_items": [], "execution_logs": [],
+        }
+        for target in targets:
+            if not any(row["id"] == target["asp_id"] for row in self.tables["asps"]):
+                self.tables["asps"].append({
+                    "id": target["asp_id"], "name": target["asp_name"], "login_url": target["base_url"] + "/",
+                })
+            if not any(row["id"] == target["media_id"] for row in self.tables["media"]):
+                self.tables["media"].append({"id": target["media_id"], "name": target["media_name"]})
+                self.tables["account_items"].append({
+                    "id": f"{target['media_id']}-affiliate", "media_id": target["media_id"], "name": "アフィリエイト",
+                })
+            self.tables["asp_credentials"].append({
+                "asp_id": target["asp_id"],
+                "media_id": target["media_id"],
+                "username_secret_key": target["username"],
+                "password_secret_key": target["password"],
+            })
+        self.client = SimpleNamespace(table=lambda name: _Query(self.tables[name]))
+        # (table_name, asp_id, media_id, date) -> amount
+        self.actuals: Dict[tuple, int] = {}
+        self.writes = 0
+        self._lock = threading.Lock()
+
+    def create_execution_log(self, asp_id: str, execution_type: str, metadata: Optional[Dict] = None) -> str:
+        log_id = uuid.uuid4().hex
+        with self._lock:
+            self.tables["execution_logs"].append({"id": log_id, "asp_id": asp_id, "status": "running"})
+        return log_id
+
+    def update_execution_log(self, log_id: str, status: str, records_saved: int = 0,
+                             error_message: Optional[str] = None) -> bool:
+        return True
+
+    def update_execution_log_metadata(self, log_id: Optional[str], metadata: Dict[str, Any]) -> bool:
+        return True
+
+    def replace_actuals_window(self, table_name: str, asp_id: str, media_id: str,
+                               records: List[Dict[str, Any]], start_date: str, end_date: str) -> Dict[str, int]:
+        counts = {"added": 0, "changed": 0, "unchanged": 0, "deleted": 0}
+        with self._lock:
+            self.writes += 1
+            window = [key for key in self.actuals
+                      if key[:3] == (table_name, asp_id, media_id) and start_date <= key[3] <= end_date]
+            fetched = {str(record["date"])[:10]: record["amount"] for record in records}
+            for key in window:
+                if key[3] not in fetched:
+                    del self.actuals[key]
+                    counts["deleted"] += 1
+            for day, amount in fetched.items():
+                key = (table_name, asp_id, media_id, day)
+                stored = self.actuals.get(key)
+                counts["added" if stored is None else "unchanged" if stored == amount else "changed"] += 1
+                self.actuals[key] = amount
+        return counts
+
+    def replace_actuals_windows(self, windows: List[Dict[str, Any]]) -> List[Dict[str, int]]:
+        return [self.replace_actuals_window(**window) for window in windows]
+
+
+class SampledBrowser:
+    """Shared browser whose contexts are counted by the memory sampler."""
+
+    def __init__(self, browser, sampler: MemorySampler):
+        self._browser = browser
+        self._sampler = sampler
+
+    def new_context(self, **kwargs):
+        context = self._browser.new_context(**kwargs)
+        self._sampler.open_context()
+        context.on("close", lambda _: self._sampler.close_context())
+        return context
+
+    def __getattr__(self, name: str):
+        return getattr(self._browser, name)
+
+
+def make_runner(options: argparse.Namespace, sampler: MemorySampler, db: StubDb):
+    """``run_target(target, browser)`` for media_batch.run_asp_group, through run_scraper."""
+    scraper_info = get_scraper_registry().get("fakeasp").to_dict()
+    run_lock = RunLock(db, enabled=False)
+
+    def run_target(target: Dict[str, Any], browser) -> Dict[str, Any]:
+        started = time.perf_counter()
+        results = run_scraper(
+            scraper_info=scraper_info,
+            asp_id=target["asp_id"],
+            media_id=target["media_id"],
+            asp_name=target["asp_name"],
+            media_name=target["media_name"],
+            run_daily="daily" in options.periods,
+            run_monthly="monthly" in options.periods,
+            headless=not options.headed,
+            max_retries=options.retries + 1,
+            browser=SampledBrowser(browser, sampler),
+            run_lock=run_lock,
+            db=db,
+        )
+        periods = [results.get(period) or {} for period in options.periods]
+        failed = [result for result in periods if not result.get("success")]
+        error = results.get("error") or ((failed[0].get("error") or "Unknown error") if failed else None)
+        return {
+            "asp": target["asp_name"],
+            "media": target["media_name"],
+            "success": error is None,
+            "records": sum(result.get("records_saved", 0) for result in periods),
+            "seconds": time.perf_counter() - started,
+            "error": error.splitlines()[0] if error else None,
+        }
+
+    return run_target
+
+
+# ==================== Driver ====================
+
+
+def build_targets(servers: List[FakeAspServer], media: int) -> List[Dict[str, Any]]:
+    targets = []
+    for server in servers:
+        for index in range(1, media + 1):
+            targets.append({
+                "asp_id": server.config.name,
+                "asp_name": server.config.name,
+                "media_id": f"media{index}",
+                "media_name": f"media{index}",
+                "base_url": server.base_url,
+                "username": f"media{index}",
+                "password": f"pass{index}",
+            })
+    return targets
+
+
+def run(options: argparse.Namespace) -> Dict[str, Any]:
+    servers = [
+        start_server(FakeAspConfig(
+            name=f"fakeasp{i + 1}",
+            media=options.media,
+            latency_ms=options.latency_ms,
+            jitter_ms=options.jitter_ms,
+            error_rate=options.error_rate,
+            seed=i,
+        ))
+        for i in range(options.asps)
+    ]
+    targets = build_targets(servers, options.media)
+    groups = media_batch.group_by_asp(targets)
+    db = StubDb(targets)
+    FakeAspScraper.SOURCE = options.source
+    FakeAspScraper.BUDGET = {"action_timeout_ms": options.timeout_ms}
+    sampler = MemorySampler().start()
+    run_target = make_runner(options, sampler, db)
+    results: List[Dict[str, Any]] = []
+    # The scrapers' own logs only with --verbose; per-target lines still go to the console
+    console = sys.stdout
+    scraper_log = sys.stdout if options.verbose else open(os.devnull, "w")
+
+    def on_result(target: Dict[str, Any], result: Dict[str, Any]) -> None:
+        status = "ok" if result["success"] else f"FAILED ({result['error']})"
+        if not options.quiet:
+            print(
+                f"  {result['asp']}/{result['media']}: {result['seconds']:.2f}s {result['records']} records {status}",
+                file=console,
+            )
+
+    def run_group(group: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return media_batch.run_asp_group(
+            group, run_target,
+            concurrency=options.media_concurrency,
+            headless=not options.headed,
+            on_result=on_result,
+        )
+
+    started = time.perf_counter()
+    try:
+        # Batches go to a throwaway spool instead of var/spool.sqlite3
+        with tempfile.TemporaryDirectory(prefix="load_test_") as spool_dir, redirect_stdout(scraper_log):
+            os.environ["SCRAPER_SPOOL_PATH"] = str(Path(spool_dir) / "spool.sqlite3")
+            with ThreadPoolExecutor(max_workers=options.asp_workers, thread_name_prefix="asp-group") as pool:
+                for group_results in pool.map(run_group, groups.values()):
+                    results.extend(group_results)
+    finally:
+        wall = time.perf_counter() - started
+        sampler.stop()
+        if scraper_log is not console:
+            scraper_log.close()
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    latencies = [r["seconds"] for r in results]
+    records = sum(r["records"] for r in results)
+    server_stats = [server.stats.to_dict() for server in servers]
+    return {
+        "config": {
+            "asps": options.asps,
+            "media": options.media,
+            "media_concurrency": options.media_concurrency,
+            "asp_workers": options.asp_workers,
+            "latency_ms": options.latency_ms,
+            "jitter_ms": options.jitter_ms,
+            "error_rate": options.error_rate,
+            "periods": options.periods,
+            "source": options.source,
+        },
+        "targets": len(results),
+        "succeeded": sum(1 for r in results if r["success"]),
+        "failed": sum(1 for r in results if not r["success"]),
+        "wall_s": round(wall, 2),
+        "targets_per_min": round(len(results) / wall * 60, 1) if wall else 0.0,
+        "records": records,
+        "records_per_s": round(records / wall, 1) if wall else 0.0,
+        "latency_s": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(max(latencies, default=0.0), 2),
+        },
+        "memory": sampler.summary(),
+        "server": {
+            "requests": sum(s["requests"] for s in server_stats),
+            "errors": sum(s["errors"] for s in server_stats),
+            "logins": sum(s["logins"] for s in server_stats),
+        },
+        "db_writes": db.writes,
+        "failures": [r for r in results if not r["success"]],
+    }
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    config = result["config"]
+    latency = result["latency_s"]
+    memory = result["memory"]
+    server = result["server"]
+    print("\n" + "=" * 60)
+    print(
+        f"{config['asps']} ASPs x {config['media']} media, {config['media_concurrency']} browsers/ASP, "
+        f"{config['asp_workers']} ASP workers"
+    )
+    print(
+        f"Targets: {result['succeeded']}/{result['targets']} succeeded "
+        f"({result['failed']} failed) in {result['wall_s']:.1f}s"
+    )
+    print(f"Throughput: {result['targets_per_min']:.1f} targets/min, {result['records_per_s']:.1f} records/s")
+    print(
+        f"Latency per target: p50 {latency['p50']:.2f}s  p95 {latency['p95']:.2f}s  "
+        f"p99 {latency['p99']:.2f}s  max {latency['max']:.2f}s"
+    )
+    print(
+        f"Memory: baseline {memory['baseline_mb']:.0f} MB, peak {memory['peak_mb']:.0f} MB "
+        f"with {memory['peak_contexts']} contexts open, "
+        f"~{memory['mb_per_context_p50']:.0f} MB/context (max {memory['mb_per_context_max']:.0f})"
+    )
+    print(f"Fake ASPs: {server['requests']} requests, {server['errors']} injected errors, {server['logins']} logins")
+    print(f"Stub DB: {result['db_writes']} window writes")
+    print("=" * 60)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load test the media batch runner against fake ASPs")
+    parser.add_argument("--asps", type=int, default=3, help="Number of fake ASPs")
+    parser.add_argument("--media", type=int, default=5, help="Media per ASP")
+    parser.add_argument("--media-concurrency", type=int, default=2, help="Browsers per ASP (as run_all_scrapers)")
+    parser.add_argument("--asp-workers", type=int, default=1, help="ASP groups run at the same time")
+    parser.add_argument("--periods", default="daily,monthly", help="Reports to read (daily,monthly)")
+    parser.add_argument("--source", choices=["table", "csv", "json"], default="table",
+                        help="Read the report table, the Shift_JIS CSV or the JSON API")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--retries", type=int, default=1, help="Retries per media after a failure")
+    parser.add_argument("--timeout-ms", type=int, default=15000, help="Action timeout (the scraper's BUDGET)")
+    parser.add_argument("--headed", action="store_true", help="Show the browsers")
+    parser.add_argument("--quiet", action="store_true", help="No per-target lines")
+    parser.add_argument("--verbose", action="store_true", help="Show the scrapers' own logs")
+    parser.add_argument("--output", type=Path, help="Write the result as JSON")
+    options = parser.parse_args()
+
+    periods = [period.strip() for period in options.periods.split(",") if period.strip()]
+    unknown = [period for period in periods if period not in ("daily", "monthly")]
+    if unknown or not periods:
+        parser.error(f"--periods must be daily and/or monthly, got {options.periods}")
+    options.periods = periods
+
+    result = run(options)
+    print_report(result)
+    if options.output:
+        options.output.parent.mkdir(parents=True, exist_ok=True)
+        options.output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"Result: {options.output}")
+    return 0 if result["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
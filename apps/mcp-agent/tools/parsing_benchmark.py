@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Micro-benchmark and randomized property checks for core.parsing.
+
+Usage:
+    # Compare core.parsing with the per-cell parsers it replaced
+    python tools/parsing_benchmark.py
+
+    # Bigger columns / more repetitions
+    python tools/parsing_benchmark.py --rows 50000 --repeat 7
+
+    # Property checks only (random round trips, exits 1 on failure)
+    python tools/parsing_benchmark.py --check 20000 --no-bench
+"""
+
+import argparse
+import calendar
+import random
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import parsing
+
+WEEKDAYS = "月火水木金土日"
+FULLWIDTH = str.maketrans("0123456789/-,()", "０１２３４５６７８９／－，（）")
+
+
+# ==================== Previous implementations (baseline) ====================
+
+
+def legacy_parse_date(date_str):
+    """AgentLoop._parse_date before core.parsing."""
+    date_str = date_str.strip()
+    date_str = re.sub(r'\s*\([日月火水木金土曜]\)\s*', '', date_str)
+    jp_match = re.match(r'(\d{4})年(\d{1,2})月(\d{1,2})日', date_str)
+    if jp_match:
+        return f"{jp_match.group(1)}-{jp_match.group(2).zfill(2)}-{jp_match.group(3).zfill(2)}"
+    for fmt in ("%Y/%m/%d", "%Y-%m-%d", "%m/%d", "%m-%d"):
+        try:
+            if "%Y" not in fmt:
+                parsed = datetime.strptime(f"{datetime.now().year}/{date_str}", f"%Y/{fmt}")
+            else:
+                parsed = datetime.strptime(date_str, fmt)
+            return parsed.strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def legacy_parse_amount(amount_str):
+    """AgentLoop._parse_amount before core.parsing."""
+    amount_str = re.sub(r"[¥,円$]", "", amount_str.strip())
+    try:
+        return int(float(amount_str))
+    except ValueError:
+        return 0
+
+
+# ==================== Data generation ====================
+
+
+def random_date(rng: random.Random) -> date:
+    return date(2015, 1, 1) + timedelta(days=rng.randrange(0, 365 * 15))
+
+
+def render_date(rng: random.Random, d: date) -> str:
+    """Render a date in one of the layouts seen in ASP reports."""
+    weekday = f"({WEEKDAYS[d.weekday()]})"
+    layouts = [
+        f"{d.year}年{d.month:02d}月{d.day:02d}日",
+        f"{d.year}年{d.month}月{d.day}日",
+        f"{d.year}/{d.month:02d}/{d.day:02d}",
+        f"{d.year}/{d.month:02d}/{d.day:02d}{weekday}",
+        f"{d.year}-{d.month:02d}-{d.day:02d}",
+        f"{d.year}{d.month:02d}{d.day:02d}",
+        f" {d.year}/{d.month}/{d.day} ",
+    ]
+    text = rng.choice(layouts)
+    if rng.random() < 0.2:
+        text = text.translate(FULLWIDTH)
+    return text
+
+
+def render_amount(rng: random.Random, value: int) -> str:
+    layouts = [f"{value:,}", f"¥{value:,}", f"￥{value:,}", f"{value:,}円", f"{value}", f"{value}.0"]
+    text = rng.choice(layouts)
+    if rng.random() < 0.2:
+        text = text.translate(FULLWIDTH)
+    return text
+
+
+# ==================== Property checks ====================
+
+
+def run_checks(n: int, seed: int) -> int:
+    rng = random.Random(seed)
+    failures = []
+
+    def expect(label, actual, expected, source):
+        if actual != expected:
+            failures.append(f"{label}: {source!r} -> {actual!r}, expected {expected!r}")
+
+    dates = [random_date(rng) for _ in range(n)]
+    date_cells = [render_date(rng, d) for d in dates]
+    amounts = [rng.choice([0, rng.randrange(0, 1000), rng.randrange(0, 10**9)]) for _ in range(n)]
+    amount_cells = [render_amount(rng, v) for v in amounts]
+
+    # Round trips: every layout parses back to the same date / amount
+    for d, cell in zip(dates, date_cells):
+        expect("parse_date", parsing.parse_date(cell), d.isoformat(), cell)
+        expect("parse_month", parsing.parse_month(cell), d.isoformat()[:7], cell)
+    for v, cell in zip(amounts, amount_cells):
+        expect("parse_amount", parsing.parse_amount(cell), v, cell)
+        expect("parse_amount(neg)", parsing.parse_amount("△" + cell), -v, "△" + cell)
+
+    # Batch parsing agrees with single-value parsing
+    expect("parse_dates", parsing.parse_dates(date_cells), [d.isoformat() for d in dates], "column")
+    expect("parse_amounts", parsing.parse_amounts(amount_cells), amounts, "column")
+
+    # Year-less cells take the default year
+    for d in dates[: n // 10]:
+        cell = f"{d.month}/{d.day}"
+        expect("default_year", parsing.parse_date(cell, default_year=d.year), d.isoformat(), cell)
+
+    # Impossible calendar dates are rejected
+    for _ in range(n // 10):
+        year = rng.randrange(2000, 2100)
+        month = rng.randrange(1, 13)
+        day = calendar.monthrange(year, month)[1] + 1
+        cell = f"{year}/{month:02d}/{day:02d}"
+        expect("invalid_day", parsing.parse_date(cell), None, cell)
+        cell = f"{year}/{rng.randrange(13, 100)}/01"
+        expect("invalid_month", parsing.parse_date(cell), None, cell)
+
+    # Periods have a month but no day
+    for d in dates[: n // 10]:
+        for cell in (f"{d.year}年{d.month}月", f"{d.year}/{d.month:02d}", f"{d.year}{d.month:02d}"):
+            expect("period_month", parsing.parse_month(cell), d.isoformat()[:7], cell)
+            expect("period_date", parsing.parse_date(cell), None, cell)
+
+    # Non-values fall back to the default
+    for cell in ("", "-", "ー", "合計", None):
+        expect("empty_amount", parsing.parse_amount(cell), 0, cell)
+        expect("empty_date", parsing.parse_date(cell), None, cell)
+
+    if failures:
+        print(f"❌ {len(failures)} property check failures (seed={seed}):")
+        for failure in failures[:20]:
+            print(f"   {failure}")
+        return 1
+
+    print(f"✅ Property checks passed ({n} random cells per property, seed={seed})")
+    return 0
+
+
+# ==================== Benchmark ====================
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmark(rows: int, repeat: int, seed: int) -> None:
+    rng = random.Random(seed)
+    # The previous parsers only understand ASCII, so give them ASCII cells
+    date_cells = [parsing.normalize(render_date(rng, random_date(rng))) for _ in range(rows)]
+    amount_cells = [f"¥{rng.randrange(0, 10**7):,}" for _ in range(rows)]
+
+    cases = [
+        ("dates   legacy per-cell", lambda: [legacy_parse_date(c) for c in date_cells]),
+        ("dates   parse_date", lambda: [parsing.parse_date(c) for c in date_cells]),
+        ("dates   parse_dates", lambda: parsing.parse_dates(date_cells)),
+        ("amounts legacy per-cell", lambda: [legacy_parse_amount(c) for c in amount_cells]),
+        ("amounts parse_amount", lambda: [parsing.parse_amount(c) for c in amount_cells]),
+        ("amounts parse_amounts", lambda: parsing.parse_amounts(amount_cells)),
+    ]
+
+    print(f"\nParsing benchmark: {rows} cells, best of {repeat}")
+    print("=" * 60)
+    for label, func in cases:
+        seconds = best_of(repeat, func)
+        print(f"{label:<26} {seconds * 1000:9.1f} ms  {rows / seconds / 1e6:6.2f} M cells/s")
+    print("=" * 60)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark and property-check core.parsing")
+    parser.add_argument("--rows", type=int, default=20000, help="Cells per benchmark column")
+    parser.add_argument("--repeat", type=int, default=5, help="Benchmark repetitions (best is reported)")
+    parser.add_argument("--check", type=int, default=5000, help="Random cells per property check (0 to skip)")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed (default: time based)")
+    parser.add_argument("--no-bench", action="store_true", help="Only run property checks")
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else int(time.time())
+    status = run_checks(args.check, seed) if args.check else 0
+    if not args.no_bench:
+        run_benchmark(args.rows, args.repeat, seed)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
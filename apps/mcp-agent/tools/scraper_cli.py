@@ -48,6 +48,10 @@ def generate_command(args):
 def execute_command(args):
     """Execute a scraper script."""
     logger.info(f"Executing scraper: {args.asp}/{args.type}")
+    if args.profile is not None:
+        from core import profiling
+
+        print(f"Profiling to {profiling.enable(args.profile or None)}")
     
     # Initialize components
     supabase = SupabaseClient(settings.supabase_url, settings.supabase_service_role_key)
@@ -80,6 +84,10 @@ def execute_all_command(args):
     executor = ScraperExecutor(supabase, generator)
     
     # Execute all scrapers
+    if args.deadline:
+        from core import budget
+
+        budget.set_run_deadline(args.deadline * 60)
     results = executor.execute_all_scrapers(execution_type=args.type)
     
     # Print summary
@@ -149,6 +157,92 @@ def list_command(args):
     return 0
 
 
+def replay_spool_command(args):
+    """Deliver records left in the local spool after a database outage."""
+    from datetime import datetime
+    from core.spool import get_record_spool
+
+    spool = get_record_spool()
+    batches = spool.pending()
+
+    if not batches:
+        print(f"✅ Spool is empty: {spool.path}")
+        return 0
+
+    print(f"\nSpooled batches ({spool.path}):")
+    print("="*60)
+    for batch in batches:
+        created = datetime.fromtimestamp(batch["created_at"]).strftime("%Y-%m-%d %H:%M:%S")
+        print(
+            f"#{batch['id']} {batch['table_name']} {batch['operation']} "
+            f"{batch['start_date']}..{batch['end_date']} "
+            f"({batch['record_count']} records, {batch['attempts']} attempts, spooled {created})"
+        )
+        if batch["last_error"]:
+            print(f"   Last error: {batch['last_error'][:200]}")
+    print("="*60)
+
+    if args.list:
+        return 0
+
+    supabase = SupabaseClient(settings.supabase_url, settings.supabase_service_role_key)
+    result = spool.drain(supabase, respect_backoff=args.respect_backoff)
+    remaining = len(spool)
+
+    print(f"Delivered: {result['delivered']}, Failed: {result['failed']}, Remaining: {remaining}")
+    if result["last_error"]:
+        print(f"   Last error: {result['last_error']}")
+    return 0 if remaining == 0 else 1
+
+
+def locks_command(args):
+    """Show which runs hold scrape leases right now."""
+    supabase = SupabaseClient(settings.supabase_url, settings.supabase_service_role_key)
+    leases = supabase.get_active_scrape_leases()
+
+    if not leases:
+        print("✅ No active scrape leases")
+        return 0
+
+    print("\nActive scrape leases:")
+    print("="*60)
+    for lease in leases:
+        print(
+            f"{lease.get('asp_name') or lease['asp_id']} / {lease.get('media_name') or lease['media_id']} "
+            f"{lease['job_type']}: {lease['holder']}"
+        )
+        print(
+            f"   acquired {lease['acquired_at']}, heartbeat {lease['heartbeat_at']}, "
+            f"expires {lease['expires_at']}"
+        )
+    print("="*60)
+    return 0
+
+
+def timeouts_command(args):
+    """Show the latency history and learned timeouts of each step."""
+    from core.adaptive_timeouts import get_latency_model
+
+    model = get_latency_model()
+    rows = [row for row in model.stats() if not args.asp or args.asp.lower() in row["asp"].lower()]
+
+    if not rows:
+        print(f"No latency samples yet: {model.path}")
+        return 0
+
+    print(f"\nLearned timeouts ({model.path}):")
+    print("="*60)
+    for row in rows:
+        timeout = f"{row['timeout_ms']}ms" if row["timeout_ms"] is not None else "default (learning)"
+        timeouts = f", {row['recent_timeouts']} recent timeouts" if row["recent_timeouts"] else ""
+        print(
+            f"{row['asp']} {row['step']}: {row['samples']} samples{timeouts}, "
+            f"p50 {row['p50_ms']:.0f}ms, p99 {row['p99_ms']:.0f}ms -> {timeout}"
+        )
+    print("="*60)
+    return 0
+
+
 def main():
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(description="Scraper management CLI")
@@ -166,11 +260,16 @@ def main():
     execute_parser.add_argument("asp", help="ASP name (e.g., a8net, afb)")
     execute_parser.add_argument("--type", default="daily", choices=["daily", "monthly"], help="Execution type")
     execute_parser.add_argument("--no-generate", action="store_true", help="Don't auto-generate if missing")
+    execute_parser.add_argument(
+        "--profile", nargs="?", const="", metavar="DIR",
+        help="Profile the script (cProfile + collapsed stacks, default dir var/profiles)",
+    )
     execute_parser.set_defaults(func=execute_command)
     
     # Execute all command
     execute_all_parser = subparsers.add_parser("execute-all", help="Execute all scrapers")
     execute_all_parser.add_argument("--type", default="daily", choices=["daily", "monthly"], help="Execution type")
+    execute_all_parser.add_argument("--deadline", type=float, metavar="MINUTES", help="Time budget of the whole run")
     execute_all_parser.set_defaults(func=execute_all_command)
     
     # Heal command
@@ -184,6 +283,21 @@ def main():
     list_parser = subparsers.add_parser("list", help="List all available scrapers")
     list_parser.set_defaults(func=list_command)
     
+    # Replay spool command
+    replay_parser = subparsers.add_parser("replay-spool", help="Deliver records left in the local spool")
+    replay_parser.add_argument("--list", action="store_true", help="Only show spooled batches")
+    replay_parser.add_argument("--respect-backoff", action="store_true", help="Skip batches whose retry is not due yet")
+    replay_parser.set_defaults(func=replay_spool_command)
+    
+    # Locks command
+    locks_parser = subparsers.add_parser("locks", help="Show runs holding scrape leases")
+    locks_parser.set_defaults(func=locks_command)
+    
+    # Timeouts command
+    timeouts_parser = subparsers.add_parser("timeouts", help="Show learned step timeouts")
+    timeouts_parser.add_argument("--asp", help="Only this ASP (partial match)")
+    timeouts_parser.set_defaults(func=timeouts_command)
+    
     # Parse arguments
     args = parser.parse_args()
     
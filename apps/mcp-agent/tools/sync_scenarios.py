@@ -10,7 +10,7 @@ import logging
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from dotenv import load_dotenv
-from core import SupabaseClient, ScenarioLoader
+from core import ScenarioLoader
 
 # Load environment variables
 load_dotenv()
@@ -95,7 +95,9 @@ def main():
         logger.error("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY")
         sys.exit(1)
 
-    # Initialize Supabase client
+    # Initialize Supabase client (imported here so --list/--dry-run stay fast)
+    from core import SupabaseClient
+
     supabase_client = SupabaseClient(
         url=supabase_url, service_role_key=supabase_key
     )
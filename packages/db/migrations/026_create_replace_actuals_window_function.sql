@@ -0,0 +1,92 @@
+-- Atomically replace scraped actuals for one (asp_id, media_id, date window)
+-- The scrapers used to DELETE the window and then INSERT the new rows in a
+-- separate request, so the dashboard could observe an empty window and a
+-- failed insert lost the whole month.
+--
+-- This function does the replacement in a single statement (one transaction):
+--   * rows in p_records that are new are inserted
+--   * rows whose amount changed are updated (unchanged rows are not touched)
+--   * rows in the window that are missing from p_records are deleted
+-- and returns how many rows fell into each bucket.
+--
+-- p_records is a JSON array of {"date": "YYYY-MM-DD", "amount": 123, "account_item_id": "<uuid>"}.
+-- When the same (date, account_item_id) appears twice, the last element wins.
+
+CREATE OR REPLACE FUNCTION replace_actuals_window(
+    p_table text,
+    p_asp_id uuid,
+    p_media_id uuid,
+    p_start_date date,
+    p_end_date date,
+    p_records jsonb
+)
+RETURNS TABLE (
+    added integer,
+    changed integer,
+    unchanged integer,
+    deleted integer
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- Only the two actuals tables share this schema; never format arbitrary names
+    IF p_table NOT IN ('daily_actuals', 'actuals') THEN
+        RAISE EXCEPTION 'replace_actuals_window: unsupported table %', p_table;
+    END IF;
+
+    RETURN QUERY EXECUTE format($sql$
+        WITH
+        -- Parse the JSON payload, keeping the last row per (date, account_item_id)
+        incoming AS (
+            SELECT DISTINCT ON (r.date, r.account_item_id)
+                r.date,
+                r.amount,
+                r.account_item_id
+            FROM (
+                SELECT
+                    (e.value->>'date')::date AS date,
+                    (e.value->>'amount')::numeric::integer AS amount,
+                    (e.value->>'account_item_id')::uuid AS account_item_id,
+                    e.ord
+                FROM
+                    jsonb_array_elements($1) WITH ORDINALITY AS e(value, ord)
+            ) r
+            ORDER BY r.date, r.account_item_id, r.ord DESC
+        ),
+        -- Delete stored rows in the window that were not scraped this time
+        removed AS (
+            DELETE FROM public.%1$I t
+            WHERE
+                t.asp_id = $2
+                AND t.media_id = $3
+                AND t.date BETWEEN $4 AND $5
+                AND NOT EXISTS (
+                    SELECT 1 FROM incoming i
+                    WHERE i.date = t.date AND i.account_item_id = t.account_item_id
+                )
+            RETURNING t.id
+        ),
+        -- Insert new rows and update rows whose amount differs
+        written AS (
+            INSERT INTO public.%1$I AS t (date, amount, media_id, account_item_id, asp_id)
+            SELECT i.date, i.amount, $3, i.account_item_id, $2
+            FROM incoming i
+            ON CONFLICT (date, media_id, account_item_id, asp_id)
+            DO UPDATE SET
+                amount = EXCLUDED.amount,
+                updated_at = now()
+            WHERE t.amount IS DISTINCT FROM EXCLUDED.amount
+            RETURNING (xmax = 0) AS inserted
+        )
+        SELECT
+            (SELECT count(*) FROM written w WHERE w.inserted)::integer,
+            (SELECT count(*) FROM written w WHERE NOT w.inserted)::integer,
+            ((SELECT count(*) FROM incoming) - (SELECT count(*) FROM written))::integer,
+            (SELECT count(*) FROM removed)::integer
+    $sql$, p_table)
+    USING p_records, p_asp_id, p_media_id, p_start_date, p_end_date;
+END;
+$$;
+
+COMMENT ON FUNCTION replace_actuals_window(text, uuid, uuid, date, date, jsonb) IS
+'Replace daily_actuals/actuals rows for one ASP, media and date window in a single transaction; returns added/changed/unchanged/deleted counts';
@@ -0,0 +1,45 @@
+-- Replace several actuals windows in one request and one transaction
+-- A scraper that collects daily and monthly data in the same browser session
+-- writes both result sets at once instead of calling replace_actuals_window
+-- twice. Either every window is replaced or none is.
+--
+-- p_windows is a JSON array of
+--   {"table": "daily_actuals" | "actuals", "asp_id": "<uuid>", "media_id": "<uuid>",
+--    "start_date": "YYYY-MM-DD", "end_date": "YYYY-MM-DD", "records": [...]}
+-- where "records" has the format of replace_actuals_window's p_records.
+-- One result row is returned per window, in input order (window_index is 0-based).
+
+CREATE OR REPLACE FUNCTION replace_actuals_windows(p_windows jsonb)
+RETURNS TABLE (
+    window_index integer,
+    added integer,
+    changed integer,
+    unchanged integer,
+    deleted integer
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    w record;
+BEGIN
+    FOR w IN
+        SELECT e.value, (e.ord - 1)::integer AS idx
+        FROM jsonb_array_elements(p_windows) WITH ORDINALITY AS e(value, ord)
+        ORDER BY e.ord
+    LOOP
+        RETURN QUERY
+        SELECT w.idx, r.added, r.changed, r.unchanged, r.deleted
+        FROM replace_actuals_window(
+            w.value->>'table',
+            (w.value->>'asp_id')::uuid,
+            (w.value->>'media_id')::uuid,
+            (w.value->>'start_date')::date,
+            (w.value->>'end_date')::date,
+            COALESCE(w.value->'records', '[]'::jsonb)
+        ) AS r;
+    END LOOP;
+END;
+$$;
+
+COMMENT ON FUNCTION replace_actuals_windows(jsonb) IS
+'Replace several daily_actuals/actuals windows atomically (see replace_actuals_window); returns one row of counts per window';
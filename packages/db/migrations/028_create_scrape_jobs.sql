@@ -0,0 +1,214 @@
+-- Job queue for distributed scraper runs
+-- The scheduler enqueues one job per (asp_id, media_id, job_type). A job has no
+-- date window of its own: the scraper fetches its current period when the job runs.
+-- Any number of workers, on any machine, claim jobs with FOR UPDATE SKIP LOCKED,
+-- so two workers never run the same job. A claimed job is leased to its worker.
+-- The worker extends the lease with heartbeats. A job whose lease expires
+-- (worker crashed or lost its connection) is queued again, or failed once its
+-- attempts are used up.
+--
+-- Workers go through the functions below, using PostgREST RPC or plain SQL.
+-- They never update the table directly.
+
+CREATE TABLE IF NOT EXISTS scrape_jobs (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  asp_id UUID NOT NULL REFERENCES asps(id) ON DELETE CASCADE,
+  media_id UUID NOT NULL REFERENCES media(id) ON DELETE CASCADE,
+  job_type TEXT NOT NULL CHECK (job_type IN ('daily', 'monthly')),
+  status TEXT NOT NULL DEFAULT 'queued'
+    CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+  priority INTEGER NOT NULL DEFAULT 0,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  max_attempts INTEGER NOT NULL DEFAULT 3,
+  run_after TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  worker_id TEXT,
+  lease_expires_at TIMESTAMPTZ,
+  heartbeat_at TIMESTAMPTZ,
+  last_error TEXT,
+  result JSONB,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- At most one open job per target (enqueue is idempotent)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_scrape_jobs_open_target
+  ON scrape_jobs (asp_id, media_id, job_type)
+  WHERE status IN ('queued', 'running');
+
+-- Claim order and expired-lease scan
+CREATE INDEX IF NOT EXISTS idx_scrape_jobs_queue
+  ON scrape_jobs (priority DESC, created_at)
+  WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS idx_scrape_jobs_lease
+  ON scrape_jobs (lease_expires_at)
+  WHERE status = 'running';
+
+ALTER TABLE scrape_jobs ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow anon read access to scrape_jobs" ON scrape_jobs
+  FOR SELECT TO anon, authenticated USING (true);
+
+CREATE POLICY "Allow service role full access to scrape_jobs" ON scrape_jobs
+  FOR ALL TO service_role USING (true);
+
+CREATE OR REPLACE FUNCTION update_scrape_jobs_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.updated_at = NOW();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_update_scrape_jobs_updated_at
+  BEFORE UPDATE ON scrape_jobs
+  FOR EACH ROW
+  EXECUTE FUNCTION update_scrape_jobs_updated_at();
+
+-- Enqueue jobs, skipping targets that already have an open job.
+-- p_jobs is a JSON array of
+--   {"asp_id", "media_id", "job_type", "priority"?, "max_attempts"?, "run_after"?}
+-- Returns the jobs that were actually created.
+CREATE OR REPLACE FUNCTION enqueue_scrape_jobs(p_jobs jsonb)
+RETURNS SETOF scrape_jobs
+LANGUAGE sql
+AS $$
+  INSERT INTO scrape_jobs (
+    asp_id, media_id, job_type, priority, max_attempts, run_after
+  )
+  SELECT
+    (j->>'asp_id')::uuid,
+    (j->>'media_id')::uuid,
+    j->>'job_type',
+    COALESCE((j->>'priority')::integer, 0),
+    COALESCE((j->>'max_attempts')::integer, 3),
+    COALESCE((j->>'run_after')::timestamptz, NOW())
+  FROM jsonb_array_elements(p_jobs) AS j
+  ON CONFLICT (asp_id, media_id, job_type)
+    WHERE status IN ('queued', 'running')
+    DO NOTHING
+  RETURNING *;
+$$;
+
+-- Return jobs whose lease expired to the queue (or fail them when no attempts are left).
+-- Returns the number of jobs touched.
+CREATE OR REPLACE FUNCTION requeue_expired_scrape_jobs()
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  touched integer;
+BEGIN
+  WITH expired AS (
+    SELECT id FROM scrape_jobs
+    WHERE status = 'running' AND lease_expires_at < NOW()
+    FOR UPDATE SKIP LOCKED
+  )
+  UPDATE scrape_jobs j
+  SET
+    status = CASE WHEN j.attempts >= j.max_attempts THEN 'failed' ELSE 'queued' END,
+    last_error = COALESCE(j.last_error || E'\n', '')
+      || 'lease expired (worker ' || COALESCE(j.worker_id, '?') || ')',
+    worker_id = NULL,
+    lease_expires_at = NULL
+  FROM expired
+  WHERE j.id = expired.id;
+
+  GET DIAGNOSTICS touched = ROW_COUNT;
+  RETURN touched;
+END;
+$$;
+
+-- Claim up to p_limit due jobs for a worker and lease them for p_lease_seconds.
+-- Concurrent callers skip rows another transaction has locked, so every job is
+-- handed to exactly one worker.
+CREATE OR REPLACE FUNCTION claim_scrape_jobs(
+  p_worker_id text,
+  p_limit integer DEFAULT 1,
+  p_lease_seconds integer DEFAULT 300
+)
+RETURNS SETOF scrape_jobs
+LANGUAGE sql
+AS $$
+  SELECT requeue_expired_scrape_jobs();
+
+  WITH picked AS (
+    SELECT id FROM scrape_jobs
+    WHERE status = 'queued' AND run_after <= NOW()
+    ORDER BY priority DESC, created_at
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  UPDATE scrape_jobs j
+  SET
+    status = 'running',
+    worker_id = p_worker_id,
+    attempts = j.attempts + 1,
+    heartbeat_at = NOW(),
+    lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+  FROM picked
+  WHERE j.id = picked.id
+  RETURNING j.*;
+$$;
+
+-- Extend the lease of a running job. Returns false when the worker no longer
+-- holds the job (lease expired and requeued, or completed elsewhere); the
+-- worker must then stop without writing a result.
+CREATE OR REPLACE FUNCTION heartbeat_scrape_job(
+  p_job_id uuid,
+  p_worker_id text,
+  p_lease_seconds integer DEFAULT 300
+)
+RETURNS boolean
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  UPDATE scrape_jobs
+  SET heartbeat_at = NOW(),
+      lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+  WHERE id = p_job_id AND worker_id = p_worker_id AND status = 'running';
+  RETURN FOUND;
+END;
+$$;
+
+-- Finish a job. On failure the job is queued again after p_retry_delay_seconds
+-- while attempts remain (p_retry = false fails it at once, e.g. wrong password).
+-- Returns the new status, or NULL if the worker no longer held the job.
+CREATE OR REPLACE FUNCTION complete_scrape_job(
+  p_job_id uuid,
+  p_worker_id text,
+  p_success boolean,
+  p_error text DEFAULT NULL,
+  p_result jsonb DEFAULT NULL,
+  p_retry boolean DEFAULT true,
+  p_retry_delay_seconds integer DEFAULT 300
+)
+RETURNS text
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  new_status text;
+BEGIN
+  UPDATE scrape_jobs
+  SET
+    status = CASE
+      WHEN p_success THEN 'succeeded'
+      WHEN p_retry AND attempts < max_attempts THEN 'queued'
+      ELSE 'failed'
+    END,
+    run_after = CASE
+      WHEN p_success THEN run_after
+      ELSE NOW() + make_interval(secs => p_retry_delay_seconds)
+    END,
+    last_error = CASE WHEN p_success THEN last_error ELSE p_error END,
+    result = p_result,
+    worker_id = NULL,
+    lease_expires_at = NULL
+  WHERE id = p_job_id AND worker_id = p_worker_id AND status = 'running'
+  RETURNING status INTO new_status;
+  RETURN new_status;
+END;
+$$;
+
+COMMENT ON TABLE scrape_jobs IS 'Queue of scraper runs claimed by distributed workers (see claim_scrape_jobs)';
+COMMENT ON COLUMN scrape_jobs.lease_expires_at IS 'Job returns to the queue if the worker does not heartbeat before this time';
+COMMENT ON COLUMN scrape_jobs.attempts IS 'Number of times the job was claimed';
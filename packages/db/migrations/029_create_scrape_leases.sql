@@ -0,0 +1,126 @@
+-- Run-level leases so two runs never scrape the same target at the same time
+-- A daily run that overruns into the next cron fire, or a manual
+-- run_all_scrapers.py started while the scheduler runs, used to scrape the
+-- same (asp, media) twice. The two runs then raced each other's window
+-- replacement.
+--
+-- Before scraping, a run takes the lease for (asp_id, media_id, job_type).
+-- A conflicting run skips the target with status "locked". Leases expire after
+-- their TTL unless renewed, so a crashed run never blocks a target for long.
+-- Current holders are listed in active_scrape_leases.
+
+CREATE TABLE IF NOT EXISTS scrape_leases (
+  asp_id UUID NOT NULL REFERENCES asps(id) ON DELETE CASCADE,
+  media_id UUID NOT NULL REFERENCES media(id) ON DELETE CASCADE,
+  job_type TEXT NOT NULL CHECK (job_type IN ('daily', 'monthly')),
+  holder TEXT NOT NULL,
+  acquired_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  heartbeat_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  expires_at TIMESTAMPTZ NOT NULL,
+  metadata JSONB DEFAULT '{}'::jsonb,
+  PRIMARY KEY (asp_id, media_id, job_type)
+);
+
+ALTER TABLE scrape_leases ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow anon read access to scrape_leases" ON scrape_leases
+  FOR SELECT TO anon, authenticated USING (true);
+
+CREATE POLICY "Allow service role full access to scrape_leases" ON scrape_leases
+  FOR ALL TO service_role USING (true);
+
+-- Take the lease, or take over an expired one (re-acquiring an own lease renews it).
+-- Returns one row: acquired, and the holder and expiry of the lease as it is now.
+CREATE OR REPLACE FUNCTION acquire_scrape_lease(
+  p_asp_id uuid,
+  p_media_id uuid,
+  p_job_type text,
+  p_holder text,
+  p_ttl_seconds integer DEFAULT 900,
+  p_metadata jsonb DEFAULT '{}'::jsonb
+)
+RETURNS TABLE (acquired boolean, holder text, expires_at timestamptz)
+LANGUAGE sql
+AS $$
+  WITH taken AS (
+    INSERT INTO scrape_leases AS l (asp_id, media_id, job_type, holder, expires_at, metadata)
+    VALUES (
+      p_asp_id, p_media_id, p_job_type, p_holder,
+      NOW() + make_interval(secs => p_ttl_seconds), p_metadata
+    )
+    ON CONFLICT (asp_id, media_id, job_type) DO UPDATE
+      SET holder = EXCLUDED.holder,
+          acquired_at = CASE WHEN l.holder = EXCLUDED.holder THEN l.acquired_at ELSE NOW() END,
+          heartbeat_at = NOW(),
+          expires_at = EXCLUDED.expires_at,
+          metadata = EXCLUDED.metadata
+      WHERE l.expires_at < NOW() OR l.holder = EXCLUDED.holder
+    RETURNING l.holder, l.expires_at
+  )
+  SELECT true, t.holder, t.expires_at FROM taken t
+  UNION ALL
+  SELECT false, l.holder, l.expires_at
+  FROM scrape_leases l
+  WHERE l.asp_id = p_asp_id AND l.media_id = p_media_id AND l.job_type = p_job_type
+    AND NOT EXISTS (SELECT 1 FROM taken);
+$$;
+
+-- Extend a held lease. Returns false if the holder lost it (expired and taken over).
+CREATE OR REPLACE FUNCTION renew_scrape_lease(
+  p_asp_id uuid,
+  p_media_id uuid,
+  p_job_type text,
+  p_holder text,
+  p_ttl_seconds integer DEFAULT 900
+)
+RETURNS boolean
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  UPDATE scrape_leases
+  SET heartbeat_at = NOW(),
+      expires_at = NOW() + make_interval(secs => p_ttl_seconds)
+  WHERE asp_id = p_asp_id AND media_id = p_media_id AND job_type = p_job_type
+    AND holder = p_holder;
+  RETURN FOUND;
+END;
+$$;
+
+-- Release a lease (only by its holder).
+CREATE OR REPLACE FUNCTION release_scrape_lease(
+  p_asp_id uuid,
+  p_media_id uuid,
+  p_job_type text,
+  p_holder text
+)
+RETURNS boolean
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  DELETE FROM scrape_leases
+  WHERE asp_id = p_asp_id AND media_id = p_media_id AND job_type = p_job_type
+    AND holder = p_holder;
+  RETURN FOUND;
+END;
+$$;
+
+-- Who is scraping what right now
+CREATE OR REPLACE VIEW active_scrape_leases AS
+SELECT
+  l.asp_id,
+  a.name AS asp_name,
+  l.media_id,
+  m.name AS media_name,
+  l.job_type,
+  l.holder,
+  l.acquired_at,
+  l.heartbeat_at,
+  l.expires_at,
+  l.metadata
+FROM scrape_leases l
+LEFT JOIN asps a ON a.id = l.asp_id
+LEFT JOIN media m ON m.id = l.media_id
+WHERE l.expires_at >= NOW();
+
+COMMENT ON TABLE scrape_leases IS 'Run-level leases per (asp_id, media_id, job_type); conflicting runs skip the target';
+COMMENT ON COLUMN scrape_leases.holder IS 'host:pid:suffix of the run holding the lease';